@@ -14,6 +14,8 @@ from .file_cache.cache_utils import (
     clear_executor_log,
     clear_oldest_cache_entries,
     format_cache_size,
+    set_cache_budget,
+    enforce_cache_budget,
 )
 
 
@@ -31,6 +31,7 @@ from .dataflow.dataflow import CustomizableDataflow
 from .dataflow.dataflow_extras import (Sampling, exception_protect)
 from .dataflow.styling_core import (ComponentConfig, DFViewerConfig, DisplayArgs, OverrideColumnConfig, PinnedRowConfig, StylingAnalysis, merge_column_config, EMPTY_DFVIEWER_CONFIG)
 from .dataflow.autocleaning import PandasAutocleaning
+from .infinite_cache import SliceCache, adjacent_windows
 from pathlib import Path
 
 logger = logging.getLogger()
@@ -366,7 +367,12 @@ class BuckarooInfiniteWidget(BuckarooWidget):
                          extra_grid_config, component_config, init_sd,
                          skip_main_serial=True, record_transcript=record_transcript)
 
+        # encoded windows, served again on scroll back and prefetched around each request
+        self._slice_cache = SliceCache()
+        self._reset_window_caches()
+
         def widget_tuple_args_bridge(change_unused):
+            self._reset_window_caches()
             self._handle_widget_change(change_unused)
         self.dataflow.observe(widget_tuple_args_bridge, "widget_args_tuple")
         def payload_bridge(_unused_self, msg, _unused_buffers):
@@ -376,6 +382,22 @@ class BuckarooInfiniteWidget(BuckarooWidget):
 
         self.on_msg(payload_bridge)
 
+    def _reset_window_caches(self):
+        """processed_df changed, windows encoded from the old one are stale"""
+        self._slice_cache.clear()
+        self._sorted_df = (None, None)
+        self._indexed_df = None
+        self._last_window_start = None
+
+    def _sort_frame(self, processed_df, sort_column, ascending):
+        return processed_df.sort_values(by=[sort_column], ascending=ascending)
+
+    def _index_frame(self, processed_df):
+        return processed_df
+
+    def _to_parquet(self, df):
+        return to_parquet(df)
+
     def _handle_payload_args(self, new_payload_args):
         start, end = new_payload_args['start'], new_payload_args['end']
         _unused, processed_df, merged_sd = self.dataflow.widget_args_tuple
@@ -384,29 +406,41 @@ class BuckarooInfiniteWidget(BuckarooWidget):
 
         try:
             sort = new_payload_args.get('sort')
+            sort_key = (sort, new_payload_args.get('sort_direction') if sort else None)
             if sort:
-                sort_dir = new_payload_args.get('sort_direction')
-                ascending = sort_dir == 'asc'
-                processed_sd = self.dataflow.widget_args_tuple[2]
-                converted_sort_column = processed_sd[sort]['orig_col_name']
-                sorted_df = processed_df.sort_values(by=[converted_sort_column], ascending=ascending)
-                slice_df = sorted_df[start:end]
-                self.send({ "type": "infinite_resp", 'key':new_payload_args, 'data':[], 'length':len(processed_df)}, [to_parquet(slice_df)])
+                if self._sorted_df[0] != sort_key:
+                    ascending = sort_key[1] == 'asc'
+                    converted_sort_column = merged_sd[sort]['orig_col_name']
+                    # sorted once per sort state, every window of it slices the same frame
+                    self._sorted_df = (sort_key, self._sort_frame(processed_df, converted_sort_column, ascending))
+                window_df = self._sorted_df[1]
             else:
-                slice_df = processed_df[start:end]
-                self.send({ "type": "infinite_resp", 'key':new_payload_args,
-                            'data': [], 'length':len(processed_df)}, [to_parquet(slice_df) ])
-    
-                second_pa = new_payload_args.get('second_request')
-                if not second_pa:
-                    return
-                
+                if self._indexed_df is None:
+                    # indexed once per processed_df, not on every scroll
+                    self._indexed_df = self._index_frame(processed_df)
+                window_df = self._indexed_df
+            total = len(processed_df)
+
+            def window(w_start, w_end):
+                return sort_key + (w_start, w_end), lambda: self._to_parquet(window_df[w_start:w_end])
+
+            self.send({ "type": "infinite_resp", 'key':new_payload_args,
+                        'data': [], 'length':total}, [self._slice_cache.get(*window(start, end))])
+
+            second_pa = new_payload_args.get('second_request')
+            if second_pa and not sort:
                 extra_start, extra_end = second_pa.get('start'), second_pa.get('end')
-                extra_df = processed_df[extra_start:extra_end]
                 self.send(
-                    {"type": "infinite_resp", 'key':second_pa, 'data':[], 'length':len(processed_df)},
-                    [to_parquet(extra_df)]
+                    {"type": "infinite_resp", 'key':second_pa, 'data':[], 'length':total},
+                    [self._slice_cache.get(*window(extra_start, extra_end))]
                 )
+
+            # the grid asks for blocks of origEnd - start rows, encode the neighbouring blocks ahead of time
+            step = (new_payload_args.get('origEnd') or end) - start
+            self._slice_cache.prefetch([
+                window(w_start, w_end)
+                for w_start, w_end in adjacent_windows(start, end, step, total, self._last_window_start)])
+            self._last_window_start = start
         except Exception as e:
             logger.error(e)
             stack_trace = traceback.format_exc()
@@ -185,6 +185,26 @@ def normalize_polars_histogram_ser(ser):
              'normalized_populations': norm_counts.to_list()}
 
 
+# normalize_polars_histogram_ser as expressions, so histograms for every
+# numeric column come out of the same lazy query as the other select_clauses
+HIST_NUMERIC = cs.by_dtype(NUMERIC_POLARS_DTYPES)
+HIST_MEAT = HIST_NUMERIC.filter((HIST_NUMERIC.quantile(.01) < HIST_NUMERIC) & (HIST_NUMERIC < HIST_NUMERIC.quantile(.99)))
+
+
+def histogram_args_from_aggregates(low_tail, high_tail, meat_hist):
+    """histogram_args from the histogram_low_tail/high_tail/meat select results"""
+    if meat_hist is None or len(meat_hist) == 0 or sum(b['count'] for b in meat_hist) == 0:
+        return { 'low_tail': low_tail, 'high_tail':high_tail,
+                 'meat_histogram': [[],[]], 'normalized_populations': []}
+    edges = [b['breakpoint'] for b in meat_hist]
+    edges[0], edges[-1] = low_tail, high_tail
+    counts = [b['count'] for b in meat_hist][1:]
+    total = sum(counts)
+    return { 'low_tail': low_tail, 'high_tail':high_tail,
+             'meat_histogram': (counts, edges),
+             'normalized_populations': [c/total for c in counts] if total else [0.0] * len(counts)}
+
+
 def categorical_dict_from_vc(vc_ser, top_n_positions=7) -> Dict[str, int]:
     temp_df = pl.DataFrame({'vc': vc_ser.explode()}).unnest('vc')
     regular_col_vc_df = temp_df.select(pl.all().exclude('count').alias('key'), pl.col('count'))
@@ -230,10 +250,86 @@ def categorical_histogram_from_cd(cd, nan_per):
         histogram.append(nan_observation)
     return histogram
 
+def histogram_from_summary(summary_dict):
+    if len(summary_dict.keys()) == 0:
+        return {}
+    #FIXME
+    vc = summary_dict.get('value_counts')
+    if vc is None or (hasattr(vc, 'len') and vc.len() == 0):
+        # Return empty defaults if value_counts is missing or empty
+        return {}
+    
+    # Check if value_counts is the default error value_counts
+    # The default is: pl.Series("", [{'a': 'error', 'count': 1}], dtype=pl.Struct({'a': pl.String, 'count': pl.UInt32}))
+    # We need to check both the structure and that it's the exact default (name is empty string "")
+    try:
+        if hasattr(vc, 'name') and vc.name == "" and hasattr(vc, 'explode'):
+            vc_exploded = vc.explode()
+            if len(vc_exploded) == 1:
+                vc_dict = vc_exploded[0]
+                if isinstance(vc_dict, dict) and vc_dict.get('a') == 'error' and vc_dict.get('count') == 1:
+                    # This is the default error value_counts, not real data
+                    return {}
+    except Exception:
+        pass  # If we can't check, proceed with normal processing
+    
+    try:
+        cd = categorical_dict_from_vc(vc)
+    except Exception:
+        # If categorical_dict_from_vc fails, return empty defaults
+        return {}
+    
+    is_numeric = summary_dict.get('is_numeric', False)
+    # nan_per should be a percentage (0-1), computed by ComputedDefaultSummaryStats
+    # If not available, compute from null_count/length if possible, otherwise default to 0.0
+    nan_per = summary_dict.get('nan_per', 0.0)
+    if nan_per == 0.0 and 'null_count' in summary_dict and 'length' in summary_dict:
+        length = summary_dict.get('length', 1)
+        if length > 0:
+            nan_per = summary_dict.get('null_count', 0.0) / length
+    
+    # Prefer numeric histograms when:
+    #   - the column is numeric, and
+    #   - value_counts indicates many distinct values (> 5), and
+    #   - histogram_args is present
+    if is_numeric:
+        try:
+            vc_exploded_len = len(vc.explode()) if vc is not None else 0
+        except Exception:
+            vc_exploded_len = 0
+        
+        histogram_args = summary_dict.get('histogram_args')
+        if histogram_args and vc_exploded_len > 5:
+            if histogram_args and isinstance(histogram_args, dict):
+                meat_histogram = histogram_args.get('meat_histogram')
+                # meat_histogram is a tuple (counts, edges) from normalize_polars_histogram_ser
+                if meat_histogram and isinstance(meat_histogram, (list, tuple)) and len(meat_histogram) == 2:
+                    min_ = summary_dict.get('min')
+                    max_ = summary_dict.get('max')
+                    nan_per = summary_dict.get('nan_per', nan_per)
+                    if min_ is not None and max_ is not None:
+                        try:
+                            temp_histo = numeric_histogram(histogram_args, min_, max_, nan_per)
+                            if len(temp_histo) > 5:
+                                # if we had basically a categorical variable encoded into an integer.. don't return it
+                                return {
+                                    'histogram': temp_histo,
+                                    'histogram_bins': meat_histogram[1],
+                                }
+                        except Exception:
+                            pass  # Fall through to categorical histogram
+    
+    return {'categorical_histogram': cd, 'histogram' : categorical_histogram_from_cd(cd, nan_per),
+            'histogram_bins': ['faked']
+            }
+
+
 class HistogramAnalysis(PolarsAnalysis):
 
-    column_ops = {
-        'histogram_args': (NUMERIC_POLARS_DTYPES, normalize_polars_histogram_ser)}
+    select_clauses = [
+        HIST_NUMERIC.quantile(.01).name.map(json_postfix('histogram_low_tail')),
+        HIST_NUMERIC.quantile(.99).name.map(json_postfix('histogram_high_tail')),
+        HIST_MEAT.hist(bin_count=10, include_breakpoint=True).implode().name.map(json_postfix('histogram_meat'))]
 
     requires_summary = ['min', 'max', 'value_counts', 'length', 'unique_count', 'is_numeric', 'nan_per',
                         'null_count',
@@ -242,77 +338,15 @@ class HistogramAnalysis(PolarsAnalysis):
 
     @staticmethod
     def computed_summary(summary_dict):
-        if len(summary_dict.keys()) == 0:
-            return {}
-        #FIXME
-        vc = summary_dict.get('value_counts')
-        if vc is None or (hasattr(vc, 'len') and vc.len() == 0):
-            # Return empty defaults if value_counts is missing or empty
-            return {}
-        
-        # Check if value_counts is the default error value_counts
-        # The default is: pl.Series("", [{'a': 'error', 'count': 1}], dtype=pl.Struct({'a': pl.String, 'count': pl.UInt32}))
-        # We need to check both the structure and that it's the exact default (name is empty string "")
-        try:
-            if hasattr(vc, 'name') and vc.name == "" and hasattr(vc, 'explode'):
-                vc_exploded = vc.explode()
-                if len(vc_exploded) == 1:
-                    vc_dict = vc_exploded[0]
-                    if isinstance(vc_dict, dict) and vc_dict.get('a') == 'error' and vc_dict.get('count') == 1:
-                        # This is the default error value_counts, not real data
-                        return {}
-        except Exception:
-            pass  # If we can't check, proceed with normal processing
-        
-        try:
-            cd = categorical_dict_from_vc(vc)
-        except Exception:
-            # If categorical_dict_from_vc fails, return empty defaults
-            return {}
-        
-        is_numeric = summary_dict.get('is_numeric', False)
-        # nan_per should be a percentage (0-1), computed by ComputedDefaultSummaryStats
-        # If not available, compute from null_count/length if possible, otherwise default to 0.0
-        nan_per = summary_dict.get('nan_per', 0.0)
-        if nan_per == 0.0 and 'null_count' in summary_dict and 'length' in summary_dict:
-            length = summary_dict.get('length', 1)
-            if length > 0:
-                nan_per = summary_dict.get('null_count', 0.0) / length
-        
-        # Prefer numeric histograms when:
-        #   - the column is numeric, and
-        #   - value_counts indicates many distinct values (> 5), and
-        #   - histogram_args is present
-        if is_numeric:
-            try:
-                vc_exploded_len = len(vc.explode()) if vc is not None else 0
-            except Exception:
-                vc_exploded_len = 0
-            
-            histogram_args = summary_dict.get('histogram_args')
-            if histogram_args and vc_exploded_len > 5:
-                if histogram_args and isinstance(histogram_args, dict):
-                    meat_histogram = histogram_args.get('meat_histogram')
-                    # meat_histogram is a tuple (counts, edges) from normalize_polars_histogram_ser
-                    if meat_histogram and isinstance(meat_histogram, (list, tuple)) and len(meat_histogram) == 2:
-                        min_ = summary_dict.get('min')
-                        max_ = summary_dict.get('max')
-                        nan_per = summary_dict.get('nan_per', nan_per)
-                        if min_ is not None and max_ is not None:
-                            try:
-                                temp_histo = numeric_histogram(histogram_args, min_, max_, nan_per)
-                                if len(temp_histo) > 5:
-                                    # if we had basically a categorical variable encoded into an integer.. don't return it
-                                    return {
-                                        'histogram': temp_histo,
-                                        'histogram_bins': meat_histogram[1],
-                                    }
-                            except Exception:
-                                pass  # Fall through to categorical histogram
-        
-        return {'categorical_histogram': cd, 'histogram' : categorical_histogram_from_cd(cd, nan_per),
-                'histogram_bins': ['faked']
-                }
+        res = {}
+        if 'histogram_args' not in summary_dict and 'histogram_meat' in summary_dict:
+            meat = summary_dict['histogram_meat']
+            res['histogram_args'] = histogram_args_from_aggregates(
+                summary_dict.get('histogram_low_tail'), summary_dict.get('histogram_high_tail'),
+                meat.to_list() if isinstance(meat, pl.Series) else meat)
+            summary_dict = dict(summary_dict, **res)
+        res.update(histogram_from_summary(summary_dict))
+        return res
 
 class PLCleaningStats(PolarsAnalysis):
     requires_summary = ['value_counts', 'length']
@@ -0,0 +1,210 @@
+"""
+Sketch backed analyses for billion row inputs.
+
+BasicAnalysis and VCAnalysis compute exact unique counts, medians and
+value_counts, which need memory proportional to the number of distinct
+values and can't be combined across chunks.  The analyses here keep a
+bounded size sketch per column instead (see sketches.py) and derive
+distinct_count, median/quartiles and the most frequent values from it.
+
+Sketch states are plain strings in the summary (hll_state, kll_state,
+topk_state) and have merge rules registered with mergeable_stats, so
+Executor can merge them across dataset pieces.
+
+Use PL_Sketch_Analysis_Klasses in place of PL_Analysis_Klasses:
+
+    LazyInfinitePolarsBuckarooWidget(ldf, analysis_klasses=PL_Sketch_Analysis_Klasses)
+"""
+from typing import Any, Optional
+
+import polars as pl
+from polars import functions as F
+import polars.selectors as cs
+
+from buckaroo.customizations.polars_analysis import (
+    NOT_STRUCTS, PlTyping, HistogramAnalysis, normalize_polars_histogram_ser)
+from buckaroo.customizations.histogram import numeric_histogram
+from buckaroo.customizations.sketches import HyperLogLog, KLLSketch, MisraGries
+from buckaroo.file_cache.mergeable_stats import register_stat_deriver, register_stat_merger
+from buckaroo.pluggable_analysis_framework.polars_analysis_management import PolarsAnalysis
+from buckaroo.pluggable_analysis_framework.polars_utils import NUMERIC_POLARS_DTYPES
+from buckaroo.pluggable_analysis_framework.utils import json_postfix
+
+FREQ_KEYS = ['most_freq', '2nd_freq', '3rd_freq', '4th_freq', '5th_freq']
+QUANTILE_KEYS = {'quantile_25': 0.25, 'median': 0.5, 'quantile_75': 0.75}
+
+
+# column_ops run over all matching columns inside one try block, a column
+# that can't be sketched (e.g. nested types) gets None instead of failing the rest
+def hll_state(ser: pl.Series) -> Optional[str]:
+    try:
+        return HyperLogLog.from_series(ser).to_state()
+    except Exception:
+        return None
+
+
+def kll_state(ser: pl.Series) -> Optional[str]:
+    try:
+        return KLLSketch.from_series(ser).to_state()
+    except Exception:
+        return None
+
+
+def topk_state(ser: pl.Series) -> Optional[str]:
+    try:
+        return MisraGries.from_series(ser).to_state()
+    except Exception:
+        return None
+
+
+class SketchBasicAnalysis(PolarsAnalysis):
+    """The streaming friendly part of BasicAnalysis, everything here is O(1) memory per column."""
+    provides_defaults = {'length':0, 'min':0, 'max':0, 'mean':0, 'std':0,
+                         'empty_count':0, 'null_count':0, 'non_null_count':0}
+
+    select_clauses = [
+        F.all().len().name.map(json_postfix('length')),
+        F.all().null_count().name.map(json_postfix('null_count')),
+        NOT_STRUCTS.min().name.map(json_postfix('min')),
+        NOT_STRUCTS.max().name.map(json_postfix('max')),
+        NOT_STRUCTS.mean().name.map(json_postfix('mean')),
+        cs.numeric().std().name.map(json_postfix('std')),
+        F.col(pl.Utf8).str.count_matches("^$").sum().name.map(json_postfix('empty_count')),
+        (NOT_STRUCTS.len() - NOT_STRUCTS.null_count()).name.map(json_postfix('non_null_count'))
+        ]
+
+
+class HLLDistinctAnalysis(PolarsAnalysis):
+    column_ops = {'hll_state': ("all", hll_state)}
+    provides_defaults = {'distinct_count': 0}
+
+    @staticmethod
+    def computed_summary(summary_dict):
+        state = summary_dict.get('hll_state')
+        if not isinstance(state, str):
+            return {}
+        return {'distinct_count': HyperLogLog.from_state(state).estimate()}
+
+
+class KLLQuantileAnalysis(PolarsAnalysis):
+    column_ops = {'kll_state': (NUMERIC_POLARS_DTYPES, kll_state)}
+    provides_defaults = {k: 0 for k in QUANTILE_KEYS}
+
+    @staticmethod
+    def computed_summary(summary_dict):
+        state = summary_dict.get('kll_state')
+        if not isinstance(state, str):
+            return {}
+        sketch = KLLSketch.from_state(state)
+        return {k: sketch.quantile(q) for k, q in QUANTILE_KEYS.items()}
+
+
+def _freqs_from_topk(mg: MisraGries) -> dict[str, Any]:
+    top = mg.top(len(FREQ_KEYS))
+    res: dict[str, Any] = {k: (top[i][0] if i < len(top) else None) for i, k in enumerate(FREQ_KEYS)}
+    res['mode'] = res['most_freq']
+    return res
+
+
+class TopKAnalysis(PolarsAnalysis):
+    """
+    Most frequent values from a Misra-Gries sketch.  value_counts holds the
+    sketch's counters, counts are lower bounds and values rarer than
+    n / (k + 1) are missing.
+    """
+    column_ops = {'topk_state': ("all", topk_state)}
+    provides_defaults = dict({k: None for k in FREQ_KEYS}, mode=None)
+
+    @staticmethod
+    def computed_summary(summary_dict):
+        state = summary_dict.get('topk_state')
+        if not isinstance(state, str):
+            return {}
+        mg = MisraGries.from_state(state)
+        res = _freqs_from_topk(mg)
+        top = mg.top()
+        if top:
+            try:
+                res['value_counts'] = pl.Series(
+                    "value_counts", [{'value': v, 'count': c} for v, c in top])
+            except Exception:
+                # mixed value types can't share a struct field
+                pass
+        return res
+
+
+class SketchComputedSummaryStats(PolarsAnalysis):
+    requires_summary = ['length', 'distinct_count', 'empty_count', 'null_count']
+    provides_defaults = dict(distinct_per=0, empty_per=0, nan_per=0)
+
+    @staticmethod
+    def computed_summary(summary_dict):
+        len_ = summary_dict['length']
+        if not len_:
+            # an empty column, or an empty piece of a dataset
+            return dict(distinct_per=0, empty_per=0, nan_per=0)
+        return dict(
+            distinct_per=summary_dict['distinct_count']/len_,
+            empty_per=summary_dict.get('empty_count',0)/len_,
+            nan_per=summary_dict['null_count']/len_)
+
+
+class SketchHistogramAnalysis(HistogramAnalysis):
+    """
+    HistogramAnalysis driven by the approximate value_counts from
+    TopKAnalysis.  A high cardinality numeric column has no heavy hitters
+    and so no value_counts, distinct_count decides between the numeric
+    and categorical histogram instead.
+
+    histogram_args stay a column_op, the quantiles HistogramAnalysis
+    selects aren't streamable so StreamingPAFColumnExecutor computes them
+    on a sample.
+    """
+    select_clauses = []
+    column_ops = {
+        'histogram_args': (NUMERIC_POLARS_DTYPES, normalize_polars_histogram_ser)}
+    requires_summary = ['min', 'max', 'value_counts', 'length', 'is_numeric', 'nan_per',
+                        'null_count', 'distinct_count']
+
+    @staticmethod
+    def computed_summary(summary_dict):
+        histogram_args = summary_dict.get('histogram_args')
+        if (summary_dict.get('is_numeric') and isinstance(histogram_args, dict)
+                and summary_dict.get('distinct_count', 0) > 5):
+            min_, max_ = summary_dict.get('min'), summary_dict.get('max')
+            if min_ is not None and max_ is not None:
+                try:
+                    temp_histo = numeric_histogram(histogram_args, min_, max_, summary_dict.get('nan_per', 0.0))
+                    if len(temp_histo) > 5:
+                        return {'histogram': temp_histo,
+                                'histogram_bins': histogram_args['meat_histogram'][1]}
+                except Exception:
+                    pass
+        return HistogramAnalysis.computed_summary(summary_dict)
+
+
+PL_Sketch_Analysis_Klasses = [SketchBasicAnalysis, HLLDistinctAnalysis, KLLQuantileAnalysis,
+                              TopKAnalysis, PlTyping, SketchComputedSummaryStats,
+                              SketchHistogramAnalysis]
+
+
+# merge rules, so per piece results can be combined (see Executor.execute_pieces)
+def _merge_state(klass):
+    def merger(parts, stat_key):
+        sketch = None
+        for p in parts:
+            if p[stat_key] is None:
+                continue
+            part_sketch = klass.from_state(p[stat_key])
+            sketch = part_sketch if sketch is None else sketch.merge(part_sketch)
+        return sketch.to_state() if sketch is not None else None
+    return merger
+
+
+register_stat_merger('hll_state', _merge_state(HyperLogLog))
+register_stat_merger('kll_state', _merge_state(KLLSketch))
+register_stat_merger('topk_state', _merge_state(MisraGries))
+# distinct_count, quantiles and frequencies are recomputed from the merged states
+register_stat_deriver(HLLDistinctAnalysis.computed_summary)
+register_stat_deriver(KLLQuantileAnalysis.computed_summary)
+register_stat_deriver(TopKAnalysis.computed_summary)
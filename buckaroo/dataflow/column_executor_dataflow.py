@@ -16,9 +16,11 @@ from .styling_core import merge_sds
 from buckaroo.df_util import old_col_new_col
 from buckaroo.pluggable_analysis_framework.polars_analysis_management import PolarsAnalysis
 from buckaroo.customizations.polars_analysis import PL_Analysis_Klasses
-from buckaroo.file_cache.base import FileCache, ProgressNotification, ProgressListener, Executor, SimpleExecutorLog, ColumnExecutor as ColumnExecutorBase, MaybeFilepathLike
+from buckaroo.file_cache.base import FileCache, ProgressNotification, ProgressListener, Executor, SimpleExecutorLog, ColumnExecutor as ColumnExecutorBase, MaybeFilepathLike, dataset_pieces
+from buckaroo.file_cache.cached_summary import CACHED_SUMMARY_CHUNK, CachedSummary
 from buckaroo.file_cache.multiprocessing_executor import MultiprocessingExecutor
 from buckaroo.file_cache.paf_column_executor import PAFColumnExecutor
+from buckaroo.file_cache.parquet_footer import footer_stats_for_lazyframe
 from .abc_dataflow import ABCDataflow
 from buckaroo.serialization_utils import pd_to_obj
 
@@ -70,8 +72,11 @@ class ColumnExecutorDataflow(ABCDataflow):
     cleaned_sd = TAny({})
     processed_sd = TAny({})
     merged_sd = TAny({})
-    # Optional callback to stream progress summary updates
+    # Optional callback to stream progress summary updates, called with the
+    # merged_sd entries of just the columns a column group changed
     progress_update_callback: Optional[Callable[[Dict[str, Dict[str, Any]]], None]] = None
+    # Optional callback for when the executor's run is over, no more updates follow
+    progress_done_callback: Optional[Callable[[], None]] = None
 
     # Analysis classes (extendable, like CustomizableDataflow)
     analysis_klasses: List[Type[PolarsAnalysis]] = PL_Analysis_Klasses.copy()
@@ -89,6 +94,10 @@ class ColumnExecutorDataflow(ABCDataflow):
         self._column_executor_class: Type[ColumnExecutorBase] = column_executor_class or self.ColumnExecutorKlass
         self._executor_class: Type[Executor] = executor_class or Executor
         self.executor_log = executor_log or SimpleExecutorLog()
+        # the executor of the latest compute_summary_with_executor call, and the
+        # columns it should compute first (the widget's visible columns)
+        self.executor: Optional[Executor] = None
+        self.priority_columns: List[str] = []
         self._initialize_df_meta()
         self.widget_args_tuple = (id(None), None, self.merged_sd)
 
@@ -117,6 +126,20 @@ class ColumnExecutorDataflow(ABCDataflow):
         existing[analysis_klass.cname()] = analysis_klass
         self.analysis_klasses = list(existing.values())
 
+    def set_priority_columns(self, columns: List[str]) -> None:
+        """
+        Compute summary stats for columns (original names) ahead of the
+        rest.  Applies to the running executor and to later recomputes.
+        """
+        self.priority_columns = list(columns)
+        if self.executor is not None:
+            self.executor.set_priority_columns(self.priority_columns)
+
+    def cancel(self) -> None:
+        """Stop the running executor, if any.  Its results are no longer wanted."""
+        if self.executor is not None:
+            self.executor.cancel()
+
     # Implement abstract method with local naming to match ABC
     def populate_df_meta(self) -> None:
         self._initialize_df_meta()
@@ -151,39 +174,9 @@ class ColumnExecutorDataflow(ABCDataflow):
         if cached_merged_sd_for_executor is None and file_path and fc:
             file_path_obj = Path(file_path)
             if fc.check_file(file_path_obj):
-                md = fc.get_file_metadata(file_path_obj)
-                if md and 'merged_sd' in md:
-                    full_cached_merged_sd = md.get('merged_sd', {})
-                    logger.info(f"ColumnExecutorDataflow.compute_summary_with_executor: loaded cached_merged_sd with {len(full_cached_merged_sd)} columns from file_path={file_path}")
-                    logger.debug(f"  Full cached columns: {list(full_cached_merged_sd.keys())}")
-                    
-                    # Filter cached data to only include columns that exist in the current LazyFrame
-                    # The cache may contain columns from a different column subset
-                    # Cache entries are keyed by rewritten names from the full dataframe, but we need to
-                    # match by original column names since rewritten names change based on column order
-                    current_orig_cols = set(orig_to_rw.keys())
-                    cached_merged_sd_for_executor = {}
-                    
-                    for cached_rw_col, cached_stats in full_cached_merged_sd.items():
-                        if isinstance(cached_stats, dict):
-                            cached_orig_col = cached_stats.get('orig_col_name')
-                            if cached_orig_col and cached_orig_col in current_orig_cols:
-                                # This column exists in current LazyFrame - map it to its new rewritten name
-                                new_rw_col = orig_to_rw.get(cached_orig_col)
-                                if new_rw_col:
-                                    # Copy the stats and update the rewritten_col_name to match the new mapping
-                                    stats_copy = cached_stats.copy()
-                                    stats_copy['rewritten_col_name'] = new_rw_col
-                                    cached_merged_sd_for_executor[new_rw_col] = stats_copy
-                    
-                    if len(cached_merged_sd_for_executor) < len(full_cached_merged_sd):
-                        filtered_count = len(full_cached_merged_sd) - len(cached_merged_sd_for_executor)
-                        logger.info(f"  Filtered cached data: kept {len(cached_merged_sd_for_executor)}/{len(full_cached_merged_sd)} columns (removed {filtered_count} columns not in current LazyFrame)")
-                        logger.debug(f"  Filtered cached columns: {list(cached_merged_sd_for_executor.keys())}")
-                    else:
-                        logger.info(f"  Using all {len(cached_merged_sd_for_executor)} cached columns")
-                else:
-                    logger.info(f"ColumnExecutorDataflow.compute_summary_with_executor: no merged_sd in cache for file_path={file_path}")
+                # read a chunk of columns at a time as the executor checks them, not every column up front
+                cached_merged_sd_for_executor = CachedSummary(fc, file_path_obj, orig_to_rw)
+                logger.info(f"ColumnExecutorDataflow.compute_summary_with_executor: reading cached_merged_sd lazily from file_path={file_path}")
             else:
                 logger.info(f"ColumnExecutorDataflow.compute_summary_with_executor: file not in cache: {file_path}")
         else:
@@ -192,20 +185,26 @@ class ColumnExecutorDataflow(ABCDataflow):
         logger.info(f"ColumnExecutorDataflow.compute_summary_with_executor: orig_to_rw map has {len(orig_to_rw)} columns: {list(orig_to_rw.keys())[:5]}...")
         
         # Pass cached_merged_sd and orig_to_rw_map to column executor so it can set no_exec flag
-        column_executor = self._column_executor_class(
-            self.analysis_klasses,
+        executor_kwargs: Dict[str, Any] = dict(
             cached_merged_sd=cached_merged_sd_for_executor,
-            orig_to_rw_map=orig_to_rw
-        )
+            orig_to_rw_map=orig_to_rw)
+        if issubclass(self._column_executor_class, PAFColumnExecutor):
+            # row count, null counts and min/max from a parquet footer don't need a scan
+            executor_kwargs['footer_stats'] = footer_stats_for_lazyframe(
+                self.raw_ldf, file_path, list(orig_to_rw.keys()))
+        column_executor = self._column_executor_class(self.analysis_klasses, **executor_kwargs)
 
         # Start with cached merged_sd if available (so skipped columns are included in aggregated_summary)
         # Note: cached_merged_sd_for_executor is already filtered to only include columns in the current LazyFrame
         aggregated_summary: Dict[str, Dict[str, Any]] = {}
-        if cached_merged_sd_for_executor:
-            # Initialize with cached data so skipped columns are preserved
-            for rw_col, cached_stats in cached_merged_sd_for_executor.items():
-                if isinstance(cached_stats, dict):
-                    aggregated_summary[rw_col] = cached_stats.copy()
+        if isinstance(cached_merged_sd_for_executor, CachedSummary):
+            # just the columns shown on open, the rest are read when they're scrolled to
+            initial_cached = cached_merged_sd_for_executor.load(list(orig_to_rw)[:CACHED_SUMMARY_CHUNK])
+        else:
+            initial_cached = cached_merged_sd_for_executor or {}
+        for rw_col, cached_stats in initial_cached.items():
+            if isinstance(cached_stats, dict):
+                aggregated_summary[rw_col] = cached_stats.copy()
 
         dataflow_id = id(self)
         dataflow_pid = os.getpid()
@@ -242,6 +241,7 @@ class ColumnExecutorDataflow(ABCDataflow):
                     entry['__status__'] = 'error'
                 return
             # note.result is ColumnResults: Dict[str, ColumnResult] keyed by ORIGINAL column names
+            changed: Dict[str, Dict[str, Any]] = {}
             for orig_col, col_res in note.result.items():
                 stats = col_res.result or {}
                 rw = orig_to_rw.get(orig_col, orig_col)
@@ -252,39 +252,50 @@ class ColumnExecutorDataflow(ABCDataflow):
                 entry.update(stats)
                 # Remove pending status on successful computation
                 entry.pop('__status__', None)
-            # Stream partial updates via callback and local df_data_dict for consumers
+                changed[rw] = entry
+            # Fold just the changed columns into summary_sd and merged_sd, then
+            # stream them to the callback.  Rebuilding the whole summary per
+            # group made progress quadratic in the number of columns
             try:
+                # replace empty (possibly shared default) dicts before updating in place
+                if not self.summary_sd:
+                    self.summary_sd = {}
+                self.summary_sd.update(changed)
+                if not self.merged_sd:
+                    self.merged_sd = {}
+                cleaned_sd = self.cleaned_sd or {}
+                processed_sd = self.processed_sd or {}
+                merged_delta = merge_sds(
+                    {rw: cleaned_sd[rw] for rw in changed if rw in cleaned_sd},
+                    changed,
+                    {rw: processed_sd[rw] for rw in changed if rw in processed_sd})
+                self.merged_sd.update(merged_delta)
                 if self.progress_update_callback:
-                    # Merge with existing merged_sd so cached columns are preserved
-                    current_merged = self.merged_sd.copy() if self.merged_sd else {}
-                    merged_summary = current_merged.copy()
-                    merged_summary.update(aggregated_summary)
-                    log_msg2 = f"ColumnExecutorDataflow._listener: Calling progress_update_callback - dataflow_id={current_dataflow_id}, pid={current_pid}, thread_id={current_thread_id}, columns_in_summary={len(merged_summary)}, callback_id={id(self.progress_update_callback)}"
+                    log_msg2 = f"ColumnExecutorDataflow._listener: Calling progress_update_callback - dataflow_id={current_dataflow_id}, pid={current_pid}, thread_id={current_thread_id}, columns_in_update={len(merged_delta)}, callback_id={id(self.progress_update_callback)}"
                     logger.info(log_msg2)
-                    self.progress_update_callback(merged_summary)
+                    self.progress_update_callback(merged_delta)
                     log_msg3 = f"ColumnExecutorDataflow._listener: progress_update_callback returned - dataflow_id={current_dataflow_id}, thread_id={current_thread_id}"
                     logger.info(log_msg3)
                 else:
                     log_msg_no_callback = f"ColumnExecutorDataflow._listener: No progress_update_callback set - dataflow_id={current_dataflow_id}, thread_id={current_thread_id}"
                     logger.warning(log_msg_no_callback)
-                # keep local df_data_dict updated too
-                if isinstance(aggregated_summary, dict) and len(aggregated_summary) > 0:
-                    # Merge with existing to preserve cached columns
-                    current_summary = self.summary_sd.copy() if self.summary_sd else {}
-                    current_summary.update(aggregated_summary)
-                    self.summary_sd = current_summary
-                    rows = pd_to_obj(pd.DataFrame(current_summary))
-                    self.df_data_dict = {'main': [], 'all_stats': rows, 'empty': []}
-                    # Update merged_sd as stats come in (important for async executors)
-                    # Merge with existing to preserve any cached columns
-                    current_merged = self.merged_sd.copy() if self.merged_sd else {}
-                    current_merged.update(merge_sds(self.cleaned_sd or {}, self.summary_sd or {}, self.processed_sd or {}))
-                    self.merged_sd = current_merged
             except Exception:
                 # do not interrupt execution on progress update failures
                 pass
 
+        def _on_run_done() -> None:
+            # the full summary is built once per run, not per column group
+            if self.summary_sd:
+                self.df_data_dict = {'main': [], 'all_stats': pd_to_obj(pd.DataFrame(self.summary_sd)), 'empty': []}
+            if self.progress_done_callback:
+                self.progress_done_callback()
+
         listener_id = id(_listener)
+        # a directory file_path is a dataset of files, stats are cached per file
+        # and merged, so re-opening it after new files land only scans those
+        piece_kwargs: Dict[str, Any] = {}
+        if file_path and Path(file_path).is_dir():
+            piece_kwargs['pieces'] = dataset_pieces(Path(file_path))
         # Pass timeout_secs to MultiprocessingExecutor if provided
         # Only pass timeout_secs if it's MultiprocessingExecutor and timeout is provided
         if timeout_secs is not None and issubclass(self._executor_class, MultiprocessingExecutor):
@@ -298,7 +309,8 @@ class ColumnExecutorDataflow(ABCDataflow):
                 timeout_secs=timeout_secs,
                 cached_merged_sd=cached_merged_sd_for_executor,
                 orig_to_rw_map=orig_to_rw,
-                planning_function=planning_function
+                planning_function=planning_function,
+                **piece_kwargs
             )
         else:
             ex = self._executor_class(
@@ -310,26 +322,36 @@ class ColumnExecutorDataflow(ABCDataflow):
                 file_path=file_path,
                 cached_merged_sd=cached_merged_sd_for_executor,
                 orig_to_rw_map=orig_to_rw,
-                planning_function=planning_function
+                planning_function=planning_function,
+                **piece_kwargs
             )
         executor_id = id(ex)
         executor_pid = os.getpid()
         log_msg = f"ColumnExecutorDataflow.compute_summary_with_executor: Executor created - executor_id={executor_id}, executor_class={self._executor_class.__name__}, pid={executor_pid}, dataflow_id={dataflow_id}, dataflow_pid={dataflow_pid}, listener_id={listener_id}"
         logger.info(log_msg)
+        # a recompute replaces the previous executor, whose results would be overwritten anyway
+        if self.executor is not None:
+            self.executor.cancel()
+        self.executor = ex
+        if self.priority_columns:
+            ex.set_priority_columns(self.priority_columns)
+        ex.add_done_callback(_on_run_done)
         ex.run()
 
         # Save and merge (no helper method; set properties directly)
         # Note: For async executors, merged_sd may already be updated by the progress callback above
         # aggregated_summary now includes cached columns (initialized above) + newly computed ones
+        # columns that weren't read from the cache keep the entries they had
         if aggregated_summary and len(aggregated_summary) > 0:
-            self.summary_sd = aggregated_summary
+            self.summary_sd = {**(self.summary_sd or {}), **aggregated_summary}
             self.merged_sd = merge_sds(self.cleaned_sd or {}, self.summary_sd or {}, self.processed_sd or {})
         # Otherwise, keep existing merged_sd (which may have cached data)
         
-        # Save merged_sd to cache if we have a file_path and aggregated_summary has content
+        # Save the columns with stats to cache, cached columns that weren't read stay as they are
         if file_path and fc and aggregated_summary and len(aggregated_summary) > 0:
             try:
-                fc.upsert_file_metadata(Path(file_path), {'merged_sd': self.merged_sd})
+                fc.upsert_column_stats(Path(file_path), {
+                    rw: self.merged_sd[rw] for rw in aggregated_summary if rw in self.merged_sd})
             except Exception as e:
                 logger.warning(f"Failed to save merged_sd to cache: {e}")
         
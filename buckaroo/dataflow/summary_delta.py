@@ -0,0 +1,135 @@
+"""
+Coalescing summary stats progress into deltas.
+
+Executors report a column group at a time.  Rebuilding, sending and
+persisting the whole summary for each report is quadratic in the number
+of columns, so the widget hands each report's changed columns to a
+SummaryDeltaBuffer instead:
+
+  - the first report after a quiet window is flushed right away, so
+    results show up without delay
+  - later reports within the window are merged and flushed together when
+    it closes, a column reported twice is sent once with its latest stats
+  - flush() sends whatever is pending immediately, the widget calls it
+    when the executor's run is over
+
+The flush callback gets only the changed columns, what it costs depends
+on them rather than on the width of the frame.  The window closes on the
+running event loop when there is one (AsyncioExecutor reports on the
+kernel's loop), on a timer thread otherwise.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("buckaroo.dataflow.summary_delta")
+
+# seconds between flushes while results stream in
+SUMMARY_DELTA_WINDOW_SECS = 0.25
+
+SummaryDelta = Dict[str, Dict[str, Any]]
+
+
+class SummaryDeltaBuffer:
+    """Merges summary deltas and passes them to flush_fn at most once per window_secs."""
+
+    def __init__(self, flush_fn: Callable[[SummaryDelta], None],
+                 window_secs: float = SUMMARY_DELTA_WINDOW_SECS) -> None:
+        self.flush_fn = flush_fn
+        self.window_secs = window_secs
+        self._pending: SummaryDelta = {}
+        self._lock = threading.Lock()
+        # serializes flush_fn calls, the timer and the reporting thread can both flush
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def add(self, delta: SummaryDelta) -> None:
+        """Queue the stats of changed columns, flushing now if the window has passed."""
+        if not delta:
+            return
+        with self._lock:
+            self._pending.update(delta)
+            wait = self._last_flush + self.window_secs - time.monotonic()
+            if wait > 0:
+                self._schedule(wait)
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """Pass everything pending to flush_fn now."""
+        with self._flush_lock:
+            with self._lock:
+                self._cancel_scheduled()
+                delta, self._pending = self._pending, {}
+                self._last_flush = time.monotonic()
+            if not delta:
+                return
+            try:
+                self.flush_fn(delta)
+            except Exception:
+                logger.exception("summary delta flush failed")
+
+    def _schedule(self, wait: float) -> None:
+        # called with _lock held, one pending flush is enough
+        if self._timer is not None or self._handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            self._handle = loop.call_later(wait, self.flush)
+            return
+        self._timer = threading.Timer(wait, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_scheduled(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+
+def patch_summary_rows(all_stats: List[Dict[str, Any]], rows: List[Dict[str, Any]],
+                       delta: SummaryDelta) -> List[Any]:
+    """
+    Update all_stats (rows keyed by 'index', one per stat) in place with
+    rows, the summary rows of delta, adding stats all_stats doesn't have
+    yet.  Stats a changed column no longer has (__status__ once computed)
+    are cleared, in all_stats and as None cells appended to rows.  Rows
+    left without values are dropped, their indexes are returned.
+    """
+    by_index = {row.get('index'): row for row in all_stats}
+    delta_rows = {row.get('index'): row for row in rows}
+    cleared = []
+    for index, row in by_index.items():
+        for col, stats in delta.items():
+            if row.get(col) is not None and index not in stats:
+                row[col] = None
+                cleared.append(index)
+                if index not in delta_rows:
+                    delta_rows[index] = {'index': index}
+                    rows.append(delta_rows[index])
+                delta_rows[index][col] = None
+    for delta_row in rows:
+        row = by_index.get(delta_row.get('index'))
+        if row is None:
+            row = dict(delta_row)
+            all_stats.append(row)
+            by_index[row.get('index')] = row
+        else:
+            row.update(delta_row)
+    removed = [index for index in dict.fromkeys(cleared)
+               if all(v is None for k, v in by_index[index].items() if k not in ('index', 'level_0'))]
+    if removed:
+        all_stats[:] = [row for row in all_stats if row.get('index') not in removed]
+    return removed
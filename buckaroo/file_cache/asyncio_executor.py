@@ -0,0 +1,129 @@
+"""
+An Executor driven by asyncio, for running on the Jupyter kernel's event loop.
+
+MultiprocessingExecutor plans, persists and calls its listener on a
+background thread, so widget traitlets change off the kernel's main loop.
+AsyncioExecutor runs the same dispatcher as a task on the event loop:
+
+  - planning, cache writes and listener calls happen on the loop, between
+    the kernel's own message handling
+  - only the wait on a WorkerPool worker (and unpacking its results) runs
+    in a thread, through loop.run_in_executor
+  - groups that finish together are reported one at a time, yielding to the
+    loop after each, so a burst of results can't starve comm messages
+  - at most max_concurrency groups are outstanding, new groups are planned
+    only as earlier ones are reported
+
+Without a running loop (scripts, tests) run() drives the task to completion
+with asyncio.run, like a synchronous Executor.  LazyInfinitePolarsBuckarooWidget
+uses it in place of MultiprocessingExecutor when created on a running loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime as dtdt
+from typing import Any, Optional
+
+from .base import ColumnGroup, ExecutorArgs
+from .cancellation import CancellationToken
+from .multiprocessing_executor import MultiprocessingExecutor
+
+logger = logging.getLogger("buckaroo.asyncio_executor")
+
+
+def running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """the event loop running in this thread (the kernel's, in Jupyter), None outside one"""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class AsyncioExecutor(MultiprocessingExecutor):
+    """
+    MultiprocessingExecutor whose dispatcher is an asyncio task, see module
+    docstring.  Takes the same arguments.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._task: Optional[asyncio.Task] = None
+
+    def run(self, cancel_token: Optional[CancellationToken] = None) -> None:
+        """
+        Schedule the dispatcher on the running event loop and return, or run
+        it to completion when there is no running loop.
+        """
+        self._use_cancel_token(cancel_token)
+        self.has_run_been_called = True
+        loop = running_loop()
+        if loop is None:
+            log_msg = f"AsyncioExecutor.run() no running loop, running to completion - executor_id={id(self)}"
+            logger.info(log_msg)
+            asyncio.run(self.run_async())
+            return
+        if not self.async_mode:
+            # blocking inside a running loop, asyncio.run can't nest
+            super().run()
+            return
+        self._task = loop.create_task(self.run_async())
+        log_msg = f"AsyncioExecutor.run() SCHEDULED on loop - executor_id={id(self)}, max_concurrency={self.max_concurrency}"
+        logger.info(log_msg)
+
+    async def join(self) -> None:
+        """wait for a run() scheduled on the running loop to finish"""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def run_async(self) -> None:
+        """The dispatcher, every column group is planned, executed and reported before it returns."""
+        loop = asyncio.get_running_loop()
+        executor_id = id(self)
+        running: dict[asyncio.Future, tuple[ColumnGroup, ExecutorArgs, dtdt, tuple[list[str], list[str]]]] = {}
+        iteration_count = 0
+        log_msg = f"AsyncioExecutor.run_async() START - executor_id={executor_id}"
+        logger.info(log_msg)
+        dispatch = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="buckaroo-async-group")
+        try:
+            while True:
+                group = None
+                if len(running) < self.max_concurrency:
+                    iteration_count += 1
+                    group = self.get_next_column_chunk()
+
+                if group is None:
+                    if not running:
+                        log_msg = f"AsyncioExecutor.run_async() DONE - executor_id={executor_id}, iterations={iteration_count}"
+                        logger.info(log_msg)
+                        break
+                    # all slots busy, or every remaining column is in flight
+                    done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    for fut in done:
+                        group, ex_args, t1, in_flight_entry = running.pop(fut)
+                        self._in_flight.remove(in_flight_entry)
+                        self._finish_group(group, ex_args, t1, fut, logger)
+                        # let the kernel handle messages and push the update before the next result
+                        await asyncio.sleep(0)
+                    continue
+
+                ex_args = self._prepare_group(group, logger)
+                if ex_args is None:
+                    continue
+
+                log_msg = f"AsyncioExecutor.run_async() EXECUTING group {group} - executor_id={executor_id}, columns={ex_args.columns}, running={len(running)}"
+                logger.info(log_msg)
+                self.executor_log.log_start_col_group(self.dfi, ex_args, self.executor_class_name)
+                in_flight_entry = (list(group), list(ex_args.columns))
+                self._in_flight.append(in_flight_entry)
+                fut = loop.run_in_executor(dispatch, self._execute_in_worker, ex_args)
+                running[fut] = (group, ex_args, dtdt.now(), in_flight_entry)
+        except asyncio.CancelledError:
+            # the task itself was cancelled (e.g. the loop is closing), take the workers down too
+            self.cancel()
+            raise
+        finally:
+            # never block the loop on worker threads, cancelled ones return within a poll interval
+            dispatch.shutdown(wait=False)
+            self._finish_run()
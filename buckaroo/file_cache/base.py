@@ -1,22 +1,32 @@
 from abc import ABC, abstractmethod
 
+from contextlib import contextmanager
 from datetime import datetime as dtdt, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import (
     Any, Optional, TypeAlias, Callable, Dict, Literal,
     Generic, TypeVar, Union)
 import logging
+import threading
 import polars as pl
 import itertools
 
 from .batch_planning import (
-    PlanningFunction, PlanningContext, extract_execution_history,
-    simple_one_column_planning
+    ColumnCost, PlanningFunction, PlanningContext, extract_execution_history, without_in_flight,
+    prioritized_columns, schema_key, simple_one_column_planning
 )
+from .cancellation import CancellationToken, ExecutionCancelled, cancel_scope
+from .cost_model import planning_inputs, split_group_cost
+from .fingerprint import FileIdentity, file_identity
+from .mergeable_stats import merge_summary_stats, piece_stats_key
+from .row_offsets import RowOffsets
 
 now = dtdt.now
 
+# stat values that survive every cache's serialization unchanged
+_SCALAR_STATS = (int, float, bool, type(None))
+
 
 SummaryStats:TypeAlias = dict[str, Any]
 
@@ -53,6 +63,17 @@ def ensure_filepath(file_path: MaybeFilepathLike) -> MaybeFilepath:
     raise TypeError(f"file_path must be str, Path, or None, got {type(file_path)}")
 
 
+def dataset_pieces(path: Path, pattern: str = "*.parquet") -> list[Path]:
+    """
+    The files making up a dataset directory, sorted so piece order is
+    stable as new files land.  A plain file is its own single piece.
+    """
+    path = Path(path)
+    if path.is_dir():
+        return sorted(p for p in path.glob(pattern) if p.is_file())
+    return [path]
+
+
 def flatten(*lists):
     list(itertools.chain(*lists))
     
@@ -69,10 +90,19 @@ class AbstractFileCache(ABC):
     def add_metadata(self, path:Path, metadata:dict[str, Any]) -> None: ...
 
     @abstractmethod
-    def check_file(self, path:Path) -> bool: ...
+    def check_file(self, path:Path) -> bool:
+        """
+          are the cached stats for path still valid.  Implementations
+          compare size, mtime and a content fingerprint (see fingerprint.py)
+          """
+        ...
 
     @abstractmethod
-    def get_file_metadata(self, path:Path) -> Optional[dict[str, Any]]: ...
+    def get_file_metadata(self, path:Path, columns: Optional[list[str]] = None) -> Optional[dict[str, Any]]:
+        """
+          columns restricts merged_sd to those original column names
+          """
+        ...
 
     @abstractmethod
     def upsert_file_metadata(self, path:Path, extra_metadata:dict[str, Any]) -> None: ...
@@ -90,6 +120,56 @@ class AbstractFileCache(ABC):
     @abstractmethod
     def upsert_file_series_hashes(self, path: Path, hashes: dict[str, int]) -> None: ...
 
+    def upsert_keys(self, results: list[tuple[int, SummaryStats]]) -> None:
+        """
+          upsert many (series_hash, result) pairs at once.  Persistent
+          caches override this to write the whole set in one transaction
+          """
+        for series_hash, result in results:
+            self.upsert_key(series_hash, result)
+
+    def upsert_column_stats(self, path:Path, merged_sd:dict[str, dict[str, Any]]) -> None:
+        """
+          replace the stored merged_sd entries of the columns in merged_sd,
+          leaving other columns alone.  Persistent caches override this to
+          write only those columns
+          """
+        md = self.get_file_metadata(path) or {}
+        current = dict(md.get('merged_sd') or {})
+        current.update(merged_sd)
+        self.upsert_file_metadata(path, {'merged_sd': current})
+
+    def get_row_offsets(self, path:Path) -> Optional[RowOffsets]:
+        """
+          the RowOffsets index stored for path, see row_offsets.py.  Callers
+          check it matches the file's current identity
+          """
+        return None
+
+    def upsert_row_offsets(self, path:Path, row_offsets:RowOffsets) -> None:
+        """
+          store the RowOffsets index of path.  Caches that don't persist
+          them have it rebuilt each time
+          """
+        pass
+
+    @contextmanager
+    def batch(self):
+        """
+          group writes made inside the block, they are flushed together on exit.
+          The in memory cache has nothing to flush
+          """
+        try:
+            yield self
+        finally:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+          make pending writes durable
+          """
+        pass
+
 
 class MemoryFileCache(AbstractFileCache):
     """
@@ -97,19 +177,21 @@ class MemoryFileCache(AbstractFileCache):
       """
     def __init__(self) -> None:
         self.file_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+        self.file_identities: dict[str, FileIdentity] = {}
         self.summary_stats_cache: dict[int, Any] = {}
         self.series_hash_cache: dict[BufferKey, int] = {}
-        
+        self.row_offsets: dict[str, RowOffsets] = {}
+
     def add_file(self, path:Path, metadata:dict[str, Any]) -> None:
         """
         Record a file's current mtime along with provided metadata.
         """
-        try:
-            mtime = path.stat().st_mtime
-        except FileNotFoundError:
+        ident = file_identity(path)
+        if ident is None:
             # If file does not exist, do not add to cache
             return
-        self.file_cache[str(path)] = (mtime, dict(metadata))
+        self.file_cache[str(path)] = (ident.mtime, dict(metadata))
+        self.file_identities[str(path)] = ident
 
     # Compatibility with tests expecting add_metadata/get_file_metadata/upsert_file_metadata
     def add_metadata(self, path:Path, metadata:dict[str, Any]) -> None:
@@ -119,18 +201,43 @@ class MemoryFileCache(AbstractFileCache):
         """
           is this path in the cache
           is the mtime of this file before the mtime in the cache for this file
+
+          if the mtime moved, or the path has never been seen, fall back to
+          the content fingerprint.  A touched file, or a copy of a cached
+          file, is still valid.  Sampled fingerprints of large non parquet
+          files also need the same mtime, see FileIdentity.same_content
           """
         key = str(path)
-        if key not in self.file_cache:
-            return False
         try:
-            current_mtime = path.stat().st_mtime
+            st = path.stat()
         except FileNotFoundError:
             # If file is gone, consider cache invalid
             return False
-        cached_mtime, _ = self.file_cache[key]
-        # Valid only if the file has not been modified since it was cached
-        return current_mtime <= cached_mtime
+        cached_ident = self.file_identities.get(key)
+        if key in self.file_cache:
+            cached_mtime, _ = self.file_cache[key]
+            # Valid if the file has not been modified since it was cached
+            if st.st_mtime <= cached_mtime and (cached_ident is None or cached_ident.size == st.st_size):
+                return True
+        current = file_identity(path)
+        if current is None:
+            return False
+        if key in self.file_cache:
+            if cached_ident is None or not cached_ident.same_content(current):
+                return False
+            # same content with a new mtime
+            _, md = self.file_cache[key]
+            self.file_cache[key] = (current.mtime, md)
+            self.file_identities[key] = current
+            return True
+        for other_key, other_ident in self.file_identities.items():
+            if other_ident.same_content(current) and other_key in self.file_cache:
+                # an identical file was cached under another path, share its entry
+                _, md = self.file_cache[other_key]
+                self.file_cache[key] = (current.mtime, dict(md))
+                self.file_identities[key] = current
+                return True
+        return False
 
     def get_hashes(self, path:Path):
         """
@@ -141,20 +248,28 @@ class MemoryFileCache(AbstractFileCache):
         # Placeholder: not used by current tests
         return None
 
-    def get_file_metadata(self, path:Path) -> Optional[dict[str, Any]]:
+    def get_file_metadata(self, path:Path, columns: Optional[list[str]] = None) -> Optional[dict[str, Any]]:
         key = str(path)
         entry = self.file_cache.get(key)
         if entry is None:
             return None
         _, metadata = entry
-        return metadata
+        if columns is None or not isinstance(metadata.get('merged_sd'), dict):
+            return metadata
+        wanted = set(columns)
+        filtered = dict(metadata)
+        filtered['merged_sd'] = {
+            k: v for k, v in metadata['merged_sd'].items()
+            if isinstance(v, dict) and v.get('orig_col_name') in wanted}
+        return filtered
 
     def upsert_file_metadata(self, path:Path, extra_metadata:dict[str, Any]) -> None:
         key = str(path)
-        try:
-            current_mtime = path.stat().st_mtime
-        except FileNotFoundError:
+        ident = file_identity(path)
+        if ident is None:
             return
+        current_mtime = ident.mtime
+        self.file_identities[key] = ident
         if key in self.file_cache:
             _, existing_md = self.file_cache[key]
             merged_md: dict[str, Any] = dict(existing_md)
@@ -180,6 +295,12 @@ class MemoryFileCache(AbstractFileCache):
         hashes = md.get('series_hashes')
         return {str(k): int(v) for k, v in hashes.items()}
 
+    def get_row_offsets(self, path:Path) -> Optional[RowOffsets]:
+        return self.row_offsets.get(str(path))
+
+    def upsert_row_offsets(self, path:Path, row_offsets:RowOffsets) -> None:
+        self.row_offsets[str(path)] = row_offsets
+
     def upsert_file_series_hashes(self, path: Path, hashes: dict[str, int]) -> None:
         md = self.get_file_metadata(path) or {}
         cur = dict(md.get('series_hashes') or {})
@@ -277,6 +398,11 @@ class PAF2:
 
 ColumnGroup:TypeAlias = list[str]
 
+# ProgressNotification.failure_kind / ExecutorLogEvent.failure_kind values
+FAILURE_TIMEOUT = "timeout"
+FAILURE_OOM = "oom"
+FAILURE_ERROR = "error"
+
 @dataclass
 class ProgressNotification:
     # how do we get a failure notification when it results in a crash?
@@ -287,6 +413,8 @@ class ProgressNotification:
     #execution_time: int # millisecones?
     execution_time: timedelta
     failure_message: str|None
+    # FAILURE_TIMEOUT, FAILURE_OOM or FAILURE_ERROR when executors can tell
+    failure_kind: Optional[str] = None
 
     def __eq__(self, other):
         props = [self.success == other.success,
@@ -303,7 +431,7 @@ ColumnRawResults:TypeAlias = Dict[str, Any]
 
 @dataclass
 class ColumnResult:
-    series_hash: int #u64 actually
+    series_hash: Optional[int] #u64 actually, None when the result isn't one series' (merged dataset pieces)
     column_name: str # strictly necessary?
     expressions: list[pl.Expr]
     # I want expressions in plass of execution_args
@@ -341,6 +469,26 @@ class ColumnExecutor(Generic[E], ABC):
         """
         ...
 
+    def execute_with_cancel(self, ldf:pl.LazyFrame, execution_args:E,
+                            cancel_token:CancellationToken) -> ColumnResults:
+        """
+          execute, raising ExecutionCancelled once cancel_token is
+          cancelled.  Checked before and after, executors that work in
+          steps call cancellation.check_cancelled between them
+          """
+        cancel_token.raise_if_cancelled()
+        with cancel_scope(cancel_token):
+            res = self.execute(ldf, execution_args)
+        cancel_token.raise_if_cancelled()
+        return res
+
+    def low_memory_executor(self) -> Optional['ColumnExecutor[E]']:
+        """
+          An equivalent executor that needs less memory, tried when a single
+          column runs out of memory.  None when there is nothing smaller.
+          """
+        return None
+
 @dataclass
 class ExecutorArgs:
     columns: ColumnGroup
@@ -372,6 +520,7 @@ class ExecutorLogEvent:
     end_time: Optional[dtdt]
     completed: bool
     executor_class_name: str = ""
+    failure_kind: Optional[str] = None
     
 
 class ExecutorLog(ABC):
@@ -390,6 +539,21 @@ class ExecutorLog(ABC):
           """
         ...
 
+    def log_failed_col_group(self, dfi: DFIdentifier, args:ExecutorArgs, failure_kind:str) -> None:
+        """
+          record why a started col_group failed, when it is known.  The
+          event stays incomplete, a group that just stops logging reads
+          as a timeout
+          """
+        pass
+
+    def log_cancelled_col_group(self, dfi: DFIdentifier, args:ExecutorArgs) -> None:
+        """
+          forget a started col_group that was cancelled.  It didn't fail,
+          so it must not read as a failure or timeout to later planning
+          """
+        pass
+
     @abstractmethod
     def check_log_for_previous_failure(self, dfi: DFIdentifier, args:ExecutorArgs) -> bool:
         """
@@ -406,6 +570,27 @@ class ExecutorLog(ABC):
           """
         ...
 
+    def get_dfi_log_events(self, dfi: DFIdentifier) -> list[ExecutorLogEvent]:
+        """
+        The logged events for one dataframe identifier, oldest first.
+        Logs that persist events across sessions should override this with
+        something cheaper than filtering every event.
+        """
+        return [ev for ev in self.get_log_events()
+                if str(ev.dfi[0]) == str(dfi[0]) and ev.dfi[1] == dfi[1]]
+
+    def log_column_costs(self, schema_key: str, costs: dict[str, ColumnCost]) -> None:
+        """
+        Add measured per column costs for a schema, keyed by column name.
+        Logs that persist across sessions keep these so files with the same
+        schema plan well from their first group.  The default drops them.
+        """
+        pass
+
+    def get_column_costs(self, schema_key: str) -> dict[str, ColumnCost]:
+        """Accumulated ColumnCost per column for a schema"""
+        return {}
+
     def find_event(self, dfi: DFIdentifier, args: ExecutorArgs) -> Optional[ExecutorLogEvent]:
         """
         Locate the log event for the given dataframe identifier and execution args.
@@ -437,6 +622,7 @@ class SimpleExecutorLog(ExecutorLog):
     
     def __init__(self) -> None:
         self._events: list[ExecutorLogEvent] = []
+        self._column_costs: dict[str, dict[str, ColumnCost]] = {}
 
 
     def log_start_col_group(self, dfi: DFIdentifier, args:ExecutorArgs, executor_class_name:str = "") -> None:
@@ -458,6 +644,17 @@ class SimpleExecutorLog(ExecutorLog):
             ev.completed = True
 
         
+    def log_failed_col_group(self, dfi: DFIdentifier, args:ExecutorArgs, failure_kind:str) -> None:
+        ev = self.find_event(dfi, args)
+        if ev:
+            ev.end_time = dtdt.now()
+            ev.failure_kind = failure_kind
+
+    def log_cancelled_col_group(self, dfi: DFIdentifier, args:ExecutorArgs) -> None:
+        ev = self.find_event(dfi, args)
+        if ev and not ev.completed:
+            self._events.remove(ev)
+
     def check_log_for_previous_failure(self, dfi: DFIdentifier, args:ExecutorArgs) -> bool:
         # Return True if there is an incomplete event with matching args
         ev = self.find_event(dfi, args)
@@ -482,6 +679,14 @@ class SimpleExecutorLog(ExecutorLog):
           """
         return self._events
 
+    def log_column_costs(self, schema_key: str, costs: dict[str, ColumnCost]) -> None:
+        known = self._column_costs.setdefault(schema_key, {})
+        for col, cost in costs.items():
+            known[col] = known[col].merge(cost) if col in known else cost
+
+    def get_column_costs(self, schema_key: str) -> dict[str, ColumnCost]:
+        return dict(self._column_costs.get(schema_key, {}))
+
     def has_incomplete_for_executor(self, dfi:DFIdentifier, executor_class_name:str) -> bool:
         for ev in self._events:
             if ev.dfi == dfi and ev.executor_class_name == executor_class_name and not ev.completed:
@@ -498,7 +703,9 @@ class Executor:
         file_path: MaybeFilepathLike = None,
         cached_merged_sd: dict[str, dict[str, Any]] | None = None,
         orig_to_rw_map: dict[str, str] | None = None,
-        planning_function: Optional[PlanningFunction] = None) -> None:
+        planning_function: Optional[PlanningFunction] = None,
+        pieces: Optional[list[Path]] = None,
+        cancel_token: Optional[CancellationToken] = None) -> None:
         self.ldf = ldf
         self.column_executor = column_executor
         self.listener = listener
@@ -511,27 +718,98 @@ class Executor:
         self.executor_class_name = self.__class__.__name__
         
         # Store cached merged_sd and mapping for checking complete columns
-        self.cached_merged_sd = cached_merged_sd or {}
+        # may be a CachedSummary that reads columns on lookup, don't test it for truthiness
+        self.cached_merged_sd = cached_merged_sd if cached_merged_sd is not None else {}
         self.orig_to_rw_map = orig_to_rw_map or {}
         
         # Batch planning
         self.planning_function = planning_function or simple_one_column_planning
         self._planning_state: Optional[dict[str, Any]] = None
+        # Groups handed out by get_next_column_chunk that are still running,
+        # as (group, logged columns).  Executors that run groups concurrently
+        # register them here so planning skips their columns and doesn't read
+        # their open log events as timeouts
+        self._in_flight: list[tuple[list[str], list[str]]] = []
+
+        # Columns to compute first (the ones visible in the grid), set from
+        # the widget's thread while run() works, see set_priority_columns
+        self._priority_columns: list[str] = []
+        self._priority_changed = False
+        self._priority_lock = threading.Lock()
+
+        # cancelled when nobody will see the results (widget closed or
+        # replaced), see cancel
+        self.cancel_token = cancel_token or CancellationToken()
         
+        # Files that together make up ldf (e.g. the parquet files of a landing
+        # directory).  When set, stats are computed and cached per piece and
+        # merged, so re-opening a grown dataset only scans the new files
+        self.pieces: Optional[list[Path]] = [Path(p) for p in pieces] if pieces is not None else None
+
         # Track if run() has been called (for testing utilities)
         self.has_run_been_called = False
 
-    def run(self) -> None:
+        # called once when run() stops producing notifications, see add_done_callback
+        self._done_callbacks: list[Callable[[], None]] = []
+        self._run_done = False
+
+    def cancel(self) -> None:
+        """
+        Stop working: no new column groups are started and running ones
+        are abandoned, their results are never reported.  Safe to call from
+        any thread, at any time.
+        """
+        if not self.cancel_token.cancelled:
+            log_msg = f"Executor.cancel() - executor_id={id(self)}, executor_class={self.executor_class_name}"
+            logging.getLogger("buckaroo.executor").info(log_msg)
+        self.cancel_token.cancel()
+
+    def _use_cancel_token(self, cancel_token: Optional[CancellationToken]) -> None:
+        if cancel_token is not None:
+            self.cancel_token = cancel_token
+
+    def add_done_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Call callback once the run is over, finished, halted or cancelled,
+        and the listener won't be called again.  Runs on the thread that
+        ran the column groups, right away if the run is already over.
+        """
+        if self._run_done:
+            callback()
+            return
+        self._done_callbacks.append(callback)
+
+    def _finish_run(self) -> None:
+        if self._run_done:
+            return
+        self._run_done = True
+        callbacks, self._done_callbacks = self._done_callbacks, []
+        for cb in callbacks:
+            try:
+                cb()
+            except Exception:
+                logging.getLogger("buckaroo.executor").exception("done callback failed")
+
+    def run(self, cancel_token: Optional[CancellationToken] = None) -> None:
         """Execute column analysis, skipping cached columns.
         
         Uses get_next_column_chunk() to get batches one at a time until all columns
         are processed or there's no way to proceed (e.g., single column timeout).
+        cancel_token, when given, replaces the executor's own.
         """
+        self._use_cancel_token(cancel_token)
         self.has_run_been_called = True
+        try:
+            self._run_groups()
+        finally:
+            self._finish_run()
+
+    def _run_groups(self) -> None:
         logger = logging.getLogger("buckaroo.executor")
         
         logger.info(f"Executor.run() START - file_path={self.file_path}")
-        logger.debug(f"  cached_merged_sd keys: {list(self.cached_merged_sd.keys()) if self.cached_merged_sd else []}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"  cached_merged_sd keys: {list(self.cached_merged_sd.keys())}")
         
         # Keep calling get_next_column_chunk() until it returns None
         while True:
@@ -605,7 +883,10 @@ class Executor:
             t1 = now()
 
             try:
-                res = self.column_executor.execute(self.ldf, ex_args)
+                if self.pieces is None:
+                    res = self.column_executor.execute_with_cancel(self.ldf, ex_args, self.cancel_token)
+                else:
+                    res = self.execute_pieces(ex_args)
                 t2 = now()
                 notification = ProgressNotification(
                     success=True,
@@ -615,28 +896,23 @@ class Executor:
                     execution_time=t2-t1,
                     failure_message=None)
 
-                executed_columns = []
-                for col, col_result in res.items():
-                    self.fc.upsert_key(col_result.series_hash, col_result.result)
-                    executed_columns.append(col)
-                    # cache insert errors should be really rare, if we get here, something weird has happened and trying to defensivly code around it is a fools errand
-
-                # If file hashes were missing and we have a file path, persist newly discovered hashes
-                # Skip spurious 0 hashes (default value when hash can't be computed)
-                if self.file_path and missing_hash_columns:
-                    new_hashes: dict[str, int] = {}
-                    for c in missing_hash_columns:
-                        if c in res and res[c].series_hash is not None and res[c].series_hash != 0:
-                            new_hashes[c] = int(res[c].series_hash)
-                    if new_hashes:
-                        self.fc.upsert_file_series_hashes(self.file_path, new_hashes)
+                executed_columns = list(res.keys())
+                # all writes for this column group go out in one transaction,
+                # so persistence costs one disk sync per group rather than per column
+                # cache insert errors should be really rare, if we get here, something weird has happened and trying to defensivly code around it is a fools errand
+                self._persist_results(res)
 
                 self.listener(notification)
                 self.executor_log.log_end_col_group(self.dfi, ex_args)
+                self._log_group_cost(list(ex_args.columns), t2-t1)
                 
                 # Update planning state after successful execution
                 self._update_planning_state_after_execution(executed_columns)
-                
+
+            except ExecutionCancelled:
+                logger.info(f"Executor.run() CANCELLED during group {col_group}")
+                self.executor_log.log_cancelled_col_group(self.dfi, ex_args)
+                return
             except Exception as e:
                 t3 = now()
                 notification = ProgressNotification(
@@ -654,6 +930,108 @@ class Executor:
                 self._update_planning_state_after_execution(list(col_group))
                 continue
 
+
+    def _persist_results(self, res: ColumnResults) -> None:
+        """
+        Write a group's series results and, for files, the file's series
+        hashes in one transaction.  The hashes are what keeps the cache's
+        orphan collection off these results, every executor goes through here.
+        """
+        with self.fc.batch():
+            # merged piece results aren't one series', execute_pieces cached each piece already
+            self.fc.upsert_keys([(col_result.series_hash, col_result.result) for col_result in res.values()
+                                 if col_result.series_hash is not None])
+            if not self.file_path:
+                return
+            current = self.fc.get_file_series_hashes(self.file_path) or {}
+            # Skip spurious 0 hashes (default value when hash can't be computed)
+            new_hashes = {c: int(r.series_hash) for c, r in res.items()
+                          if r.series_hash and current.get(c) != r.series_hash}
+            if new_hashes:
+                self.fc.upsert_file_series_hashes(self.file_path, new_hashes)
+
+    def _piece_signature(self) -> str:
+        analyses = getattr(self.column_executor, 'analyses', [])
+        names = ",".join(getattr(a, '__name__', str(a)) for a in analyses)
+        return f"{self.column_executor.__class__.__name__}:{names}"
+
+    def execute_pieces(self, ex_args:ExecutorArgs) -> ColumnResults:
+        """
+        Execute ex_args against each piece separately and merge the results.
+
+        Each piece's stats are cached under a key derived from the piece's
+        content fingerprint, so only pieces that are new or changed are
+        scanned.  Stats with a merge rule (see mergeable_stats.py) are
+        combined, the rest come from the newest piece, see
+        _recompute_derived_stats.
+        """
+        logger = logging.getLogger("buckaroo.executor")
+        assert self.pieces is not None
+        cols = list(ex_args.columns)
+        signature = self._piece_signature()
+        idents = []
+        for piece in self.pieces:
+            ident = file_identity(piece)
+            if ident is None:
+                raise FileNotFoundError(f"dataset piece {piece} is missing")
+            idents.append((piece, ident))
+        # oldest first, stats that can't be merged come from the newest piece
+        idents.sort(key=lambda pi: pi[1].mtime)
+        per_piece: list[dict[str, SummaryStats]] = []
+        scanned = 0
+        for piece, ident in idents:
+            keys = {c: piece_stats_key(ident, c, signature) for c in cols}
+            piece_stats: dict[str, SummaryStats] = {}
+            missing: list[str] = []
+            for c in cols:
+                cached = self.fc.get_series_results(keys[c])
+                if cached is None:
+                    missing.append(c)
+                else:
+                    piece_stats[c] = cached
+            if missing:
+                scanned += 1
+                res = self._execute_piece(piece, replace(ex_args, columns=missing))
+                for c in missing:
+                    piece_stats[c] = dict(res[c].result) if c in res else {}
+                with self.fc.batch():
+                    self.fc.upsert_keys([(keys[c], piece_stats[c]) for c in missing])
+                    # referenced from the piece, so the cache's orphan collection keeps them
+                    self.fc.upsert_file_series_hashes(piece, {c: keys[c] for c in missing})
+            per_piece.append(piece_stats)
+        logger.info(f"Executor.execute_pieces: scanned {scanned}/{len(self.pieces)} pieces for {cols}")
+        results: ColumnResults = {}
+        for c in cols:
+            results[c] = ColumnResult(
+                series_hash=None,
+                column_name=c,
+                expressions=[],
+                result=self._recompute_derived_stats(merge_summary_stats([p[c] for p in per_piece])))
+        return results
+
+    def _execute_piece(self, piece: Path, ex_args: ExecutorArgs) -> ColumnResults:
+        """results of ex_args over one dataset piece"""
+        from buckaroo.read_utils import read_df
+        return self.column_executor.execute_with_cancel(read_df(piece), ex_args, self.cancel_token)
+
+    def _recompute_derived_stats(self, merged: SummaryStats) -> SummaryStats:
+        """
+        Run computed_summary again on the merged stats for analyses whose
+        inputs were all merged and are scalars (nan_per from length and
+        null_count...), so they follow the merged counts.  merge_summary_stats
+        leaves out stats it can't merge, an analysis reading one of them
+        (distinct_per from an exact distinct_count) is skipped and its
+        outputs stay out of the summary.
+        """
+        for a_kls in getattr(self.column_executor, 'analyses', []):
+            needs = getattr(a_kls, 'requires_summary', [])
+            if not needs or not all(k in merged and isinstance(merged[k], _SCALAR_STATS) for k in needs):
+                continue
+            try:
+                merged.update(a_kls.computed_summary(merged))
+            except Exception:
+                continue
+        return merged
                 
     def get_column_raw_results(self, columns:ColumnGroup) -> ColumnRawResults:
         hashes_for_cols: dict[str,int]= {} # how are we getting the hashes for this ldf?
@@ -674,6 +1052,18 @@ class Executor:
     
 
 
+    def set_priority_columns(self, columns: list[str]) -> None:
+        """
+        Compute columns before any others, e.g. the columns scrolled into
+        view.  Safe to call from another thread while run() is working.
+        Groups the planner already queued are dropped and replanned, so
+        the next group handed out starts on these columns.  Groups already
+        executing are left to finish.
+        """
+        with self._priority_lock:
+            self._priority_columns = list(columns)
+            self._priority_changed = True
+
     def get_next_column_chunk(self) -> Optional[ColumnGroup]:
         """
         Get next column chunk using batch planning.
@@ -685,6 +1075,10 @@ class Executor:
         which returns one column at a time (backward compatible).
         """
         logger = logging.getLogger("buckaroo.executor")
+        if self.cancel_token.cancelled:
+            log_msg_cancelled = f"Executor.get_next_column_chunk() CANCELLED - executor_id={id(self)}, returning None"
+            logger.info(log_msg_cancelled)
+            return None
         if self._planning_state is None:
             # Initialize planning state
             all_columns = list(self.ldf.collect_schema().names())
@@ -698,7 +1092,10 @@ class Executor:
                 'batch_index': 0,
                 'last_returned_group': None,  # Track last returned to detect infinite loops
                 'consecutive_same_returns': 0,  # Count consecutive same returns
+                # dtypes and sizes for cost based planners, read once
+                'planning_inputs': planning_inputs(self.ldf, self.file_path, self.cached_merged_sd),
             }
+            self._planning_state['schema_key'] = schema_key(self._planning_state['planning_inputs']['column_dtypes'])
         
         # Use iteration instead of recursion to avoid stack overflow
         state = self._planning_state
@@ -711,6 +1108,16 @@ class Executor:
             
             log_msg_iter = f"Executor.get_next_column_chunk() ITERATION {iteration} - executor_id={id(self)}, remaining={len(state.get('remaining', []))}, current_batches={len(state.get('current_batches', []))}, batch_index={state.get('batch_index', 0)}"
             logger.debug(log_msg_iter)
+
+            with self._priority_lock:
+                priority, priority_changed = self._priority_columns, self._priority_changed
+                self._priority_changed = False
+            if priority_changed and state['batch_index'] < len(state['current_batches']):
+                # preempt the queue, it was planned for the old priority
+                log_msg_preempt = f"Executor.get_next_column_chunk() PRIORITY CHANGED, dropping queued batches - executor_id={id(self)}, dropped={len(state['current_batches']) - state['batch_index']}, priority={priority}"
+                logger.info(log_msg_preempt)
+                state['current_batches'] = []
+                state['batch_index'] = 0
             
             # If we have batches queued, return next one
             if state['current_batches'] and state['batch_index'] < len(state['current_batches']):
@@ -744,11 +1151,20 @@ class Executor:
                 logger.info(log_msg_no_remaining)
                 return None
             
+            in_flight_cols = {col for group, _ in self._in_flight for col in group}
+            remaining = [col for col in state['remaining'] if col not in in_flight_cols]
+            if not remaining:
+                log_msg_in_flight = f"Executor.get_next_column_chunk() ALL REMAINING IN FLIGHT - executor_id={id(self)}, in_flight={len(self._in_flight)}, returning None"
+                logger.info(log_msg_in_flight)
+                return None
+            remaining = prioritized_columns(remaining, priority)
+
             # Extract history from executor log
-            log_msg_planning = f"Executor.get_next_column_chunk() CALLING PLANNING FUNCTION - executor_id={id(self)}, remaining={len(state['remaining'])}, planning_function={self.planning_function.__name__ if hasattr(self.planning_function, '__name__') else type(self.planning_function).__name__}"
+            log_msg_planning = f"Executor.get_next_column_chunk() CALLING PLANNING FUNCTION - executor_id={id(self)}, remaining={len(remaining)}, planning_function={self.planning_function.__name__ if hasattr(self.planning_function, '__name__') else type(self.planning_function).__name__}"
             logger.info(log_msg_planning)
             
             history = extract_execution_history(self.executor_log, self.dfi)
+            history = without_in_flight(history, [cols for _, cols in self._in_flight])
             
             # Get timeout (default 30s, can be overridden by subclasses)
             timeout_secs = getattr(self, 'timeout_secs', 30.0)
@@ -764,7 +1180,9 @@ class Executor:
                 baseline_overhead=state['baseline_overhead'],
                 timeout_secs=timeout_secs,
                 execution_history=history,
-                remaining_columns=state['remaining']
+                remaining_columns=remaining,
+                column_history=self._get_column_costs(),
+                **state['planning_inputs'],
             )
             
             # Plan next batches
@@ -796,6 +1214,27 @@ class Executor:
         logger.warning(log_msg_max_iter)
         return None
     
+    def _get_column_costs(self) -> dict[str, ColumnCost]:
+        try:
+            return self.executor_log.get_column_costs(self._planning_state['schema_key'])
+        except Exception:
+            logging.getLogger("buckaroo.executor").exception("reading column costs failed")
+            return {}
+
+    def _log_group_cost(self, columns: list[str], execution_time: timedelta,
+                        peak_memory_bytes: int = 0) -> None:
+        """Record a completed group's time and memory per column, for future files with this schema"""
+        state = self._planning_state
+        if not state or not columns:
+            return
+        baseline = state['baseline_overhead'].total_seconds()
+        secs = max(execution_time.total_seconds() - baseline, 0.0)
+        costs = split_group_cost(columns, secs, peak_memory_bytes, state['all_columns'], state['planning_inputs'])
+        try:
+            self.executor_log.log_column_costs(state['schema_key'], costs)
+        except Exception:
+            logging.getLogger("buckaroo.executor").exception("logging column costs failed")
+
     def _update_planning_state_after_execution(self, executed_columns: list[str]) -> None:
         """Update planning state after a batch is executed."""
         if self._planning_state:
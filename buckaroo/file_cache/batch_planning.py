@@ -13,10 +13,14 @@ The planning algorithm:
 """
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import json
+from dataclasses import dataclass, field
 from datetime import timedelta
 from typing import Callable, Optional, TYPE_CHECKING
 
+import polars as pl
+
 if TYPE_CHECKING:
     from buckaroo.file_cache.base import ExecutorLog, DFIdentifier
 
@@ -31,6 +35,38 @@ class ExecutionResult:
     error: str | None = None
 
 
+@dataclass
+class ColumnCost:
+    """
+    Measured cost of summarising one column, accumulated over runs of
+    files with the same schema.  A single measurement has runs=1.
+    """
+    dtype: str
+    runs: int
+    total_secs: float
+    total_rows: int  # 0 when row counts weren't known
+    peak_memory_bytes: int  # largest share of a group's peak RSS seen
+
+    def merge(self, other: 'ColumnCost') -> 'ColumnCost':
+        return ColumnCost(
+            dtype=other.dtype,
+            runs=self.runs + other.runs,
+            total_secs=self.total_secs + other.total_secs,
+            total_rows=self.total_rows + other.total_rows,
+            peak_memory_bytes=max(self.peak_memory_bytes, other.peak_memory_bytes))
+
+    def predict_secs(self, row_count: Optional[int]) -> float:
+        if row_count and self.total_rows:
+            return self.total_secs / self.total_rows * row_count
+        return self.total_secs / max(self.runs, 1)
+
+
+def schema_key(column_dtypes: dict[str, pl.DataType]) -> str:
+    """identifies a schema, column names and dtypes in order"""
+    spec = json.dumps([[name, str(dtype)] for name, dtype in column_dtypes.items()])
+    return hashlib.sha1(spec.encode()).hexdigest()
+
+
 @dataclass
 class PlanningContext:
     """Context for planning column batches."""
@@ -39,6 +75,13 @@ class PlanningContext:
     timeout_secs: float  # Timeout in seconds (like mp_timeout expects)
     execution_history: list[ExecutionResult]
     remaining_columns: list[str]  # Columns not yet executed
+    # What is known up front about the data, used by cost_model_planning_function
+    column_dtypes: dict[str, pl.DataType] = field(default_factory=dict)
+    row_count: Optional[int] = None
+    file_size: Optional[int] = None
+    column_bytes: dict[str, int] = field(default_factory=dict)  # e.g. parquet uncompressed sizes
+    # costs measured on earlier files with the same schema, see ExecutorLog.get_column_costs
+    column_history: dict[str, ColumnCost] = field(default_factory=dict)
 
 
 @dataclass
@@ -64,7 +107,7 @@ def extract_execution_history(executor_log: 'ExecutorLog', dfi: 'DFIdentifier')
     Extract execution history from executor log.
     
     Converts ExecutorLogEvent objects to ExecutionResult objects for planning.
-    Filters to events matching the dfi.
+    Only the events for dfi are read (ExecutorLog.get_dfi_log_events).
     
     Args:
         executor_log: ExecutorLog instance
@@ -79,43 +122,24 @@ def extract_execution_history(executor_log: 'ExecutorLog', dfi: 'DFIdentifier')
     # Import at runtime to avoid circular import
     
     try:
-        events = executor_log.get_log_events()
+        events = executor_log.get_dfi_log_events(dfi)
     except Exception:
         return []
     
-    log_msg = f"extract_execution_history: dfi={dfi}, total_events={len(events)}"
+    log_msg = f"extract_execution_history: dfi={dfi}, dfi_events={len(events)}"
     logger.info(log_msg)
     
     results = []
-    # dfi is (id(ldf), file_path_str)
-    # Note: SQLite stores dfi as JSON, so integers become strings when reconstructed
-    # We need to handle both int and string comparisons
-    def dfi_matches(event_dfi, target_dfi):
-        """Compare dfi tuples, handling string/int conversion for IDs."""
-        if len(event_dfi) != len(target_dfi):
-            return False
-        # Compare IDs (first element) - handle int/string conversion
-        event_id = event_dfi[0]
-        target_id = target_dfi[0]
-        if str(event_id) != str(target_id):
-            return False
-        # Compare file paths (second element)
-        if len(event_dfi) > 1 and len(target_dfi) > 1:
-            return event_dfi[1] == target_dfi[1]
-        return len(event_dfi) == len(target_dfi)
-    
-    matched_count = 0
     for i, event in enumerate(events):
-        # Filter to matching dfi
-        if not dfi_matches(event.dfi, dfi):
-            continue
-        matched_count += 1
-        if matched_count <= 3:  # Log first few matches
+        if i < 3:  # Log first few matches
             log_msg = f"extract_execution_history: event {i} MATCHED - dfi={event.dfi}, columns={len(event.args.columns) if hasattr(event, 'args') and event.args else 'N/A'}"
             logger.info(log_msg)
         
-        # Determine if timed out (started but not completed, and end_time is None)
-        timed_out = not event.completed and event.end_time is None
+        # Determine if timed out (started but not completed, and end_time is None),
+        # failures with a known kind (e.g. "oom") carry an end_time
+        failure_kind = getattr(event, 'failure_kind', None)
+        timed_out = not event.completed and (
+            failure_kind == "timeout" or (failure_kind is None and event.end_time is None))
         
         # Calculate execution time
         if event.end_time:
@@ -130,7 +154,7 @@ def extract_execution_history(executor_log: 'ExecutorLog', dfi: 'DFIdentifier')
             success=event.completed,
             execution_time=execution_time,
             timed_out=timed_out,
-            error=None  # ExecutorLogEvent doesn't store error messages
+            error=failure_kind  # kind of failure when known, not the message
         )
         
         log_msg = f"extract_execution_history: event columns={len(result.columns)}, success={result.success}, timed_out={result.timed_out}"
@@ -138,16 +162,44 @@ def extract_execution_history(executor_log: 'ExecutorLog', dfi: 'DFIdentifier')
         
         results.append(result)
     
-    log_msg = f"extract_execution_history: matched {matched_count} events, returning {len(results)} results"
+    log_msg = f"extract_execution_history: returning {len(results)} results"
     logger.info(log_msg)
     
-    if matched_count > 0 and len(results) == 0:
-        log_msg = f"extract_execution_history: WARNING - matched {matched_count} events but created 0 results. This should not happen!"
-        logger.warning(log_msg)
-    
     return results
 
 
+def without_in_flight(history: list[ExecutionResult], in_flight: list[list[str]]) -> list[ExecutionResult]:
+    """
+    Drop the open events of column groups that are still executing.
+
+    An event without an end time reads as a timeout, while groups run
+    concurrently the latest unfinished event for each in flight column
+    list is a running group, not a failure.
+    """
+    if not in_flight:
+        return history
+    pending = [list(cols) for cols in in_flight]
+    kept: list[ExecutionResult] = []
+    for result in reversed(history):
+        if not result.success and result.columns in pending:
+            pending.remove(result.columns)
+            continue
+        kept.append(result)
+    kept.reverse()
+    return kept
+
+
+def prioritized_columns(remaining: list[str], priority: list[str]) -> list[str]:
+    """
+    The priority columns still in remaining, in priority order, so they
+    are planned on their own ahead of everything else.  All of remaining
+    once none of them are left.
+    """
+    remaining_set = set(remaining)
+    first = [col for col in dict.fromkeys(priority) if col in remaining_set]
+    return first or remaining
+
+
 def simple_one_column_planning(context: PlanningContext) -> PlanningResult:
     """
     Simple planning function that returns one column at a time.
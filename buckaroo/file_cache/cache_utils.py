@@ -3,18 +3,34 @@ Global cache instances and cache management utilities.
 """
 from __future__ import annotations
 
+import logging
+import threading
 from pathlib import Path
 from typing import Optional
 import time
 
+from .spill import evict_spills
 from .sqlite_file_cache import SQLiteFileCache
 from .sqlite_log import SQLiteExecutorLog
 
+logger = logging.getLogger("buckaroo.file_cache.cache_utils")
 
 # Global cache instances (initialized lazily)
 _file_cache: Optional[SQLiteFileCache] = None
 _executor_log: Optional[SQLiteExecutorLog] = None
 
+# Size budget for the file cache, enforced by a background thread
+DEFAULT_CACHE_BUDGET_BYTES = 1024 * 1024 * 1024
+CACHE_BUDGET_CHECK_INTERVAL = 300.0
+# first check waits this long, so it doesn't compete with widget startup for the db
+CACHE_BUDGET_STARTUP_DELAY = 30.0
+# series results released less than this long ago aren't garbage collected,
+# another file may pick the same hashes up again
+ORPHAN_SERIES_MIN_AGE = 60.0 * 60
+_cache_budget_bytes: Optional[int] = DEFAULT_CACHE_BUDGET_BYTES
+_budget_thread: Optional[threading.Thread] = None
+_budget_stop: Optional[threading.Event] = None
+
 
 def _ensure_buckaroo_dir() -> Path:
     """Ensure ~/.buckaroo directory exists."""
@@ -51,6 +67,7 @@ def get_global_file_cache() -> SQLiteFileCache:
         buckaroo_dir = _ensure_buckaroo_dir()
         file_cache_path = buckaroo_dir / "file_cache.sqlite"
         _file_cache = SQLiteFileCache(str(file_cache_path))
+        _start_budget_thread(str(file_cache_path))
     return _file_cache
 
 
@@ -90,8 +107,10 @@ def clear_file_cache() -> None:
     fc = get_global_file_cache()
     # Clear files table
     fc._conn.execute("DELETE FROM files")
+    fc._conn.execute("DELETE FROM column_stats")
     # Clear series_results table
     fc._conn.execute("DELETE FROM series_results")
+    fc._conn.execute("DELETE FROM released_series")
     fc._conn.commit()
 
 
@@ -116,15 +135,94 @@ def clear_oldest_cache_entries(max_age_days: int = 30) -> int:
     cutoff_time = time.time() - (max_age_days * 24 * 60 * 60)
     
     # Delete old files based on mtime
-    cursor = fc._conn.execute(
-        "DELETE FROM files WHERE mtime < ?",
+    old_paths = [path for (path,) in fc._conn.execute(
+        "SELECT path FROM files WHERE mtime < ?",
         (cutoff_time,)
-    )
-    files_deleted = cursor.rowcount
-    
-    fc._conn.commit()
+    ).fetchall()]
+    fc.remove_files(old_paths)
+    fc.gc_orphan_series()
     
-    return files_deleted
+    return len(old_paths)
+
+
+def set_cache_budget(max_bytes: Optional[int]) -> None:
+    """
+    Set the byte budget the background thread holds the file cache to.
+    None disables budget enforcement.
+    """
+    global _cache_budget_bytes
+    _cache_budget_bytes = max_bytes
+
+
+def get_cache_budget() -> Optional[int]:
+    return _cache_budget_bytes
+
+
+def enforce_cache_budget(fc: Optional[SQLiteFileCache] = None,
+                         max_bytes: Optional[int] = None,
+                         spill_dir: Optional[Path] = None) -> dict[str, int]:
+    """
+    Garbage collect orphaned series results, then evict least recently
+    used files until the cache fits in max_bytes (the configured budget
+    by default).  Source spills in spill_dir (~/.buckaroo/spill by
+    default) get what the cache leaves of the budget.
+
+    Returns:
+        Dictionary with 'orphan_series', 'files_evicted' and 'spills_evicted' counts
+    """
+    if fc is None:
+        fc = get_global_file_cache()
+    if max_bytes is None:
+        max_bytes = _cache_budget_bytes
+    orphans = fc.gc_orphan_series(min_age_seconds=ORPHAN_SERIES_MIN_AGE)
+    evicted = 0
+    spills = 0
+    if max_bytes is not None:
+        evicted = fc.evict_to_budget(max_bytes)
+        spills = evict_spills(max(max_bytes - fc.cache_bytes(), 0), spill_dir)
+    if orphans or evicted or spills:
+        logger.info(f"cache budget enforced, removed {orphans} orphan series, {evicted} files and {spills} spills")
+    return {'orphan_series': orphans, 'files_evicted': evicted, 'spills_evicted': spills}
+
+
+def _budget_loop(db_path: str, stop: threading.Event) -> None:
+    # a separate connection, so eviction never lands inside a batch
+    # transaction that the widget's connection has open
+    fc: Optional[SQLiteFileCache] = None
+    if stop.wait(CACHE_BUDGET_STARTUP_DELAY):
+        return
+    while True:
+        try:
+            if fc is None:
+                fc = SQLiteFileCache(db_path)
+            enforce_cache_budget(fc)
+        except Exception:
+            logger.exception(f"cache budget enforcement failed for {db_path}")
+        if stop.wait(CACHE_BUDGET_CHECK_INTERVAL):
+            break
+    if fc is not None:
+        fc._conn.close()
+
+
+def _start_budget_thread(db_path: str) -> None:
+    global _budget_thread, _budget_stop
+    stop_budget_thread()
+    _budget_stop = threading.Event()
+    _budget_thread = threading.Thread(
+        target=_budget_loop, args=(db_path, _budget_stop),
+        name="buckaroo-cache-budget", daemon=True)
+    _budget_thread.start()
+
+
+def stop_budget_thread() -> None:
+    """Stop the background budget thread, if one is running."""
+    global _budget_thread, _budget_stop
+    if _budget_stop is not None:
+        _budget_stop.set()
+    if _budget_thread is not None:
+        _budget_thread.join(timeout=5)
+    _budget_thread = None
+    _budget_stop = None
 
 
 def format_cache_size(size_bytes: int) -> str:
@@ -0,0 +1,130 @@
+"""
+Cached summary stats of a file, read a chunk of columns at a time.
+
+SQLiteFileCache stores merged_sd per column, so re-opening a wide file
+doesn't have to decode every column's stats before the grid shows the
+first few.  CachedSummary is the cached merged_sd of one file as seen by
+one LazyFrame: keyed by the frame's rewritten column names, with stats
+read from the file cache CACHED_SUMMARY_CHUNK columns (in schema order) at
+a time, when one of them is first looked up.
+
+  - the first chunk is the columns the grid shows on open, the widget
+    reads it eagerly.  Further chunks are read when the viewport scrolls
+    to them, or when the executor checks whether a group is cached
+  - iterating reads chunk by chunk, so stopping early (the cost model
+    looking for a row count) stops reading too
+  - entries are remapped from the rewritten names they were cached under
+    to this frame's, like the eager loading did
+  - it pickles as a plain dict of what was read so far, column executors
+    are sent to worker processes which never look stats up
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+if TYPE_CHECKING:
+    from .base import AbstractFileCache
+
+logger = logging.getLogger("buckaroo.file_cache.cached_summary")
+
+# columns read per file cache lookup, the first chunk is what the grid shows on open
+CACHED_SUMMARY_CHUNK = 50
+
+
+class CachedSummary(Mapping):
+    """
+    Read-only mapping of rewritten column name -> cached stats for path,
+    holding only the columns that have stats cached.
+    """
+
+    def __init__(self, fc: "AbstractFileCache", path: Path, orig_to_rw: dict[str, str],
+                 chunk_size: int = CACHED_SUMMARY_CHUNK) -> None:
+        self._fc = fc
+        self._path = Path(path)
+        self._orig_cols = list(orig_to_rw)
+        self._orig_to_rw = dict(orig_to_rw)
+        self._rw_pos = {rw: i for i, rw in enumerate(orig_to_rw.values())}
+        self._chunk_size = max(1, chunk_size)
+        self._loaded_chunks: set[int] = set()
+        self._stats: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def num_chunks(self) -> int:
+        return -(-len(self._orig_cols) // self._chunk_size)
+
+    def load(self, orig_cols: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """The cached stats of orig_cols keyed by rewritten name, reading their chunks if needed."""
+        out: dict[str, dict[str, Any]] = {}
+        for orig in orig_cols:
+            rw = self._orig_to_rw.get(orig)
+            if rw is None:
+                continue
+            self._ensure_chunk(self._rw_pos[rw] // self._chunk_size)
+            if rw in self._stats:
+                out[rw] = self._stats[rw]
+        return out
+
+    def is_loaded(self, rw_col: str) -> bool:
+        pos = self._rw_pos.get(rw_col)
+        return pos is not None and pos // self._chunk_size in self._loaded_chunks
+
+    def _ensure_chunk(self, chunk: int) -> None:
+        if chunk in self._loaded_chunks:
+            return
+        with self._lock:
+            if chunk in self._loaded_chunks:
+                return
+            cols = self._orig_cols[chunk * self._chunk_size:(chunk + 1) * self._chunk_size]
+            try:
+                md = self._fc.get_file_metadata(self._path, columns=cols) or {}
+            except Exception:
+                logger.exception(f"reading cached stats of {self._path} failed")
+                md = {}
+            for cached_stats in (md.get('merged_sd') or {}).values():
+                if not isinstance(cached_stats, dict):
+                    continue
+                # cached under the rewritten names of the frame that wrote them
+                new_rw_col = self._orig_to_rw.get(cached_stats.get('orig_col_name'))
+                if new_rw_col:
+                    stats_copy = dict(cached_stats)
+                    stats_copy['rewritten_col_name'] = new_rw_col
+                    self._stats[new_rw_col] = stats_copy
+            self._loaded_chunks.add(chunk)
+            log_msg = f"CachedSummary read chunk {chunk}/{self.num_chunks} of {self._path}, {len(self._stats)} columns read so far"
+            logger.info(log_msg)
+
+    def __getitem__(self, rw_col: str) -> dict[str, Any]:
+        pos = self._rw_pos.get(rw_col)
+        if pos is None:
+            raise KeyError(rw_col)
+        self._ensure_chunk(pos // self._chunk_size)
+        return self._stats[rw_col]
+
+    def __contains__(self, rw_col: object) -> bool:
+        try:
+            self[rw_col]  # type: ignore[index]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        rw_cols = list(self._rw_pos)
+        for chunk in range(self.num_chunks):
+            self._ensure_chunk(chunk)
+            for rw in rw_cols[chunk * self._chunk_size:(chunk + 1) * self._chunk_size]:
+                if rw in self._stats:
+                    yield rw
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        return next(iter(self), None) is not None
+
+    def __reduce__(self):
+        return (dict, (dict(self._stats),))
@@ -0,0 +1,94 @@
+"""
+Cancellation of executor work nobody will see.
+
+An Executor owns a CancellationToken.  Cancelling it (Executor.cancel,
+usually from widget teardown) stops planning new column groups, makes
+in process column executors give up at their next check and kills the
+worker processes of groups running on a WorkerPool.
+
+ColumnExecutor.execute doesn't take the token, subclasses and tests
+override it with a fixed signature.  execute_with_cancel makes the token
+current for the thread instead, long running executors call
+check_cancelled between steps.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger("buckaroo.file_cache.cancellation")
+
+
+class ExecutionCancelled(Exception):
+    """work was abandoned because its CancellationToken was cancelled"""
+    pass
+
+
+class CancellationToken:
+    """A one way flag, safe to share between threads."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """Cancel, running on_cancel callbacks once.  Later calls do nothing."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for cb in callbacks:
+            try:
+                cb()
+            except Exception:
+                logger.exception("cancel callback failed")
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Call callback when cancelled, right away if already cancelled.
+        Returns a function that unregisters it.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def _remove() -> None:
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+                return _remove
+        callback()
+        return lambda: None
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise ExecutionCancelled("cancelled")
+
+
+_current_token: ContextVar[Optional[CancellationToken]] = ContextVar("buckaroo_cancel_token", default=None)
+
+
+@contextmanager
+def cancel_scope(token: CancellationToken) -> Iterator[CancellationToken]:
+    """make token the one check_cancelled looks at, for this thread"""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+def check_cancelled() -> None:
+    """Raise ExecutionCancelled if the work this thread is doing was cancelled."""
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
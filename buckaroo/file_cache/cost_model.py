@@ -0,0 +1,293 @@
+"""
+Cost model batch planning.
+
+smart_planning_function finds a batch size by halving and doubling at
+runtime and starts from scratch for every file.  cost_model_planning_function
+predicts each column's cost instead and packs columns into groups that
+should take a target duration:
+
+  - a column's weight is the bytes it is expected to scan, scaled by how
+    expensive its dtype is to summarise (strings hash for value_counts,
+    booleans are nearly free).  Bytes come from the parquet footer's
+    uncompressed column sizes when available, else from the row count and
+    dtype width, else from the file size split over the columns
+  - seconds per unit of weight start from a prior and are refit from the
+    execution history of the executor log, a timed out group raises the
+    rate so that group would have been predicted to time out
+  - a group that ran out of memory caps later groups at half its weight
+  - columns with a ColumnCost from an earlier file with the same schema
+    (context.column_history) use that measurement directly
+  - until a group has completed, or there is schema history, only a
+    small first group is planned so first results arrive quickly, after
+    that every remaining column is packed into groups of a larger target
+    duration
+
+planning_inputs gathers what the model needs from the LazyFrame and file
+without scanning the data.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+import polars as pl
+
+from .batch_planning import ColumnBatch, ColumnCost, ExecutionResult, PlanningContext, PlanningResult
+
+logger = logging.getLogger("buckaroo.file_cache.cost_model")
+
+# seconds the first group should take, before anything has been measured
+FIRST_GROUP_SECS = 1.0
+# later groups aim for this share of the timeout
+TARGET_TIMEOUT_FRACTION = 0.25
+# prior throughput, bytes of weight summarised per second
+PRIOR_BYTES_PER_SEC = 200 * 1024 * 1024
+# prior cost of a column when nothing is known about its size
+PRIOR_COLUMN_SECS = 0.1
+# assumed average width of a string value when nothing better is known
+DEFAULT_STRING_WIDTH = 16
+
+STRING_DTYPES = (pl.String, pl.Categorical, pl.Enum, pl.Binary, pl.Object)
+NESTED_DTYPES = (pl.List, pl.Array, pl.Struct)
+
+_FIXED_WIDTHS: dict[Any, int] = {
+    pl.Int8: 1, pl.UInt8: 1, pl.Int16: 2, pl.UInt16: 2,
+    pl.Int32: 4, pl.UInt32: 4, pl.Float32: 4, pl.Date: 4,
+    pl.Int64: 8, pl.UInt64: 8, pl.Float64: 8, pl.Datetime: 8, pl.Duration: 8, pl.Time: 8,
+    pl.Decimal: 16,
+}
+
+
+def dtype_cost_factor(dtype: Any) -> float:
+    """relative cost of summarising one byte of a column of dtype"""
+    if dtype is None:
+        return 1.0
+    if isinstance(dtype, STRING_DTYPES) or dtype in STRING_DTYPES:
+        return 4.0
+    if isinstance(dtype, NESTED_DTYPES) or dtype in NESTED_DTYPES:
+        return 4.0
+    if dtype == pl.Boolean:
+        return 0.5
+    return 1.0
+
+
+def dtype_width(dtype: Any, string_width: float = DEFAULT_STRING_WIDTH) -> float:
+    """bytes per value"""
+    if dtype is None:
+        return 8.0
+    if dtype == pl.Boolean:
+        return 1.0
+    if isinstance(dtype, STRING_DTYPES) or dtype in STRING_DTYPES:
+        return string_width
+    if isinstance(dtype, NESTED_DTYPES) or dtype in NESTED_DTYPES:
+        return 4 * string_width
+    base = dtype.base_type() if hasattr(dtype, "base_type") else dtype
+    return float(_FIXED_WIDTHS.get(base, 8))
+
+
+def column_weights(context: PlanningContext) -> tuple[dict[str, float], bool]:
+    """
+    Weight of every column in context.all_columns, and whether the weights
+    are byte estimates (False means every column counts as 1).
+    """
+    cols = context.all_columns
+    dtypes = context.column_dtypes
+    rows = context.row_count
+    string_width: float = DEFAULT_STRING_WIDTH
+    if rows and context.file_size and cols:
+        # spread what fixed width columns don't explain over the string columns
+        n_str = sum(1 for c in cols if dtype_cost_factor(dtypes.get(c)) > 1)
+        fixed = sum(rows * dtype_width(dtypes.get(c)) for c in cols if dtype_cost_factor(dtypes.get(c)) <= 1)
+        if n_str:
+            string_width = max(1.0, (context.file_size - fixed) / (rows * n_str))
+
+    weights: dict[str, float] = {}
+    sized = bool(context.column_bytes) or bool(rows) or bool(context.file_size)
+    for c in cols:
+        dtype = dtypes.get(c)
+        if c in context.column_bytes:
+            size = float(context.column_bytes[c])
+        elif rows:
+            size = rows * dtype_width(dtype, string_width)
+        elif context.file_size:
+            size = context.file_size / len(cols)
+        else:
+            size = 1.0
+        weights[c] = max(size, 1.0) * (dtype_cost_factor(dtype) if sized else 1.0)
+    return weights, sized
+
+
+def fit_rate(history: list[ExecutionResult], weights: dict[str, float], prior: float,
+             baseline_secs: float, timeout_secs: float) -> float:
+    """seconds per unit of weight, refit from completed and timed out groups"""
+    total_secs = 0.0
+    total_weight = 0.0
+    for r in history:
+        if r.success and not r.timed_out:
+            total_secs += max(r.execution_time.total_seconds() - baseline_secs, 0.0)
+            total_weight += sum(weights.get(c, 0.0) for c in r.columns)
+    rate = total_secs / total_weight if total_weight > 0 and total_secs > 0 else prior
+    for r in history:
+        if r.error == "oom":
+            # ran out of memory, not time, see memory_cap
+            continue
+        if r.timed_out or not r.success:
+            w = sum(weights.get(c, 0.0) for c in r.columns)
+            if w > 0:
+                rate = max(rate, timeout_secs / w)
+    return rate
+
+
+def memory_cap(history: list[ExecutionResult], weights: dict[str, float]) -> Optional[float]:
+    """
+    Largest group weight to plan, half of the smallest group that ran out
+    of memory.  None when nothing has.
+    """
+    cap: Optional[float] = None
+    for r in history:
+        if r.error == "oom" and r.columns:
+            half = sum(weights.get(c, 1.0) for c in r.columns) / 2
+            cap = half if cap is None else min(cap, half)
+    return cap
+
+
+def pack_columns(columns: list[str], costs: dict[str, float], target_secs: float,
+                 weights: Optional[dict[str, float]] = None, max_weight: Optional[float] = None) -> list[list[str]]:
+    """
+    consecutive groups whose predicted cost stays under target_secs, and
+    total weight under max_weight when given, at least one column each
+    """
+    groups: list[list[str]] = []
+    current: list[str] = []
+    current_cost = 0.0
+    current_weight = 0.0
+    for c in columns:
+        cost = costs[c]
+        weight = weights.get(c, 1.0) if weights else 0.0
+        over_weight = max_weight is not None and current_weight + weight > max_weight
+        if current and (current_cost + cost > target_secs or over_weight):
+            groups.append(current)
+            current, current_cost, current_weight = [], 0.0, 0.0
+        current.append(c)
+        current_cost += cost
+        current_weight += weight
+    if current:
+        groups.append(current)
+    return groups
+
+
+def cost_model_planning_function(context: PlanningContext) -> PlanningResult:
+    """
+    Plan groups of remaining columns from predicted per column cost, see
+    module docstring.
+    """
+    remaining = context.remaining_columns
+    history = context.execution_history
+    if not remaining:
+        return PlanningResult(batches=[], phase="complete", notes="No columns remaining")
+
+    # a lone column that timed out needs the expression bisector, same as smart_planning_function
+    remaining_set = set(remaining)
+    for r in history:
+        if r.timed_out and len(r.columns) == 1 and r.columns[0] in remaining_set:
+            return PlanningResult(batches=[], phase="error",
+                                  notes=f"Single column {r.columns[0]} timed out - should use expression bisector")
+
+    weights, sized = column_weights(context)
+    prior = 1.0 / PRIOR_BYTES_PER_SEC if sized else PRIOR_COLUMN_SECS
+    baseline_secs = context.baseline_overhead.total_seconds()
+    rate = fit_rate(history, weights, prior, baseline_secs, context.timeout_secs)
+    costs = {c: weights.get(c, 1.0) * rate for c in remaining}
+    known = context.column_history
+    for c in remaining:
+        if c in known:
+            costs[c] = known[c].predict_secs(context.row_count)
+
+    measured = bool(known) or any(r.success and not r.timed_out for r in history)
+    target_secs = TARGET_TIMEOUT_FRACTION * context.timeout_secs
+    if not measured:
+        target_secs = min(FIRST_GROUP_SECS, target_secs)
+    # worker overhead is paid once per group
+    budget = max(target_secs - baseline_secs, 0.0)
+    groups = pack_columns(remaining, costs, budget, weights, memory_cap(history, weights))
+    if not measured:
+        groups = groups[:1]
+
+    batches = [ColumnBatch(columns=g, expected_duration=timedelta(seconds=sum(costs[c] for c in g) + baseline_secs))
+               for g in groups]
+    log_msg = f"cost_model_planning_function: remaining={len(remaining)}, rate={rate:.3g}s/unit, target={target_secs:.2f}s, groups={[len(g) for g in groups]}"
+    logger.info(log_msg)
+    return PlanningResult(
+        batches=batches,
+        phase="cost_model" if measured else "first_group",
+        notes=f"{len(batches)} groups predicted at ~{target_secs:.2f}s each",
+    )
+
+
+def split_group_cost(columns: list[str], secs: float, peak_memory_bytes: int,
+                     all_columns: list[str], inputs: dict[str, Any]) -> dict[str, ColumnCost]:
+    """
+    Share a group's measured time and peak memory between its columns in
+    proportion to their weights.  inputs are the planning_inputs of the file.
+    """
+    ctx = PlanningContext(all_columns=all_columns, baseline_overhead=timedelta(0), timeout_secs=0.0,
+                          execution_history=[], remaining_columns=[], **inputs)
+    weights, _ = column_weights(ctx)
+    total = sum(weights.get(c, 1.0) for c in columns) or 1.0
+    dtypes = inputs.get('column_dtypes', {})
+    rows = inputs.get('row_count') or 0
+    costs: dict[str, ColumnCost] = {}
+    for c in columns:
+        share = weights.get(c, 1.0) / total
+        costs[c] = ColumnCost(dtype=str(dtypes.get(c)), runs=1, total_secs=secs * share,
+                              total_rows=rows, peak_memory_bytes=int(peak_memory_bytes * share))
+    return costs
+
+
+def parquet_column_bytes(path: Path) -> tuple[Optional[int], dict[str, int]]:
+    """(row count, uncompressed bytes per top level column) from a parquet footer"""
+    import pyarrow.parquet as pq
+    try:
+        md = pq.ParquetFile(path).metadata
+    except Exception:
+        return None, {}
+    sizes: dict[str, int] = {}
+    for rg in range(md.num_row_groups):
+        row_group = md.row_group(rg)
+        for i in range(row_group.num_columns):
+            chunk = row_group.column(i)
+            top = chunk.path_in_schema.split(".", 1)[0]
+            sizes[top] = sizes.get(top, 0) + chunk.total_uncompressed_size
+    return md.num_rows, sizes
+
+
+def planning_inputs(ldf: pl.LazyFrame, file_path: Any = None,
+                    cached_sd: Optional[dict[str, dict[str, Any]]] = None) -> dict[str, Any]:
+    """
+    PlanningContext keyword arguments describing ldf: column_dtypes,
+    row_count, file_size and column_bytes.  Only reads the schema, file
+    metadata and any cached stats, never the data.
+    """
+    inputs: dict[str, Any] = {}
+    try:
+        inputs['column_dtypes'] = dict(ldf.collect_schema().items())
+    except Exception:
+        inputs['column_dtypes'] = {}
+    names = set(inputs['column_dtypes'])
+    path = Path(file_path) if file_path else None
+    if path is not None and path.is_file():
+        inputs['file_size'] = path.stat().st_size
+        if path.suffix.lower() in (".parquet", ".parq", ".pq"):
+            rows, sizes = parquet_column_bytes(path)
+            if rows is not None:
+                inputs['row_count'] = rows
+            inputs['column_bytes'] = {c: b for c, b in sizes.items() if c in names}
+    if 'row_count' not in inputs and cached_sd:
+        for stats in cached_sd.values():
+            length = stats.get('length') if isinstance(stats, dict) else None
+            if isinstance(length, int) and length > 0:
+                inputs['row_count'] = length
+                break
+    return inputs
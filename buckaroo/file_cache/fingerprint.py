@@ -0,0 +1,132 @@
+"""
+Content based identity for files in the file cache.
+
+mtime alone throws cached stats away whenever a file is copied, rsynced or
+touched.  A FileIdentity combines size and mtime with a cheap fingerprint of
+the content so the cache can recognise the same bytes under a new mtime or a
+new path.
+
+The fingerprint never reads the whole file:
+  - parquet files hash the footer (schema, row group offsets and statistics)
+  - everything else hashes a handful of fixed size blocks spread across the file,
+    small files are read whole
+  - a sampled fingerprint misses edits between the blocks, FileIdentity.sampled
+    says so and callers only trust it together with an unchanged mtime
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+PARQUET_MAGIC = b"PAR1"
+SAMPLE_BLOCK_SIZE = 64 * 1024
+SAMPLE_BLOCK_COUNT = 8
+# footers bigger than this are sampled like any other file
+MAX_FOOTER_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class FileIdentity:
+    size: int
+    mtime: float
+    fingerprint: str
+    # fingerprint hashes sampled blocks rather than a parquet footer or the whole file
+    sampled: bool = False
+
+    def same_content(self, other: "FileIdentity") -> bool:
+        """
+        Whether other has the same bytes.  Sampled fingerprints only count
+        when the mtimes match too, a same size edit between the sampled
+        blocks would otherwise look unchanged.
+        """
+        if (self.size, self.fingerprint) != (other.size, other.fingerprint):
+            return False
+        return not (self.sampled or other.sampled) or self.mtime == other.mtime
+
+
+def _parquet_footer(f, size: int) -> Optional[bytes]:
+    if size < 12:
+        return None
+    f.seek(0)
+    if f.read(4) != PARQUET_MAGIC:
+        return None
+    f.seek(size - 8)
+    tail = f.read(8)
+    if tail[4:] != PARQUET_MAGIC:
+        return None
+    (footer_len,) = struct.unpack("<I", tail[:4])
+    if footer_len > min(size - 12, MAX_FOOTER_BYTES):
+        return None
+    f.seek(size - 8 - footer_len)
+    return f.read(footer_len)
+
+
+def _sampled_blocks(f, size: int) -> list[bytes]:
+    if size <= SAMPLE_BLOCK_SIZE * SAMPLE_BLOCK_COUNT:
+        f.seek(0)
+        return [f.read()]
+    # first and last block are always included, the rest are evenly spaced
+    stride = (size - SAMPLE_BLOCK_SIZE) // (SAMPLE_BLOCK_COUNT - 1)
+    blocks = []
+    for i in range(SAMPLE_BLOCK_COUNT):
+        f.seek(i * stride)
+        blocks.append(f.read(SAMPLE_BLOCK_SIZE))
+    return blocks
+
+
+def compute_fingerprint(path: Path, size: int) -> str:
+    return _fingerprint(path, size)[0]
+
+
+def _fingerprint(path: Path, size: int) -> tuple[str, bool]:
+    """the fingerprint of path and whether it was sampled"""
+    sampled = False
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(size).encode())
+    with open(path, "rb") as f:
+        footer = _parquet_footer(f, size)
+        if footer is not None:
+            h.update(b"parquet-footer")
+            h.update(footer)
+        else:
+            h.update(b"sampled-blocks")
+            sampled = size > SAMPLE_BLOCK_SIZE * SAMPLE_BLOCK_COUNT
+            for block in _sampled_blocks(f, size):
+                h.update(block)
+    return h.hexdigest(), sampled
+
+
+# fingerprints are memoized on (path, size, mtime_ns) so repeated cache
+# writes for an unchanged file don't re-read it
+_memo_lock = threading.Lock()
+_fingerprint_memo: dict[tuple[str, int, int], tuple[str, bool]] = {}
+_MEMO_MAX = 4096
+
+
+def file_identity(path: Path) -> Optional[FileIdentity]:
+    """
+    Return the FileIdentity of path, or None if it doesn't exist or can't be read.
+    """
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    key = (str(path), st.st_size, st.st_mtime_ns)
+    with _memo_lock:
+        memo = _fingerprint_memo.get(key)
+    if memo is None:
+        try:
+            memo = _fingerprint(path, st.st_size)
+        except OSError:
+            return None
+        with _memo_lock:
+            if len(_fingerprint_memo) >= _MEMO_MAX:
+                _fingerprint_memo.clear()
+            _fingerprint_memo[key] = memo
+    fp, sampled = memo
+    return FileIdentity(size=st.st_size, mtime=st.st_mtime, fingerprint=fp, sampled=sampled)
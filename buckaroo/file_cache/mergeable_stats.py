@@ -0,0 +1,157 @@
+"""
+Merge rules for summary stats computed over pieces of a dataset.
+
+Counts, sums and min/max of a dataset follow from the same stats over its
+files (or row groups) without looking at the data again.  Executor uses
+these rules when it is given dataset pieces: stats for each piece are
+cached, only new pieces are scanned, and the per piece results are merged.
+
+Stats without a merge rule (median, unique_count, value_counts,
+histograms...) can't be combined this way.  One piece's median isn't the
+dataset's, so they are left out of a merged summary rather than carried
+over.  Stats describing the column rather than its values (dtype, the
+typing flags) are kept when every piece agrees, see
+register_constant_stat.  Analyses with mergeable state register their own
+rules with register_stat_merger, and stats derived from that state (a
+distinct count from a merged HyperLogLog) with register_stat_deriver.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Callable, Optional, TypeAlias
+
+from .fingerprint import FileIdentity
+
+SummaryStats: TypeAlias = dict[str, Any]
+# receives the stats of every piece that has stat_key, returns the merged value
+StatMerger: TypeAlias = Callable[[list[SummaryStats], str], Any]
+# receives the merged stats, returns stats derived from them
+StatDeriver: TypeAlias = Callable[[SummaryStats], SummaryStats]
+
+_STAT_MERGERS: dict[str, StatMerger] = {}
+_STAT_DERIVERS: list[StatDeriver] = []
+_CONSTANT_STATS: set[str] = set()
+
+
+def register_stat_merger(stat_key: str, merger: StatMerger) -> None:
+    _STAT_MERGERS[stat_key] = merger
+
+
+def register_stat_deriver(deriver: StatDeriver) -> None:
+    if deriver not in _STAT_DERIVERS:
+        _STAT_DERIVERS.append(deriver)
+
+
+def register_constant_stat(stat_key: str) -> None:
+    """stat_key is the same for every piece of a column, kept in a merge when the pieces agree"""
+    _CONSTANT_STATS.add(stat_key)
+
+
+def stat_merger(stat_key: str) -> Optional[StatMerger]:
+    return _STAT_MERGERS.get(stat_key)
+
+
+def mergeable_stat_keys() -> set[str]:
+    return set(_STAT_MERGERS.keys())
+
+
+def _merge_sum(parts: list[SummaryStats], stat_key: str) -> Any:
+    return sum(p[stat_key] for p in parts)
+
+
+def _merge_min(parts: list[SummaryStats], stat_key: str) -> Any:
+    vals = [p[stat_key] for p in parts if p[stat_key] is not None]
+    return min(vals) if vals else None
+
+
+def _merge_max(parts: list[SummaryStats], stat_key: str) -> Any:
+    vals = [p[stat_key] for p in parts if p[stat_key] is not None]
+    return max(vals) if vals else None
+
+
+def _non_null_count(part: SummaryStats) -> Any:
+    if 'non_null_count' in part:
+        return part['non_null_count']
+    return part['length'] - part['null_count']
+
+
+def _merge_mean(parts: list[SummaryStats], stat_key: str) -> Any:
+    """mean weighted by each piece's non null count"""
+    total = 0.0
+    weight = 0
+    for p in parts:
+        if p[stat_key] is None:
+            continue
+        n = _non_null_count(p)
+        total += p[stat_key] * n
+        weight += n
+    return total / weight if weight else None
+
+
+for _key in ('length', 'null_count', 'non_null_count', 'empty_count', 'sum'):
+    register_stat_merger(_key, _merge_sum)
+register_stat_merger('min', _merge_min)
+register_stat_merger('max', _merge_max)
+register_stat_merger('mean', _merge_mean)
+for _key in ('orig_col_name', 'rewritten_col_name', 'dtype', '_type', 'is_numeric', 'is_integer'):
+    register_constant_stat(_key)
+
+
+def _all_equal(vals: list[Any]) -> bool:
+    try:
+        return all(bool(v == vals[0]) for v in vals[1:])
+    except Exception:
+        # e.g. comparing Series is elementwise, don't treat them as equal
+        return False
+
+
+def mergeable_subset(stats: SummaryStats) -> SummaryStats:
+    """The stats of one piece that can later be merged with other pieces."""
+    return {k: v for k, v in stats.items() if k in _STAT_MERGERS}
+
+
+def merge_summary_stats(parts: list[SummaryStats]) -> SummaryStats:
+    """
+    Merge the stats of several pieces of the same column, parts ordered
+    oldest piece first.  A stat with a merge rule is only merged when every
+    piece has it, otherwise it is left out.  Constant stats are kept when
+    every piece has the same value, any other stat is left out, a single
+    piece keeps all of its stats.
+    """
+    if not parts:
+        return {}
+    merged: SummaryStats = {}
+    if len(parts) == 1:
+        merged.update({k: v for k, v in parts[0].items() if k not in _STAT_MERGERS})
+    else:
+        for stat_key in _CONSTANT_STATS:
+            vals = [p[stat_key] for p in parts if stat_key in p]
+            if len(vals) == len(parts) and _all_equal(vals):
+                merged[stat_key] = vals[0]
+    for stat_key, merger in _STAT_MERGERS.items():
+        if not all(stat_key in p for p in parts):
+            continue
+        try:
+            merged[stat_key] = merger(parts, stat_key)
+        except (TypeError, KeyError, ValueError):
+            # e.g. mean of a piece without counts, leave it out rather than guess
+            continue
+    for deriver in _STAT_DERIVERS:
+        try:
+            merged.update(deriver(merged))
+        except (TypeError, KeyError, ValueError):
+            continue
+    return merged
+
+
+def piece_stats_key(identity: FileIdentity, column: str, signature: str) -> int:
+    """
+    Cache key for the stats of column in one piece.  Keyed on the content
+    fingerprint so a rewritten file gets new stats and a copied one reuses them.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    for part in (identity.fingerprint, str(identity.size), column, signature):
+        h.update(part.encode())
+        h.update(b"\0")
+    # positive and within sqlite's signed 64 bit range
+    return int.from_bytes(h.digest(), "big") >> 1
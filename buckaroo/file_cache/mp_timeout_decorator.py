@@ -1,4 +1,5 @@
 import multiprocessing
+import signal
 from typing import Any
 import inspect
 import cloudpickle as _cloudpickle  # type: ignore
@@ -20,13 +21,32 @@ class ExecutionFailed(Exception):
       """
     pass
 
+class OutOfMemory(ExecutionFailed):
+    """
+      thrown when the worker ran out of memory: it went over its memory limit,
+      raised MemoryError or was SIGKILLed (what the kernel OOM killer sends)
+      """
+    pass
+
+def classify_worker_exit(exitcode: Any) -> ExecutionFailed:
+    """the exception for a worker that exited without reporting a result"""
+    if exitcode == -signal.SIGKILL:
+        return OutOfMemory("worker was killed, likely out of memory")
+    return ExecutionFailed("Execution failed in worker")
+
+def classify_worker_exception(exc: BaseException) -> BaseException:
+    """MemoryError from a worker is reported as OutOfMemory"""
+    if isinstance(exc, MemoryError):
+        return OutOfMemory(f"worker raised MemoryError: {exc}")
+    return exc
+
 def is_running_in_mp_timeout() -> bool:
     """
     Check if the current code is running inside an mp_timeout decorator.
     
-    Returns True if the current call stack includes either _execute_and_report
-    or _execute_and_report_fork, which are the functions that execute code
-    within the multiprocessing worker processes created by mp_timeout.
+    Returns True if the current call stack includes _execute_and_report,
+    _execute_and_report_fork or _pool_worker_main, the functions that execute
+    code within the worker processes created by mp_timeout and WorkerPool.
     
     Returns:
         bool: True if running inside mp_timeout decorator, False otherwise
@@ -35,7 +55,7 @@ def is_running_in_mp_timeout() -> bool:
         stack = inspect.stack()
         for frame_info in stack:
             func_name = frame_info.function
-            if func_name in ('_execute_and_report', '_execute_and_report_fork'):
+            if func_name in ('_execute_and_report', '_execute_and_report_fork', '_pool_worker_main'):
                 return True
         return False
     except Exception:
@@ -183,14 +203,14 @@ def mp_timeout(timeout_secs: float):
                     raise TimeoutException("Timeout fail")
                 # Process already exited: treat as execution failure (likely crash)
                 process.join(0.25)
-                raise ExecutionFailed("Execution failed in worker")
+                raise classify_worker_exit(process.exitcode)
 
             # Child reported a result or an error; ensure child exits
             process.join(0.25)
             exit_code = process.exitcode
 
             if exit_code not in (0, None):
-                raise ExecutionFailed("Execution failed in worker")
+                raise classify_worker_exit(exit_code)
             if status == "ok":
                 return payload
             if status == "exception" and payload is not None:
@@ -198,7 +218,7 @@ def mp_timeout(timeout_secs: float):
                     exc = _cloudpickle.loads(payload)
                 except Exception:
                     raise ExecutionFailed("Execution failed in worker")
-                raise exc
+                raise classify_worker_exception(exc)
             if status == "system_exit":
                 raise ExecutionFailed("Execution failed in worker")
             # Any other error status
@@ -0,0 +1,365 @@
+"""
+A pool of long lived worker processes with per task timeouts.
+
+mp_timeout starts a fresh forkserver process for every call and
+cloudpickles the function and its arguments into it, so process startup,
+imports and shipping the LazyFrame are paid once per column group.
+WorkerPool keeps workers alive between tasks:
+
+  - a task's context (for MultiprocessingExecutor the column executor and
+    the LazyFrame) is sent once per worker under a context key, later
+    tasks only send their ExecutorArgs.  Workers keep the
+    WORKER_CONTEXT_SLOTS most recently used contexts, the parent tracks the
+    same LRU and resends an evicted context when it's needed again
+  - a task that runs past its timeout gets its worker killed, the worker
+    is replaced on next use and TimeoutException is raised, same as
+    mp_timeout
+  - a worker that dies or exits mid task raises ExecutionFailed
+  - with a memory limit, a worker whose RSS goes over it is killed and
+    OutOfMemory is raised, as it is for a MemoryError or a SIGKILL from
+    the kernel OOM killer
+  - a task whose CancellationToken is cancelled gets its worker killed and
+    ExecutionCancelled is raised
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Optional
+
+import cloudpickle as _cloudpickle  # type: ignore
+
+from .cancellation import CancellationToken, ExecutionCancelled
+from .mp_timeout_decorator import (
+    ctx, TimeoutException, ExecutionFailed, OutOfMemory,
+    classify_worker_exit, classify_worker_exception,
+)
+
+logger = logging.getLogger("buckaroo.file_cache.mp_worker_pool")
+
+# contexts each worker keeps, least recently used are dropped
+WORKER_CONTEXT_SLOTS = 4
+DEFAULT_POOL_SIZE = 2
+# how often a worker's RSS is checked against its memory limit, and a
+# task's cancel token
+MEMORY_POLL_SECS = 0.1
+
+
+def reset_peak_rss() -> None:
+    """Restart peak RSS tracking for this process, where the OS allows it (Linux)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_bytes() -> int:
+    """
+    Peak resident set size of this process since reset_peak_rss, or since
+    it started when the peak can't be reset.  0 when unknown.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+    except Exception:
+        return 0
+
+
+def process_rss_bytes(pid: Optional[int]) -> int:
+    """current resident set size of pid, 0 when unknown"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _pool_worker_main(conn: Connection) -> None:
+    """
+    Worker loop.  Messages from the parent:
+      ("context", key, bytes)   cloudpickled context object to keep under key
+      ("run", key, bytes)       cloudpickled (fn, args), runs fn(context, *args)
+      ("stop",)
+    Each "run" gets one reply, the same (status, payload) tuples as mp_timeout,
+    or ("missing_context", None) when the worker doesn't hold key.
+    """
+    contexts: OrderedDict[str, Any] = OrderedDict()
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            return
+        kind = msg[0]
+        if kind == "stop":
+            return
+        if kind == "context":
+            _, key, ctx_bytes = msg
+            try:
+                contexts[key] = _cloudpickle.loads(ctx_bytes)
+            except Exception:
+                # reported when a task asks for the missing context
+                contexts.pop(key, None)
+                continue
+            contexts.move_to_end(key)
+            while len(contexts) > WORKER_CONTEXT_SLOTS:
+                contexts.popitem(last=False)
+            continue
+        _, key, task_bytes = msg
+        if key not in contexts:
+            # evicted, or it failed to unpickle, the parent resends it
+            conn.send(("missing_context", None))
+            continue
+        try:
+            fn, args = _cloudpickle.loads(task_bytes)
+            context = contexts[key]
+            contexts.move_to_end(key)
+            result = fn(context, *args)
+        except SystemExit:
+            try:
+                conn.send(("system_exit", None))
+            except Exception:
+                pass
+            return
+        except BaseException as e:
+            try:
+                conn.send(("exception", _cloudpickle.dumps(e)))
+            except Exception:
+                conn.send(("exception", None))
+            continue
+        try:
+            conn.send(("ok", result))
+        except Exception:
+            # result not serializable
+            conn.send(("error", None))
+
+
+class _Worker:
+    def __init__(self) -> None:
+        self.conn, child_conn = ctx.Pipe(duplex=True)
+        self.process = ctx.Process(target=_pool_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        # mirrors the worker's LRU of contexts, see _pool_worker_main
+        self.context_keys: OrderedDict[str, None] = OrderedDict()
+
+    def send_context(self, key: str, context_bytes: bytes) -> None:
+        self.conn.send(("context", key, context_bytes))
+        self.context_keys[key] = None
+        self.context_keys.move_to_end(key)
+        while len(self.context_keys) > WORKER_CONTEXT_SLOTS:
+            self.context_keys.popitem(last=False)
+
+    def send_task(self, key: str, task_bytes: bytes) -> None:
+        self.conn.send(("run", key, task_bytes))
+        # the worker moves key to the end of its LRU when it runs the task
+        self.context_keys.move_to_end(key)
+
+    def kill(self) -> None:
+        try:
+            self.process.terminate()
+            self.process.join(0.25)
+        except Exception:
+            pass
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(("stop",))
+            self.process.join(1.0)
+        except Exception:
+            pass
+        if self.process.is_alive():
+            self.kill()
+
+
+class WorkerPool:
+    """
+    Long lived worker processes, see module docstring.  Safe to share
+    between threads, each task checks out one idle worker.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE) -> None:
+        self.size = size
+        self._idle: list[Optional[_Worker]] = [None] * size
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def grow(self, size: int) -> None:
+        """Raise the pool to at least size workers, new ones start lazily."""
+        with self._cond:
+            if self._closed or size <= self.size:
+                return
+            self._idle.extend([None] * (size - self.size))
+            self.size = size
+            self._cond.notify_all()
+
+    def _checkout(self) -> _Worker:
+        with self._cond:
+            while not self._idle:
+                self._cond.wait()
+            if self._closed:
+                raise RuntimeError("WorkerPool is shut down")
+            worker = self._idle.pop()
+        if worker is None or not worker.process.is_alive():
+            # workers are started lazily and replaced after a kill or crash
+            worker = _Worker()
+            log_msg = f"WorkerPool: started worker pid={worker.process.pid}"
+            logger.info(log_msg)
+        return worker
+
+    def _checkin(self, worker: Optional[_Worker]) -> None:
+        with self._cond:
+            self._idle.append(worker)
+            self._cond.notify()
+
+    def _wait_for_reply(self, worker: _Worker, timeout_secs: float,
+                        memory_limit_bytes: Optional[int],
+                        cancel_token: Optional[CancellationToken] = None) -> None:
+        """
+        Block until worker has a reply, raising TimeoutException, OutOfMemory
+        when its RSS goes over memory_limit_bytes, ExecutionCancelled when
+        cancel_token is cancelled, or the classified failure when it exits
+        without replying.
+        """
+        deadline = time.monotonic() + timeout_secs
+        poll = bool(memory_limit_bytes) or cancel_token is not None
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                if worker.process.is_alive():
+                    raise TimeoutException("Timeout fail")
+                break
+            wait_secs = min(left, MEMORY_POLL_SECS) if poll else left
+            if worker.conn.poll(wait_secs):
+                return
+            if cancel_token is not None and cancel_token.cancelled:
+                raise ExecutionCancelled("cancelled while running in worker")
+            if not worker.process.is_alive():
+                break
+            if memory_limit_bytes:
+                rss = process_rss_bytes(worker.process.pid)
+                if rss > memory_limit_bytes:
+                    raise OutOfMemory(f"worker used {rss} bytes, over its limit of {memory_limit_bytes}")
+        # poll can wake on EOF from a dead worker too, let recv sort that out
+        if worker.conn.poll(0):
+            return
+        worker.process.join(0.25)
+        raise classify_worker_exit(worker.process.exitcode)
+
+    def run(self, context_key: str, context_bytes: Callable[[], bytes],
+            fn: Callable[..., Any], args: tuple, timeout_secs: float,
+            memory_limit_bytes: Optional[int] = None,
+            cancel_token: Optional[CancellationToken] = None) -> Any:
+        """
+        Run fn(context, *args) in a worker, context being the object
+        context_bytes() cloudpickles.  context_bytes is only called when the
+        worker hasn't seen context_key, callers should cache the bytes.
+
+        With memory_limit_bytes the worker's RSS is polled while it runs and
+        the worker is killed once it goes over, raising OutOfMemory.  With
+        cancel_token the worker is killed once it is cancelled, raising
+        ExecutionCancelled.
+        """
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        worker = self._checkout()
+        ok = False
+        try:
+            task_bytes = _cloudpickle.dumps((fn, args))
+            resent = False
+            while True:
+                if context_key not in worker.context_keys:
+                    worker.send_context(context_key, context_bytes())
+                    resent = True
+                worker.send_task(context_key, task_bytes)
+                self._wait_for_reply(worker, timeout_secs, memory_limit_bytes, cancel_token)
+                try:
+                    status, payload = worker.conn.recv()
+                except (EOFError, OSError):
+                    worker.process.join(0.25)
+                    raise classify_worker_exit(worker.process.exitcode)
+                if status != "missing_context":
+                    break
+                worker.context_keys.pop(context_key, None)
+                if resent:
+                    # sent just now and still missing, it doesn't unpickle in the worker
+                    ok = True
+                    raise ExecutionFailed(f"context {context_key} couldn't be loaded in worker")
+            if status == "ok":
+                ok = True
+                return payload
+            if status == "exception" and payload is not None:
+                try:
+                    exc = _cloudpickle.loads(payload)
+                except Exception:
+                    raise ExecutionFailed("Execution failed in worker")
+                # the worker survived, unless it ran out of memory
+                ok = not isinstance(exc, MemoryError)
+                raise classify_worker_exception(exc)
+            raise ExecutionFailed("Execution failed in worker")
+        finally:
+            if ok:
+                self._checkin(worker)
+            else:
+                worker.kill()
+                self._checkin(None)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._closed = True
+            workers, self._idle = self._idle, []
+            # let blocked _checkout calls raise
+            self._idle.extend([None] * self.size)
+            self._cond.notify_all()
+        for w in workers:
+            if w is not None:
+                w.stop()
+
+
+_global_pool: Optional[WorkerPool] = None
+_global_pool_pid: Optional[int] = None
+_global_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> WorkerPool:
+    """The process wide WorkerPool, created on first use."""
+    global _global_pool, _global_pool_pid
+    with _global_pool_lock:
+        # a forked child can't use its parent's workers
+        if _global_pool is None or _global_pool_pid != os.getpid():
+            _global_pool = WorkerPool()
+            _global_pool_pid = os.getpid()
+        return _global_pool
+
+
+def shutdown_worker_pool() -> None:
+    global _global_pool
+    with _global_pool_lock:
+        pool, _global_pool = _global_pool, None
+    if pool is not None and _global_pool_pid == os.getpid():
+        pool.shutdown()
+
+
+atexit.register(shutdown_worker_pool)
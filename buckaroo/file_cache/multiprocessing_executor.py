@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import partial
 from datetime import datetime as dtdt
+from pathlib import Path
 from typing import Optional, Any
 import os
 import threading
@@ -11,6 +14,11 @@ import polars as pl
 from .base import (
     Executor as BaseExecutor,
     ColumnExecutor,
+    ColumnGroup,
+    ColumnResults,
+    FAILURE_ERROR,
+    FAILURE_OOM,
+    FAILURE_TIMEOUT,
     ExecutorArgs,
     FileCache,
     ProgressNotification,
@@ -18,18 +26,114 @@ from .base import (
     SimpleExecutorLog,
     MaybeFilepathLike,
 )
-from .mp_timeout_decorator import mp_timeout, TimeoutException, ExecutionFailed
+import cloudpickle as _cloudpickle  # type: ignore
+
+from .cancellation import CancellationToken, ExecutionCancelled
+from .mp_timeout_decorator import TimeoutException, ExecutionFailed, OutOfMemory
+from .mp_worker_pool import WorkerPool, get_worker_pool, peak_rss_bytes, reset_peak_rss
+from .result_transport import PackedResults, discard_reply, pack_results, reply_path, unpack_results
 from .batch_planning import PlanningFunction, simple_one_column_planning
 
 
+# memory one column group is assumed to need when there is no file to size
+DEFAULT_GROUP_MEMORY_BYTES = 512 * 1024 * 1024
+# share of currently available memory concurrent column groups may use
+MEMORY_BUDGET_FRACTION = 0.5
+
+
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def available_memory_bytes() -> Optional[int]:
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_concurrency(memory_budget_bytes: Optional[int] = None,
+                        group_memory_bytes: int = DEFAULT_GROUP_MEMORY_BYTES) -> int:
+    """
+    How many column groups to run at once: one per available core, capped
+    by how many groups of group_memory_bytes fit in memory_budget_bytes
+    (default MEMORY_BUDGET_FRACTION of the memory available now).
+    """
+    cpus = available_cpus()
+    if memory_budget_bytes is None:
+        avail = available_memory_bytes()
+        if avail is None:
+            return cpus
+        memory_budget_bytes = int(avail * MEMORY_BUDGET_FRACTION)
+    return max(1, min(cpus, memory_budget_bytes // max(group_memory_bytes, 1)))
+
+
+def default_memory_limit(concurrency: int, memory_budget_bytes: Optional[int] = None) -> Optional[int]:
+    """
+    Memory each of concurrency workers may use: an even share of
+    memory_budget_bytes (default MEMORY_BUDGET_FRACTION of the memory
+    available now).  None when available memory is unknown.
+    """
+    if memory_budget_bytes is None:
+        avail = available_memory_bytes()
+        if avail is None:
+            return None
+        memory_budget_bytes = int(avail * MEMORY_BUDGET_FRACTION)
+    return max(memory_budget_bytes // max(concurrency, 1), 1)
+
+
 def _execute_column(column_executor: ColumnExecutor, ldf: pl.LazyFrame, ex_args):
     return column_executor.execute(ldf, ex_args)
 
 
+def _execute_column_in_context(context: tuple[ColumnExecutor, pl.LazyFrame], ex_args,
+                               ipc_path: str) -> PackedResults:
+    column_executor, ldf = context
+    reset_peak_rss()
+    res = _execute_column(column_executor, ldf, ex_args)
+    # large Series travel as Arrow IPC instead of through the pipe
+    packed = pack_results(res, path=ipc_path)
+    packed.peak_rss_bytes = peak_rss_bytes()
+    return packed
+
+
+def _execute_piece_in_context(context: tuple[ColumnExecutor, pl.LazyFrame], ex_args,
+                              ipc_path: str, piece: Path) -> PackedResults:
+    from buckaroo.read_utils import read_df
+    column_executor, _ldf = context
+    reset_peak_rss()
+    packed = pack_results(_execute_column(column_executor, read_df(piece), ex_args), path=ipc_path)
+    packed.peak_rss_bytes = peak_rss_bytes()
+    return packed
+
+
 class MultiprocessingExecutor(BaseExecutor):
     """
     Executor that runs each column group in a separate process with a timeout.
-    Uses mp_timeout (cloudpickle + multiprocessing) to isolate crashes and cap runtime.
+    Column groups run on a WorkerPool of long lived processes, the column
+    executor and LazyFrame are sent to each worker once per executor rather
+    than once per group.  A hung worker is killed and replaced.  Large
+    Series in the results come back as memory mapped Arrow IPC, see
+    result_transport.
+
+    Up to max_concurrency groups run at once (default_concurrency when not
+    given), planning and bookkeeping stay on one thread and
+    ProgressNotifications arrive in completion order.
+
+    Each worker is held to memory_limit_bytes (default_memory_limit when not
+    given).  A group that goes over fails with failure_kind FAILURE_OOM and
+    is left for the planner to split, a single column is first retried on
+    the column executor's low_memory_executor.
+
+    cancel() kills the workers of running groups and stops the dispatcher,
+    cancelled groups are dropped from the executor log rather than read as
+    failures.
+
+    With pieces, each piece a group still has to scan runs in a worker, see
+    Executor.execute_pieces.
     """
     def __init__(
         self,
@@ -44,179 +148,323 @@ class MultiprocessingExecutor(BaseExecutor):
         cached_merged_sd: dict[str, dict[str, Any]] | None = None,
         orig_to_rw_map: dict[str, str] | None = None,
         planning_function: Optional[PlanningFunction] = None,
+        worker_pool: Optional[WorkerPool] = None,
+        max_concurrency: Optional[int] = None,
+        memory_budget_bytes: Optional[int] = None,
+        memory_limit_bytes: Optional[int] = None,
+        pieces: Optional[list[Path]] = None,
     ) -> None:
         # Use simple_one_column_planning by default for backward compatibility
         # Can be overridden with default_planning_function for batch optimization
         planning_func = planning_function or simple_one_column_planning
         super().__init__(ldf, column_executor, listener, fc, executor_log, file_path=file_path, 
                         cached_merged_sd=cached_merged_sd, orig_to_rw_map=orig_to_rw_map,
-                        planning_function=planning_func)
+                        planning_function=planning_func, pieces=pieces)
         self.timeout_secs = timeout_secs
         self.async_mode = async_mode
         # Track thread for async mode (for testing utilities)
         self._work_thread: Optional[threading.Thread] = None
+        self.worker_pool = worker_pool
+        self._context_key = f"{os.getpid()}-{id(self)}-{dtdt.now().timestamp()}"
+        # column executor and pickled context per low memory level, 0 is column_executor
+        self._level_executors: list[ColumnExecutor] = [column_executor]
+        self._context_bytes: dict[int, bytes] = {}
+        self._context_lock = threading.Lock()
+        if max_concurrency is None:
+            max_concurrency = default_concurrency(memory_budget_bytes, self._group_memory_estimate())
+        self.max_concurrency = max(1, max_concurrency)
+        if memory_limit_bytes is None:
+            memory_limit_bytes = default_memory_limit(self.max_concurrency, memory_budget_bytes)
+        self.memory_limit_bytes = memory_limit_bytes
+
+    def _group_memory_estimate(self) -> int:
+        # a group can't need much less than the file it scans
+        size = 0
+        if self.file_path is not None and Path(self.file_path).is_file():
+            size = Path(self.file_path).stat().st_size
+        return max(DEFAULT_GROUP_MEMORY_BYTES, size)
+
+    def _level_executor(self, level: int) -> Optional[ColumnExecutor]:
+        """column executor for a low memory level, None past the last one"""
+        with self._context_lock:
+            while len(self._level_executors) <= level:
+                smaller = self._level_executors[-1].low_memory_executor()
+                if smaller is None:
+                    return None
+                self._level_executors.append(smaller)
+            return self._level_executors[level]
+
+    def _get_context_bytes(self, level: int = 0) -> bytes:
+        # pickled once, workers that haven't seen this executor get the same bytes
+        with self._context_lock:
+            if level not in self._context_bytes:
+                self._context_bytes[level] = _cloudpickle.dumps((self._level_executors[level], self.ldf))
+            return self._context_bytes[level]
+
+    def _execute_in_worker(self, ex_args: ExecutorArgs) -> tuple[ColumnResults, int]:
+        """
+        results of ex_args and the worker's peak RSS while computing them.
+        A single column that runs out of memory is retried on the column
+        executor's low_memory_executor chain.
+        """
+        if self.pieces is not None:
+            # peak memory of the piece runs isn't tracked
+            return self.execute_pieces(ex_args), 0
+        return self._run_in_worker(_execute_column_in_context, ex_args)
+
+    def _execute_piece(self, piece: Path, ex_args: ExecutorArgs) -> ColumnResults:
+        return self._run_in_worker(partial(_execute_piece_in_context, piece=piece), ex_args)[0]
+
+    def _run_in_worker(self, fn, ex_args: ExecutorArgs) -> tuple[ColumnResults, int]:
+        pool = self.worker_pool
+        if pool is None:
+            pool = get_worker_pool()
+            pool.grow(self.max_concurrency)
+        level = 0
+        while True:
+            # chosen here so a reply that is never unpacked can still be removed
+            ipc_path = str(reply_path())
+            try:
+                packed = pool.run(f"{self._context_key}-{level}", partial(self._get_context_bytes, level),
+                                  fn, (ex_args, ipc_path), self.timeout_secs,
+                                  memory_limit_bytes=self.memory_limit_bytes,
+                                  cancel_token=self.cancel_token)
+                break
+            except BaseException as e:
+                # cancelled, timed out or the worker died, maybe after writing
+                discard_reply(ipc_path)
+                if not isinstance(e, OutOfMemory):
+                    raise
+                if len(ex_args.columns) != 1 or self._level_executor(level + 1) is None:
+                    raise
+                level += 1
+                log_msg = f"MultiprocessingExecutor: {ex_args.columns} out of memory, retrying with {type(self._level_executors[level]).__name__} (level {level})"
+                logging.getLogger("buckaroo.multiprocessing_executor").warning(log_msg)
+        try:
+            return unpack_results(packed), packed.peak_rss_bytes
+        except OSError as e:
+            raise ExecutionFailed(f"could not read worker results: {e}")
+
+    def _prepare_group(self, group: ColumnGroup, logger: logging.Logger) -> Optional[ExecutorArgs]:
+        """ExecutorArgs to run group with, None when the group is skipped"""
+        executor_id = id(self)
+        log_msg_args = f"MultiprocessingExecutor._work() getting executor args - executor_id={executor_id}, group={group}"
+        logger.info(log_msg_args)
+
+        ex_args = self.get_executor_args(group)
+
+        log_msg_args_result = f"MultiprocessingExecutor._work() got executor args - executor_id={executor_id}, columns={ex_args.columns}, no_exec={ex_args.no_exec}, expressions_count={len(ex_args.expressions) if ex_args.expressions else 0}"
+        logger.info(log_msg_args_result)
+
+        # Check if already failed (don't retry)
+        if self.executor_log.check_log_for_previous_failure(self.dfi, ex_args):
+            log_msg = f"MultiprocessingExecutor._work() SKIPPING group {group} - previous failure detected"
+            logger.info(log_msg)
+            # DON'T remove columns from remaining - planner needs to retry with smaller batches
+            # The planner will detect the timeout from executor log history and transition to smaller batches
+            return None
+
+        # Check if already completed
+        original_group_args = ExecutorArgs(
+            columns=list(group),
+            column_specific_expressions=ex_args.column_specific_expressions,
+            include_hash=ex_args.include_hash,
+            expressions=ex_args.expressions,
+            row_start=ex_args.row_start,
+            row_end=ex_args.row_end,
+            extra=ex_args.extra,
+            no_exec=False
+        )
+
+        if self.executor_log.check_log_for_completed(self.dfi, original_group_args):
+            log_msg = f"MultiprocessingExecutor._work() SKIPPING group {group} - already completed (found in executor log)"
+            logger.info(log_msg)
+            self._update_planning_state_after_execution(list(group))
+            return None
+
+        # Check if no_exec (all columns cached via merged_sd)
+        if ex_args.no_exec:
+            log_msg = f"MultiprocessingExecutor._work() SKIPPING group {group} - no_exec=True (all columns cached)"
+            logger.info(log_msg)
+            self._update_planning_state_after_execution(list(group))
+            return None
+
+        # No columns to execute
+        if not ex_args.columns:
+            log_msg = f"MultiprocessingExecutor._work() SKIPPING group {group} - no columns to execute"
+            logger.info(log_msg)
+            self._update_planning_state_after_execution(list(group))
+            return None
+        return ex_args
+
+    def _finish_group(self, group: ColumnGroup, ex_args: ExecutorArgs, t1: dtdt,
+                      fut: Future, logger: logging.Logger) -> None:
+        """Persist, notify and update planning for a group that finished running"""
+        executor_id = id(self)
+        try:
+            res, peak_rss = fut.result()
+
+            log_msg_after_exec = f"MultiprocessingExecutor._work() worker pool returned - executor_id={executor_id}, result_keys={list(res.keys()) if res else None}"
+            logger.info(log_msg_after_exec)
+            # persist results, one transaction per column group
+            self._persist_results(res)
+            t2 = dtdt.now()
 
-    def run(self) -> None:
+            listener_id = id(self.listener)
+            log_msg = f"MultiprocessingExecutor._work() CALLING LISTENER - executor_id={executor_id}, listener_id={listener_id}, col_group={group}, columns_computed={len(res)}"
+            logger.info(log_msg)
+            self.listener(ProgressNotification(
+                success=True,
+                col_group=group,
+                execution_args=ex_args,
+                result=res,
+                execution_time=t2-t1,  # timedelta
+                failure_message=None
+            ))
+            self.executor_log.log_end_col_group(self.dfi, ex_args)
+            self._log_group_cost(list(ex_args.columns), t2-t1, peak_rss)
+            # Update planning state after successful execution
+            executed_columns = list(res.keys())
+            self._update_planning_state_after_execution(executed_columns)
+        except ExecutionCancelled:
+            log_msg = f"MultiprocessingExecutor._work() CANCELLED group {group} - executor_id={executor_id}"
+            logger.info(log_msg)
+            self.executor_log.log_cancelled_col_group(self.dfi, ex_args)
+        except TimeoutException:
+            t2 = dtdt.now()
+            self.listener(ProgressNotification(
+                success=False,
+                col_group=group,
+                execution_args=ex_args,
+                result=None,
+                execution_time=t2-t1,  # timedelta
+                failure_message=f"timeout after {self.timeout_secs}s",
+                failure_kind=FAILURE_TIMEOUT,
+            ))
+            # DON'T remove columns from remaining on timeout - planner needs to retry with smaller batches
+            # The planner will detect the timeout from executor log history and transition to smaller batches
+        except OutOfMemory as e:
+            t2 = dtdt.now()
+            self.listener(ProgressNotification(
+                success=False,
+                col_group=group,
+                execution_args=ex_args,
+                result=None,
+                execution_time=t2-t1,  # timedelta
+                failure_message=f"out of memory: {e}",
+                failure_kind=FAILURE_OOM,
+            ))
+            self.executor_log.log_failed_col_group(self.dfi, ex_args, FAILURE_OOM)
+            # a multi column group stays in remaining, planners split groups that ran out of memory.
+            # A single column already went through low_memory_executor, give up on it
+            if len(ex_args.columns) == 1:
+                self._update_planning_state_after_execution(list(group))
+        except ExecutionFailed:
+            t2 = dtdt.now()
+            # ExecutionFailed means the worker process exited abnormally (non-zero exit,
+            # crash/SystemExit, or failed to serialize/return a result). Other exceptions
+            # caught below are raised in the parent process during orchestration.
+            self.listener(ProgressNotification(
+                success=False,
+                col_group=group,
+                execution_args=ex_args,
+                result=None,
+                execution_time=t2-t1,  # timedelta
+                failure_message="execution failed in worker",
+                failure_kind=FAILURE_ERROR,
+            ))
+            # DON'T remove columns from remaining on ExecutionFailed - planner may retry with smaller batches
+            # For now, remove to prevent infinite loop, but this could be improved
+            self._update_planning_state_after_execution(list(group))
+        except Exception as e:
+            t2 = dtdt.now()
+            self.listener(ProgressNotification(
+                success=False,
+                col_group=group,
+                execution_args=ex_args,
+                result=None,
+                execution_time=t2-t1,  # timedelta
+                failure_message=str(e),
+                failure_kind=FAILURE_ERROR,
+            ))
+            # Update planning state to prevent infinite loop
+            self._update_planning_state_after_execution(list(group))
+
+    def run(self, cancel_token: Optional[CancellationToken] = None) -> None:
+        self._use_cancel_token(cancel_token)
         logger = logging.getLogger("buckaroo.multiprocessing_executor")
         executor_id = id(self)
         executor_pid = os.getpid()
-        log_msg = f"MultiprocessingExecutor.run() START - executor_id={executor_id}, pid={executor_pid}, async_mode={self.async_mode}"
+        log_msg = f"MultiprocessingExecutor.run() START - executor_id={executor_id}, pid={executor_pid}, async_mode={self.async_mode}, max_concurrency={self.max_concurrency}"
         logger.info(log_msg)
-        
+
         def _work():
             worker_pid = os.getpid()
             worker_thread_id = threading.get_ident()
             log_msg = f"MultiprocessingExecutor._work() START - executor_id={executor_id}, original_pid={executor_pid}, worker_pid={worker_pid}, worker_thread_id={worker_thread_id}"
             logger.info(log_msg)
-            
+
+            # Planning, logging and listener calls all happen on this thread,
+            # the dispatch threads only wait on the worker pool
+            running: dict[Future, tuple[ColumnGroup, ExecutorArgs, dtdt, tuple[list[str], list[str]]]] = {}
+
+            def _finish(done) -> None:
+                for fut in done:
+                    group, ex_args, t1, in_flight_entry = running.pop(fut)
+                    self._in_flight.remove(in_flight_entry)
+                    self._finish_group(group, ex_args, t1, fut, logger)
+
             iteration_count = 0
-            # Use get_next_column_chunk() to get batches one at a time
-            while True:
-                iteration_count += 1
-                log_msg_iter = f"MultiprocessingExecutor._work() ITERATION {iteration_count} - executor_id={executor_id}, worker_thread_id={worker_thread_id}, calling get_next_column_chunk()"
-                logger.info(log_msg_iter)
-                
-                group = self.get_next_column_chunk()
-                log_msg_group = f"MultiprocessingExecutor._work() got group - executor_id={executor_id}, worker_thread_id={worker_thread_id}, group={group}, iteration={iteration_count}"
-                logger.info(log_msg_group)
-                
-                if group is None:
-                    log_msg_done = f"MultiprocessingExecutor._work() DONE - executor_id={executor_id}, worker_thread_id={worker_thread_id}, iterations={iteration_count}, no more groups"
-                    logger.info(log_msg_done)
-                    break
-                log_msg_args = f"MultiprocessingExecutor._work() getting executor args - executor_id={executor_id}, worker_thread_id={worker_thread_id}, group={group}"
-                logger.info(log_msg_args)
-                
-                ex_args = self.get_executor_args(group)
-                
-                log_msg_args_result = f"MultiprocessingExecutor._work() got executor args - executor_id={executor_id}, worker_thread_id={worker_thread_id}, columns={ex_args.columns}, no_exec={ex_args.no_exec}, expressions_count={len(ex_args.expressions) if ex_args.expressions else 0}"
-                logger.info(log_msg_args_result)
-                
-                # Check if already failed (don't retry)
-                if self.executor_log.check_log_for_previous_failure(self.dfi, ex_args):
-                    log_msg = f"MultiprocessingExecutor._work() SKIPPING group {group} - previous failure detected"
-                    logger.info(log_msg)
-                    # DON'T remove columns from remaining - planner needs to retry with smaller batches
-                    # The planner will detect the timeout from executor log history and transition to smaller batches
-                    continue
-                
-                # Check if already completed
-                original_group_args = ExecutorArgs(
-                    columns=list(group),
-                    column_specific_expressions=ex_args.column_specific_expressions,
-                    include_hash=ex_args.include_hash,
-                    expressions=ex_args.expressions,
-                    row_start=ex_args.row_start,
-                    row_end=ex_args.row_end,
-                    extra=ex_args.extra,
-                    no_exec=False
-                )
-                
-                if self.executor_log.check_log_for_completed(self.dfi, original_group_args):
-                    log_msg = f"MultiprocessingExecutor._work() SKIPPING group {group} - already completed (found in executor log)"
-                    logger.info(log_msg)
-                    self._update_planning_state_after_execution(list(group))
-                    continue
-                
-                # Check if no_exec (all columns cached via merged_sd)
-                if ex_args.no_exec:
-                    log_msg = f"MultiprocessingExecutor._work() SKIPPING group {group} - no_exec=True (all columns cached)"
-                    logger.info(log_msg)
-                    self._update_planning_state_after_execution(list(group))
-                    continue
-                
-                # No columns to execute
-                if not ex_args.columns:
-                    log_msg = f"MultiprocessingExecutor._work() SKIPPING group {group} - no columns to execute"
-                    logger.info(log_msg)
-                    self._update_planning_state_after_execution(list(group))
-                    continue
-                
-                log_msg_exec = f"MultiprocessingExecutor._work() EXECUTING group {group} - executor_id={executor_id}, worker_thread_id={worker_thread_id}, columns={ex_args.columns}"
-                logger.info(log_msg_exec)
-                
-                log_msg_dfi = f"MultiprocessingExecutor._work() LOGGING START - dfi={self.dfi}, columns={len(ex_args.columns)}"
-                logger.debug(log_msg_dfi)
-                self.executor_log.log_start_col_group(self.dfi, ex_args, self.executor_class_name)
-                t1 = dtdt.now()
-                try:
-                    timed_exec = mp_timeout(self.timeout_secs)(_execute_column)
-                    log_msg_before_exec = f"MultiprocessingExecutor._work() calling timed_exec - executor_id={executor_id}, worker_thread_id={worker_thread_id}, columns={ex_args.columns}"
-                    logger.info(log_msg_before_exec)
-                    
-                    res = timed_exec(self.column_executor, self.ldf, ex_args)
-                    
-                    log_msg_after_exec = f"MultiprocessingExecutor._work() timed_exec returned - executor_id={executor_id}, worker_thread_id={worker_thread_id}, result_keys={list(res.keys()) if res else None}"
-                    logger.info(log_msg_after_exec)
-                    # persist results
-                    for _col, col_result in res.items():
-                        self.fc.upsert_key(col_result.series_hash, col_result.result)
-                    t2 = dtdt.now()
-
-                    listener_id = id(self.listener)
-                    log_msg = f"MultiprocessingExecutor._work() CALLING LISTENER - executor_id={executor_id}, worker_pid={worker_pid}, listener_id={listener_id}, col_group={group}, columns_computed={len(res)}"
-                    logger.info(log_msg)
-                    self.listener(ProgressNotification(
-                        success=True,
-                        col_group=group,
-                        execution_args=ex_args,
-                        result=res,
-                        execution_time=t2-t1,  # timedelta
-                        failure_message=None
-                    ))
-                    self.executor_log.log_end_col_group(self.dfi, ex_args)
-                    # Update planning state after successful execution
-                    executed_columns = list(res.keys())
-                    self._update_planning_state_after_execution(executed_columns)
-                except TimeoutException:
-                    t2 = dtdt.now()
-                    self.listener(ProgressNotification(
-                        success=False,
-                        col_group=group,
-                        execution_args=ex_args,
-                        result=None,
-                        execution_time=t2-t1,  # timedelta
-                        failure_message=f"timeout after {self.timeout_secs}s",
-                    ))
-                    # DON'T remove columns from remaining on timeout - planner needs to retry with smaller batches
-                    # The planner will detect the timeout from executor log history and transition to smaller batches
-                    continue
-                except ExecutionFailed:
-                    t2 = dtdt.now()
-                    # ExecutionFailed means the worker process exited abnormally (non-zero exit,
-                    # crash/SystemExit, or failed to serialize/return a result). Other exceptions
-                    # caught below are raised in the parent process during orchestration.
-                    self.listener(ProgressNotification(
-                        success=False,
-                        col_group=group,
-                        execution_args=ex_args,
-                        result=None,
-                        execution_time=t2-t1,  # timedelta
-                        failure_message="execution failed in worker",
-                    ))
-                    # DON'T remove columns from remaining on ExecutionFailed - planner may retry with smaller batches
-                    # For now, remove to prevent infinite loop, but this could be improved
-                    self._update_planning_state_after_execution(list(group))
-                    continue
-                except Exception as e:
-                    t2 = dtdt.now()
-                    self.listener(ProgressNotification(
-                        success=False,
-                        col_group=group,
-                        execution_args=ex_args,
-                        result=None,
-                        execution_time=t2-t1,  # timedelta
-                        failure_message=str(e),
-                    ))
-                    # Update planning state to prevent infinite loop
-                    self._update_planning_state_after_execution(list(group))
-                    continue
+            with ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                    thread_name_prefix="buckaroo-mp-group") as dispatch:
+                while True:
+                    _finish([fut for fut in running if fut.done()])
+                    group = None
+                    if len(running) < self.max_concurrency:
+                        iteration_count += 1
+                        log_msg_iter = f"MultiprocessingExecutor._work() ITERATION {iteration_count} - executor_id={executor_id}, worker_thread_id={worker_thread_id}, running={len(running)}, calling get_next_column_chunk()"
+                        logger.info(log_msg_iter)
+                        group = self.get_next_column_chunk()
+                        log_msg_group = f"MultiprocessingExecutor._work() got group - executor_id={executor_id}, worker_thread_id={worker_thread_id}, group={group}, iteration={iteration_count}"
+                        logger.info(log_msg_group)
+
+                    if group is None:
+                        if not running:
+                            log_msg_done = f"MultiprocessingExecutor._work() DONE - executor_id={executor_id}, worker_thread_id={worker_thread_id}, iterations={iteration_count}, no more groups"
+                            logger.info(log_msg_done)
+                            break
+                        # all slots busy, or every remaining column is in flight
+                        done, _ = wait(running, return_when=FIRST_COMPLETED)
+                        _finish(done)
+                        continue
+
+                    ex_args = self._prepare_group(group, logger)
+                    if ex_args is None:
+                        continue
+
+                    log_msg_exec = f"MultiprocessingExecutor._work() EXECUTING group {group} - executor_id={executor_id}, worker_thread_id={worker_thread_id}, columns={ex_args.columns}, running={len(running)}"
+                    logger.info(log_msg_exec)
+
+                    log_msg_dfi = f"MultiprocessingExecutor._work() LOGGING START - dfi={self.dfi}, columns={len(ex_args.columns)}"
+                    logger.debug(log_msg_dfi)
+                    self.executor_log.log_start_col_group(self.dfi, ex_args, self.executor_class_name)
+                    in_flight_entry = (list(group), list(ex_args.columns))
+                    self._in_flight.append(in_flight_entry)
+                    t1 = dtdt.now()
+                    fut = dispatch.submit(self._execute_in_worker, ex_args)
+                    running[fut] = (group, ex_args, t1, in_flight_entry)
+
+        def _work_then_finish():
+            try:
+                _work()
+            finally:
+                self._finish_run()
 
         if self.async_mode:
             listener_id = id(self.listener)
             log_msg = f"MultiprocessingExecutor.run() STARTING BACKGROUND THREAD - executor_id={executor_id}, pid={executor_pid}, listener_id={listener_id}, async_mode=True"
             logger.info(log_msg)
-            t = threading.Thread(target=_work, daemon=True)
+            t = threading.Thread(target=_work_then_finish, daemon=True)
             self._work_thread = t  # Store thread reference for testing utilities
             t.start()
             thread_id = t.ident
@@ -224,6 +472,4 @@ class MultiprocessingExecutor(BaseExecutor):
             logger.info(log_msg)
             return
         else:
-            _work()
-
-
+            _work_then_finish()
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, List, Type, Set
+from typing import Any, Callable, List, Optional, Type, Set
 from collections import defaultdict
 import json
 import logging
@@ -8,12 +8,20 @@ import logging
 import polars as pl
 
 from buckaroo.file_cache.base import ColumnExecutor, ColumnResults, ColumnResult, ExecutorArgs
+from buckaroo.file_cache.cancellation import check_cancelled
 from buckaroo.pluggable_analysis_framework.polars_analysis_management import (
     PolarsAnalysis, polars_select_expressions, polars_series_stats_from_select_result,
+    polars_produce_summary_df,
 )
+from buckaroo.file_cache.mergeable_stats import mergeable_stat_keys, stat_merger
 from buckaroo.pluggable_analysis_framework.polars_utils import split_to_dicts
 
 
+# column_ops whose value follows from the column's dtype, taken from the
+# schema rather than collecting the column
+SCHEMA_COLUMN_OPS: dict[str, Callable[[pl.DataType], Any]] = {'dtype': lambda dtype: dtype}
+
+
 class PAFColumnExecutor(ColumnExecutor[ExecutorArgs]):
     """
     ColumnExecutor that delegates per-column analysis to the Polars pluggable
@@ -21,10 +29,43 @@ class PAFColumnExecutor(ColumnExecutor[ExecutorArgs]):
     summary stats per column, and returns ColumnResults suitable for caching.
     """
 
-    def __init__(self, analyses: List[Type[PolarsAnalysis]], cached_merged_sd: dict[str, dict[str, Any]] | None = None, orig_to_rw_map: dict[str, str] | None = None) -> None:
+    def __init__(self, analyses: List[Type[PolarsAnalysis]], cached_merged_sd: dict[str, dict[str, Any]] | None = None, orig_to_rw_map: dict[str, str] | None = None,
+                 footer_stats: dict[str, dict[str, Any]] | None = None) -> None:
         self.analyses = list(analyses)
-        self.cached_merged_sd = cached_merged_sd or {}
+        # may be a CachedSummary that reads columns on lookup, don't test it for truthiness
+        self.cached_merged_sd = cached_merged_sd if cached_merged_sd is not None else {}
         self.orig_to_rw_map = orig_to_rw_map or {}
+        # stats known from the parquet footer keyed by original column name,
+        # expressions that would only recompute these are skipped
+        self.footer_stats = footer_stats or {}
+
+    def _split_footer_expressions(self, only_cols: pl.LazyFrame,
+                                  expressions: list[pl.Expr]) -> tuple[list[pl.Expr], dict[str, Any]]:
+        """
+        Split expressions into the ones that still need to run and the
+        output columns (json [col, measure] names) answered by footer_stats.
+        An expression is only dropped when every output it produces is known.
+        """
+        if not self.footer_stats:
+            return expressions, {}
+        remaining: list[pl.Expr] = []
+        known: dict[str, Any] = {}
+        for expr in expressions:
+            try:
+                out_names = only_cols.select(expr).collect_schema().names()
+                values = {}
+                for name in out_names:
+                    orig_col, measure = json.loads(name)
+                    values[name] = self.footer_stats[orig_col][measure]
+            except Exception:
+                # not a [col, measure] output, or not covered by the footer
+                remaining.append(expr)
+                continue
+            if not out_names:
+                remaining.append(expr)
+                continue
+            known.update(values)
+        return remaining, known
     
     def _get_expected_stat_keys(self) -> Set[str]:
         """
@@ -67,7 +108,9 @@ class PAFColumnExecutor(ColumnExecutor[ExecutorArgs]):
         
         logger.info(f"PAFColumnExecutor.get_execution_args: checking {len(all_input_cols)} columns in group")
         logger.debug(f"  Input columns: {all_input_cols}")
-        logger.debug(f"  cached_merged_sd keys: {list(self.cached_merged_sd.keys())}")
+        if logger.isEnabledFor(logging.DEBUG):
+            # reads every cached column
+            logger.debug(f"  cached_merged_sd keys: {list(self.cached_merged_sd.keys())}")
         logger.debug(f"  orig_to_rw_map: {self.orig_to_rw_map}")
         
         # Get expected stat keys from the requested analyses
@@ -148,18 +191,54 @@ class PAFColumnExecutor(ColumnExecutor[ExecutorArgs]):
     def execute(self, ldf:pl.LazyFrame, execution_args:ExecutorArgs) -> ColumnResults:
         cols = execution_args.columns
         only_cols = ldf.select(cols)
+        expressions, footer_values = self._split_footer_expressions(only_cols, list(execution_args.expressions))
+        if footer_values:
+            logger = logging.getLogger("buckaroo.paf_column_executor")
+            logger.info(f"PAFColumnExecutor.execute: {len(execution_args.expressions) - len(expressions)} expressions answered by parquet footer")
         
+        res = self._run_select(only_cols, expressions)
+        check_cancelled()
+
+        if footer_values:
+            res = self._add_footer_values(res, footer_values)
+
+        series_stats = self._series_stats(only_cols, res)
+        # Extract hash values from result if present
+        hash_values: dict[str, int] = {}
+        for c in cols:
+            hcol = f"{c}_hash"
+            if hcol in res.columns:
+                try:
+                    hash_values[c] = int(res[hcol][0])
+                except Exception:
+                    hash_values[c] = 0
+            else:
+                hash_values[c] = 0
+        return self._series_stats_to_results(cols, series_stats, hash_values)
+
+    def _collect(self, lf: pl.LazyFrame) -> pl.DataFrame:
+        return lf.collect()
+
+    def low_memory_executor(self) -> Optional['PAFColumnExecutor']:
+        """the same analyses on StreamingPAFColumnExecutor"""
+        return StreamingPAFColumnExecutor(self.analyses, self.cached_merged_sd, self.orig_to_rw_map,
+                                          footer_stats=self.footer_stats)
+
+    def _run_select(self, only_cols: pl.LazyFrame, expressions: list[pl.Expr]) -> pl.DataFrame:
         # Try to execute all expressions together first (like polars_produce_series_df)
         try:
-            res = only_cols.select(*execution_args.expressions).collect()
+            if expressions:
+                res = self._collect(only_cols.select(*expressions))
+            else:
+                res = pl.DataFrame()
         except Exception:
             # Fallback: Execute expressions individually and combine horizontally
             # This matches the behavior of polars_produce_series_df (lines 46-82)
             # to handle cases where some expressions fail (e.g., mean() on string columns)
             individual_results = []
-            for expr in execution_args.expressions:
+            for expr in expressions:
                 try:
-                    expr_result = only_cols.select(expr).collect()
+                    expr_result = self._collect(only_cols.select(expr))
                     individual_results.append(expr_result)
                 except Exception:
                     # Skip failed expression, continue with others
@@ -192,8 +271,8 @@ class PAFColumnExecutor(ColumnExecutor[ExecutorArgs]):
                     for orig_col, measures in merged_dict.items():
                         for measure, value in measures.items():
                             col_name = json.dumps([orig_col, measure])
-                            if measure == 'value_counts' and isinstance(value, pl.Series):
-                                # Preserve the Series for value_counts (it's a Series of structs)
+                            if measure in ('value_counts', 'histogram_meat') and isinstance(value, pl.Series):
+                                # Preserve the Series for imploded measures (Series of structs)
                                 reconstructed_cols[col_name] = [value]
                             elif isinstance(value, pl.Series):
                                 # For other Series, extract first element
@@ -214,26 +293,49 @@ class PAFColumnExecutor(ColumnExecutor[ExecutorArgs]):
                 # This should rarely happen, but handle it gracefully
                 res = pl.DataFrame()
         
-        # Collect the original column data for column_ops execution
-        original_data = only_cols.collect()
-        # Build series stats from the selection result, passing actual data so column_ops can execute
-        # Use run_computed_summary=True so computed_summary runs here (PAFColumnExecutor doesn't
-        # call polars_produce_summary_df separately)
-        series_stats, errs = polars_series_stats_from_select_result(
-            res, original_data, self.analyses, 'paf_exec', debug=False, run_computed_summary=True
-        )
-        # Extract hash values from result if present
-        hash_values: dict[str, int] = {}
-        for c in cols:
-            hcol = f"{c}_hash"
-            if hcol in res.columns:
-                try:
-                    hash_values[c] = int(res[hcol][0])
-                except Exception:
-                    hash_values[c] = 0
-            else:
-                hash_values[c] = 0
-        return self._series_stats_to_results(cols, series_stats, hash_values)
+        return res
+
+    @staticmethod
+    def _op_columns(schema: pl.Schema, col_selector: Any) -> list[str]:
+        if col_selector == "all":
+            return list(schema.names())
+        if isinstance(col_selector, list):
+            return [c for c, dtype in schema.items() if dtype in col_selector]
+        return [col_selector] if col_selector in schema else []
+
+    def _needs_column_data(self, schema: pl.Schema) -> bool:
+        """whether a column_op the schema can't answer applies to this group's columns"""
+        return any(measure not in SCHEMA_COLUMN_OPS and self._op_columns(schema, col_selector)
+                   for pa in self.analyses
+                   for measure, (col_selector, _func) in pa.column_ops.items())
+
+    def _series_stats(self, only_cols: pl.LazyFrame, res: pl.DataFrame) -> dict[str, dict[str, Any]]:
+        schema = only_cols.collect_schema()
+        if self._needs_column_data(schema):
+            # column_ops run on the group's data
+            data = only_cols.collect()
+        else:
+            # everything came out of the select, don't materialize the group
+            data = pl.DataFrame(schema=schema)
+        series_stats, _errs = polars_series_stats_from_select_result(
+            res, data, self.analyses, 'paf_exec', debug=False, run_computed_summary=False)
+        schema_ops = {measure for pa in self.analyses for measure in pa.column_ops if measure in SCHEMA_COLUMN_OPS}
+        for stats in series_stats.values():
+            if isinstance(stats, dict) and stats['orig_col_name'] in schema:
+                dtype = schema[stats['orig_col_name']]
+                stats.update({m: SCHEMA_COLUMN_OPS[m](dtype) for m in schema_ops})
+        summary, _errs = polars_produce_summary_df(data, series_stats, self.analyses, 'paf_exec')
+        return summary
+
+    @staticmethod
+    def _add_footer_values(res: pl.DataFrame, footer_values: dict[str, Any]) -> pl.DataFrame:
+        footer_df = pl.DataFrame({name: [val] for name, val in footer_values.items()})
+        if res.width == 0 or res.height == 0:
+            return footer_df
+        if res.height != 1:
+            # split_to_dicts only reads row 0
+            res = res.head(1)
+        return res.hstack(footer_df.select([c for c in footer_df.columns if c not in res.columns]))
 
     def _series_stats_to_results(self,
                                  cols: list[str],
@@ -262,3 +364,136 @@ class PAFColumnExecutor(ColumnExecutor[ExecutorArgs]):
             )
         return results
 
+
+
+STREAMING_BATCH_ROWS = 250_000
+# low_memory_executor stops halving batch_rows here
+MIN_STREAMING_BATCH_ROWS = 10_000
+
+# select_clause stats polars' streaming engine computes in O(1) memory per
+# column, besides the ones with a merge rule
+STREAMABLE_SELECT_STATS = {'length', 'null_count', 'non_null_count', 'empty_count',
+                           'sum', 'min', 'max', 'mean', 'std'}
+# empty frames select_clauses are run on to find the stats they produce
+_PROBE_DTYPES = [pl.Int64, pl.Float64, pl.Utf8, pl.Boolean]
+
+
+def _select_stats(expr: pl.Expr) -> Optional[set[str]]:
+    """The stat keys expr produces over the probe dtypes, None if it fails on all of them"""
+    stats: set[str] = set()
+    ran = False
+    for dtype in _PROBE_DTYPES:
+        try:
+            cols = pl.DataFrame(schema={'probe': dtype}).select(expr).columns
+        except Exception:
+            continue
+        ran = True
+        for c in cols:
+            try:
+                stats.add(json.loads(c)[1])
+            except (ValueError, TypeError, IndexError):
+                return None
+    return stats if ran else None
+
+
+def analyses_streamable(analyses: List[Type[PolarsAnalysis]]) -> bool:
+    """
+    Whether every select_clause of analyses is a bounded memory aggregation.
+    column_ops always are on StreamingPAFColumnExecutor, they are merged
+    across batches or run on a sample.
+    """
+    allowed = STREAMABLE_SELECT_STATS | mergeable_stat_keys()
+    for expr in polars_select_expressions(analyses):
+        stats = _select_stats(expr)
+        if stats is None or not stats <= allowed:
+            return False
+    return True
+
+
+class StreamingPAFColumnExecutor(PAFColumnExecutor):
+    """
+    PAFColumnExecutor for inputs larger than memory.
+
+    select_clauses run on polars' streaming engine.  column_ops run on
+    batches of batch_rows rows and the per batch values are combined with
+    the merge rules from mergeable_stats, the sketch states of
+    polars_sketch_analysis have such rules.  column_ops without a merge
+    rule (dtype, sketch histogram_args) run on an evenly spaced sample of about
+    batch_rows rows.
+
+    Peak memory is bounded by batch_rows as long as the select_clauses are
+    streamable aggregations, pair this with PL_Sketch_Analysis_Klasses
+    rather than the exact value_counts/median/mode analyses.
+    """
+    batch_rows: int = STREAMING_BATCH_ROWS
+
+    def _collect(self, lf: pl.LazyFrame) -> pl.DataFrame:
+        return lf.collect(engine="streaming")
+
+    def low_memory_executor(self) -> Optional['PAFColumnExecutor']:
+        """
+        the same executor on batches of half the rows.  None when the
+        select_clauses aren't streamable, their memory doesn't depend on
+        batch_rows so a smaller batch would fail the same way
+        """
+        if self.batch_rows <= MIN_STREAMING_BATCH_ROWS:
+            return None
+        if not analyses_streamable(self.analyses):
+            log_msg = f"StreamingPAFColumnExecutor: {[a.__name__ for a in self.analyses]} aren't all streamable, not retrying with smaller batches"
+            logging.getLogger("buckaroo.paf_column_executor").info(log_msg)
+            return None
+        smaller = StreamingPAFColumnExecutor(self.analyses, self.cached_merged_sd, self.orig_to_rw_map,
+                                             footer_stats=self.footer_stats)
+        smaller.batch_rows = max(MIN_STREAMING_BATCH_ROWS, self.batch_rows // 2)
+        return smaller
+
+    def _series_stats(self, only_cols: pl.LazyFrame, res: pl.DataFrame) -> dict[str, dict[str, Any]]:
+        logger = logging.getLogger("buckaroo.paf_column_executor")
+        schema = only_cols.collect_schema()
+        merged_ops: list[tuple[str, Any, list[str]]] = []
+        need_sample = False
+        for pa in self.analyses:
+            for measure, (col_selector, func) in pa.column_ops.items():
+                if stat_merger(measure) is not None:
+                    merged_ops.append((measure, func, self._op_columns(schema, col_selector)))
+                else:
+                    need_sample = True
+
+        step = 1
+        if need_sample:
+            total_rows = int(self._collect(only_cols.select(pl.len())).item())
+            step = max(1, -(-total_rows // self.batch_rows))
+
+        accumulated: dict[str, dict[str, Any]] = defaultdict(dict)
+        sample_parts: list[pl.DataFrame] = []
+        pos = 0
+        batches = 0
+        if merged_ops or need_sample:
+            for batch in only_cols.collect_batches(chunk_size=self.batch_rows):
+                check_cancelled()
+                batches += 1
+                for measure, func, op_cols in merged_ops:
+                    merger = stat_merger(measure)
+                    for col in op_cols:
+                        try:
+                            val = func(batch[col])
+                            acc = accumulated[col]
+                            acc[measure] = (val if measure not in acc else
+                                            merger([{measure: acc[measure]}, {measure: val}], measure))
+                        except Exception as e:
+                            logger.debug(f"StreamingPAFColumnExecutor: column_op {measure} failed for {col}: {e}")
+                            accumulated[col][measure] = None
+                if need_sample:
+                    # rows at global positions that are multiples of step
+                    sample_parts.append(batch.gather_every(step, offset=(-pos) % step))
+                pos += batch.height
+        logger.info(f"StreamingPAFColumnExecutor._series_stats: {pos} rows in {batches} batches, sample every {step} rows")
+
+        sample = pl.concat(sample_parts) if sample_parts else pl.DataFrame(schema=schema)
+        series_stats, _errs = polars_series_stats_from_select_result(
+            res, sample, self.analyses, 'paf_exec', debug=False, run_computed_summary=False)
+        for stats in series_stats.values():
+            if isinstance(stats, dict):
+                stats.update(accumulated.get(stats['orig_col_name'], {}))
+        summary, _errs = polars_produce_summary_df(sample, series_stats, self.analyses, 'paf_exec')
+        return summary
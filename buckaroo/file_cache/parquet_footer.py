@@ -0,0 +1,124 @@
+"""
+Summary stats read straight from a parquet footer.
+
+Parquet files carry the row count and, per row group and column chunk,
+null counts and min/max statistics.  Reading them only touches the
+footer, so ``length``, ``null_count``, ``min`` and ``max`` are available
+in milliseconds regardless of file size.  The widget paints them
+immediately and PAFColumnExecutor skips the expressions that would
+recompute them.
+
+Stats are only trusted when they mean the same thing as the polars
+expression they replace:
+  - the LazyFrame must be a plain parquet scan, any filter, slice or
+    derived column changes the answer
+  - null_count needs every row group to report a null count
+  - min/max are only used for integer and float columns with min/max in
+    every row group.  Binary min/max may be truncated by the writer
+"""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+import polars as pl
+
+logger = logging.getLogger("buckaroo.file_cache.parquet_footer")
+
+FOOTER_STAT_KEYS = ('length', 'null_count', 'min', 'max')
+
+
+def is_plain_parquet_scan(ldf: pl.LazyFrame, file_path: Any) -> bool:
+    """True when ldf is a scan of the parquet file at file_path with nothing but a projection on top."""
+    try:
+        plan = ldf.explain(optimized=False)
+    except Exception:
+        return False
+    first_line = plan.lstrip().split("\n", 1)[0]
+    return first_line.startswith("Parquet SCAN") and Path(file_path).name in first_line
+
+
+def parquet_footer_stats(path: Path, columns: Optional[list[str]] = None) -> dict[str, dict[str, Any]]:
+    """
+    Return {column: {'length':..., 'null_count':..., 'min':..., 'max':...}}
+    for the top level columns of a parquet file.  Stats that the footer
+    can't answer exactly are left out.  Returns {} for anything that
+    isn't a readable parquet file.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    try:
+        pf = pq.ParquetFile(path)
+    except Exception:
+        return {}
+    md = pf.metadata
+    arrow_schema = pf.schema_arrow
+    wanted = set(columns) if columns is not None else None
+
+    # leaf column index by name, nested columns have dotted paths and only get length
+    leaf_index: dict[str, int] = {}
+    for i in range(md.num_columns):
+        leaf_index[md.schema.column(i).path] = i
+
+    stats: dict[str, dict[str, Any]] = {}
+    for field in arrow_schema:
+        name = field.name
+        if wanted is not None and name not in wanted:
+            continue
+        col_stats: dict[str, Any] = {'length': md.num_rows}
+        stats[name] = col_stats
+        i = leaf_index.get(name)
+        if i is None:
+            continue
+        null_count: Optional[int] = 0
+        col_min: Any = None
+        col_max: Any = None
+        has_min_max = pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+        for rg in range(md.num_row_groups):
+            chunk_stats = md.row_group(rg).column(i).statistics
+            if chunk_stats is None:
+                null_count = None
+                has_min_max = False
+                break
+            if null_count is not None:
+                if getattr(chunk_stats, 'has_null_count', True) and chunk_stats.null_count is not None:
+                    null_count += chunk_stats.null_count
+                else:
+                    null_count = None
+            if not has_min_max:
+                continue
+            # an all null row group has no min/max, which is fine
+            if not chunk_stats.has_min_max:
+                if chunk_stats.num_values == 0:
+                    continue
+                has_min_max = False
+                continue
+            if col_min is None or chunk_stats.min < col_min:
+                col_min = chunk_stats.min
+            if col_max is None or chunk_stats.max > col_max:
+                col_max = chunk_stats.max
+        if null_count is not None:
+            col_stats['null_count'] = null_count
+        if has_min_max:
+            col_stats['min'] = col_min
+            col_stats['max'] = col_max
+    return stats
+
+
+def footer_stats_for_lazyframe(ldf: pl.LazyFrame, file_path: Any,
+                               columns: Optional[list[str]] = None) -> dict[str, dict[str, Any]]:
+    """
+    parquet_footer_stats for the file ldf scans, or {} when ldf isn't a
+    plain scan of file_path.
+    """
+    if not file_path or not is_plain_parquet_scan(ldf, file_path):
+        return {}
+    try:
+        stats = parquet_footer_stats(Path(file_path), columns)
+    except Exception as e:
+        logger.warning(f"reading parquet footer stats for {file_path} failed: {e}")
+        return {}
+    log_msg = f"footer_stats_for_lazyframe: {len(stats)} columns from footer of {file_path}"
+    logger.info(log_msg)
+    return stats
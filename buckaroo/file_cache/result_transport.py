@@ -0,0 +1,120 @@
+"""
+Arrow IPC transport for column results coming back from worker processes.
+
+Column results can hold large polars Series (value_counts, histogram
+bins).  Sent through the worker pipe they are pickled in the worker,
+copied through the pipe and unpickled into fresh buffers in the parent.
+Instead the worker writes every large Series into one Arrow IPC file,
+on /dev/shm when available, and sends the results with the Series
+replaced by ArrowRef placeholders.  The parent memory maps the file and
+puts slices of it back in place, so the Series data is never pickled or
+copied.
+
+The parent picks the file's path with reply_path before sending a task,
+so it can discard_reply when the reply is never unpacked (the task was
+cancelled, timed out or its worker was killed after writing).
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Optional
+
+import polars as pl
+
+from .base import ColumnResults
+
+# Series smaller than this are cheaper to pickle than to map
+MIN_ARROW_BYTES = 64 * 1024
+SHM_DIR = Path("/dev/shm")
+
+
+@dataclass(frozen=True)
+class ArrowRef:
+    """stands in for the Series stored as column `index` of the IPC file"""
+    index: int
+    name: str
+
+
+@dataclass
+class PackedResults:
+    results: ColumnResults
+    ipc_path: Optional[str]
+    peak_rss_bytes: int = 0  # of the worker while computing results
+
+
+def transport_dir() -> Path:
+    if SHM_DIR.is_dir() and os.access(SHM_DIR, os.W_OK):
+        return SHM_DIR
+    return Path(tempfile.gettempdir())
+
+
+def reply_path(directory: Optional[Path] = None) -> Path:
+    """a fresh path for pack_results to write an IPC file to"""
+    directory = directory or transport_dir()
+    return directory / f"buckaroo-results-{os.getpid()}-{uuid.uuid4().hex}.arrow"
+
+
+def discard_reply(path: Optional[str | Path]) -> None:
+    """remove the IPC file of a reply that won't be unpacked, if it was written"""
+    if path is None:
+        return
+    try:
+        Path(path).unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def pack_results(results: ColumnResults, min_bytes: int = MIN_ARROW_BYTES,
+                 directory: Optional[Path] = None,
+                 path: Optional[str | Path] = None) -> PackedResults:
+    """
+    Move the large Series out of results into an Arrow IPC file, written
+    to path when given, otherwise to a fresh reply_path in directory
+    """
+    columns: list[pl.Series] = []
+    packed: ColumnResults = {}
+    for col, col_result in results.items():
+        raw: dict[str, Any] = {}
+        for k, v in col_result.result.items():
+            if isinstance(v, pl.Series) and v.estimated_size() >= min_bytes:
+                ref = ArrowRef(len(columns), v.name)
+                # one row per file, each large Series becomes a list cell
+                columns.append(v.implode().alias(str(ref.index)))
+                raw[k] = ref
+            else:
+                raw[k] = v
+        packed[col] = replace(col_result, result=raw)
+    if not columns:
+        return PackedResults(results, None)
+    path = Path(path) if path is not None else reply_path(directory)
+    try:
+        pl.DataFrame(columns).write_ipc(path, compression="uncompressed")
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+    return PackedResults(packed, str(path))
+
+
+def unpack_results(packed: PackedResults) -> ColumnResults:
+    """Put the Series back, as zero copy slices of the memory mapped IPC file"""
+    if packed.ipc_path is None:
+        return packed.results
+    path = Path(packed.ipc_path)
+    try:
+        frame = pl.read_ipc(path, memory_map=True, rechunk=False)
+    finally:
+        # the mapping outlives the directory entry
+        discard_reply(path)
+    results: ColumnResults = {}
+    for col, col_result in packed.results.items():
+        raw: dict[str, Any] = {}
+        for k, v in col_result.result.items():
+            if isinstance(v, ArrowRef):
+                v = frame.get_column(str(v.index))[0].alias(v.name)
+            raw[k] = v
+        results[col] = replace(col_result, result=raw)
+    return results
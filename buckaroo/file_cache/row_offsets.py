@@ -0,0 +1,217 @@
+"""
+Sparse byte offsets of rows in CSV and NDJSON files.
+
+Text files can't seek to a row, ldf.slice(start, n) on a CSV scan parses
+everything before start.  When spilling the whole file (see spill.py) is
+too expensive, a RowOffsets index is the cheap alternative: the byte
+position of every stride-th row, found in one streaming pass over the
+file.  Reading rows [start, end) then seeks to the block holding start
+and parses at most a stride of rows either side of the window, so a deep
+jump costs O(window) instead of O(offset).
+
+  - row boundaries are newlines, in CSV files only those outside double
+    quotes.  NDJSON escapes newlines inside strings
+  - the index is only used for scans with polars' default parse options
+    (comma separated, header, double quotes), those are what the pass and
+    the block reader assume.  Other scans read windows the usual way
+  - blocks are parsed with the scan's schema, so dtypes match the LazyFrame
+  - the index is stored in the file cache with the size and content
+    fingerprint it was built from (see fingerprint.py), an edited file
+    gets a new index
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal, Optional
+
+import numpy as np
+import polars as pl
+
+from .fingerprint import FileIdentity, file_identity
+from .spill import slow_source_path
+
+if TYPE_CHECKING:
+    from .base import AbstractFileCache
+
+logger = logging.getLogger("buckaroo.file_cache.row_offsets")
+
+# 10k rows of a wide CSV is a few MB, parsed per window read
+ROW_OFFSET_STRIDE = 10_000
+READ_CHUNK_BYTES = 1024 * 1024
+
+TextKind = Literal["csv", "ndjson"]
+
+_NEWLINE = ord("\n")
+_QUOTE = ord('"')
+
+
+@dataclass(frozen=True)
+class RowOffsets:
+    """offsets[i] is the byte position of data row i * stride"""
+    size: int
+    fingerprint: str
+    stride: int
+    row_count: int
+    offsets: tuple[int, ...]
+
+    def matches(self, ident: Optional[FileIdentity]) -> bool:
+        return ident is not None and (ident.size, ident.fingerprint) == (self.size, self.fingerprint)
+
+
+def text_source(ldf: pl.LazyFrame) -> Optional[tuple[Path, TextKind]]:
+    """
+    The file and kind of ldf when it's a plain CSV or NDJSON scan with
+    default parse options, else None.
+    """
+    source = slow_source_path(ldf)
+    if source is None:
+        return None
+    kind: TextKind = "csv" if ldf.explain(optimized=False).lstrip().startswith("Csv") else "ndjson"
+    default_scan = pl.scan_csv(source) if kind == "csv" else pl.scan_ndjson(source)
+    try:
+        if ldf.serialize() != default_scan.serialize():
+            return None
+    except Exception:
+        return None
+    return source, kind
+
+
+def scan_row_offsets(path: Path, kind: TextKind, stride: int = ROW_OFFSET_STRIDE) -> RowOffsets:
+    """Build the RowOffsets of path in one streaming pass."""
+    ident = file_identity(path)
+    if ident is None:
+        raise FileNotFoundError(path)
+    quoted = kind == "csv"
+    offsets: list[int] = []
+    # a CSV header line is row -1, the newline ending it marks row 0
+    rows = -1 if kind == "csv" else 0
+    if rows == 0:
+        offsets.append(0)
+    next_mark = 0 if rows < 0 else stride
+    pos = 0
+    in_quote = 0
+    last_byte = _NEWLINE
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_CHUNK_BYTES):
+            arr = np.frombuffer(chunk, dtype=np.uint8)
+            is_newline = arr == _NEWLINE
+            if quoted and (in_quote or _QUOTE in chunk):
+                quotes = arr == _QUOTE
+                # quote parity before each byte, newlines only count outside quotes
+                parity = (np.cumsum(quotes) - quotes + in_quote) & 1
+                is_newline &= parity == 0
+                in_quote = int(in_quote + quotes.sum()) & 1
+            newlines = np.flatnonzero(is_newline)
+            # rows + i + 1 is the row the i-th newline ends, a mark starts right after it
+            first = next_mark - rows - 1
+            if first < len(newlines):
+                marks = newlines[first::stride]
+                offsets.extend((marks + pos + 1).tolist())
+                next_mark += stride * len(marks)
+            rows += len(newlines)
+            pos += len(chunk)
+            last_byte = chunk[-1]
+    if last_byte != _NEWLINE:
+        # the last row has no newline
+        rows += 1
+    # a mark at the end of the file starts no row
+    while len(offsets) > 1 and offsets[-1] >= pos:
+        offsets.pop()
+    log_msg = f"scan_row_offsets {path} rows={max(rows, 0)} offsets={len(offsets)} stride={stride}"
+    logger.info(log_msg)
+    return RowOffsets(size=ident.size, fingerprint=ident.fingerprint, stride=stride,
+                      row_count=max(rows, 0), offsets=tuple(offsets))
+
+
+def read_rows(path: Path, kind: TextKind, schema: pl.Schema, row_offsets: RowOffsets,
+              start: int, end: int) -> pl.DataFrame:
+    """Rows [start, end) of path, parsed from the blocks of row_offsets that hold them."""
+    stride, offsets = row_offsets.stride, row_offsets.offsets
+    start, end = max(start, 0), min(end, row_offsets.row_count)
+    first_block = start // stride
+    if end <= start or first_block >= len(offsets):
+        return pl.DataFrame(schema=schema)
+    last_block = -(-end // stride)
+    with open(path, "rb") as f:
+        f.seek(offsets[first_block])
+        if last_block < len(offsets):
+            data = f.read(offsets[last_block] - offsets[first_block])
+        else:
+            data = f.read()
+    if kind == "csv":
+        block = pl.read_csv(BytesIO(data), has_header=False, schema=schema, raise_if_empty=False)
+    else:
+        block = pl.read_ndjson(BytesIO(data), schema=schema)
+    return block.slice(start - first_block * stride, end - start)
+
+
+class RowOffsetIndex:
+    """
+    The RowOffsets of a text source, from the file cache or built on a
+    background thread by start().  read() is None until it's available.
+    """
+
+    def __init__(self, ldf: pl.LazyFrame, source: Path, kind: TextKind,
+                 file_cache: Optional["AbstractFileCache"] = None, stride: int = ROW_OFFSET_STRIDE) -> None:
+        self.source = source
+        self.kind = kind
+        self.stride = stride
+        self.schema = ldf.collect_schema()
+        self.file_cache = file_cache
+        self.row_offsets: Optional[RowOffsets] = None
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.row_offsets is not None
+
+    def start(self) -> None:
+        """Load the index from the file cache, or start building it."""
+        if self._done.is_set() or self._thread is not None:
+            return
+        cached = self.file_cache.get_row_offsets(self.source) if self.file_cache is not None else None
+        if cached is not None and cached.matches(file_identity(self.source)):
+            self.row_offsets = cached
+            self._done.set()
+            return
+        self._thread = threading.Thread(target=self._build, name="buckaroo-row-offsets", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the index is loaded or failed, True if it's ready."""
+        self._done.wait(timeout)
+        return self.ready
+
+    def read(self, start: int, end: int) -> Optional[pl.DataFrame]:
+        if self.row_offsets is None:
+            return None
+        return read_rows(self.source, self.kind, self.schema, self.row_offsets, start, end)
+
+    def _build(self) -> None:
+        try:
+            row_offsets = scan_row_offsets(self.source, self.kind, self.stride)
+            if self.file_cache is not None:
+                self.file_cache.upsert_row_offsets(self.source, row_offsets)
+            self.row_offsets = row_offsets
+        except Exception:
+            logger.exception(f"building row offsets of {self.source} failed")
+        finally:
+            self._done.set()
+
+
+def row_offset_index_for(ldf: pl.LazyFrame, file_cache: Optional["AbstractFileCache"] = None) -> Optional[RowOffsetIndex]:
+    """
+    The started RowOffsetIndex of ldf, or None when ldf isn't a default
+    CSV or NDJSON scan.
+    """
+    found = text_source(ldf)
+    if found is None:
+        return None
+    index = RowOffsetIndex(ldf, found[0], found[1], file_cache)
+    index.start()
+    return index
@@ -0,0 +1,240 @@
+"""
+Spilling slow sources to memory mapped Arrow IPC.
+
+CSV and NDJSON scans can't seek, ldf.slice(start, n) parses the file from
+the top down to row start, so scrolling deep into a big CSV re-parses
+gigabytes per window.  SourceSpill converts such a source once, on a
+background thread, into an uncompressed Arrow IPC file under
+~/.buckaroo/spill.  Once it's written windows are read with
+pl.scan_ipc(memory_map=True), which only touches the pages they cover.
+
+  - only plain scans are spilled, the root of the plan is the CSV/NDJSON
+    scan itself.  A filter or derived column on top would make the spill
+    a different frame than the file
+  - the spill is named path-identity-options: the source path, its
+    FileIdentity (size and content fingerprint, like the file cache) and
+    the serialized scan, so parse options are part of the key.  An edited
+    file gets a new spill, a touched one keeps its old one.  Spills of
+    earlier identities of the same path are deleted once the new one is
+    written, spills of the same file with other parse options are kept
+  - spills count against the cache budget, evict_spills drops the least
+    recently scanned ones.  A spill that's gone falls back to the source
+  - it's written through LazyFrame.sink_ipc, streaming, to a temporary
+    name that is renamed into place, a half written spill is never read
+  - widgets scanning the same source share one SourceSpill, see spill_for
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import polars as pl
+
+from .fingerprint import file_identity
+
+logger = logging.getLogger("buckaroo.file_cache.spill")
+
+SLOW_SCAN_PREFIXES = ("Csv SCAN", "NDJson SCAN")
+SPILL_SUFFIX = ".arrow"
+# a spill's mtime is its last use, only rewritten when it moved by more than this
+SPILL_TOUCH_RESOLUTION = 60.0
+
+_spills: dict[Path, "SourceSpill"] = {}
+_spills_lock = threading.Lock()
+
+
+def default_spill_dir() -> Path:
+    """~/.buckaroo/spill, created if needed."""
+    spill_dir = Path.home() / ".buckaroo" / "spill"
+    spill_dir.mkdir(parents=True, exist_ok=True)
+    return spill_dir
+
+
+def slow_source_path(ldf: pl.LazyFrame) -> Optional[Path]:
+    """The file ldf scans when it's a plain CSV or NDJSON scan of a single file, else None."""
+    try:
+        plan = ldf.explain(optimized=False)
+    except Exception:
+        return None
+    first_line = plan.lstrip().split("\n", 1)[0]
+    if not first_line.startswith(SLOW_SCAN_PREFIXES):
+        return None
+    start, end = first_line.find("["), first_line.rfind("]")
+    if start < 0 or end < start:
+        return None
+    path = Path(first_line[start + 1:end])
+    return path if path.is_file() else None
+
+
+def spill_path_for(ldf: pl.LazyFrame, source: Path, spill_dir: Path) -> Optional[Path]:
+    """Where ldf, a plain scan of source, is spilled.  None if source can't be identified."""
+    ident = file_identity(source)
+    if ident is None:
+        return None
+    try:
+        plan = ldf.serialize()
+    except Exception:
+        plan = ldf.explain(optimized=False).encode()
+    path_key = hashlib.sha1(str(source.resolve()).encode()).hexdigest()[:16]
+    # a sampled fingerprint alone misses edits between its blocks
+    ident_str = f"{ident.size}:{ident.fingerprint}" + (f":{ident.mtime}" if ident.sampled else "")
+    ident_key = hashlib.sha1(ident_str.encode()).hexdigest()[:16]
+    options_key = hashlib.sha1(plan).hexdigest()[:16]
+    return spill_dir / f"{path_key}-{ident_key}-{options_key}{SPILL_SUFFIX}"
+
+
+class SourceSpill:
+    """
+    The IPC spill of a slow source, written by start() on a background
+    thread.  scan() is the memory mapped spill once it exists, None before.
+    """
+
+    def __init__(self, ldf: pl.LazyFrame, path: Path) -> None:
+        self.ldf: Optional[pl.LazyFrame] = ldf
+        self.path = path
+        self.error: Optional[BaseException] = None
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._frame: Optional[pl.DataFrame] = None
+        if path.exists():
+            self._done.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set() and self.error is None
+
+    def start(self) -> None:
+        """Start writing the spill, unless it exists or is being written."""
+        with self._lock:
+            if self._done.is_set() or self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._write, name="buckaroo-spill", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the spill is written or failed, True if it's ready."""
+        self._done.wait(timeout)
+        return self.ready
+
+    def scan(self) -> Optional[pl.LazyFrame]:
+        """The memory mapped spill, None before it's written or once it was evicted."""
+        if not self.ready:
+            return None
+        try:
+            last_use = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        now = time.time()
+        if now - last_use > SPILL_TOUCH_RESOLUTION:
+            try:
+                os.utime(self.path, (now, now))
+            except OSError:
+                pass
+        return pl.scan_ipc(self.path, memory_map=True)
+
+    def frame(self) -> Optional[pl.DataFrame]:
+        """
+        The spill as a memory mapped DataFrame, None when scan() is.
+        Gathering rows from it only reads their pages, sorted windows
+        don't rescan the spill.
+        """
+        if self.scan() is None:
+            with self._lock:
+                self._frame = None
+            return None
+        with self._lock:
+            if self._frame is None:
+                self._frame = pl.read_ipc(self.path, memory_map=True)
+            return self._frame
+
+    def _write(self) -> None:
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        log_msg = f"SourceSpill writing {self.path}"
+        logger.info(log_msg)
+        assert self.ldf is not None
+        try:
+            self.ldf.sink_ipc(tmp, compression="uncompressed")
+            os.replace(tmp, self.path)
+            self._remove_stale()
+            log_msg = f"SourceSpill wrote {self.path} bytes={self.path.stat().st_size}"
+            logger.info(log_msg)
+        except Exception as e:
+            self.error = e
+            logger.exception(f"spilling to {self.path} failed")
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+        finally:
+            # the spill stands in for the source from here on
+            self.ldf = None
+            self._done.set()
+
+    def _remove_stale(self) -> None:
+        # spills of the same path under another identity are earlier versions of the file,
+        # ones under the same identity are the file read with other parse options
+        path_key, ident_key, _ = self.path.name.split("-", 2)
+        for other in self.path.parent.glob(f"{path_key}-*{SPILL_SUFFIX}"):
+            if other.name.split("-", 2)[1] != ident_key:
+                try:
+                    other.unlink()
+                except OSError:
+                    pass
+
+
+def spill_for(ldf: pl.LazyFrame, spill_dir: Optional[Path] = None) -> Optional[SourceSpill]:
+    """
+    The SourceSpill of ldf, started, or None when ldf isn't a plain scan of
+    a slow source.
+    """
+    source = slow_source_path(ldf)
+    if source is None:
+        return None
+    path = spill_path_for(ldf, source, spill_dir or default_spill_dir())
+    if path is None:
+        return None
+    with _spills_lock:
+        spill = _spills.get(path)
+        if spill is None or spill.error is not None or (spill.ready and not path.exists()):
+            spill = SourceSpill(ldf, path)
+            _spills[path] = spill
+    spill.start()
+    return spill
+
+
+def evict_spills(max_bytes: int, spill_dir: Optional[Path] = None) -> int:
+    """
+    Delete the least recently scanned spills until the spills in spill_dir
+    take at most max_bytes.  Spills being written aren't counted.
+
+    Returns the number of spills deleted.
+    """
+    spill_dir = spill_dir or default_spill_dir()
+    spills = []
+    for path in spill_dir.glob(f"*{SPILL_SUFFIX}"):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        spills.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in spills)
+    evicted = 0
+    for _, size, path in sorted(spills):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        evicted += 1
+    if evicted:
+        log_msg = f"evicted {evicted} spills from {spill_dir}, {total} bytes left"
+        logger.info(log_msg)
+    return evicted
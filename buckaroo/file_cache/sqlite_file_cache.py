@@ -1,14 +1,45 @@
 from __future__ import annotations
 
+import functools
 import json
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any, Optional
 
+import numpy as np
 import polars as pl
 from io import BytesIO
 
 from .base import SummaryStats, AbstractFileCache
+from .fingerprint import FileIdentity, file_identity
+from .row_offsets import RowOffsets
+
+# stay under SQLITE_MAX_VARIABLE_NUMBER on older sqlite builds
+_SQLITE_MAX_PARAMS = 500
+# last_access is only rewritten when it moved by more than this many seconds,
+# cache hits shouldn't turn into a write per lookup
+LAST_ACCESS_RESOLUTION = 60.0
+
+def _locked(method):
+    """run method holding self._conn_lock, the lock of the sqlite connection every thread shares, see SQLiteFileCache.batch"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._conn_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def _series_refs(metadata: dict[str, Any] | str) -> set[str]:
+    """series_hash keys a file's metadata (or its JSON) references"""
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except Exception:
+            return set()
+    hashes = metadata.get('series_hashes') if isinstance(metadata, dict) else None
+    return {str(h) for h in (hashes or {}).values()}
 
 
 class SQLiteFileCache(AbstractFileCache):
@@ -16,12 +47,39 @@ class SQLiteFileCache(AbstractFileCache):
     SQLite-backed implementation of a simple file/series cache.
 
     Stored data:
-    - files(path TEXT PRIMARY KEY, mtime REAL, metadata_json TEXT)
-    - series_results(series_hash INTEGER PRIMARY KEY, result_json TEXT)
+    - files(path TEXT PRIMARY KEY, mtime REAL, metadata_json TEXT, size, fingerprint, last_access)
+    - column_stats(path, col_name, stat_key, val_json), merged_sd split per column and stat
+    - series_results(series_hash INTEGER PRIMARY KEY, result_json TEXT, written_at)
+    - row_offsets(path, size, fingerprint, stride, row_count, offsets_blob), see row_offsets.py
+
+    last_access is bumped on cache hits, evict_to_budget drops the least
+    recently used files and gc_orphan_series drops series results files
+    stopped referencing (released_series).  Results no file ever referenced
+    (in memory frames) are only dropped by evict_to_budget, oldest first.
+
+    The database runs in WAL mode with synchronous=NORMAL.  Writes made
+    inside ``with cache.batch():`` share one transaction, which is
+    committed when the outermost batch exits.  Outside of a batch every
+    write commits immediately.
+
+    Every thread shares the one connection, and so its open transaction.
+    Each call holds _conn_lock and a batch holds it until it exits, so
+    another thread's writes neither land in a batch nor commit half of it.
     """
 
     def __init__(self, db_path: str = ":memory:") -> None:
-        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
+        # WAL lets readers proceed during writes and turns commits into appends,
+        # synchronous=NORMAL only fsyncs at checkpoints instead of every commit
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # held by every call, and by a batch until it exits
+        self._conn_lock = threading.RLock()
+        # batch nesting depth of the thread holding _conn_lock
+        self._batch_state = threading.local()
+        # path -> last_access value written, see _touch
+        self._last_access_written: dict[str, float] = {}
         self._conn.execute(
             """
             CREATE TABLE IF NOT EXISTS files (
@@ -38,6 +96,34 @@ class SQLiteFileCache(AbstractFileCache):
         except sqlite3.OperationalError:
             # Column already exists, ignore
             pass
+        # size and content fingerprint, see fingerprint.py, and last_access for LRU eviction
+        for col_def in ("size INTEGER", "fingerprint TEXT", "last_access REAL"):
+            try:
+                self._conn.execute(f"ALTER TABLE files ADD COLUMN {col_def}")
+                self._conn.commit()
+            except sqlite3.OperationalError:
+                pass
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS files_fingerprint ON files(fingerprint, size)"
+        )
+        # merged_sd, one row per (column, stat).  Columns can be loaded
+        # individually instead of decoding the whole summary
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS column_stats (
+              path TEXT NOT NULL,
+              col_name TEXT NOT NULL,
+              col_pos INTEGER NOT NULL,
+              orig_col_name TEXT,
+              stat_key TEXT NOT NULL,
+              val_json TEXT NOT NULL,
+              PRIMARY KEY (path, col_name, stat_key)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS column_stats_orig_col ON column_stats(path, orig_col_name)"
+        )
         self._conn.execute(
             """
             CREATE TABLE IF NOT EXISTS series_results (
@@ -46,77 +132,282 @@ class SQLiteFileCache(AbstractFileCache):
             )
             """
         )
+        # sparse row offsets of text files, evicted with their files row
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS row_offsets (
+              path TEXT PRIMARY KEY,
+              size INTEGER NOT NULL,
+              fingerprint TEXT NOT NULL,
+              stride INTEGER NOT NULL,
+              row_count INTEGER NOT NULL,
+              offsets_blob BLOB NOT NULL
+            )
+            """
+        )
+        # series results a file stopped referencing, its hash was replaced or
+        # its entry reset or removed.  gc_orphan_series only considers these
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS released_series (
+              series_hash TEXT PRIMARY KEY,
+              released_at REAL NOT NULL
+            )
+            """
+        )
+        # written_at orders results no file references for eviction
+        try:
+            self._conn.execute("ALTER TABLE series_results ADD COLUMN written_at REAL")
+        except sqlite3.OperationalError:
+            pass
         self._conn.commit()
 
     # File metadata API -----------------------------------------------------
-    def add_file(self, path:Path, metadata:dict[str, Any]) -> None:
-        try:
-            mtime = path.stat().st_mtime
-        except FileNotFoundError:
-            return
-        # Extract merged_sd if present
-        merged_sd_blob = None
+    def _split_metadata(self, metadata:dict[str, Any]) -> tuple[Optional[dict[str, dict[str, Any]]], dict[str, Any]]:
+        """
+        Separate merged_sd (stored per column in column_stats) from the
+        rest of the metadata, which is stored as JSON on the files row.
+        """
+        merged_sd = None
         metadata_without_merged_sd = {}
         for k, v in metadata.items():
             if k == 'merged_sd' and isinstance(v, dict) and len(v) > 0:
-                merged_sd_blob = self._merged_sd_to_parquet_blob(v)
+                merged_sd = v
             else:
                 try:
                     json.dumps(v)  # Test if serializable
                     metadata_without_merged_sd[k] = v
                 except (TypeError, ValueError):
                     metadata_without_merged_sd[k] = str(v)
+        return merged_sd, metadata_without_merged_sd
+
+    @_locked
+    def add_file(self, path:Path, metadata:dict[str, Any]) -> None:
+        ident = file_identity(path)
+        if ident is None:
+            return
+        merged_sd, metadata_without_merged_sd = self._split_metadata(metadata)
+        now = time.time()
+        self._release_series(self._path_series_refs(str(path)) - _series_refs(metadata_without_merged_sd))
         self._conn.execute(
-            "REPLACE INTO files(path, mtime, metadata_json, merged_sd_blob) VALUES (?,?,?,?)",
-            (str(path), mtime, json.dumps(metadata_without_merged_sd), merged_sd_blob)
+            "REPLACE INTO files(path, mtime, metadata_json, merged_sd_blob, size, fingerprint, last_access) VALUES (?,?,?,NULL,?,?,?)",
+            (str(path), ident.mtime, json.dumps(metadata_without_merged_sd), ident.size, ident.fingerprint, now)
         )
-        self._conn.commit()
+        self._last_access_written[str(path)] = now
+        self._replace_column_stats(path, merged_sd or {})
+        self._commit()
 
     def add_metadata(self, path:Path, metadata:dict[str, Any]) -> None:
         self.add_file(path, metadata)
 
+    @_locked
     def check_file(self, path:Path) -> bool:
-        cur = self._conn.execute("SELECT mtime FROM files WHERE path=?", (str(path),))
+        """
+        Valid when the file hasn't changed since it was cached.  Unchanged
+        mtime and size are trusted without reading the file.  Otherwise
+        the content fingerprint decides, so a touched file keeps its entry
+        and a copy of a cached file adopts the original's entry.  Sampled
+        fingerprints of large non parquet files also need the same mtime,
+        see FileIdentity.same_content.
+        """
+        cur = self._conn.execute("SELECT mtime, size, fingerprint FROM files WHERE path=?", (str(path),))
         row = cur.fetchone()
-        if not row:
-            return False
         try:
-            current_mtime = path.stat().st_mtime
+            st = path.stat()
         except FileNotFoundError:
             return False
-        cached_mtime = float(row[0])
-        return current_mtime <= cached_mtime
+        if row:
+            cached_mtime, cached_size, cached_fp = float(row[0]), row[1], row[2]
+            if st.st_mtime <= cached_mtime and (cached_size is None or cached_size == st.st_size):
+                self._touch(path)
+                return True
+        current = file_identity(path)
+        if current is None:
+            return False
+        if row:
+            # sampled only depends on size and format, which the fingerprint covers
+            cached_ident = FileIdentity(size=cached_size, mtime=cached_mtime, fingerprint=cached_fp,
+                                        sampled=current.sampled)
+            if cached_size is None or not cached_ident.same_content(current):
+                return False
+            # same content with a new mtime
+            self._conn.execute("UPDATE files SET mtime=? WHERE path=?", (current.mtime, str(path)))
+            self._touch(path)
+            self._commit()
+            return True
+        if current.sampled:
+            cur = self._conn.execute(
+                "SELECT path FROM files WHERE fingerprint=? AND size=? AND mtime=? LIMIT 1",
+                (current.fingerprint, current.size, current.mtime))
+        else:
+            cur = self._conn.execute(
+                "SELECT path FROM files WHERE fingerprint=? AND size=? LIMIT 1",
+                (current.fingerprint, current.size))
+        src = cur.fetchone()
+        if not src:
+            return False
+        self._copy_file_entry(src[0], path, current)
+        self._touch(path)
+        self._commit()
+        return True
 
-    def get_file_metadata(self, path:Path) -> Optional[dict[str, Any]]:
-        # Check if merged_sd_blob column exists
-        try:
-            cur = self._conn.execute("SELECT metadata_json, merged_sd_blob FROM files WHERE path=?", (str(path),))
-        except sqlite3.OperationalError:
-            # Column doesn't exist yet, use old schema
-            cur = self._conn.execute("SELECT metadata_json FROM files WHERE path=?", (str(path),))
-            row = cur.fetchone()
-            if not row:
-                return None
-            return json.loads(row[0])
-        
+    def _touch(self, path:Path) -> None:
+        """Record a cache hit on path, at most once per LAST_ACCESS_RESOLUTION seconds."""
+        now = time.time()
+        key = str(path)
+        if now - self._last_access_written.get(key, 0.0) < LAST_ACCESS_RESOLUTION:
+            return
+        self._conn.execute("UPDATE files SET last_access=? WHERE path=?", (now, key))
+        self._last_access_written[key] = now
+        self._commit()
+
+    def _copy_file_entry(self, src_path: str, path: Path, ident: FileIdentity) -> None:
+        """An identical file was cached under src_path, give path the same metadata and column stats."""
+        self._release_series(self._path_series_refs(str(path)) - self._path_series_refs(src_path))
+        self._conn.execute(
+            """
+            REPLACE INTO files(path, mtime, metadata_json, merged_sd_blob, size, fingerprint)
+            SELECT ?, ?, metadata_json, merged_sd_blob, size, fingerprint FROM files WHERE path=?
+            """,
+            (str(path), ident.mtime, src_path))
+        self._conn.execute("DELETE FROM column_stats WHERE path=?", (str(path),))
+        self._conn.execute(
+            """
+            INSERT INTO column_stats(path, col_name, col_pos, orig_col_name, stat_key, val_json)
+            SELECT ?, col_name, col_pos, orig_col_name, stat_key, val_json FROM column_stats WHERE path=?
+            ORDER BY col_pos, rowid
+            """,
+            (str(path), src_path))
+        self._conn.execute(
+            """
+            REPLACE INTO row_offsets(path, size, fingerprint, stride, row_count, offsets_blob)
+            SELECT ?, size, fingerprint, stride, row_count, offsets_blob FROM row_offsets WHERE path=?
+            """,
+            (str(path), src_path))
+
+    @_locked
+    def get_file_metadata(self, path:Path, columns: Optional[list[str]] = None) -> Optional[dict[str, Any]]:
+        """
+        Return the metadata stored for path.  merged_sd is assembled from
+        column_stats, when columns (original column names) is passed only
+        those columns are read.
+        """
+        cur = self._conn.execute("SELECT metadata_json, merged_sd_blob FROM files WHERE path=?", (str(path),))
         row = cur.fetchone()
         if not row:
             return None
+        self._touch(path)
         md = json.loads(row[0])
-        # Load merged_sd from parquet blob if present
-        merged_sd_blob = row[1] if len(row) > 1 else None
-        if merged_sd_blob:
+        merged_sd = self._load_column_stats(path, columns)
+        if not merged_sd and row[1]:
+            # written by an older version as a single parquet blob
             try:
-                merged_sd = self._parquet_blob_to_merged_sd(merged_sd_blob)
-                if merged_sd:
-                    md['merged_sd'] = merged_sd
+                merged_sd = self._parquet_blob_to_merged_sd(row[1])
+                if merged_sd and columns is not None:
+                    wanted = set(columns)
+                    merged_sd = {k: v for k, v in merged_sd.items() if v.get('orig_col_name') in wanted}
             except Exception:
                 # If deserialization fails, continue without merged_sd
-                pass
+                merged_sd = None
+        if merged_sd:
+            md['merged_sd'] = merged_sd
         return md
 
+    def _column_stats_rows(self, path:Path, merged_sd: dict[str, dict[str, Any]],
+                           positions: dict[str, int]) -> list[tuple[str, str, int, Optional[str], str, str]]:
+        """column_stats rows for merged_sd, positions gives each column's col_pos"""
+        rows = []
+        for col_name, col_stats in merged_sd.items():
+            if not isinstance(col_stats, dict):
+                continue
+            col_pos = positions[col_name]
+            orig_col_name = col_stats.get('orig_col_name')
+            for stat_key, stat_val in col_stats.items():
+                try:
+                    # default=str handles non-serializable types
+                    val_json = json.dumps(stat_val, default=str)
+                except Exception:
+                    val_json = json.dumps(str(stat_val))
+                rows.append((str(path), str(col_name), col_pos,
+                             None if orig_col_name is None else str(orig_col_name),
+                             str(stat_key), val_json))
+        return rows
+
+    def _replace_column_stats(self, path:Path, merged_sd: dict[str, dict[str, Any]]) -> None:
+        """Rewrite the column_stats rows for path from merged_sd, one row per (column, stat_key)."""
+        positions = {col_name: pos for pos, col_name in enumerate(merged_sd)}
+        rows = self._column_stats_rows(path, merged_sd, positions)
+        self._conn.execute("DELETE FROM column_stats WHERE path=?", (str(path),))
+        self._conn.executemany(
+            "INSERT INTO column_stats(path, col_name, col_pos, orig_col_name, stat_key, val_json) VALUES (?,?,?,?,?,?)",
+            rows
+        )
+
+    @_locked
+    def upsert_column_stats(self, path:Path, merged_sd:dict[str, dict[str, Any]]) -> None:
+        """
+        Rewrite the column_stats rows of just the columns in merged_sd.
+        Columns keep their position, new ones go after the rest.
+        """
+        if not merged_sd:
+            return
+        row = self._conn.execute("SELECT merged_sd_blob FROM files WHERE path=?", (str(path),)).fetchone()
+        if row is None or row[0] is not None:
+            # no entry yet, or a legacy blob that partial rows would hide
+            super().upsert_column_stats(path, merged_sd)
+            return
+        col_names = [str(c) for c in merged_sd]
+        positions: dict[str, int] = {}
+        for i in range(0, len(col_names), _SQLITE_MAX_PARAMS):
+            chunk = col_names[i:i + _SQLITE_MAX_PARAMS]
+            cur = self._conn.execute(
+                f"SELECT col_name, MIN(col_pos) FROM column_stats WHERE path=? AND col_name IN ({','.join('?' * len(chunk))}) GROUP BY col_name",
+                (str(path), *chunk))
+            positions.update({name: int(pos) for name, pos in cur.fetchall()})
+        next_pos = self._conn.execute(
+            "SELECT COALESCE(MAX(col_pos) + 1, 0) FROM column_stats WHERE path=?", (str(path),)).fetchone()[0]
+        for col_name in col_names:
+            if col_name not in positions:
+                positions[col_name] = next_pos
+                next_pos += 1
+        rows = self._column_stats_rows(path, {str(k): v for k, v in merged_sd.items()}, positions)
+        for i in range(0, len(col_names), _SQLITE_MAX_PARAMS):
+            chunk = col_names[i:i + _SQLITE_MAX_PARAMS]
+            self._conn.execute(
+                f"DELETE FROM column_stats WHERE path=? AND col_name IN ({','.join('?' * len(chunk))})",
+                (str(path), *chunk))
+        self._conn.executemany(
+            "INSERT INTO column_stats(path, col_name, col_pos, orig_col_name, stat_key, val_json) VALUES (?,?,?,?,?,?)",
+            rows
+        )
+        self._commit()
+
+    def _load_column_stats(self, path:Path, columns: Optional[list[str]] = None) -> dict[str, dict[str, Any]]:
+        query = "SELECT col_pos, col_name, stat_key, val_json FROM column_stats WHERE path=?"
+        order = " ORDER BY col_pos, rowid"
+        rows = []
+        if columns is None:
+            rows = self._conn.execute(query + order, (str(path),)).fetchall()
+        else:
+            for i in range(0, len(columns), _SQLITE_MAX_PARAMS):
+                chunk = list(columns[i:i + _SQLITE_MAX_PARAMS])
+                cur = self._conn.execute(
+                    query + f" AND orig_col_name IN ({','.join('?' * len(chunk))})" + order,
+                    (str(path), *chunk))
+                rows.extend(cur.fetchall())
+            rows.sort(key=lambda r: r[0])
+        merged_sd: dict[str, dict[str, Any]] = {}
+        for _col_pos, col_name, stat_key, val_json in rows:
+            try:
+                val = json.loads(val_json)
+            except Exception:
+                # If JSON parsing fails, keep as string
+                val = val_json
+            merged_sd.setdefault(col_name, {})[stat_key] = val
+        return merged_sd
+
     def _merged_sd_to_parquet_blob(self, merged_sd: dict[str, dict[str, Any]]) -> bytes:
-        """Convert merged_sd dict to parquet blob for storage."""
+        """Convert merged_sd dict to the legacy parquet blob format."""
         # Store as parquet with one row per (column, stat_key) pair
         # Store all values as JSON strings to avoid schema inference issues with mixed types
         rows = []
@@ -154,7 +445,7 @@ class SQLiteFileCache(AbstractFileCache):
         return buf.getvalue()
     
     def _parquet_blob_to_merged_sd(self, blob: bytes) -> Optional[dict[str, dict[str, Any]]]:
-        """Convert parquet blob back to merged_sd dict."""
+        """Convert a legacy parquet blob back to merged_sd dict."""
         if not blob:
             return None
         try:
@@ -186,62 +477,125 @@ class SQLiteFileCache(AbstractFileCache):
         except Exception:
             return None
 
+    @_locked
     def upsert_file_metadata(self, path:Path, extra_metadata:dict[str, Any]) -> None:
-        try:
-            current_mtime = path.stat().st_mtime
-        except FileNotFoundError:
+        ident = file_identity(path)
+        if ident is None:
             return
-        
-        # Extract merged_sd if present - store it separately as parquet blob
-        merged_sd_blob = None
-        metadata_without_merged_sd = {}
-        for k, v in extra_metadata.items():
-            if k == 'merged_sd' and isinstance(v, dict) and len(v) > 0:
-                # Store merged_sd as parquet blob
-                merged_sd_blob = self._merged_sd_to_parquet_blob(v)
-            else:
-                # For other metadata, serialize for JSON
-                try:
-                    json.dumps(v)  # Test if serializable
-                    metadata_without_merged_sd[k] = v
-                except (TypeError, ValueError):
-                    metadata_without_merged_sd[k] = str(v)
-        
-        cur = self._conn.execute("SELECT mtime, metadata_json FROM files WHERE path=?", (str(path),))
+        merged_sd, metadata_without_merged_sd = self._split_metadata(extra_metadata)
+        now = time.time()
+        cur = self._conn.execute("SELECT metadata_json FROM files WHERE path=?", (str(path),))
         row = cur.fetchone()
         if row:
-            md = json.loads(row[1])
+            md = json.loads(row[0])
+            old_refs = _series_refs(md)
             md.update(metadata_without_merged_sd)
-            # Update metadata, mtime, and merged_sd_blob
+            self._release_series(old_refs - _series_refs(md))
             self._conn.execute(
-                "UPDATE files SET mtime=?, metadata_json=?, merged_sd_blob=? WHERE path=?",
-                (current_mtime, json.dumps(md), merged_sd_blob, str(path))
+                "UPDATE files SET mtime=?, metadata_json=?, size=?, fingerprint=?, last_access=? WHERE path=?",
+                (ident.mtime, json.dumps(md), ident.size, ident.fingerprint, now, str(path))
             )
         else:
             self._conn.execute(
-                "INSERT INTO files(path, mtime, metadata_json, merged_sd_blob) VALUES (?,?,?,?)",
-                (str(path), current_mtime, json.dumps(metadata_without_merged_sd), merged_sd_blob)
+                "INSERT INTO files(path, mtime, metadata_json, size, fingerprint, last_access) VALUES (?,?,?,?,?,?)",
+                (str(path), ident.mtime, json.dumps(metadata_without_merged_sd), ident.size, ident.fingerprint, now)
             )
+        self._last_access_written[str(path)] = now
+        # merged_sd is only rewritten when it's passed, other metadata updates leave it alone
+        if merged_sd is not None:
+            self._replace_column_stats(path, merged_sd)
+            self._conn.execute("UPDATE files SET merged_sd_blob=NULL WHERE path=?", (str(path),))
+        self._commit()
+
+    # Row offsets ------------------------------------------------------------
+    @_locked
+    def get_row_offsets(self, path:Path) -> Optional[RowOffsets]:
+        row = self._conn.execute(
+            "SELECT size, fingerprint, stride, row_count, offsets_blob FROM row_offsets WHERE path=?",
+            (str(path),)).fetchone()
+        if not row:
+            return None
+        size, fingerprint, stride, row_count, blob = row
+        offsets = tuple(np.frombuffer(blob, dtype='<u8').tolist())
+        return RowOffsets(size=size, fingerprint=fingerprint, stride=stride, row_count=row_count, offsets=offsets)
+
+    @_locked
+    def upsert_row_offsets(self, path:Path, row_offsets:RowOffsets) -> None:
+        """
+        Stored as little endian uint64s, a 100M row file at the default
+        stride is 80KB.  A files row is created if there isn't one, so the
+        offsets are evicted with the file.
+        """
+        ident = file_identity(path)
+        if ident is not None:
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR IGNORE INTO files(path, mtime, metadata_json, size, fingerprint, last_access) VALUES (?,?,?,?,?,?)",
+                (str(path), ident.mtime, json.dumps({}), ident.size, ident.fingerprint, now))
+        self._conn.execute(
+            "REPLACE INTO row_offsets(path, size, fingerprint, stride, row_count, offsets_blob) VALUES (?,?,?,?,?,?)",
+            (str(path), row_offsets.size, row_offsets.fingerprint, row_offsets.stride, row_offsets.row_count,
+             np.asarray(row_offsets.offsets, dtype='<u8').tobytes()))
+        self._commit()
+
+    # Transactions ----------------------------------------------------------
+    @contextmanager
+    def batch(self):
+        """
+        Defer commits until the outermost batch on this thread exits.
+        Nested batches are folded into the outer one.  Other threads'
+        calls wait until then, they'd share the batch's transaction.
+        """
+        with self._conn_lock:
+            state = self._batch_state
+            state.depth = getattr(state, 'depth', 0) + 1
+            try:
+                yield self
+            finally:
+                state.depth -= 1
+                if state.depth == 0:
+                    self.flush()
+
+    @_locked
+    def flush(self) -> None:
         self._conn.commit()
 
+    def _commit(self) -> None:
+        if getattr(self._batch_state, 'depth', 0) == 0:
+            self._conn.commit()
+
     # Series results API ----------------------------------------------------
     def upsert_key(self, series_hash:int, result:SummaryStats) -> None:
-        # Merge with existing result stored as parquet blob
-        cur = self._conn.execute("SELECT result_blob FROM series_results WHERE series_hash=?", (str(series_hash),))
-        row = cur.fetchone()
-        if row:
-            existing_blob: bytes = row[0]
-            current = self._parquet_bytes_to_dict(existing_blob)
-            current.update(result)
-        else:
-            current = dict(result)
-        blob = self._dict_to_parquet_bytes(current)
-        self._conn.execute(
-            "REPLACE INTO series_results(series_hash, result_blob) VALUES (?,?)",
-            (str(series_hash), blob)
+        self.upsert_keys([(series_hash, result)])
+
+    @_locked
+    def upsert_keys(self, results: list[tuple[int, SummaryStats]]) -> None:
+        """
+        Merge many results into series_results with one read, one
+        executemany and at most one commit.
+        """
+        if not results:
+            return
+        keys = list(dict.fromkeys(str(h) for h, _ in results))
+        merged: dict[str, dict[str, Any]] = {}
+        # Merge with existing results stored as parquet blobs
+        for i in range(0, len(keys), _SQLITE_MAX_PARAMS):
+            chunk = keys[i:i + _SQLITE_MAX_PARAMS]
+            cur = self._conn.execute(
+                f"SELECT series_hash, result_blob FROM series_results WHERE series_hash IN ({','.join('?' * len(chunk))})",
+                chunk)
+            for key, existing_blob in cur.fetchall():
+                merged[key] = self._parquet_bytes_to_dict(existing_blob)
+        for series_hash, result in results:
+            merged.setdefault(str(series_hash), {}).update(result)
+        now = time.time()
+        self._conn.executemany(
+            "REPLACE INTO series_results(series_hash, result_blob, written_at) VALUES (?,?,?)",
+            [(key, self._dict_to_parquet_bytes(merged[key]), now) for key in keys]
         )
-        self._conn.commit()
+        self._commit()
 
+    @_locked
     def get_series_results(self, series_hash:int) -> SummaryStats|None:
         cur = self._conn.execute("SELECT result_blob FROM series_results WHERE series_hash=?", (str(series_hash),))
         row = cur.fetchone()
@@ -250,19 +604,160 @@ class SQLiteFileCache(AbstractFileCache):
         return self._parquet_bytes_to_dict(row[0])
 
     # New: file-level series hashes helpers
+    # these only touch metadata_json, there's no reason to read or rewrite column_stats
+    def _get_metadata_json(self, path: Path) -> Optional[dict[str, Any]]:
+        cur = self._conn.execute("SELECT metadata_json FROM files WHERE path=?", (str(path),))
+        row = cur.fetchone()
+        if not row:
+            return None
+        return json.loads(row[0])
+
+    @_locked
     def get_file_series_hashes(self, path: Path) -> Optional[dict[str, int]]:
-        md = self.get_file_metadata(path)
+        md = self._get_metadata_json(path)
         if not md:
             return None
         return md.get('series_hashes')
 
+    @_locked
     def upsert_file_series_hashes(self, path: Path, hashes: dict[str, int]) -> None:
-        md = self.get_file_metadata(path) or {}
+        md = self._get_metadata_json(path) or {}
         current = dict(md.get('series_hashes') or {})
         current.update({str(k): int(v) for k, v in hashes.items()})
-        merged = dict(md)
-        merged['series_hashes'] = current
-        self.upsert_file_metadata(path, merged)
+        self.upsert_file_metadata(path, {'series_hashes': current})
+
+    # Eviction --------------------------------------------------------------
+    def _file_series_refs(self) -> dict[str, set[str]]:
+        """path -> series_hash keys referenced by that file's series_hashes"""
+        refs: dict[str, set[str]] = {}
+        for path, metadata_json in self._conn.execute("SELECT path, metadata_json FROM files"):
+            refs[path] = _series_refs(metadata_json)
+        return refs
+
+    def _path_series_refs(self, path: str) -> set[str]:
+        row = self._conn.execute("SELECT metadata_json FROM files WHERE path=?", (path,)).fetchone()
+        return _series_refs(row[0]) if row else set()
+
+    def _release_series(self, keys: set[str]) -> None:
+        """Mark series results a file stopped referencing, see gc_orphan_series."""
+        if keys:
+            now = time.time()
+            self._conn.executemany(
+                "REPLACE INTO released_series(series_hash, released_at) VALUES (?,?)", [(k, now) for k in keys])
+
+    @_locked
+    def remove_files(self, paths: list[str]) -> None:
+        """Delete the entries of paths, their series results are released."""
+        refs = self._file_series_refs()
+        with self.batch():
+            for p in paths:
+                self._release_series(refs.get(p, set()))
+            self._conn.executemany("DELETE FROM files WHERE path=?", [(p,) for p in paths])
+            self._conn.executemany("DELETE FROM column_stats WHERE path=?", [(p,) for p in paths])
+            self._conn.executemany("DELETE FROM row_offsets WHERE path=?", [(p,) for p in paths])
+        for p in paths:
+            self._last_access_written.pop(p, None)
+
+    @_locked
+    def cache_bytes(self) -> int:
+        """
+        Logical size of the cached data in bytes.  The sqlite file itself
+        can be larger, freed pages are reused rather than returned to the OS.
+        """
+        total = 0
+        for query in (
+            "SELECT SUM(LENGTH(path) + LENGTH(metadata_json) + COALESCE(LENGTH(merged_sd_blob), 0)) FROM files",
+            "SELECT SUM(LENGTH(col_name) + LENGTH(stat_key) + LENGTH(val_json)) FROM column_stats",
+            "SELECT SUM(LENGTH(series_hash) + LENGTH(result_blob)) FROM series_results",
+            "SELECT SUM(LENGTH(path) + LENGTH(offsets_blob)) FROM row_offsets",
+        ):
+            total += self._conn.execute(query).fetchone()[0] or 0
+        return total
+
+    def _delete_series(self, keys: list[str]) -> None:
+        self._conn.executemany("DELETE FROM series_results WHERE series_hash=?", [(k,) for k in keys])
+
+    @_locked
+    def gc_orphan_series(self, min_age_seconds: float = 0.0) -> int:
+        """
+        Delete series results files stopped referencing, that no other file
+        references.  Results released in the last min_age_seconds are kept
+        for a later pass.  Results no file ever referenced aren't touched,
+        executors for in memory frames write those.
+
+        Returns the number of series results deleted.
+        """
+        referenced: set[str] = set()
+        for hashes in self._file_series_refs().values():
+            referenced.update(hashes)
+        cutoff = time.time() - min_age_seconds
+        released = [key for (key,) in self._conn.execute(
+            "SELECT series_hash FROM released_series WHERE released_at <= ?", (cutoff,)).fetchall()]
+        orphans = [key for key in released if key not in referenced]
+        self._delete_series(orphans)
+        # still referenced ones are released again when their last file lets go
+        self._conn.executemany("DELETE FROM released_series WHERE series_hash=?", [(k,) for k in released])
+        self._commit()
+        return len(orphans)
+
+    @_locked
+    def evict_to_budget(self, max_bytes: int) -> int:
+        """
+        Delete least recently used files, with their column stats, row
+        offsets and the series results only they reference, until cache_bytes() is at
+        most max_bytes.  If that isn't enough, series results no file
+        references are deleted too, least recently written first.
+
+        Returns the number of files evicted.
+        """
+        total = self.cache_bytes()
+        if total <= max_bytes:
+            return 0
+        refs = self._file_series_refs()
+        ref_counts: dict[str, int] = {}
+        for hashes in refs.values():
+            for h in hashes:
+                ref_counts[h] = ref_counts.get(h, 0) + 1
+        series_bytes = dict(self._conn.execute(
+            "SELECT series_hash, LENGTH(series_hash) + LENGTH(result_blob) FROM series_results").fetchall())
+        stats_bytes = dict(self._conn.execute(
+            "SELECT path, SUM(LENGTH(col_name) + LENGTH(stat_key) + LENGTH(val_json)) FROM column_stats GROUP BY path").fetchall())
+        offsets_bytes = dict(self._conn.execute(
+            "SELECT path, LENGTH(path) + LENGTH(offsets_blob) FROM row_offsets").fetchall())
+        cur = self._conn.execute(
+            """
+            SELECT path, LENGTH(path) + LENGTH(metadata_json) + COALESCE(LENGTH(merged_sd_blob), 0)
+            FROM files ORDER BY COALESCE(last_access, mtime) ASC
+            """)
+        evicted_paths: list[str] = []
+        freed_series: list[str] = []
+        for path, file_bytes in cur.fetchall():
+            if total <= max_bytes:
+                break
+            total -= file_bytes + (stats_bytes.get(path) or 0) + (offsets_bytes.get(path) or 0)
+            for h in refs.get(path, ()):
+                ref_counts[h] -= 1
+                if ref_counts[h] == 0 and h in series_bytes:
+                    total -= series_bytes[h]
+                    freed_series.append(h)
+            evicted_paths.append(path)
+        if total > max_bytes:
+            cur = self._conn.execute(
+                "SELECT series_hash FROM series_results ORDER BY COALESCE(written_at, 0) ASC")
+            for (h,) in cur.fetchall():
+                if total <= max_bytes:
+                    break
+                if h not in ref_counts:
+                    total -= series_bytes[h]
+                    freed_series.append(h)
+        with self.batch():
+            self._conn.executemany("DELETE FROM files WHERE path=?", [(p,) for p in evicted_paths])
+            self._conn.executemany("DELETE FROM column_stats WHERE path=?", [(p,) for p in evicted_paths])
+            self._conn.executemany("DELETE FROM row_offsets WHERE path=?", [(p,) for p in evicted_paths])
+            self._delete_series(freed_series)
+        for p in evicted_paths:
+            self._last_access_written.pop(p, None)
+        return len(evicted_paths)
 
     # Helpers ---------------------------------------------------------------
     def _dict_to_parquet_bytes(self, d: dict[str, Any]) -> bytes:
@@ -2,26 +2,93 @@ from __future__ import annotations
 
 import sqlite3
 import json
+import logging
+import threading
+from collections import OrderedDict
 from typing import Optional
-from datetime import datetime as dtdt
+from datetime import datetime as dtdt, timedelta
 
-from .base import ExecutorLog, ExecutorLogEvent, ExecutorArgs, DFIdentifier
+from .base import ColumnCost, ExecutorLog, ExecutorLogEvent, ExecutorArgs, DFIdentifier
+from .sqlite_file_cache import _SQLITE_MAX_PARAMS, _locked
+
+
+logger = logging.getLogger("buckaroo.file_cache.sqlite_log")
+
+# events older than this are deleted when the log is opened
+DEFAULT_RETENTION_DAYS = 30.0
+# events older than this are compacted to the latest completed and latest
+# incomplete run of each (dfi, columns, rows, flags)
+DEFAULT_COMPACT_AFTER_HOURS = 24.0
+# event histories kept for the most recently planned dfis, an evicted one
+# is read again from the table on its next lookup
+MAX_DFI_HISTORIES = 64
+
+_EVENT_COLS = "id, dfi, columns_json, include_hash, row_start, row_end, expr_count, completed, start_time, end_time, failure_kind"
 
 
 def _dfi_key(dfi: DFIdentifier) -> str:
     return json.dumps([str(dfi[0]), dfi[1]])
 
 
+def _row_to_event(row: tuple) -> ExecutorLogEvent:
+    _id, dfi_k, cols_json, include_hash, row_start, row_end, expr_count, completed, start_s, end_s, failure_kind = row
+    # Reconstruct dfi
+    dfi_dec = json.loads(dfi_k)
+    dfi: DFIdentifier = (dfi_dec[0], dfi_dec[1])  # type: ignore
+    # Reconstruct minimal args (expressions omitted for log purposes)
+    args = ExecutorArgs(
+        columns=list(json.loads(cols_json)),
+        column_specific_expressions=False,
+        include_hash=bool(include_hash),
+        expressions=[],
+        row_start=row_start,
+        row_end=row_end,
+        extra=None,
+    )
+    return ExecutorLogEvent(
+        dfi=dfi,
+        args=args,
+        start_time=dtdt.fromisoformat(start_s),
+        end_time=dtdt.fromisoformat(end_s) if end_s else None,
+        completed=bool(completed),
+        failure_kind=failure_kind,
+    )
+
+
+class _DfiHistory:
+    """events already read for one dfi, completed events never change"""
+
+    def __init__(self) -> None:
+        self.events: dict[int, ExecutorLogEvent] = {}
+        self.max_id = 0
+        self.pending: set[int] = set()
+
+
 class SQLiteExecutorLog(ExecutorLog):
     """
     SQLite-backed implementation of ExecutorLog. Stores minimal, serializable
     details of ExecutorArgs sufficient to:
       - detect previous incomplete runs for the same (dfi, columns, rows, flags)
       - reconstruct ExecutorLogEvent objects for inspection
+
+    Lookups are indexed on dfi.  get_dfi_log_events, which planning calls
+    on every step, only reads rows added since the previous call plus the
+    ones that were still running, so its cost doesn't grow with the age
+    of the log.  Histories are kept for the MAX_DFI_HISTORIES most recently
+    looked up dfis.  Old events are pruned and compacted when the log is
+    opened, see prune.
+
+    Per column costs (log_column_costs) are kept per schema in their own
+    table and are never pruned, one row per (schema, column).
     """
 
-    def __init__(self, db_path: str = ":memory:") -> None:
+    def __init__(self, db_path: str = ":memory:",
+                 retention_days: Optional[float] = DEFAULT_RETENTION_DAYS,
+                 compact_after_hours: Optional[float] = DEFAULT_COMPACT_AFTER_HOURS) -> None:
         self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        # held by every call, planning, dispatch threads and the widget share the connection
+        self._conn_lock = threading.RLock()
+        self._histories: OrderedDict[str, _DfiHistory] = OrderedDict()
         self._conn.execute(
             """
             CREATE TABLE IF NOT EXISTS events (
@@ -34,11 +101,67 @@ class SQLiteExecutorLog(ExecutorLog):
               expr_count INTEGER,
               completed INTEGER NOT NULL,
               start_time TEXT NOT NULL,
-              end_time TEXT
+              end_time TEXT,
+              failure_kind TEXT
+            )
+            """
+        )
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(events)")}
+        if "failure_kind" not in existing:
+            # logs written before failure kinds were recorded
+            self._conn.execute("ALTER TABLE events ADD COLUMN failure_kind TEXT")
+        # rowid is the implicit last column, so dfi=? AND id>? is a range scan
+        self._conn.execute("CREATE INDEX IF NOT EXISTS events_dfi ON events(dfi)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS events_dfi_cols ON events(dfi, columns_json)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS events_start_time ON events(start_time)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS column_costs (
+              schema_key TEXT NOT NULL,
+              column_name TEXT NOT NULL,
+              dtype TEXT NOT NULL,
+              runs INTEGER NOT NULL,
+              total_secs REAL NOT NULL,
+              total_rows INTEGER NOT NULL,
+              peak_memory_bytes INTEGER NOT NULL,
+              PRIMARY KEY (schema_key, column_name)
             )
             """
         )
         self._conn.commit()
+        if retention_days is not None or compact_after_hours is not None:
+            self.prune(retention_days, compact_after_hours)
+
+    def prune(self, retention_days: Optional[float] = DEFAULT_RETENTION_DAYS,
+              compact_after_hours: Optional[float] = DEFAULT_COMPACT_AFTER_HOURS) -> int:
+        """
+        Delete events that started more than retention_days ago, and compact
+        events older than compact_after_hours down to the newest completed
+        and newest incomplete event per (dfi, columns, rows, flags), which is
+        all check_log_for_previous_failure / check_log_for_completed look at.
+        Returns the number of deleted events.
+        """
+        now = dtdt.now()
+        deleted = 0
+        with self._conn_lock:
+            if retention_days is not None:
+                cutoff = (now - timedelta(days=retention_days)).isoformat()
+                deleted += self._conn.execute("DELETE FROM events WHERE start_time < ?", (cutoff,)).rowcount
+            if compact_after_hours is not None:
+                cutoff = (now - timedelta(hours=compact_after_hours)).isoformat()
+                deleted += self._conn.execute(
+                    """
+                    DELETE FROM events WHERE start_time < ? AND id NOT IN (
+                      SELECT MAX(id) FROM events
+                      GROUP BY dfi, columns_json, include_hash, IFNULL(row_start,-1), IFNULL(row_end,-1), completed
+                    )
+                    """, (cutoff,)).rowcount
+            self._conn.commit()
+            self._histories.clear()
+        if deleted:
+            log_msg = f"SQLiteExecutorLog.prune: deleted {deleted} events"
+            logger.info(log_msg)
+        return deleted
 
     def _args_key_parts(self, args: ExecutorArgs) -> tuple[str, int, Optional[int], Optional[int], int]:
         cols = json.dumps(list(args.columns))
@@ -48,6 +171,7 @@ class SQLiteExecutorLog(ExecutorLog):
         expr_count = len(args.expressions)
         return cols, include_hash, row_start, row_end, expr_count
 
+    @_locked
     def log_start_col_group(self, dfi: DFIdentifier, args:ExecutorArgs, executor_class_name:str = "") -> None:
         dfi_k = _dfi_key(dfi)
         cols, include_hash, row_start, row_end, expr_count = self._args_key_parts(args)
@@ -57,6 +181,7 @@ class SQLiteExecutorLog(ExecutorLog):
         )
         self._conn.commit()
 
+    @_locked
     def log_end_col_group(self, dfi: DFIdentifier, args:ExecutorArgs) -> None:
         dfi_k = _dfi_key(dfi)
         cols, include_hash, row_start, row_end, expr_count = self._args_key_parts(args)
@@ -73,6 +198,41 @@ class SQLiteExecutorLog(ExecutorLog):
         )
         self._conn.commit()
 
+    @_locked
+    def log_failed_col_group(self, dfi: DFIdentifier, args:ExecutorArgs, failure_kind:str) -> None:
+        dfi_k = _dfi_key(dfi)
+        cols, include_hash, row_start, row_end, expr_count = self._args_key_parts(args)
+        self._conn.execute(
+            """
+            UPDATE events SET failure_kind=?, end_time=?
+            WHERE id = (
+              SELECT id FROM events
+              WHERE dfi=? AND columns_json=? AND include_hash=? AND IFNULL(row_start,-1)=IFNULL(?, -1) AND IFNULL(row_end,-1)=IFNULL(?, -1)
+              ORDER BY id DESC LIMIT 1
+            ) AND completed=0
+            """,
+            (failure_kind, dtdt.now().isoformat(), dfi_k, cols, include_hash, row_start, row_end)
+        )
+        self._conn.commit()
+
+    @_locked
+    def log_cancelled_col_group(self, dfi: DFIdentifier, args:ExecutorArgs) -> None:
+        dfi_k = _dfi_key(dfi)
+        cols, include_hash, row_start, row_end, expr_count = self._args_key_parts(args)
+        self._conn.execute(
+            """
+            DELETE FROM events
+            WHERE id = (
+              SELECT id FROM events
+              WHERE dfi=? AND columns_json=? AND include_hash=? AND IFNULL(row_start,-1)=IFNULL(?, -1) AND IFNULL(row_end,-1)=IFNULL(?, -1)
+              ORDER BY id DESC LIMIT 1
+            ) AND completed=0
+            """,
+            (dfi_k, cols, include_hash, row_start, row_end)
+        )
+        self._conn.commit()
+
+    @_locked
     def check_log_for_previous_failure(self, dfi: DFIdentifier, args:ExecutorArgs) -> bool:
         dfi_k = _dfi_key(dfi)
         cols, include_hash, row_start, row_end, expr_count = self._args_key_parts(args)
@@ -86,6 +246,7 @@ class SQLiteExecutorLog(ExecutorLog):
         (cnt,) = cur.fetchone()
         return cnt > 0
     
+    @_locked
     def check_log_for_completed(self, dfi: DFIdentifier, args:ExecutorArgs) -> bool:
         """
         Check if this column group was already completed successfully.
@@ -103,34 +264,76 @@ class SQLiteExecutorLog(ExecutorLog):
         (cnt,) = cur.fetchone()
         return cnt > 0
 
+    @_locked
     def get_log_events(self) -> list[ExecutorLogEvent]:
-        res: list[ExecutorLogEvent] = []
-        cur = self._conn.execute("SELECT dfi, columns_json, include_hash, row_start, row_end, expr_count, completed, start_time, end_time FROM events ORDER BY id ASC")
-        for row in cur.fetchall():
-            dfi_k, cols_json, include_hash, row_start, row_end, expr_count, completed, start_s, end_s = row
-            # Reconstruct dfi
-            dfi_dec = json.loads(dfi_k)
-            dfi: DFIdentifier = (dfi_dec[0], dfi_dec[1])  # type: ignore
-            # Reconstruct minimal args (expressions omitted for log purposes)
-            args = ExecutorArgs(
-                columns=list(json.loads(cols_json)),
-                column_specific_expressions=False,
-                include_hash=bool(include_hash),
-                expressions=[],
-                row_start=row_start,
-                row_end=row_end,
-                extra=None,
-            )
-            ev = ExecutorLogEvent(
-                dfi=dfi,
-                args=args,
-                start_time=dtdt.fromisoformat(start_s),
-                end_time=dtdt.fromisoformat(end_s) if end_s else None,
-                completed=bool(completed),
-            )
-            res.append(ev)
-        return res
+        cur = self._conn.execute(f"SELECT {_EVENT_COLS} FROM events ORDER BY id ASC")
+        return [_row_to_event(row) for row in cur.fetchall()]
+
+    def get_dfi_log_events(self, dfi: DFIdentifier) -> list[ExecutorLogEvent]:
+        dfi_k = _dfi_key(dfi)
+        with self._conn_lock:
+            hist = self._histories.get(dfi_k)
+            if hist is None:
+                hist = self._histories[dfi_k] = _DfiHistory()
+                while len(self._histories) > MAX_DFI_HISTORIES:
+                    self._histories.popitem(last=False)
+            else:
+                self._histories.move_to_end(dfi_k)
+            rows = self._conn.execute(
+                f"SELECT {_EVENT_COLS} FROM events WHERE dfi=? AND id>? ORDER BY id ASC",
+                (dfi_k, hist.max_id)).fetchall()
+            if hist.pending:
+                # events that were still running last time may have completed since,
+                # or been deleted when they were cancelled
+                pending = sorted(hist.pending)
+                pending_rows = []
+                for i in range(0, len(pending), _SQLITE_MAX_PARAMS):
+                    chunk = pending[i:i + _SQLITE_MAX_PARAMS]
+                    pending_rows.extend(self._conn.execute(
+                        f"SELECT {_EVENT_COLS} FROM events WHERE id IN ({','.join('?' * len(chunk))})",
+                        chunk).fetchall())
+                for gone in hist.pending - {row[0] for row in pending_rows}:
+                    hist.pending.discard(gone)
+                    hist.events.pop(gone, None)
+                rows += pending_rows
+            for row in rows:
+                ev_id = row[0]
+                ev = _row_to_event(row)
+                hist.events[ev_id] = ev
+                hist.max_id = max(hist.max_id, ev_id)
+                if ev.completed:
+                    hist.pending.discard(ev_id)
+                else:
+                    hist.pending.add(ev_id)
+            return [hist.events[i] for i in sorted(hist.events)]
+
+    def log_column_costs(self, schema_key: str, costs: dict[str, ColumnCost]) -> None:
+        with self._conn_lock:
+            self._conn.executemany(
+                """
+                INSERT INTO column_costs (schema_key, column_name, dtype, runs, total_secs, total_rows, peak_memory_bytes)
+                VALUES (?,?,?,?,?,?,?)
+                ON CONFLICT(schema_key, column_name) DO UPDATE SET
+                  dtype=excluded.dtype,
+                  runs=runs + excluded.runs,
+                  total_secs=total_secs + excluded.total_secs,
+                  total_rows=total_rows + excluded.total_rows,
+                  peak_memory_bytes=MAX(peak_memory_bytes, excluded.peak_memory_bytes)
+                """,
+                [(schema_key, col, c.dtype, c.runs, c.total_secs, c.total_rows, c.peak_memory_bytes)
+                 for col, c in costs.items()])
+            self._conn.commit()
+
+    @_locked
+    def get_column_costs(self, schema_key: str) -> dict[str, ColumnCost]:
+        rows = self._conn.execute(
+            "SELECT column_name, dtype, runs, total_secs, total_rows, peak_memory_bytes FROM column_costs WHERE schema_key=?",
+            (schema_key,)).fetchall()
+        return {col: ColumnCost(dtype=dtype, runs=runs, total_secs=secs, total_rows=total_rows,
+                                peak_memory_bytes=peak)
+                for col, dtype, runs, secs, total_rows, peak in rows}
 
+    @_locked
     def has_incomplete_for_executor(self, dfi: DFIdentifier, executor_class_name: str) -> bool:
         """
         Check if there are incomplete events for the given dataframe identifier and executor class.
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Optional, Dict, Any
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -15,6 +16,7 @@ from .base import (
     SimpleExecutorLog,
     MaybeFilepathLike,
 )
+from .cancellation import ExecutionCancelled
 
 
 class ThreadedExecutor(BaseExecutor):
@@ -33,11 +35,13 @@ class ThreadedExecutor(BaseExecutor):
         max_workers: Optional[int] = None,
         cached_merged_sd: dict[str, dict[str, Any]] | None = None,
         orig_to_rw_map: dict[str, str] | None = None,
+        pieces: Optional[list[Path]] = None,
     ) -> None:
-        super().__init__(ldf, column_executor, listener, fc, executor_log, file_path=file_path, cached_merged_sd=cached_merged_sd, orig_to_rw_map=orig_to_rw_map)
+        super().__init__(ldf, column_executor, listener, fc, executor_log, file_path=file_path, cached_merged_sd=cached_merged_sd, orig_to_rw_map=orig_to_rw_map,
+                         pieces=pieces)
         self.max_workers = max_workers
 
-    def run(self) -> None:
+    def _run_groups(self) -> None:
         # Collect all column groups first (threaded executor needs them all upfront)
         # Use a set to avoid duplicates in case of planning issues
         seen_groups: set[tuple[str, ...]] = set()
@@ -68,15 +72,17 @@ class ThreadedExecutor(BaseExecutor):
             for group in groups:
                 ex_args = self.get_executor_args(group)
                 self.executor_log.log_start_col_group(self.dfi, ex_args)
-                fut = pool.submit(self.column_executor.execute, self.ldf, ex_args)
+                if self.pieces is None:
+                    fut = pool.submit(self.column_executor.execute_with_cancel, self.ldf, ex_args, self.cancel_token)
+                else:
+                    fut = pool.submit(self.execute_pieces, ex_args)
                 fut_to_args[fut] = (group, ex_args)
 
             for fut in as_completed(fut_to_args):
                 group, ex_args = fut_to_args[fut]
                 try:
                     res = fut.result()
-                    for _col, col_result in res.items():
-                        self.fc.upsert_key(col_result.series_hash, col_result.result)
+                    self._persist_results(res)
                     self.listener(ProgressNotification(
                         success=True,
                         col_group=group,
@@ -86,6 +92,10 @@ class ThreadedExecutor(BaseExecutor):
                         failure_message=None
                     ))
                     self.executor_log.log_end_col_group(self.dfi, ex_args)
+                except ExecutionCancelled:
+                    # groups that hadn't started give up immediately
+                    self.executor_log.log_cancelled_col_group(self.dfi, ex_args)
+                    continue
                 except Exception as e:
                     self.listener(ProgressNotification(
                         success=False,
@@ -0,0 +1,295 @@
+"""
+Caches that keep scrolling an infinite widget cheap.
+
+Sorting the whole frame for every window the grid asks for costs
+O(n log n) per scroll.  SortIndexCache keeps the arg-sort permutation of
+each (column, direction) instead, as a UInt32 index (UInt64 past 2**32
+rows), so a sorted window is a slice of the permutation and a read of
+just those rows, see gather_window.  Filtered views are kept the same way, as the ids of the
+matching rows in sort order, so paging through the matches of a filter
+doesn't rescan the source per window.  Entries are evicted least
+recently used first once their total size passes max_bytes.
+
+Scrolling back to rows just seen, or forward to the next block, asks for
+windows that were (or could have been) encoded already.  SliceCache keeps
+encoded windows keyed by (sort state, start, end), and after each request
+encodes the windows either side of it on a background thread, the one in
+the scroll direction first, so smooth scrolling is mostly served from
+memory.  Windows are evicted least recently used first past max_bytes.
+"""
+from __future__ import annotations
+
+import bisect
+import itertools
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Hashable, List, Optional, Tuple
+
+import polars as pl
+
+logger = logging.getLogger("buckaroo.infinite_cache")
+
+# a 50M row permutation is 200MB as UInt32
+SORT_INDEX_CACHE_BYTES = 512 * 1024 * 1024
+
+# a 1000 row window of a wide frame is a few MB of uncompressed parquet
+SLICE_CACHE_BYTES = 128 * 1024 * 1024
+
+# seconds an idle prefetch thread waits for more work before exiting
+PREFETCH_IDLE_SECS = 5.0
+
+Encoder = Callable[[], bytes]
+
+
+def sort_permutation(ldf: pl.LazyFrame, column: str, descending: bool) -> pl.Series:
+    """
+    Row positions of ldf in the order ldf.sort(column, descending=...) puts
+    them, as the narrowest unsigned integer type that fits.
+    """
+    perm = ldf.select(pl.col(column).arg_sort(descending=descending)).collect().to_series()
+    dtype = pl.UInt32 if len(perm) < 2 ** 32 else pl.UInt64
+    return perm.cast(dtype).rename("__perm")
+
+
+def filtered_rows(ldf: pl.LazyFrame, expr: pl.Expr, column: Optional[str], descending: bool) -> pl.Series:
+    """
+    Row positions of the rows of ldf matching expr, in the order
+    ldf.sort(column, descending=...) puts them when column is given.
+    """
+    matches = ldf.with_row_index("__perm").filter(expr)
+    if column is not None:
+        matches = matches.sort(column, descending=descending, maintain_order=True)
+    return matches.select("__perm").collect().to_series()
+
+
+class SortIndexCache:
+    """LRU of sort permutations and filtered row ids, bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int = SORT_INDEX_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, pl.Series] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, ldf: pl.LazyFrame, column: str, descending: bool) -> pl.Series:
+        """The permutation for sorting ldf by column, computed on first use."""
+        return self._get_or_compute(
+            (column, descending), lambda: sort_permutation(ldf, column, descending),
+            f"permutation column={column} descending={descending}")
+
+    def get_rows(self, ldf: pl.LazyFrame, filter_key: str, expr: pl.Expr,
+                 column: Optional[str] = None, descending: bool = False) -> pl.Series:
+        """
+        The ids of ldf's rows matching expr, sorted by column when given,
+        computed on first use.  filter_key identifies expr.
+        """
+        return self._get_or_compute(
+            ("rows", filter_key, column, descending), lambda: filtered_rows(ldf, expr, column, descending),
+            f"filtered rows filter={filter_key} column={column} descending={descending}")
+
+    def _get_or_compute(self, key: Hashable, compute: Callable[[], pl.Series], describe: str) -> pl.Series:
+        with self._lock:
+            perm = self._entries.get(key)
+            if perm is not None:
+                self._entries.move_to_end(key)
+                return perm
+        perm = compute()
+        self.put(key, perm)
+        log_msg = f"SortIndexCache computed {describe} rows={len(perm)} bytes={perm.estimated_size()}"
+        logger.info(log_msg)
+        return perm
+
+    def put(self, key: Hashable, perm: pl.Series) -> None:
+        size = perm.estimated_size()
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.estimated_size()
+            if size > self.max_bytes:
+                # wouldn't fit even alone, used once and dropped
+                return
+            self._entries[key] = perm
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.estimated_size()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# window rows closer together than this are read with one slice of the
+# source, about a row group, rows in the same one are decoded once
+GATHER_RUN_GAP = 64 * 1024
+
+
+def _row_runs(ids: pl.Series) -> List[Tuple[int, int]]:
+    """[lo, hi) ranges covering the sorted ids, rows closer than GATHER_RUN_GAP share a range"""
+    runs: List[Tuple[int, int]] = []
+    for i in ids.sort().to_list():
+        if runs and i - runs[-1][1] < GATHER_RUN_GAP:
+            runs[-1] = (runs[-1][0], i + 1)
+        else:
+            runs.append((i, i + 1))
+    return runs
+
+
+def gather_window(source: pl.LazyFrame | pl.DataFrame, perm: Optional[pl.Series],
+                  start: int, end: int) -> pl.DataFrame:
+    """
+    rows [start, end) of source, in perm's order when given.  source is a
+    LazyFrame, or a DataFrame (a memory mapped spill) rows are gathered
+    from directly.
+
+    A gather isn't pushed down into a scan, it reads every row of every
+    column for each window.  Slices are, so a LazyFrame is read as one
+    slice per run of nearby window rows, and parquet and IPC scans only
+    decode the row groups the window touches.  The slices are collected
+    one by one, in one query (or collect_all) polars shares a single full
+    scan between them.
+    """
+    length = max(end - start, 0)
+    if perm is None:
+        return source.lazy().slice(start, length).collect()
+    ids = perm.slice(start, length)
+    if isinstance(source, pl.DataFrame):
+        return source[ids]
+    if len(ids) == 0:
+        return source.slice(0, 0).collect()
+    runs = _row_runs(ids)
+    rows = pl.concat([source.slice(lo, hi - lo).collect() for lo, hi in runs])
+    # where each run starts in rows
+    run_starts = [lo for lo, _ in runs]
+    bases = list(itertools.accumulate((hi - lo for lo, hi in runs[:-1]), initial=0))
+    positions = []
+    for i in ids.to_list():
+        run = bisect.bisect_right(run_starts, i) - 1
+        positions.append(bases[run] + i - run_starts[run])
+    return rows[pl.Series(positions, dtype=ids.dtype)]
+
+
+class SliceCache:
+    """
+    LRU of encoded windows, bounded by their total size in bytes, filled by
+    requests and by prefetch().
+    """
+
+    def __init__(self, max_bytes: int = SLICE_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, bytes] = OrderedDict()
+        self._bytes = 0
+        # bumped by clear(), windows encoded from data since replaced are dropped
+        self._generation = 0
+        self._cond = threading.Condition()
+        self._queue: Deque[Tuple[int, Hashable, Encoder]] = deque()
+        self._worker: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, encode: Encoder) -> bytes:
+        """The window cached under key, calling encode on a miss."""
+        with self._cond:
+            buf = self._entries.get(key)
+            if buf is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return buf
+            self.misses += 1
+            generation = self._generation
+        buf = encode()
+        self._put(generation, key, buf)
+        return buf
+
+    def prefetch(self, windows: List[Tuple[Hashable, Encoder]]) -> None:
+        """
+        Encode windows not cached yet on the background thread, in order.
+        Windows queued by an earlier call and not started yet are dropped,
+        the user has scrolled past them.
+        """
+        with self._cond:
+            self._queue.clear()
+            for key, encode in windows:
+                if key not in self._entries:
+                    self._queue.append((self._generation, key, encode))
+            if not self._queue:
+                return
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._prefetch_loop, name="buckaroo-slice-prefetch", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+
+    def _prefetch_loop(self) -> None:
+        while True:
+            with self._cond:
+                if not self._queue:
+                    self._cond.wait(PREFETCH_IDLE_SECS)
+                if not self._queue:
+                    self._worker = None
+                    return
+                generation, key, encode = self._queue.popleft()
+                if generation != self._generation or key in self._entries:
+                    continue
+            try:
+                buf = encode()
+            except Exception:
+                logger.exception("prefetching window %r failed", key)
+                continue
+            self._put(generation, key, buf)
+
+    def _put(self, generation: int, key: Hashable, buf: bytes) -> None:
+        size = len(buf)
+        with self._cond:
+            if generation != self._generation or size > self.max_bytes:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = buf
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self) -> None:
+        """Drop every window, cached or queued, the data they came from changed."""
+        with self._cond:
+            self._entries.clear()
+            self._queue.clear()
+            self._bytes = 0
+            self._generation += 1
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def adjacent_windows(start: int, end: int, step: int, total: int,
+                     prev_start: Optional[int]) -> List[Tuple[int, int]]:
+    """
+    The windows a step after and before [start, end), the one in the scroll
+    direction first.  Scrolling is taken to be forward unless start is
+    before the previous request's prev_start.  Windows starting outside
+    [0, total) are left out.
+    """
+    if step <= 0:
+        return []
+    ahead = (start + step, end + step)
+    behind = (start - step, end - step)
+    order = [behind, ahead] if prev_start is not None and start < prev_start else [ahead, behind]
+    return [(s, e) for s, e in order if 0 <= s < total]
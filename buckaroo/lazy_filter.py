@@ -0,0 +1,83 @@
+"""
+Row filters for the lazy widget, pushed down to the LazyFrame.
+
+The frontend describes a filter in buckaroo_state:
+
+  - search_string, which the lazy widget's search box sets, or
+    quick_command_args['search'][0] which is what the StatusBar search box
+    sets.  A case sensitive substring matched against every string,
+    categorical and enum column, like the pandas Search command
+  - column_filters, a list of {'col': <rewritten column name>, 'op': ...,
+    'val': ...} with op one of FILTER_OPS
+
+They become a single polars expression, the terms ANDed together.  The
+widget doesn't materialize the filtered frame, SortIndexCache keeps the
+ids of the matching rows per (filter, sort) and windows gather through
+them, so paging through matches doesn't rescan the source per window.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import polars as pl
+
+FILTER_OPS: Dict[str, Callable[[pl.Expr, Any], pl.Expr]] = {
+    '==': lambda col, val: col == val,
+    '!=': lambda col, val: col != val,
+    '<': lambda col, val: col < val,
+    '<=': lambda col, val: col <= val,
+    '>': lambda col, val: col > val,
+    '>=': lambda col, val: col >= val,
+    'in': lambda col, val: col.is_in(list(val)),
+    'contains': lambda col, val: col.cast(pl.Utf8).str.contains(str(val), literal=True),
+    'is_null': lambda col, _val: col.is_null(),
+    'not_null': lambda col, _val: col.is_not_null(),
+}
+
+
+@dataclass(frozen=True)
+class RowFilter:
+    """A search term and column predicates, on original column names."""
+    search: str = ""
+    column_filters: Tuple[Tuple[str, str, Any], ...] = ()
+
+    @property
+    def key(self) -> str:
+        """identifies the filter in caches, equal filters have equal keys"""
+        return json.dumps([self.search, [list(f) for f in self.column_filters]], sort_keys=True, default=str)
+
+    def expr(self, schema: pl.Schema) -> pl.Expr:
+        terms = []
+        if self.search:
+            str_cols = [name for name, dtype in schema.items() if dtype.base_type() in (pl.Utf8, pl.Categorical, pl.Enum)]
+            matches = [pl.col(name).cast(pl.Utf8).str.contains(self.search, literal=True) for name in str_cols]
+            # no string columns, nothing matches
+            terms.append(pl.any_horizontal(matches).fill_null(False) if matches else pl.lit(False))
+        for col, op, val in self.column_filters:
+            terms.append(FILTER_OPS[op](pl.col(col), val).fill_null(False))
+        return pl.all_horizontal(terms) if terms else pl.lit(True)
+
+
+def row_filter_from_state(state: Mapping[str, Any], rw_to_orig: Mapping[str, str]) -> Optional[RowFilter]:
+    """
+    The RowFilter buckaroo_state describes, None when it doesn't filter.
+    Raises ValueError for unknown columns or operators.
+    """
+    search = state.get('search_string') or ''
+    quick_search = (state.get('quick_command_args') or {}).get('search')
+    if not search and quick_search:
+        search = quick_search[0] or ''
+    column_filters = []
+    for f in state.get('column_filters') or []:
+        col, op = f.get('col'), f.get('op')
+        if col not in rw_to_orig:
+            raise ValueError(f"column_filters: unknown column {col!r}")
+        if op not in FILTER_OPS:
+            raise ValueError(f"column_filters: unknown op {op!r}, expected one of {sorted(FILTER_OPS)}")
+        val = f.get('val')
+        column_filters.append((rw_to_orig[col], op, tuple(val) if isinstance(val, list) else val))
+    if not search and not column_filters:
+        return None
+    return RowFilter(search=search, column_filters=tuple(column_filters))
@@ -4,13 +4,14 @@ from __future__ import annotations
 import copy
 import datetime
 from datetime import timedelta
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Callable, Dict, List, Optional, Type
 from io import BytesIO
 from pathlib import Path
 import os
 import traceback
 import re
 import sys
+import weakref
 
 
 import anywidget
@@ -21,6 +22,9 @@ import logging
 from traitlets import Dict as TDict, Unicode
 
 from .dataflow.column_executor_dataflow import ColumnExecutorDataflow
+from .dataflow.summary_delta import SummaryDeltaBuffer, patch_summary_rows
+from .lazy_filter import row_filter_from_state
+from .infinite_cache import SliceCache, SortIndexCache, adjacent_windows, gather_window
 from .customizations.polars_analysis import PL_Analysis_Klasses, NOT_STRUCTS
 from buckaroo.pluggable_analysis_framework.utils import json_postfix
 from buckaroo.styling_helpers import obj_, pinned_histogram
@@ -29,8 +33,14 @@ from .df_util import old_col_new_col
 from .serialization_utils import pd_to_obj
 from buckaroo.file_cache.base import AbstractFileCache, Executor as _SyncExec, ExecutorLog  # type: ignore
 from buckaroo.file_cache.multiprocessing_executor import MultiprocessingExecutor as _ParExec
+from buckaroo.file_cache.asyncio_executor import AsyncioExecutor, running_loop
 from buckaroo.file_cache.cache_utils import get_global_file_cache, get_global_executor_log
-from buckaroo.file_cache.batch_planning import default_planning_function, PlanningFunction
+from buckaroo.file_cache.batch_planning import PlanningFunction
+from buckaroo.file_cache.cached_summary import CACHED_SUMMARY_CHUNK, CachedSummary
+from buckaroo.file_cache.cost_model import cost_model_planning_function
+from buckaroo.file_cache.parquet_footer import footer_stats_for_lazyframe
+from buckaroo.file_cache.row_offsets import RowOffsetIndex, row_offset_index_for
+from buckaroo.file_cache.spill import spill_for
 
 
 
@@ -89,12 +99,56 @@ def _extract_file_path_from_lazyframe(ldf: pl.LazyFrame) -> Optional[str]:
         return None
 
 
+def _default_parallel_executor() -> type:
+    """
+    On the kernel's running event loop, AsyncioExecutor, so progress
+    updates are applied on the loop rather than from a background thread.
+    """
+    return AsyncioExecutor if running_loop() is not None else _ParExec
+
+
+def _current_cell_id() -> Optional[str]:
+    """
+    id of the notebook cell being executed, when the frontend sends one
+    (JupyterLab and VS Code do).  None outside a kernel.
+    """
+    try:
+        from IPython.core.getipython import get_ipython
+        kernel = getattr(get_ipython(), 'kernel', None)
+        if kernel is None:
+            return None
+        parent = kernel.get_parent()
+        return (parent.get('metadata') or {}).get('cellId')
+    except Exception:
+        return None
+
+
+# the latest widget created by each notebook cell
+_cell_widgets: "weakref.WeakValueDictionary[str, LazyInfinitePolarsBuckarooWidget]" = weakref.WeakValueDictionary()
+
+
+def _replace_cell_widget(cell_id: Optional[str], widget: "LazyInfinitePolarsBuckarooWidget") -> None:
+    """
+    Re-running a cell replaces its widget, stop computing stats for the
+    widget it displayed before.
+    """
+    if cell_id is None:
+        return
+    previous = _cell_widgets.get(cell_id)
+    _cell_widgets[cell_id] = widget
+    if previous is not None and previous is not widget:
+        logger.info(f"cell {cell_id} re-run, cancelling summary stats of widget {id(previous)}")
+        previous.cancel_computation()
+
+
 class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
     """
     A lazy, infinite-viewer widget for Polars LazyFrame built on ColumnExecutorDataflow.
     - Summary stats via ColumnExecutorDataflow + PAF executor
     - Infinite row streaming directly from the LazyFrame
     - Minimal DFViewer config (no code interpreter/post-processing)
+    - file_path may be a directory of parquet files, stats are then cached
+      per file and re-opening it after new files land only scans those
     """
 
     _esm = Path(__file__).parent / "static" / "widget.js"
@@ -163,11 +217,13 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
         show_message_box: bool,
     ) -> Optional[Dict[str, Dict[str, Any]]]:
         """
-        Load cached data from file cache, filter to match current LazyFrame columns, and log messages.
+        Load cached data from file cache for the first CACHED_SUMMARY_CHUNK columns,
+        keyed by the current LazyFrame's rewritten names, and log messages.
         
         Returns:
             Filtered cached merged_sd dict, or None if no cache available.
         """
+        self._cached_summary: Optional[CachedSummary] = None
         if not self._file_path or not self._file_cache:
             logger.info("LazyInfinitePolarsBuckarooWidget._load_and_filter_cached_data: No file_path or file_cache provided")
             return None
@@ -176,38 +232,14 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
         # Check if file is in cache and hasn't been modified
         if self._file_cache.check_file(file_path_obj):
             self._add_message('cache', f'file found in cache with file name {self._file_path}', show_message_box)
-            md = self._file_cache.get_file_metadata(file_path_obj)
-            if md and 'merged_sd' in md:
-                full_cached_merged_sd = md['merged_sd']
+            # only read stats for the columns shown on open, wide files may have many more cached.
+            # The rest are read as the viewport reaches them, see _handle_viewport
+            self._cached_summary = CachedSummary(self._file_cache, file_path_obj, self._orig_to_rw)
+            cached_merged_sd = self._cached_summary.load(all_cols[:CACHED_SUMMARY_CHUNK])
+            if cached_merged_sd:
                 logger.info(f"LazyInfinitePolarsBuckarooWidget._load_and_filter_cached_data: Loaded cached merged_sd for {self._file_path}")
-                logger.info(f"  Full cached columns count: {len(full_cached_merged_sd)}")
-                logger.debug(f"  Full cached column keys: {list(full_cached_merged_sd.keys())}")
-                
-                # Filter cached data to only include columns that exist in the current LazyFrame
-                # The cache may contain columns from a different column subset, so we filter it
-                # Cache entries are keyed by rewritten names from the full dataframe, but we need to
-                # match by original column names since rewritten names change based on column order
-                current_orig_cols = set(all_cols)
-                cached_merged_sd = {}
-                
-                for cached_rw_col, cached_stats in full_cached_merged_sd.items():
-                    if isinstance(cached_stats, dict):
-                        cached_orig_col = cached_stats.get('orig_col_name')
-                        if cached_orig_col and cached_orig_col in current_orig_cols:
-                            # This column exists in current LazyFrame - map it to its new rewritten name
-                            new_rw_col = self._orig_to_rw.get(cached_orig_col)
-                            if new_rw_col:
-                                # Copy the stats and update the rewritten_col_name to match the new mapping
-                                stats_copy = cached_stats.copy()
-                                stats_copy['rewritten_col_name'] = new_rw_col
-                                cached_merged_sd[new_rw_col] = stats_copy
-                
-                if len(cached_merged_sd) < len(full_cached_merged_sd):
-                    filtered_count = len(full_cached_merged_sd) - len(cached_merged_sd)
-                    logger.info(f"  Filtered cached data: kept {len(cached_merged_sd)}/{len(full_cached_merged_sd)} columns (removed {filtered_count} columns not in current LazyFrame)")
-                    logger.debug(f"  Filtered column keys: {list(cached_merged_sd.keys())}")
-                else:
-                    logger.info(f"  Using all {len(cached_merged_sd)} cached columns")
+                logger.info(f"  Read {len(cached_merged_sd)} cached columns of the first {min(len(all_cols), CACHED_SUMMARY_CHUNK)}/{len(all_cols)}")
+                logger.debug(f"  Cached column keys: {list(cached_merged_sd.keys())}")
                 
                 # Log cache info if message box is enabled
                 self._log_cache_info(cached_merged_sd, show_message_box)
@@ -329,7 +361,8 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
             total_rows = 0
         num_cols = len(all_cols)
         
-        self.df_meta = {'columns': num_cols, 'rows_shown': 0, 'filtered_rows': 0, 'total_rows': total_rows}
+        # nothing is filtered until buckaroo_state asks for it
+        self.df_meta = {'columns': num_cols, 'rows_shown': 0, 'filtered_rows': total_rows, 'total_rows': total_rows}
     
     def ensure_summary_defaults(self, all_cols: List[str]) -> Dict[str, Dict[str, Any]]:
         """
@@ -362,6 +395,26 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
         logger.info(f"LazyInfinitePolarsBuckarooWidget.ensure_summary_defaults: created {len(base)} entries, sample entry keys: {list(list(base.values())[0].keys()) if base else []}")
         return base
     
+    def ensure_footer_stats(
+        self,
+        initial_sd: Dict[str, Dict[str, Any]],
+        ldf: pl.LazyFrame,
+        all_cols: List[str],
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fill length, null_count, min and max into the initial summary from the
+        parquet footer, so the first paint of a parquet file shows them without
+        scanning the data.  Columns stay pending, the other stats still need
+        the executor.
+        """
+        footer_stats = footer_stats_for_lazyframe(ldf, self._file_path, all_cols)
+        for orig, col_stats in footer_stats.items():
+            rw = self._orig_to_rw.get(orig, orig)
+            if rw in initial_sd:
+                initial_sd[rw].update(col_stats)
+        logger.info(f"LazyInfinitePolarsBuckarooWidget.ensure_footer_stats: filled {len(footer_stats)} columns from parquet footer")
+        return initial_sd
+
     def ensure_merged_initial_summary(
         self,
         initial_sd: Dict[str, Dict[str, Any]],
@@ -465,10 +518,13 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
                         # Check if this looks like it only has defaults (no real computation)
                         # If it has provides_defaults values but they're all the same/default, it's pending
                         col_stats['__status__'] = 'pending'
-            # Save merged_sd to cache for next time
-            if self._file_path and self._file_cache:
+            # Save merged_sd to cache for next time.  Placeholders aren't saved, they
+            # may stand for cached columns that haven't been read yet
+            computed_sd = {rw: col_stats for rw, col_stats in summary_sd.items()
+                           if isinstance(col_stats, dict) and '__status__' not in col_stats}
+            if self._file_path and self._file_cache and computed_sd:
                 try:
-                    self._file_cache.upsert_file_metadata(Path(self._file_path), {'merged_sd': summary_sd})
+                    self._file_cache.upsert_column_stats(Path(self._file_path), computed_sd)
                 except Exception as e:
                     logger.warning(f"Failed to save merged_sd to cache: {e}")
             return summary_sd
@@ -551,6 +607,13 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
     # Option to show message box
     show_message_box = TDict({'enabled': False}).tag(sync=True)
 
+    # Search and column filters, applied to the LazyFrame, see lazy_filter.py
+    buckaroo_state = TDict({
+        'search_string': '',
+        'quick_command_args': {},
+        'column_filters': [],
+    }).tag(sync=True)
+
     def __init__(
         self,
         ldf: pl.LazyFrame,
@@ -568,6 +631,8 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
         timeout_secs: float = 14.0,  # Timeout for multiprocessing executor
         show_message_box: bool = False,  # Enable message box for logging
         record_transcript: bool = False,  # Enable transcript recording for replay
+        spill_slow_sources: bool = False,  # Serve CSV/NDJSON windows from a memory mapped IPC copy
+        index_slow_sources: bool = False,  # Seek to CSV/NDJSON windows through a sparse row offset index
     ) -> None:
         logger = logging.getLogger("buckaroo.lazy_widget")
         # Store original widget ID and PID for logging and tracking
@@ -578,6 +643,11 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
         super().__init__()
         self._debug = debug
         self._ldf = ldf
+        # arg-sort permutations of _ldf, so sorted scrolling doesn't re-sort per window
+        self._sort_index = SortIndexCache()
+        # encoded windows, served again on scroll back and prefetched around each request
+        self._slice_cache = SliceCache()
+        self._last_window_start: Optional[int] = None
         self.show_message_box = {'enabled': show_message_box}
         self.record_transcript = {'enabled': record_transcript}
         logger.info(f"LazyInfinitePolarsBuckarooWidget.__init__: show_message_box={show_message_box}, record_transcript={record_transcript}")
@@ -602,6 +672,11 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
         # Ensure file_path is set, attempting to extract from LazyFrame if needed
         self.ensure_file_path(file_path, ldf)
 
+        # CSV/NDJSON re-parse from the top for every slice, convert them once in the background
+        self._spill = spill_for(ldf) if spill_slow_sources else None
+        # or, without a copy of the data, index where every stride-th row starts
+        self._row_index = row_offset_index_for(ldf, self._file_cache) if index_slow_sources else None
+
 
         # Build stable rewrites
         # Try to get column names from schema, but handle errors gracefully
@@ -636,55 +711,63 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
         # Keep track of initial merged_sd to preserve cached columns
         self._log_with_widget_info("LazyInfinitePolarsBuckarooWidget.__init__: Widget instance ready")
         
-        def _on_progress_update(aggregated_summary: Dict[str, Dict[str, Any]]) -> None:
-            self._log_with_widget_info(
+        # The executor's thread holds these callbacks, through weak references
+        # they don't keep a discarded widget alive and it can be collected
+        widget_ref = weakref.ref(self)
+
+        def _flush_summary_delta(delta: Dict[str, Dict[str, Any]]) -> None:
+            widget = widget_ref()
+            if widget is not None:
+                widget._apply_summary_delta(delta)
+        # results are coalesced and pushed as deltas, see summary_delta.py
+        self._summary_deltas = SummaryDeltaBuffer(_flush_summary_delta)
+
+        def _on_progress_update(delta: Dict[str, Dict[str, Any]]) -> None:
+            # delta holds the merged_sd entries of the columns that just changed,
+            # the dataflow has already folded them into its merged_sd
+            widget = widget_ref()
+            if widget is None:
+                return
+            widget._log_with_widget_info(
                 "LazyInfinitePolarsBuckarooWidget._on_progress_update",
                 include_current=True,
-                columns_in_update=len(aggregated_summary) if aggregated_summary else 0
+                columns_in_update=len(delta) if delta else 0
             )
-            try:
-                # Merge with existing merged_sd to preserve cached columns
-                # aggregated_summary may only contain newly computed columns
-                current_merged = self._df.merged_sd.copy() if self._df.merged_sd else {}
-                merged_for_display = current_merged.copy()
-                merged_for_display.update(aggregated_summary or {})
-                
-                rows = self._summary_to_rows(merged_for_display)              
-                # Update merged_sd on dataflow so it's in sync
-                self._df.merged_sd = merged_for_display
-                # Update df_data_dict - create new dict to trigger traitlets change notification
-                self.df_data_dict = {'main': [], 'all_stats': rows, 'empty': []}
-                # Save merged_sd to cache as stats come in (important for async executors)
-                if self._file_path and self._file_cache and merged_for_display and len(merged_for_display) > 0:
-                    try:
-                        self._file_cache.upsert_file_metadata(Path(self._file_path), {'merged_sd': merged_for_display})
-                    except Exception as e:
-                        logger.warning(f"Failed to save merged_sd to cache during progress update: {e}")
-            except Exception:
-                logger.exception("error updating df_data_dict from progress")
+            widget._summary_deltas.add(delta)
+
+        def _on_progress_done() -> None:
+            widget = widget_ref()
+            if widget is not None:
+                widget._summary_deltas.flush()
         self._df.progress_update_callback = _on_progress_update
+        self._df.progress_done_callback = _on_progress_done
 
         # Prepare initial defaults so pinned rows have placeholders immediately
         _initial_sd = self.ensure_summary_defaults(all_cols)
         # Compute summary stats and wire progress to a trait
         def _listener(note):
+            widget = widget_ref()
+            if widget is None:
+                return
             # Minimal progress surface; expand as needed
 
             # logger.info(
             #     "ProgressNotification for %s  status %s message %s",
             #     note.col_group, note.success, note.failure_message)
 
-            self.executor_progress = {
+            widget.executor_progress = {
                 'success': note.success,
                 'col_group': note.col_group,
                 'message': note.failure_message or ''
             }
             
-            self._log_execution_update(note, show_message_box)
+            widget._log_execution_update(note, show_message_box)
 
         chosen_sync_exec = sync_executor_class or _SyncExec
-        chosen_par_exec = parallel_executor_class or _ParExec
+        chosen_par_exec = parallel_executor_class or _default_parallel_executor()
         
+        # Footer stats first, cached data (which is complete for its columns) wins over them
+        _initial_sd = self.ensure_footer_stats(_initial_sd, ldf, all_cols)
         # Merge cached data into initial summary so all columns appear with cached stats where available
         initial_summary_sd = self.ensure_merged_initial_summary(_initial_sd, cached_merged_sd)
         
@@ -699,9 +782,12 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
         # 1. Cached columns to appear immediately
         # 2. Missing columns to compute in background
         # 3. No need to wait for all columns before showing anything
-        # Use default_planning_function (smart batch planner) for optimal performance by default
+        # Use the cost model planner by default, it sizes groups from dtypes, file size and timing history
         # Tests can override with simple_one_column_planning for deterministic behavior
-        chosen_planning_function = planning_function or default_planning_function
+        chosen_planning_function = planning_function or cost_model_planning_function
+        _replace_cell_widget(_current_cell_id(), self)
+        # stop the executor when the widget is garbage collected, close() stops it too
+        weakref.finalize(self, self._df.cancel)
         self._df.auto_compute_summary(
             chosen_sync_exec,
             chosen_par_exec,
@@ -710,6 +796,8 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
             file_path=self._file_path,
             planning_function=chosen_planning_function,
             timeout_secs=timeout_secs,
+            # shares the chunks already read, the executor reads the rest as it reaches them
+            cached_merged_sd_override=self._cached_summary,
         )
         
         # Ensure summary is ready for initial display (checks if computation completed synchronously)
@@ -746,11 +834,51 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
                 except Exception:
                     logger.exception("error logging infinite_request")
                 self._handle_payload_args(payload_args)
+            elif msg.get('type') == 'viewport':
+                self._handle_viewport(msg.get('columns') or [])
         self.on_msg(payload_bridge)
 
 
+    def cancel_computation(self) -> None:
+        """Stop computing summary stats, nobody will see them (widget closed or replaced)."""
+        # close() also runs from __del__, possibly before __init__ got this far
+        dataflow = getattr(self, '_df', None)
+        if dataflow is not None:
+            dataflow.cancel()
+
+    def close(self) -> None:
+        self.cancel_computation()
+        slice_cache = getattr(self, '_slice_cache', None)
+        if slice_cache is not None:
+            slice_cache.clear()
+        super().close()
+
     # no schema-only column config helper needed for sync path
 
+    def _apply_summary_delta(self, delta: Dict[str, Dict[str, Any]], persist: bool = True) -> None:
+        """
+        Show and persist the stats of the columns in delta: all_stats is
+        patched in place, the frontend gets the changed rows as a
+        summary_delta message and the file cache rewrites just those columns.
+        """
+        try:
+            delta_df = pd.DataFrame(delta)
+            # pd_to_obj renames columns by position, give the cells their column's name back
+            to_rw = {new: old for old, new in old_col_new_col(delta_df)}
+            rows = [{to_rw.get(k, k): v for k, v in row.items()} for row in pd_to_obj(delta_df)]
+            all_stats = self.df_data_dict.get('all_stats')
+            # before ensure_df_display_args there is nothing displayed to patch
+            if all_stats is not None:
+                removed = patch_summary_rows(all_stats, rows, delta)
+                self.send({'type': 'summary_delta', 'all_stats': rows, 'removed': removed})
+        except Exception:
+            logger.exception("error applying summary delta")
+        if persist and self._file_path and self._file_cache:
+            try:
+                self._file_cache.upsert_column_stats(Path(self._file_path), delta)
+            except Exception as e:
+                logger.warning(f"Failed to save summary delta to cache: {e}")
+
     def _summary_to_rows(self, summary: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
         if not summary:
             return []
@@ -789,6 +917,65 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
         out.seek(0)
         return out.read()
 
+    def _handle_viewport(self, visible_columns: List[str]) -> None:
+        """
+        The grid scrolled horizontally, visible_columns are the rewritten
+        names of the columns on screen.  Their summary stats are computed
+        before the rest.
+        """
+        orig_cols = [self._rw_to_orig[c] for c in visible_columns if c in self._rw_to_orig]
+        logger.info("viewport columns=%s", orig_cols)
+        self._show_cached_columns(orig_cols)
+        try:
+            self._df.set_priority_columns(orig_cols)
+        except Exception:
+            logger.exception("error prioritizing viewport columns")
+
+    def _show_cached_columns(self, orig_cols: List[str]) -> None:
+        """Read the cached stats of orig_cols that only show placeholders and display them."""
+        cached = self._cached_summary
+        if cached is None:
+            return
+        merged_sd = self._df.merged_sd if self._df.merged_sd is not None else {}
+        pending = [orig for orig in orig_cols
+                   if merged_sd.get(self._orig_to_rw[orig], {}).get('__status__') == 'pending']
+        if not pending:
+            return
+        try:
+            delta: Dict[str, Dict[str, Any]] = {}
+            for rw, cached_stats in cached.load(pending).items():
+                entry = dict(merged_sd.get(rw, {}))
+                entry.update(cached_stats)
+                entry.pop('__status__', None)
+                delta[rw] = entry
+        except Exception:
+            logger.exception("error reading cached stats for viewport columns")
+            return
+        if delta:
+            merged_sd.update(delta)
+            # already in the file cache, just show them
+            self._apply_summary_delta(delta, persist=False)
+
+    def _row_source(self) -> pl.LazyFrame:
+        """the frame windows are read from, the IPC spill of a slow source once it's written"""
+        spill = self._spill
+        if spill is not None:
+            spilled = spill.scan()
+            if spilled is not None:
+                return spilled
+        return self._ldf
+
+    def _window_encoder(self, base: pl.LazyFrame | pl.DataFrame, perm: Optional[pl.Series], start: int, end: int,
+                        row_index: Optional[RowOffsetIndex] = None) -> Callable[[], bytes]:
+        """encodes rows [start, end) of base, in perm's order when sorted"""
+        def encode() -> bytes:
+            window = row_index.read(start, end) if row_index is not None and perm is None else None
+            if window is None:
+                window = gather_window(base, perm, start, end)
+            # Use a global, non-repeating index by offsetting with the slice start
+            return self._to_parquet(window.with_row_index(name='index', offset=start))
+        return encode
+
     def _handle_payload_args(self, new_payload_args: Dict[str, Any]) -> None:
         start, end = new_payload_args.get('start', 0), new_payload_args.get('end', 0)
         if start is None or end is None:
@@ -803,42 +990,57 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
                 new_payload_args.get('sort_direction'),
             )
             # create a derived lazyframe to avoid borrowing conflicts with background tasks
-            base = self._ldf.select(pl.all())
+            source = self._row_source()
+            base = source.select(pl.all())
+            # a spill is already seekable, the row index only helps reading the text source
+            row_index = self._row_index if source is self._ldf else None
+            # sorted windows gather from the memory mapped spill rather than scanning it
+            mapped = self._spill.frame() if self._spill is not None and source is not self._ldf else None
+            window_source = mapped if mapped is not None else base
             sort = new_payload_args.get('sort')
-            if sort:
-                orig_sort_col = self._rw_to_orig.get(sort, sort)
-                sort_dir = new_payload_args.get('sort_direction')
-                ascending = (sort_dir == 'asc')
-                base = base.sort(orig_sort_col, descending=not ascending)
-            slice_len = max(int(end) - int(start), 0)
-            # Use a global, non-repeating index by offsetting with the slice start
-            slice_df = (
-                base.slice(int(start), slice_len)
-                .with_row_index(name='index', offset=int(start))
-                .collect()
-            )
+            sort_dir = new_payload_args.get('sort_direction') if sort else None
+            orig_sort_col = self._rw_to_orig.get(sort, sort) if sort else None
+            row_filter = row_filter_from_state(self.buckaroo_state, self._rw_to_orig)
+            perm = None
+            if row_filter is not None:
+                # matching rows found once per (filter, sort), windows page through them
+                perm = self._sort_index.get_rows(
+                    base, row_filter.key, row_filter.expr(base.collect_schema()),
+                    orig_sort_col, descending=sort_dir != 'asc')
+            elif sort:
+                # sorted once per (column, direction), windows gather through the permutation
+                perm = self._sort_index.get(base, orig_sort_col, descending=sort_dir != 'asc')
+            sort_key = (row_filter.key if row_filter is not None else None, sort, sort_dir)
+            total = len(perm) if row_filter is not None else self.df_meta['total_rows']
+            if self.df_meta.get('filtered_rows') != total:
+                self.df_meta = {**self.df_meta, 'filtered_rows': total}
+            start, end = int(start), int(end)
+            buf = self._slice_cache.get(sort_key + (start, end), self._window_encoder(window_source, perm, start, end, row_index))
             logger.info(
-                "sending slice [%s,%s) rows=%s total=%s",
-                start, end, len(slice_df), self.df_meta['total_rows']
+                "sending slice [%s,%s) bytes=%s total=%s",
+                start, end, len(buf), total
             )
-            self.send({"type": "infinite_resp", 'key': new_payload_args, 'data': [], 'length': self.df_meta['total_rows']},
-                      [self._to_parquet(slice_df)])
+            self.send({"type": "infinite_resp", 'key': new_payload_args, 'data': [], 'length': total}, [buf])
 
             second_pa = new_payload_args.get('second_request')
             if second_pa:
                 s2, e2 = second_pa.get('start'), second_pa.get('end')
                 if s2 is not None and e2 is not None:
-                    slice2 = (
-                        base.slice(int(s2), max(int(e2) - int(s2), 0))
-                        .with_row_index(name='index', offset=int(s2))
-                        .collect()
-                    )
+                    s2, e2 = int(s2), int(e2)
+                    buf2 = self._slice_cache.get(sort_key + (s2, e2), self._window_encoder(window_source, perm, s2, e2, row_index))
                     logger.info(
-                        "sending second slice [%s,%s) rows=%s total=%s",
-                        s2, e2, len(slice2), self.df_meta['total_rows']
+                        "sending second slice [%s,%s) bytes=%s total=%s",
+                        s2, e2, len(buf2), total
                     )
-                    self.send({"type": "infinite_resp", 'key': second_pa, 'data': [], 'length': self.df_meta['total_rows']},
-                              [self._to_parquet(slice2)])
+                    self.send({"type": "infinite_resp", 'key': second_pa, 'data': [], 'length': total},
+                              [buf2])
+
+            # the grid asks for blocks of origEnd - start rows, encode the neighbouring blocks ahead of time
+            step = int(new_payload_args.get('origEnd') or end) - start
+            self._slice_cache.prefetch([
+                (sort_key + (s, e), self._window_encoder(window_source, perm, s, e, row_index))
+                for s, e in adjacent_windows(start, end, step, total, self._last_window_start)])
+            self._last_window_start = start
         except Exception as e:
             stack_trace = traceback.format_exc()
             self.send({"type": "infinite_resp", 'key': new_payload_args, 'data': [], 'error_info': stack_trace, 'length': 0}, [])
@@ -902,7 +1104,7 @@ class LazyInfinitePolarsBuckarooWidget(anywidget.AnyWidget):
         
         # Get executor classes (use the same ones from __init__)
         sync_executor_class = self._sync_executor_class or _SyncExec
-        parallel_executor_class = self._parallel_executor_class or _ParExec
+        parallel_executor_class = self._parallel_executor_class or _default_parallel_executor()
         
         # Recompute summary stats with the new analysis
         # Note: progress_update_callback is already set on self._df, so we don't need to pass progress_listener
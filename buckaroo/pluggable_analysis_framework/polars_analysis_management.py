@@ -97,8 +97,8 @@ def polars_produce_series_df(df:pl.DataFrame,
                     for orig_col, measures in merged_dict.items():
                         for measure, value in measures.items():
                             col_name = json.dumps([orig_col, measure])
-                            if measure == 'value_counts' and isinstance(value, pl.Series):
-                                # Preserve the Series for value_counts (it's a Series of structs)
+                            if measure in ('value_counts', 'histogram_meat') and isinstance(value, pl.Series):
+                                # Preserve the Series for imploded measures (Series of structs)
                                 reconstructed_cols[col_name] = [value]
                             elif isinstance(value, pl.Series):
                                 # For other Series, extract first element
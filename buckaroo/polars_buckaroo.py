@@ -1,5 +1,4 @@
 from io import BytesIO
-import traceback
 
 import polars as pl
 from traitlets import Unicode
@@ -97,45 +96,14 @@ def to_parquet(df):
 
 
 class PolarsBuckarooInfiniteWidget(PolarsBuckarooWidget, BuckarooInfiniteWidget):
-    def _handle_payload_args(self, new_payload_args):
-        start, end = new_payload_args['start'], new_payload_args['end']
-        _unused, processed_df, merged_sd = self.dataflow.widget_args_tuple
-        if processed_df is None:
-            return
-
-        try:
-            sort = new_payload_args.get('sort')
-            if sort:
-                sort_dir = new_payload_args.get('sort_direction')
-                ascending = sort_dir == 'asc'
-                processed_sd = self.dataflow.widget_args_tuple[2]
-                converted_sort_column = processed_sd[sort]['orig_col_name']
-                sorted_df = processed_df.with_row_index().sort(converted_sort_column, descending=not ascending)
-                slice_df = sorted_df[start:end]
-                #slice_df['index'] = slice_df.index
-                self.send({ "type": "infinite_resp", 'key':new_payload_args, 'data':[], 'length':len(processed_df)}, [to_parquet(slice_df)])
-            else:
-                slice_df = processed_df.with_row_index()[start:end]
-                #slice_df['index'] = slice_df.index
-                self.send({ "type": "infinite_resp", 'key':new_payload_args,
-                            'data': [], 'length':len(processed_df)}, [to_parquet(slice_df) ])
-    
-                second_pa = new_payload_args.get('second_request')
-                if not second_pa:
-                    return
-                
-                extra_start, extra_end = second_pa.get('start'), second_pa.get('end')
-                extra_df = processed_df.with_row_index()[extra_start:extra_end]
-                extra_df['index'] = extra_df.index
-                self.send(
-                    {"type": "infinite_resp", 'key':second_pa, 'data':[], 'length':len(processed_df)},
-                    [to_parquet(extra_df)]
-                )
-        except Exception as e:
-            print(e)
-            stack_trace = traceback.format_exc()
-            self.send({ "type": "infinite_resp", 'key':new_payload_args, 'data':[], 'error_info':stack_trace, 'length':0})
-            raise
+    def _sort_frame(self, processed_df, sort_column, ascending):
+        return processed_df.with_row_index().sort(sort_column, descending=not ascending)
+
+    def _index_frame(self, processed_df):
+        return processed_df.with_row_index()
+
+    def _to_parquet(self, df):
+        return to_parquet(df)
 
 
 def PolarsDFViewer(df,
@@ -40,6 +40,28 @@ export const getDataWrapper = (
         };
     }
 };
+// patch summary stat rows (one per stat, keyed by index) with the rows of
+// the columns that changed, adding stats that weren't there yet and
+// dropping the rows the kernel emptied
+export const mergeSummaryDelta = (allStats: DFData, deltaRows: DFData, removed: unknown[] = []): DFData => {
+    const merged = allStats.slice();
+    const positions = new Map<unknown, number>();
+    merged.forEach((row, i) => positions.set(row.index, i));
+    for (const deltaRow of deltaRows) {
+        const pos = positions.get(deltaRow.index);
+        if (pos === undefined) {
+            positions.set(deltaRow.index, merged.length);
+            merged.push(deltaRow);
+        } else {
+            merged[pos] = { ...merged[pos], ...deltaRow };
+        }
+    }
+    if (removed.length === 0) {
+        return merged;
+    }
+    const removedSet = new Set(removed);
+    return merged.filter((row) => !removedSet.has(row.index));
+};
 /*
 const gensym = () => {
     let a = 0;
@@ -56,9 +78,23 @@ export const getKeySmartRowCache = (model: any, setRespError:any) => {
         model.send({ type: 'infinite_request', payload_args: pa })
     }
     const src = new KeyAwareSmartRowCache(reqFn)
+    // the kernel computes summary stats for visible columns first
+    src.onVisibleColumns = _.debounce((fields: string[]) => {
+        model.send({ type: 'viewport', columns: fields })
+    }, 150)
 
     model.on("msg:custom", (msg: any, buffers: any[]) => {
         console.log("got a message", msg);
+        if (msg?.type === "summary_delta") {
+            // only the changed columns' stats are sent, merge them locally
+            // rather than having the kernel resync all of df_data_dict
+            const dfDataDict = model.get("df_data_dict") || {};
+            model.set("df_data_dict", {
+                ...dfDataDict,
+                all_stats: mergeSummaryDelta(dfDataDict.all_stats || [], msg.all_stats || [], msg.removed || []),
+            });
+            return
+        }
         if (msg?.type !== "infinite_resp") {
             console.log("bailing not infinite_resp")
             return
@@ -208,6 +244,32 @@ export function BuckarooInfiniteWidget({
             </div>
         );
     }
+const LazySearchBox = ({ value, setValue }: { value: string; setValue: (v: string) => void }) => {
+    const [searchVal, setSearchVal] = useState<string>(value);
+    React.useEffect(() => setSearchVal(value), [value]);
+
+    const keyPressHandler = (event: React.KeyboardEvent<HTMLInputElement>) => {
+        if (event.key === "Enter") {
+            event.preventDefault();
+            setValue(searchVal);
+        }
+    };
+    return (
+        <div className="LazySearchBox" style={{ display: "flex", flexDirection: "row" }}>
+            <input
+                type="text"
+                placeholder="search"
+                style={{ flex: "auto", maxWidth: 200 }}
+                value={searchVal}
+                onChange={({ target: { value } }) => setSearchVal(value)}
+                onKeyDown={keyPressHandler}
+            />
+            <button style={{ flex: "none" }} onClick={() => setValue(searchVal)}>&#x1F50D;</button>
+            <button style={{ flex: "none" }} onClick={() => { setSearchVal(""); setValue(""); }}>X</button>
+        </div>
+    );
+};
+
 export function DFViewerInfiniteDS({
         df_meta,
         df_data_dict,
@@ -215,7 +277,9 @@ export function DFViewerInfiniteDS({
         src,
         df_id,
         message_log,
-        show_message_box
+        show_message_box,
+        buckaroo_state,
+        on_buckaroo_state
     }: {
         df_meta: DFMeta;
         df_data_dict: Record<string, DFData>;
@@ -224,6 +288,9 @@ export function DFViewerInfiniteDS({
         df_id: string // the memory id 
         message_log?: { messages?: Array<any> };
         show_message_box?: { enabled?: boolean };
+        buckaroo_state?: Partial<BuckarooState> & { column_filters?: unknown[] };
+        // when set, a search box filters rows on the kernel through buckaroo_state.search_string
+        on_buckaroo_state?: (newState: Partial<BuckarooState> & { column_filters?: unknown[] }) => void;
     }) {
         // DFViewerInfiniteDS rendering
         // we only want to create KeyAwareSmartRowCache once, it caches sourceName too
@@ -258,7 +325,13 @@ export function DFViewerInfiniteDS({
         //evantually spliced back into the request args from scrolling/
         //the data source
         //const outsideDFParams = ["unused", "unused"];
-        const outsideDFParams: unknown = [df_id];
+        // the kernel filters rows by buckaroo_state, a new filter is a new datasource
+        const outsideDFParams: unknown = [
+            df_id,
+            buckaroo_state?.search_string,
+            buckaroo_state?.quick_command_args?.search,
+            buckaroo_state?.column_filters,
+        ];
         
 
         const messagesEnabled = show_message_box?.enabled ?? false;
@@ -289,6 +362,12 @@ export function DFViewerInfiniteDS({
         return (
             <div className="dcf-root flex flex-col buckaroo-widget buckaroo-infinite-widget"
              style={{ width: "100%", height: "100%" }}>
+                {on_buckaroo_state && (
+                    <LazySearchBox
+                        value={buckaroo_state?.search_string || ""}
+                        setValue={(search_string) => on_buckaroo_state({ ...buckaroo_state, search_string })}
+                    />
+                )}
                 <div
                     className="orig-df flex flex-row"
                     style={{
@@ -17,6 +17,7 @@ import {
     IDatasource,
     ModuleRegistry,
     SortChangedEvent,
+    VirtualColumnsChangedEvent,
     CellClassParams,
     RefreshCellsParams,
     //ColDef,
@@ -28,7 +29,8 @@ import {
     getAutoSize,
     getHeightStyle2,
     HeightStyleI,
-    SetColumnFunc
+    SetColumnFunc,
+    TimedIDatasource
 } from "./gridUtils";
 import { themeAlpine} from '@ag-grid-community/theming';
 import { colorSchemeDark } from '@ag-grid-community/theming';
@@ -423,13 +425,14 @@ const getFinalGridOptions = (
             suppressNoRowsOverlay: true,
         };
     } else if (data_wrapper.data_type === "DataSource") {
-        return getDsGridOptions(gridOptions, hs.maxRowsWithoutScrolling);
+        return getDsGridOptions(gridOptions, hs.maxRowsWithoutScrolling, data_wrapper.datasource as TimedIDatasource);
     } else {
         throw new Error(`Unexpected data_wrapper.data_type on  ${data_wrapper}`)
     }
  }
 
-const getDsGridOptions = (origGridOptions: GridOptions, maxRowsWithoutScrolling:number):
+const getDsGridOptions = (origGridOptions: GridOptions, maxRowsWithoutScrolling:number,
+    datasource?: TimedIDatasource):
  GridOptions => {
     const dsGridOptions: GridOptions = {
         ...origGridOptions,
@@ -447,6 +450,13 @@ const getDsGridOptions = (origGridOptions: GridOptions, maxRowsWithoutScrolling:
             // Setting a sort and being in the middle of it makes no sense
             api.ensureIndexVisible(0);
         },
+        onVirtualColumnsChanged: (event: VirtualColumnsChangedEvent) => {
+            // horizontal scrolling, let the kernel prioritize stats for these columns
+            const fields = event.api.getAllDisplayedVirtualColumns()
+                .map((col) => col.getColDef().field)
+                .filter((f): f is string => f !== undefined);
+            datasource?.onVisibleColumns?.(fields);
+        },
         rowBuffer: 20,
         rowModelType: "infinite",
         cacheBlockSize: maxRowsWithoutScrolling + 50,
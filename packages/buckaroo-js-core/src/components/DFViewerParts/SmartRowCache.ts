@@ -486,6 +486,8 @@ export class KeyAwareSmartRowCache {
     public reUpDist:number = 300;  //threshhold for requesting next range
 
     public padding: number = 200;
+    // set by the widget to tell the kernel which columns are on screen
+    public onVisibleColumns?: (fields: string[]) => void;
     constructor(reqFn: RequestFN) {
         this.reqFn = reqFn;
         this.waitingCallbacks = {};
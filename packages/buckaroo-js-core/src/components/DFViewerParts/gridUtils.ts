@@ -356,6 +356,8 @@ export interface IDisplayArgs {
 
 export interface TimedIDatasource extends IDatasource {
     createTime: Date;
+    // called with the fields of the columns scrolled into view
+    onVisibleColumns?: (fields: string[]) => void;
 }
 
 
@@ -393,7 +395,8 @@ export const getDs = (
             }
             // src.getRequestRows(dsPayloadArgs, params.successCallback)
             src.getRequestRows(dsPayloadArgs, successWrapper, failWrapper)
-        }
+        },
+        onVisibleColumns: (fields: string[]) => src.onVisibleColumns?.(fields),
     };
     return dsLoc;
 };
@@ -321,6 +321,7 @@ const srcClosureRBI = (src) => {
         const [df_id, _set_df_id] = useModelState("df_id");
 	const [message_log, _set_message_log] = useModelState("message_log");
 	const [show_message_box, _set_show_message_box] = useModelState("show_message_box");
+	const [buckaroo_state, on_buckaroo_state] = useModelState("buckaroo_state");
 	return (
 	    <div className="buckaroo_anywidget">
 		<srt.DFViewerInfiniteDS
@@ -331,6 +332,8 @@ const srcClosureRBI = (src) => {
 	            src={src}
 		    message_log={message_log}
 		    show_message_box={show_message_box}
+		    buckaroo_state={buckaroo_state}
+		    on_buckaroo_state={on_buckaroo_state}
 		/>
 		</div>
 	);
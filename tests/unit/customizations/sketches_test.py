@@ -0,0 +1,95 @@
+import numpy as np
+import polars as pl
+
+from buckaroo.customizations.sketches import HyperLogLog, KLLSketch, MisraGries
+from buckaroo.customizations.polars_sketch_analysis import PL_Sketch_Analysis_Klasses, SketchComputedSummaryStats
+from buckaroo.file_cache.mergeable_stats import merge_summary_stats
+from buckaroo.pluggable_analysis_framework.polars_analysis_management import PolarsAnalysisPipeline
+
+
+def test_hll_estimate_and_merge():
+    a = pl.Series("a", np.arange(60_000))
+    b = pl.Series("a", np.arange(40_000, 100_000))
+    hll_a, hll_b = HyperLogLog.from_series(a), HyperLogLog.from_series(b)
+    assert abs(hll_a.estimate() - 60_000) / 60_000 < 0.05
+    merged = hll_a.merge(hll_b)
+    assert abs(merged.estimate() - 100_000) / 100_000 < 0.05
+
+    assert HyperLogLog.from_series(pl.Series("a", [1, 2, 2, 3, None])).estimate() == 3
+    assert HyperLogLog.from_state(merged.to_state()).estimate() == merged.estimate()
+
+
+def test_kll_quantiles_and_merge():
+    rng = np.random.default_rng(0)
+    vals = rng.permutation(100_000).astype(float)
+    parts = [KLLSketch.from_series(pl.Series("a", chunk)) for chunk in np.array_split(vals, 7)]
+    merged = parts[0]
+    for p in parts[1:]:
+        merged = merged.merge(p)
+    assert merged.n == 100_000
+    for q in (0.25, 0.5, 0.75):
+        assert abs(merged.quantile(q) - q * 100_000) < 2_000
+    restored = KLLSketch.from_state(merged.to_state())
+    assert restored.quantile(0.5) == merged.quantile(0.5)
+    assert KLLSketch.from_series(pl.Series("a", [], dtype=pl.Float64)).quantile(0.5) is None
+
+
+def test_misra_gries_heavy_hitters():
+    ser = pl.Series("a", ["x"] * 500 + ["y"] * 300 + [f"v{i}" for i in range(2000)])
+    mg = MisraGries.from_series(ser, k=16)
+    assert [v for v, _ in mg.top(2)] == ["x", "y"]
+    # counts are lower bounds within n / (k + 1)
+    bound = len(ser) / 17
+    assert 500 - bound <= mg.counters["x"] <= 500
+
+    halves = MisraGries.from_series(ser[:1400], k=16).merge(MisraGries.from_series(ser[1400:], k=16))
+    assert halves.n == len(ser)
+    assert halves.top(1)[0][0] == "x"
+    assert MisraGries.from_state(halves.to_state()).top() == halves.top()
+
+
+def test_misra_gries_bounded_chunks():
+    ser = pl.Series("a", ["x"] * 500 + [f"v{i}" for i in range(5000)] + ["y"] * 300)
+    mg = MisraGries.from_series(ser, k=16, chunk_rows=100)
+    assert mg.n == len(ser)
+    assert len(mg.counters) <= 16
+    assert [v for v, _ in mg.top(2)] == ["x", "y"]
+    assert 500 - len(ser) / 17 <= mg.counters["x"] <= 500
+
+
+def test_sketch_computed_summary_empty_column():
+    summary = dict(length=0, distinct_count=0, empty_count=0, null_count=0)
+    assert SketchComputedSummaryStats.computed_summary(summary) == dict(distinct_per=0, empty_per=0, nan_per=0)
+
+
+def test_sketch_analyses_pipeline():
+    df = pl.DataFrame({
+        'ints': np.tile(np.arange(1000), 5),
+        'strs': (["a"] * 2000) + [f"s{i % 300}" for i in range(3000)],
+    })
+    summary, errs = PolarsAnalysisPipeline.full_produce_summary_df(df, PL_Sketch_Analysis_Klasses)
+    assert errs == {}
+    # summaries are keyed by rewritten column name
+    ints, strs = summary['a'], summary['b']
+    assert ints['length'] == 5000
+    assert abs(ints['distinct_count'] - 1000) < 50
+    assert abs(ints['median'] - 500) < 25
+    assert strs['most_freq'] == 'a'
+    assert strs['mode'] == 'a'
+    assert 'kll_state' not in strs
+    assert len(ints['histogram']) > 5
+    assert strs['histogram'][0]['name'] == 'a'
+
+
+def test_sketch_states_merge_across_pieces():
+    df = pl.DataFrame({'a': np.arange(20_000) % 5000})
+    pieces = [df[:8000], df[8000:]]
+    parts = []
+    for piece in pieces:
+        summary, _ = PolarsAnalysisPipeline.full_produce_summary_df(piece, PL_Sketch_Analysis_Klasses)
+        parts.append(summary['a'])
+    merged = merge_summary_stats(parts)
+    assert merged['length'] == 20_000
+    assert abs(merged['distinct_count'] - 5000) / 5000 < 0.05
+    assert abs(merged['median'] - 2500) < 100
+    assert isinstance(merged['hll_state'], str)
@@ -17,9 +17,9 @@ def test_polars_only_progress_streams_sequentially():
     ldf = df.lazy()
 
     # capture partial updates from dataflow
-    partial_counts = []
-    def on_progress(agg):
-        partial_counts.append(len(agg.keys()))
+    partial_updates = []
+    def on_progress(delta):
+        partial_updates.append(list(delta.keys()))
 
     cdf = ColumnExecutorDataflow(
         ldf,
@@ -32,6 +32,6 @@ def test_polars_only_progress_streams_sequentially():
 
     # final merged_sd should have all 3 columns
     assert len(cdf.merged_sd.keys()) == 3
-    # and we should have seen intermediate updates (1..3)
-    assert partial_counts and partial_counts[-1] == 3
+    # and we should have seen one update per column, carrying only that column
+    assert partial_updates == [['a'], ['b'], ['c']]
 
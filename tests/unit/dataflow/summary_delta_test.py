@@ -0,0 +1,60 @@
+import time
+
+from buckaroo.dataflow.summary_delta import SummaryDeltaBuffer, patch_summary_rows
+
+
+def test_summary_delta_buffer_coalesces_within_window():
+    flushed = []
+    buf = SummaryDeltaBuffer(flushed.append, window_secs=60)
+
+    # the first delta goes out right away
+    buf.add({'a': {'mean': 1}})
+    assert flushed == [{'a': {'mean': 1}}]
+
+    # later ones wait for the window, a column reported twice is sent once
+    buf.add({'b': {'mean': 2}})
+    buf.add({'b': {'mean': 3}, 'c': {'mean': 4}})
+    assert len(flushed) == 1
+
+    buf.flush()
+    assert flushed[1] == {'b': {'mean': 3}, 'c': {'mean': 4}}
+    # nothing pending, nothing flushed
+    buf.flush()
+    assert len(flushed) == 2
+
+
+def test_summary_delta_buffer_flushes_when_window_closes():
+    flushed = []
+    buf = SummaryDeltaBuffer(flushed.append, window_secs=0.05)
+    buf.add({'a': {'mean': 1}})
+    buf.add({'b': {'mean': 2}})
+    assert flushed == [{'a': {'mean': 1}}]
+    deadline = time.time() + 5
+    while len(flushed) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert flushed == [{'a': {'mean': 1}}, {'b': {'mean': 2}}]
+
+
+def test_patch_summary_rows():
+    all_stats = [
+        {'index': '__status__', 'a': None, 'b': 'pending'},
+        {'index': 'mean', 'a': 1, 'b': None},
+        {'index': 'null_count', 'a': 0, 'b': None},
+    ]
+    rows = [
+        {'index': 'mean', 'b': 2.5},
+        {'index': 'null_count', 'b': 3},
+        {'index': 'max', 'b': 9},
+    ]
+    delta = {'b': {'mean': 2.5, 'null_count': 3, 'max': 9}}
+    removed = patch_summary_rows(all_stats, rows, delta)
+
+    # b's __status__ is gone, which empties that row
+    assert removed == ['__status__']
+    assert all_stats == [
+        {'index': 'mean', 'a': 1, 'b': 2.5},
+        {'index': 'null_count', 'a': 0, 'b': 3},
+        {'index': 'max', 'b': 9},
+    ]
+    # the frontend is told to clear the cell too
+    assert {'index': '__status__', 'b': None} in rows
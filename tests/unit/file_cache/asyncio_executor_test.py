@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import time
+
+import polars as pl
+
+from buckaroo.file_cache.asyncio_executor import AsyncioExecutor
+from buckaroo.file_cache.base import FileCache, ProgressNotification
+from .executor_test_utils import SimpleColumnExecutor, SlowColumnExecutor
+
+
+ldf = pl.DataFrame({'a1': [1, 2, 3], 'b2': [10, 20, 30], 'c3': [4, 5, 6]}).lazy()
+
+
+def test_asyncio_executor_runs_on_the_loop():
+    notes: list[ProgressNotification] = []
+    listener_threads: set[int] = set()
+
+    def listener(p: ProgressNotification) -> None:
+        listener_threads.add(threading.get_ident())
+        notes.append(p)
+
+    async def main():
+        exc = AsyncioExecutor(ldf, SimpleColumnExecutor(), listener, FileCache(), timeout_secs=20.0)
+        exc.run()
+        # scheduled as a task, nothing has run yet
+        assert exc._task is not None and notes == []
+        await exc.join()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+    assert sorted(c for n in notes for c in n.result) == ['a1', 'b2', 'c3']
+    assert all(n.success for n in notes)
+    # progress was reported on the loop's thread, not from a background thread
+    assert listener_threads == {loop_thread}
+
+
+def test_asyncio_executor_without_loop_runs_to_completion():
+    notes: list[ProgressNotification] = []
+    exc = AsyncioExecutor(ldf, SimpleColumnExecutor(), notes.append, FileCache(), timeout_secs=20.0)
+    exc.run()
+    assert exc._task is None
+    assert sorted(c for n in notes for c in n.result) == ['a1', 'b2', 'c3']
+
+
+def test_asyncio_executor_cancel():
+    notes: list[ProgressNotification] = []
+
+    async def main():
+        exc = AsyncioExecutor(ldf, SlowColumnExecutor(30), notes.append, FileCache(),
+                              timeout_secs=60.0, max_concurrency=1)
+        exc.run()
+        await asyncio.sleep(1.0)
+        t0 = time.monotonic()
+        exc.cancel()
+        await asyncio.wait_for(exc.join(), 10)
+        return time.monotonic() - t0, exc
+
+    elapsed, exc = asyncio.run(main())
+    assert elapsed < 5
+    assert notes == []
+    assert exc.executor_log.get_log_events() == []
+
+
+def test_lazy_widget_uses_asyncio_executor_on_a_running_loop():
+    from buckaroo.lazy_infinite_polars_widget import LazyInfinitePolarsBuckarooWidget
+
+    async def main():
+        # enough rows for the parallel executor
+        df = pl.DataFrame({'x': list(range(400)), 'y': [str(i % 7) for i in range(400)]})
+        w = LazyInfinitePolarsBuckarooWidget(df.lazy(), timeout_secs=30.0)
+        assert isinstance(w._df.executor, AsyncioExecutor)
+        await w._df.executor.join()
+        return w
+
+    w = asyncio.run(main())
+    for col_stats in w._df.merged_sd.values():
+        assert col_stats.get('length') == 400
@@ -315,6 +315,23 @@ def test_simple_executor_listener_calls():
     assert call_args[0].result is not None
     assert 'a1' in call_args[0].result
 
+def test_simple_executor_cancel():
+    """a group cancelled mid execute isn't reported or left in the log, and no further groups run"""
+    fc = FileCache()
+    call_args = []
+    exc = None
+
+    class CancellingExecutor(SimpleColumnExecutor):
+        def execute(self, ldf, execution_args):
+            exc.cancel()
+            return super().execute(ldf, execution_args)
+
+    exc = Executor(ldf, CancellingExecutor(), call_args.append, fc, planning_function=simple_one_column_planning)
+    exc.run()
+    assert call_args == []
+    assert exc.executor_log.get_log_events() == []
+    assert exc.get_next_column_chunk() is None
+
 def Xtest_in_memory_cache():
     """
       This is trying to demonstrate caching series from a dataframe that was never written to a file
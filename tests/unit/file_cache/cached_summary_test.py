@@ -0,0 +1,56 @@
+import pickle
+
+from buckaroo.file_cache.base import FileCache
+from buckaroo.file_cache.cached_summary import CachedSummary
+
+
+def _cached_file(tmp_path, n_cols):
+    path = tmp_path / "f.parquet"
+    path.write_text("x")
+    fc = FileCache()
+    # cached by a frame whose rewritten names were different
+    fc.upsert_file_metadata(path, {'merged_sd': {
+        f"old{i}": {'orig_col_name': f"c{i}", 'rewritten_col_name': f"old{i}", 'length': 10 + i}
+        for i in range(n_cols) if i != 3}})
+    return fc, path
+
+
+class _CountingCache(FileCache):
+    def __init__(self, inner):
+        super().__init__()
+        self.inner = inner
+        self.reads = []
+
+    def get_file_metadata(self, path, columns=None):
+        self.reads.append(list(columns or []))
+        return self.inner.get_file_metadata(path, columns=columns)
+
+
+def test_cached_summary_reads_chunks_on_lookup(tmp_path):
+    inner, path = _cached_file(tmp_path, 10)
+    fc = _CountingCache(inner)
+    orig_to_rw = {f"c{i}": f"rw{i}" for i in range(10)}
+    cached = CachedSummary(fc, path, orig_to_rw, chunk_size=4)
+    assert fc.reads == []
+
+    assert cached.load(['c0', 'c3']) == {'rw0': {'orig_col_name': 'c0', 'rewritten_col_name': 'rw0', 'length': 10}}
+    assert fc.reads == [['c0', 'c1', 'c2', 'c3']]
+    assert 'rw1' in cached and 'rw3' not in cached
+    assert cached.is_loaded('rw2') and not cached.is_loaded('rw5')
+
+    assert cached['rw9']['length'] == 19
+    assert fc.reads[-1] == ['c8', 'c9']
+    # iterating stops reading when the caller stops
+    assert next(iter(cached.values()))['length'] == 10
+    assert len(fc.reads) == 2
+    assert len(cached) == 9
+    assert len(fc.reads) == 3
+
+
+def test_cached_summary_pickles_what_was_read(tmp_path):
+    fc, path = _cached_file(tmp_path, 6)
+    cached = CachedSummary(fc, path, {f"c{i}": f"rw{i}" for i in range(6)}, chunk_size=2)
+    cached.load(['c0'])
+    assert pickle.loads(pickle.dumps(cached)) == {'rw0': cached['rw0'], 'rw1': cached['rw1']}
+    # nothing cached for path
+    assert not CachedSummary(FileCache(), path, {'c0': 'rw0'})
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+import polars as pl
+
+from buckaroo.file_cache.batch_planning import ExecutionResult, PlanningContext
+from buckaroo.file_cache.cost_model import (
+    column_weights, cost_model_planning_function, planning_inputs,
+)
+
+
+def _context(cols, history=(), remaining=None, **kwargs):
+    return PlanningContext(
+        all_columns=cols,
+        baseline_overhead=timedelta(seconds=0.1),
+        timeout_secs=30.0,
+        execution_history=list(history),
+        remaining_columns=list(cols if remaining is None else remaining),
+        **kwargs)
+
+
+def _ok(cols, secs):
+    return ExecutionResult(columns=cols, success=True, execution_time=timedelta(seconds=secs), timed_out=False)
+
+
+def test_strings_weigh_more_than_numbers():
+    ctx = _context(['i', 's', 'b'], row_count=1000,
+                   column_dtypes={'i': pl.Int64, 's': pl.String, 'b': pl.Boolean})
+    weights, sized = column_weights(ctx)
+    assert sized
+    assert weights['s'] > weights['i'] > weights['b']
+
+
+def test_first_group_small_then_packed_by_history():
+    cols = [f"c{i}" for i in range(100)]
+    dtypes = {c: pl.Float64 for c in cols}
+    # 100M rows of float64, each column predicted well over the first group target
+    ctx = _context(cols, row_count=100_000_000, column_dtypes=dtypes)
+    first = cost_model_planning_function(ctx)
+    assert first.phase == "first_group"
+    assert len(first.batches) == 1 and len(first.batches[0].columns) == 1
+
+    # the first column took 0.6s after overhead, groups target 7.5s so 12 columns per group
+    ctx = _context(cols, history=[_ok(['c0'], 0.7)], remaining=cols[1:],
+                   row_count=100_000_000, column_dtypes=dtypes)
+    planned = cost_model_planning_function(ctx)
+    assert planned.phase == "cost_model"
+    assert [c for b in planned.batches for c in b.columns] == cols[1:]
+    assert len(planned.batches[0].columns) == 12
+
+
+def test_timeout_shrinks_groups_and_single_column_timeout_is_error():
+    cols = ['a', 'b', 'c', 'd']
+    timed_out = ExecutionResult(columns=['a', 'b'], success=False,
+                                execution_time=timedelta(seconds=30), timed_out=True)
+    planned = cost_model_planning_function(_context(cols, history=[_ok(['d'], 0.2), timed_out],
+                                                    remaining=['a', 'b', 'c']))
+    assert all(len(b.columns) == 1 for b in planned.batches)
+
+    single = ExecutionResult(columns=['a'], success=False, execution_time=timedelta(seconds=30), timed_out=True)
+    assert cost_model_planning_function(_context(cols, history=[single])).phase == "error"
+
+
+def test_planning_inputs_from_parquet(tmp_path):
+    path = tmp_path / "f.parquet"
+    df = pl.DataFrame({'a': list(range(1000)), 's': [f"{i:050d}" for i in range(1000)]})
+    df.write_parquet(path, compression="uncompressed")
+    inputs = planning_inputs(pl.scan_parquet(path), path)
+    assert inputs['row_count'] == 1000
+    assert inputs['column_dtypes'] == {'a': pl.Int64, 's': pl.String}
+    assert inputs['file_size'] == path.stat().st_size
+    assert inputs['column_bytes']['s'] > inputs['column_bytes']['a'] > 0
+
+
+def test_schema_history_plans_first_group_like_a_measured_one():
+    from buckaroo.file_cache.batch_planning import ColumnCost
+    cols = [f"c{i}" for i in range(20)]
+    # yesterday's file had half the rows, 0.5s per column
+    history = {c: ColumnCost(dtype='Float64', runs=1, total_secs=0.5, total_rows=1_000_000, peak_memory_bytes=0)
+               for c in cols}
+    ctx = _context(cols, row_count=2_000_000, column_dtypes={c: pl.Float64 for c in cols},
+                   column_history=history)
+    planned = cost_model_planning_function(ctx)
+    assert planned.phase == "cost_model"
+    # 1s per column today, 7.4s of budget per group
+    assert [len(b.columns) for b in planned.batches] == [7, 7, 6]
+
+
+def test_multiprocessing_executor_logs_column_costs():
+    from buckaroo.file_cache.base import FileCache, SimpleExecutorLog
+    from buckaroo.file_cache.batch_planning import schema_key
+    from buckaroo.file_cache.multiprocessing_executor import MultiprocessingExecutor
+    from buckaroo.file_cache.mp_worker_pool import WorkerPool
+    from .executor_test_utils import SimpleColumnExecutor
+    df = pl.DataFrame({'a1': [1, 2, 3], 'b2': ['x', 'y', 'z']})
+    log = SimpleExecutorLog()
+    pool = WorkerPool(size=1)
+    try:
+        MultiprocessingExecutor(df.lazy(), SimpleColumnExecutor(), lambda p: None, FileCache(), executor_log=log,
+                                timeout_secs=30.0, async_mode=False, worker_pool=pool).run()
+    finally:
+        pool.shutdown()
+    costs = log.get_column_costs(schema_key(dict(df.schema)))
+    assert set(costs) == {'a1', 'b2'}
+    assert costs['b2'].dtype == 'String'
+    assert all(c.peak_memory_bytes > 0 for c in costs.values())
+
+
+def test_out_of_memory_caps_group_weight():
+    cols = [f"c{i}" for i in range(8)]
+    oom = ExecutionResult(columns=cols[:4], success=False, execution_time=timedelta(seconds=2),
+                          timed_out=False, error="oom")
+    ctx = _context(cols, history=[_ok(['c7'], 0.2), oom], remaining=cols[:7],
+                   row_count=1000, column_dtypes={c: pl.Int64 for c in cols})
+    planned = cost_model_planning_function(ctx)
+    # groups of at most half of the 4 columns that ran out of memory
+    assert [len(b.columns) for b in planned.batches] == [2, 2, 2, 1]
@@ -66,6 +66,23 @@ class SlowColumnExecutor(SimpleColumnExecutor):
         return super().execute(ldf, execution_args)
 
 
+class MemoryHungryColumnExecutor(SimpleColumnExecutor):
+    """allocates alloc_bytes and holds them for a while, low_memory_executor doesn't"""
+    def __init__(self, alloc_bytes: int) -> None:
+        super().__init__()
+        self.alloc_bytes = alloc_bytes
+
+    def execute(self, ldf: pl.LazyFrame, execution_args: ExecutorArgs) -> ColumnResults:
+        if self.alloc_bytes:
+            buf = bytearray(self.alloc_bytes)
+            buf[::4096] = b"x" * len(buf[::4096])
+            time.sleep(3)
+        return super().execute(ldf, execution_args)
+
+    def low_memory_executor(self) -> "MemoryHungryColumnExecutor | None":
+        return MemoryHungryColumnExecutor(0) if self.alloc_bytes else None
+
+
 # Helper functions for PAFColumnExecutor tests
 def create_listener(collected: list) -> Callable[[ProgressNotification], None]:
     """Create a listener that collects ProgressNotifications."""
@@ -150,7 +167,14 @@ def wait_for_executor_finish(
     # For sync executors, run() blocks until complete, so if it's been called, we're done
     # For async executors (MultiprocessingExecutor with async_mode=True), check thread status
     from buckaroo.file_cache.multiprocessing_executor import MultiprocessingExecutor
-    
+    from buckaroo.file_cache.asyncio_executor import AsyncioExecutor
+
+    if isinstance(executor, AsyncioExecutor):
+        # without a running loop run() blocked until done, on a loop use `await executor.join()`
+        if executor._task is not None and not executor._task.done():
+            raise AssertionError("AsyncioExecutor is running on an event loop, await executor.join() instead")
+        return
+
     if isinstance(executor, MultiprocessingExecutor) and executor.async_mode:
         if executor._work_thread is None:
             raise AssertionError(
@@ -40,3 +40,33 @@ def test_sqlite_file_cache_series_hashes_roundtrip(tmp_path):
     md = fc.get_file_metadata(p)
     assert md and md.get("schema") == ["c1", "c2"]
 
+
+def _check_executor_records_file_series_hashes(tmp_path, executor_factory):
+    import polars as pl
+    from tests.unit.file_cache.executor_test_utils import SimpleColumnExecutor
+
+    p = tmp_path / "f.parquet"
+    pl.DataFrame({"a": [1, 2, 3], "b": [4, 5, 6]}).write_parquet(p)
+    fc = SQLiteFileCache(str(tmp_path / "cache.db"))
+    fc.add_file(p, {})
+    notes = []
+    exc = executor_factory(pl.scan_parquet(p), SimpleColumnExecutor(), notes.append, fc, file_path=p)
+    exc.run()
+    assert notes and all(n.success for n in notes)
+    hashes = fc.get_file_series_hashes(p)
+    assert hashes == {c: n.result[c].series_hash for n in notes for c in n.result}
+    # referenced by the file, orphan collection leaves them alone
+    assert fc.gc_orphan_series() == 0
+    assert all(fc.get_series_results(h) is not None for h in hashes.values())
+
+
+def test_threaded_executor_records_file_series_hashes(tmp_path):
+    from buckaroo.file_cache.threaded_executor import ThreadedExecutor
+    _check_executor_records_file_series_hashes(tmp_path, ThreadedExecutor)
+
+
+def test_multiprocessing_executor_records_file_series_hashes(tmp_path):
+    from functools import partial
+    from buckaroo.file_cache.multiprocessing_executor import MultiprocessingExecutor
+    _check_executor_records_file_series_hashes(
+        tmp_path, partial(MultiprocessingExecutor, timeout_secs=10.0, async_mode=False))
@@ -0,0 +1,116 @@
+import os
+import shutil
+
+import polars as pl
+
+from buckaroo.file_cache.base import MemoryFileCache
+from buckaroo.file_cache.fingerprint import file_identity, SAMPLE_BLOCK_SIZE, SAMPLE_BLOCK_COUNT
+from buckaroo.file_cache.sqlite_file_cache import SQLiteFileCache
+
+
+def test_parquet_fingerprint_uses_footer(tmp_path):
+    p1, p2, p3 = tmp_path / "a.parquet", tmp_path / "b.parquet", tmp_path / "c.parquet"
+    df = pl.DataFrame({'a': list(range(1000)), 'b': ['x'] * 1000})
+    df.write_parquet(p1)
+    shutil.copy(p1, p2)
+    df.with_columns(pl.col('a') + 1).write_parquet(p3)
+    i1, i2, i3 = file_identity(p1), file_identity(p2), file_identity(p3)
+    assert i1.fingerprint == i2.fingerprint
+    assert i1.fingerprint != i3.fingerprint
+
+
+def test_large_text_fingerprint_samples_blocks(tmp_path):
+    p1, p2 = tmp_path / "a.csv", tmp_path / "b.csv"
+    size = SAMPLE_BLOCK_SIZE * SAMPLE_BLOCK_COUNT * 4
+    content = bytearray(b"1,2\n" * (size // 4))
+    p1.write_bytes(bytes(content))
+    # change a byte inside the last sampled block
+    content[-10] = ord("9")
+    p2.write_bytes(bytes(content))
+    assert file_identity(p1).fingerprint != file_identity(p2).fingerprint
+    assert file_identity(tmp_path / "missing.csv") is None
+
+
+def _touch_and_copy(fc, tmp_path):
+    p1 = tmp_path / "data.csv"
+    p1.write_text("a,b\n1,2\n")
+    fc.add_metadata(p1, {'series_hashes': {'a': 5}})
+    assert fc.check_file(p1)
+
+    # touching the file doesn't invalidate it
+    future = p1.stat().st_mtime + 100
+    os.utime(p1, (future, future))
+    assert fc.check_file(p1)
+
+    # a copy under a new path picks up the cached entry
+    p2 = tmp_path / "copy.csv"
+    shutil.copy(p1, p2)
+    assert fc.check_file(p2)
+    assert fc.get_file_metadata(p2)['series_hashes'] == {'a': 5}
+
+    # different content with a newer mtime is invalid
+    p1.write_text("a,b\n1,3\n")
+    os.utime(p1, (future + 100, future + 100))
+    assert not fc.check_file(p1)
+
+
+def test_sqlite_filecache_content_identity(tmp_path):
+    _touch_and_copy(SQLiteFileCache(":memory:"), tmp_path)
+
+
+def test_memory_filecache_content_identity(tmp_path):
+    _touch_and_copy(MemoryFileCache(), tmp_path)
+
+
+def test_sqlite_filecache_copy_shares_merged_sd(tmp_path):
+    fc = SQLiteFileCache(":memory:")
+    p1 = tmp_path / "data.parquet"
+    pl.DataFrame({'foo': [1, 2, 3]}).write_parquet(p1)
+    merged_sd = {'a': {'orig_col_name': 'foo', 'rewritten_col_name': 'a', 'null_count': 0}}
+    fc.upsert_file_metadata(p1, {'merged_sd': merged_sd})
+    p2 = tmp_path / "moved.parquet"
+    shutil.copy(p1, p2)
+    assert fc.check_file(p2)
+    assert fc.get_file_metadata(p2)['merged_sd'] == merged_sd
+
+
+def _same_size_edit_between_blocks(fc, tmp_path):
+    p1 = tmp_path / "big.csv"
+    size = SAMPLE_BLOCK_SIZE * SAMPLE_BLOCK_COUNT * 4
+    content = bytearray(b"1,2\n" * (size // 4))
+    p1.write_bytes(bytes(content))
+    assert file_identity(p1).sampled
+    fc.add_metadata(p1, {'series_hashes': {'a': 5}})
+    assert fc.check_file(p1)
+
+    # a copy that keeps the mtime is trusted, one with a new mtime isn't
+    kept, copied = tmp_path / "kept.csv", tmp_path / "copied.csv"
+    shutil.copy2(p1, kept)
+    shutil.copy(p1, copied)
+    os.utime(copied, (p1.stat().st_mtime + 50, p1.stat().st_mtime + 50))
+    assert fc.check_file(kept)
+    assert not fc.check_file(copied)
+
+    # an edit between the sampled blocks leaves the fingerprint alone
+    content[SAMPLE_BLOCK_SIZE + 2] = ord("9")
+    future = p1.stat().st_mtime + 100
+    p1.write_bytes(bytes(content))
+    os.utime(p1, (future, future))
+    assert file_identity(p1).fingerprint == file_identity(kept).fingerprint
+    assert not fc.check_file(p1)
+
+
+def test_sqlite_filecache_distrusts_sampled_fingerprint_with_new_mtime(tmp_path):
+    _same_size_edit_between_blocks(SQLiteFileCache(":memory:"), tmp_path)
+
+
+def test_memory_filecache_distrusts_sampled_fingerprint_with_new_mtime(tmp_path):
+    _same_size_edit_between_blocks(MemoryFileCache(), tmp_path)
+
+
+def test_parquet_and_small_files_are_not_sampled(tmp_path):
+    pq, small = tmp_path / "a.parquet", tmp_path / "a.csv"
+    pl.DataFrame({'a': list(range(100_000))}).write_parquet(pq)
+    small.write_text("a,b\n1,2\n")
+    assert not file_identity(pq).sampled
+    assert not file_identity(small).sampled
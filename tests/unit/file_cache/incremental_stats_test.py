@@ -0,0 +1,188 @@
+import polars as pl
+import pytest
+
+from buckaroo.customizations.polars_analysis import BasicAnalysis, ComputedDefaultSummaryStats, PlTyping, VCAnalysis
+from buckaroo.file_cache.base import Executor, FileCache, ProgressNotification, dataset_pieces
+from buckaroo.file_cache.batch_planning import simple_one_column_planning
+from buckaroo.file_cache.mergeable_stats import (
+    merge_summary_stats, mergeable_subset, register_stat_merger, mergeable_stat_keys)
+from buckaroo.file_cache.paf_column_executor import PAFColumnExecutor
+from buckaroo.file_cache.sqlite_file_cache import SQLiteFileCache
+
+
+def test_merge_summary_stats():
+    parts = [
+        {'length': 4, 'null_count': 1, 'min': 3, 'max': 9, 'mean': 6.0, 'median': 5},
+        {'length': 2, 'null_count': 0, 'min': None, 'max': 12, 'mean': 3.0, 'median': 1},
+    ]
+    merged = merge_summary_stats(parts)
+    # median has no merge rule, one piece's median isn't the dataset's
+    assert merged == {'length': 6, 'null_count': 1, 'min': 3, 'max': 12, 'mean': 4.8}
+    # a single piece keeps everything
+    assert merge_summary_stats(parts[:1]) == parts[0]
+    # column descriptions are kept when the pieces agree
+    typed = [dict(p, dtype='Int64', _type='integer') for p in parts]
+    assert merge_summary_stats(typed)['_type'] == 'integer'
+    assert 'dtype' not in merge_summary_stats([typed[0], dict(typed[1], dtype='Float64')])
+    # stats missing from a piece aren't guessed
+    assert 'mean' not in merge_summary_stats([{'mean': 1.0, 'length': 1, 'null_count': 0}, {'length': 1}])
+    assert mergeable_subset(parts[0]) == {k: v for k, v in parts[0].items() if k != 'median'}
+
+
+def test_register_stat_merger():
+    register_stat_merger('test_bitor', lambda parts, k: parts[0][k] | parts[1][k])
+    try:
+        assert merge_summary_stats([{'test_bitor': 1}, {'test_bitor': 4}]) == {'test_bitor': 5}
+    finally:
+        from buckaroo.file_cache import mergeable_stats
+        mergeable_stats._STAT_MERGERS.pop('test_bitor')
+    assert 'test_bitor' not in mergeable_stat_keys()
+
+
+class CountingExecutor(PAFColumnExecutor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.executed_rows: list[int] = []
+
+    def execute(self, ldf, execution_args):
+        self.executed_rows.append(ldf.select(pl.len()).collect().item())
+        return super().execute(ldf, execution_args)
+
+
+def run_pieces(tmp_path, fc, executor_class=Executor, **kwargs):
+    pieces = dataset_pieces(tmp_path)
+    ldf = pl.scan_parquet(pieces)
+    collected: list[ProgressNotification] = []
+    col_exec = CountingExecutor([VCAnalysis, BasicAnalysis, PlTyping, ComputedDefaultSummaryStats])
+    ex = executor_class(ldf, col_exec, collected.append, fc,
+                        planning_function=simple_one_column_planning, pieces=pieces, **kwargs)
+    ex.run()
+    assert all(n.success for n in collected)
+    results = {c: r.result for n in collected for c, r in n.result.items()}
+    return results, col_exec.executed_rows
+
+
+@pytest.mark.parametrize("make_cache", [FileCache, lambda: SQLiteFileCache(":memory:")])
+def test_executor_pieces_only_scan_new_files(tmp_path, make_cache):
+    fc = make_cache()
+    pl.DataFrame({'a': [1, 2, None], 'b': ['x', 'y', 'z']}).write_parquet(tmp_path / "00.parquet")
+    pl.DataFrame({'a': [10, 20], 'b': ['', 'w']}).write_parquet(tmp_path / "01.parquet")
+
+    results, executed = run_pieces(tmp_path, fc)
+    assert executed == [3, 2, 3, 2]  # two pieces for each of two columns
+    assert mergeable_subset(results['a']) == {'length': 5, 'null_count': 1, 'non_null_count': 4,
+                                              'empty_count': 0, 'min': 1, 'max': 20, 'mean': 8.25}
+    assert results['b']['empty_count'] == 1
+    # exact stats of one piece aren't the dataset's, they're left out
+    assert 'median' not in results['a'] and 'value_counts' not in results['a']
+    assert results['a']['_type'] == 'integer'
+    # reads the exact distinct_count, so it isn't recomputed from one piece's
+    assert 'distinct_per' not in results['a'] and 'nan_per' not in results['a']
+
+    pl.DataFrame({'a': [-5], 'b': ['v']}).write_parquet(tmp_path / "02.parquet")
+    results, executed = run_pieces(tmp_path, fc)
+    assert executed == [1, 1]
+    assert results['a']['length'] == 6
+    assert results['a']['min'] == -5
+    assert results['a']['max'] == 20
+
+    full = pl.scan_parquet(dataset_pieces(tmp_path)).collect()
+    assert results['a']['mean'] == pytest.approx(full['a'].mean())
+
+
+def test_pieces_run_in_worker_pool(tmp_path):
+    from buckaroo.file_cache.multiprocessing_executor import MultiprocessingExecutor
+    from buckaroo.file_cache.mp_worker_pool import WorkerPool
+    fc = FileCache()
+    pl.DataFrame({'a': [1, 2, None], 'b': ['x', 'y', 'z']}).write_parquet(tmp_path / "00.parquet")
+    pl.DataFrame({'a': [10, 20], 'b': ['', 'w']}).write_parquet(tmp_path / "01.parquet")
+    pool = WorkerPool(size=1)
+    try:
+        results, executed = run_pieces(tmp_path, fc, MultiprocessingExecutor, async_mode=False,
+                                       worker_pool=pool, max_concurrency=1, timeout_secs=60)
+    finally:
+        pool.shutdown()
+    # pieces were scanned in the worker, not by this process's column executor
+    assert executed == []
+    assert results['a']['length'] == 5 and results['a']['max'] == 20
+    # cached per piece, a sequential executor finds every piece already scanned
+    assert run_pieces(tmp_path, fc)[1] == []
+
+
+def test_widget_reopening_dataset_directory_scans_new_files(tmp_path):
+    from buckaroo.lazy_infinite_polars_widget import LazyInfinitePolarsBuckarooWidget
+    from buckaroo.file_cache.base import Executor as _Exec
+    fc = FileCache()
+    pl.DataFrame({'a': [1, 2, 3]}).write_parquet(tmp_path / "00.parquet")
+
+    def open_widget():
+        return LazyInfinitePolarsBuckarooWidget(
+            pl.scan_parquet(tmp_path / "*.parquet"), file_path=str(tmp_path), file_cache=fc,
+            sync_executor_class=_Exec, parallel_executor_class=_Exec,
+            planning_function=simple_one_column_planning)
+
+    w = open_widget()
+    assert w._df.merged_sd[w._orig_to_rw['a']]['length'] == 3
+    piece_keys = set(fc.summary_stats_cache)
+
+    pl.DataFrame({'a': [4, 5]}).write_parquet(tmp_path / "01.parquet")
+    w = open_widget()
+    assert w._df.merged_sd[w._orig_to_rw['a']]['length'] == 5
+    assert w._df.merged_sd[w._orig_to_rw['a']]['max'] == 5
+    # the first file's cached stats were reused, only the new file was scanned
+    assert piece_keys < set(fc.summary_stats_cache)
+    assert len(set(fc.summary_stats_cache) - piece_keys) == 1
+
+
+def test_pieces_with_different_values_keep_distinct_stats_correct(tmp_path):
+    from buckaroo.customizations.polars_sketch_analysis import PL_Sketch_Analysis_Klasses
+    pl.DataFrame({'a': list(range(100)) * 2}).write_parquet(tmp_path / "00.parquet")
+    pl.DataFrame({'a': list(range(100, 300))}).write_parquet(tmp_path / "01.parquet")
+    full = pl.scan_parquet(dataset_pieces(tmp_path)).collect()['a']
+
+    results, _ = run_pieces(tmp_path, FileCache())
+    assert 'distinct_count' not in results['a'] and 'unique_count' not in results['a']
+    assert 'distinct_per' not in results['a'] and 'unique_per' not in results['a']
+
+    # sketch states merge, so distinct_count and distinct_per cover both pieces
+    collected: list[ProgressNotification] = []
+    pieces = dataset_pieces(tmp_path)
+    ex = Executor(pl.scan_parquet(pieces), PAFColumnExecutor(PL_Sketch_Analysis_Klasses), collected.append,
+                  FileCache(), planning_function=simple_one_column_planning, pieces=pieces)
+    ex.run()
+    stats = collected[-1].result['a'].result
+    assert abs(stats['distinct_count'] - full.n_unique()) / full.n_unique() < 0.05
+    assert stats['distinct_per'] == pytest.approx(stats['distinct_count'] / len(full))
+    assert stats['nan_per'] == 0
+
+
+def test_pieces_persist_in_parallel_to_one_sqlite_cache(tmp_path):
+    import sqlite3
+    from buckaroo.file_cache.multiprocessing_executor import MultiprocessingExecutor
+    from buckaroo.file_cache.mp_worker_pool import WorkerPool
+    from buckaroo.file_cache.sqlite_log import SQLiteExecutorLog
+    db_path = tmp_path / "cache.sqlite"
+    fc = SQLiteFileCache(str(db_path))
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    cols = ['a', 'b', 'c', 'd']
+    for i in range(3):
+        pl.DataFrame({c: list(range(i * 10, i * 10 + 5 + i)) for c in cols}).write_parquet(data_dir / f"{i:02}.parquet")
+    pool = WorkerPool(size=2)
+    try:
+        results, _ = run_pieces(data_dir, fc, MultiprocessingExecutor, async_mode=False, worker_pool=pool,
+                                max_concurrency=4, timeout_secs=60, executor_log=SQLiteExecutorLog(":memory:"))
+    finally:
+        pool.shutdown()
+    assert {c: results[c]['length'] for c in cols} == {c: 18 for c in cols}
+
+    # every group's writes were committed whole, as another connection sees them
+    reader = sqlite3.connect(str(db_path))
+    stored = {int(k) for (k,) in reader.execute("SELECT series_hash FROM series_results")}
+    for piece in dataset_pieces(data_dir):
+        hashes = fc.get_file_series_hashes(piece)
+        assert set(hashes) == set(cols)
+        assert set(hashes.values()) <= stored
+    assert not fc._conn.in_transaction
+    # a sequential run finds every piece cached
+    assert run_pieces(data_dir, fc)[1] == []
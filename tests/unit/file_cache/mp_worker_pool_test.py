@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+
+import pytest
+
+from buckaroo.file_cache.cancellation import CancellationToken, ExecutionCancelled
+from buckaroo.file_cache.mp_timeout_decorator import TimeoutException, ExecutionFailed
+from buckaroo.file_cache.mp_worker_pool import WORKER_CONTEXT_SLOTS, WorkerPool
+import cloudpickle
+
+
+def _pid_and_context_id(context, x):
+    return os.getpid(), id(context), context['base'] + x
+
+
+def _sleep(context, secs):
+    time.sleep(secs)
+    return secs
+
+
+def _raise(context):
+    raise ValueError("bad column")
+
+
+def _exit(context):
+    sys.exit(1)
+
+
+@pytest.fixture
+def pool():
+    p = WorkerPool(size=1)
+    yield p
+    p.shutdown()
+
+
+def _ctx(calls):
+    def get():
+        calls.append(1)
+        return cloudpickle.dumps({'base': 10})
+    return get
+
+
+def test_worker_reused_and_context_sent_once(pool):
+    calls = []
+    r1 = pool.run("ctx", _ctx(calls), _pid_and_context_id, (1,), 10)
+    r2 = pool.run("ctx", _ctx(calls), _pid_and_context_id, (2,), 10)
+    assert r1[0] == r2[0] != os.getpid()
+    # the same unpickled context object served both tasks
+    assert r1[1] == r2[1]
+    assert (r1[2], r2[2]) == (11, 12)
+    assert len(calls) == 1
+
+
+def test_evicted_context_is_resent(pool):
+    calls = []
+    keys = [f"k{i}" for i in range(WORKER_CONTEXT_SLOTS + 2)]
+    pid = pool.run(keys[0], _ctx(calls), _pid_and_context_id, (0,), 10)[0]
+    for key in keys[1:]:
+        pool.run(key, _ctx(calls), _pid_and_context_id, (0,), 10)
+    # k0 was dropped by the worker, the pool sends it again
+    assert pool.run(keys[0], _ctx(calls), _pid_and_context_id, (1,), 10)[::2] == (pid, 11)
+    assert len(calls) == len(keys) + 1
+    # the most recent contexts are still held
+    pool.run(keys[-1], _ctx(calls), _pid_and_context_id, (0,), 10)
+    assert len(calls) == len(keys) + 1
+
+
+def test_unloadable_context_fails_task(pool):
+    with pytest.raises(ExecutionFailed):
+        pool.run("bad", lambda: b"not a pickle", _pid_and_context_id, (0,), 10)
+    # the worker is still usable
+    assert pool.run("ctx", _ctx([]), _pid_and_context_id, (1,), 10)[2] == 11
+
+
+def test_exception_keeps_worker(pool):
+    calls = []
+    pid = pool.run("ctx", _ctx(calls), _pid_and_context_id, (0,), 10)[0]
+    with pytest.raises(ValueError):
+        pool.run("ctx", _ctx(calls), _raise, (), 10)
+    assert pool.run("ctx", _ctx(calls), _pid_and_context_id, (0,), 10)[0] == pid
+
+
+def test_timeout_and_exit_replace_worker(pool):
+    calls = []
+    pid = pool.run("ctx", _ctx(calls), _pid_and_context_id, (0,), 10)[0]
+    with pytest.raises(TimeoutException):
+        pool.run("ctx", _ctx(calls), _sleep, (30,), 0.5)
+    pid2 = pool.run("ctx", _ctx(calls), _pid_and_context_id, (0,), 10)[0]
+    assert pid2 != pid
+    # the replacement worker was sent the context again
+    assert len(calls) == 2
+
+    with pytest.raises(ExecutionFailed):
+        pool.run("ctx", _ctx(calls), _exit, (), 10)
+    assert pool.run("ctx", _ctx(calls), _pid_and_context_id, (5,), 10)[2] == 15
+
+
+def _rss(context):
+    from buckaroo.file_cache.mp_worker_pool import process_rss_bytes
+    return process_rss_bytes(os.getpid())
+
+
+def _alloc(context, n):
+    buf = bytearray(n)
+    buf[::4096] = b"x" * len(buf[::4096])
+    time.sleep(5)
+    return len(buf)
+
+
+def _memory_error(context):
+    raise MemoryError()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="RSS polling reads /proc")
+def test_memory_limit_raises_out_of_memory(pool):
+    from buckaroo.file_cache.mp_timeout_decorator import OutOfMemory
+    calls = []
+    base = pool.run("ctx", _ctx(calls), _rss, (), 10)
+    assert base > 0
+    t1 = time.time()
+    with pytest.raises(OutOfMemory):
+        pool.run("ctx", _ctx(calls), _alloc, (400 * 1024 * 1024,), 30,
+                 memory_limit_bytes=base + 100 * 1024 * 1024)
+    # killed while it was still sleeping
+    assert time.time() - t1 < 5
+    with pytest.raises(OutOfMemory):
+        pool.run("ctx", _ctx(calls), _memory_error, (), 10)
+    # the pool recovers
+    assert pool.run("ctx", _ctx(calls), _pid_and_context_id, (1,), 10)[2] == 11
+
+
+def test_cancel_kills_running_task(pool):
+    import threading
+    calls = []
+    pid = pool.run("ctx", _ctx(calls), _pid_and_context_id, (0,), 10)[0]
+    token = CancellationToken()
+    threading.Timer(0.3, token.cancel).start()
+    t0 = time.monotonic()
+    with pytest.raises(ExecutionCancelled):
+        pool.run("ctx", _ctx(calls), _sleep, (30,), 60, cancel_token=token)
+    assert time.monotonic() - t0 < 5
+    # the worker was killed, a fresh one serves the next task
+    assert pool.run("ctx", _ctx(calls), _pid_and_context_id, (0,), 10)[0] != pid
+    # already cancelled, nothing is sent to a worker
+    with pytest.raises(ExecutionCancelled):
+        pool.run("ctx", _ctx(calls), _sleep, (30,), 60, cancel_token=token)
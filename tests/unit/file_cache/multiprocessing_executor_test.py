@@ -254,3 +254,87 @@ def test_multiprocessing_executor_skips_cached_columns(tmp_path):
 
 
             
+
+
+def test_multiprocessing_executor_runs_groups_concurrently():
+    from buckaroo.file_cache.mp_worker_pool import WorkerPool
+    df = pl.DataFrame({'a1': [1,2,3], 'b2': [10,20,30], 'c3': [4,5,6], 'd4': [7,8,9]})
+    fc = FileCache()
+    notes: list[ProgressNotification] = []
+    pool = WorkerPool(size=4)
+    try:
+        # warm the workers so process startup isn't timed
+        warm = MultiprocessingExecutor(df.lazy(), SimpleColumnExecutor(), lambda p: None, FileCache(),
+                                       timeout_secs=30.0, async_mode=False, worker_pool=pool, max_concurrency=4)
+        warm.run()
+        exc = MultiprocessingExecutor(df.lazy(), SlowColumnExecutor(1.5), notes.append, fc,
+                                      timeout_secs=30.0, async_mode=False, worker_pool=pool, max_concurrency=4)
+        t1 = time.time()
+        exc.run()
+        elapsed = time.time() - t1
+    finally:
+        pool.shutdown()
+    assert sorted(c for n in notes for c in n.col_group) == ['a1', 'b2', 'c3', 'd4']
+    assert all(n.success for n in notes)
+    # one column per group, 4 groups of 1.5s each run side by side
+    assert elapsed < 4.5
+
+
+def test_default_concurrency_respects_memory_budget():
+    from buckaroo.file_cache.multiprocessing_executor import default_concurrency, available_cpus
+    assert default_concurrency(memory_budget_bytes=10, group_memory_bytes=100) == 1
+    assert default_concurrency(memory_budget_bytes=10**15, group_memory_bytes=1) == available_cpus()
+
+
+def test_multiprocessing_executor_out_of_memory():
+    import os
+    import sys
+    import pytest
+    from buckaroo.file_cache.base import FAILURE_OOM
+    from buckaroo.file_cache.mp_worker_pool import WorkerPool, process_rss_bytes
+    from .executor_test_utils import MemoryHungryColumnExecutor
+    if not sys.platform.startswith("linux"):
+        pytest.skip("RSS polling reads /proc")
+    # workers import less than the test process
+    limit = process_rss_bytes(os.getpid()) + 150 * 1024 * 1024
+    df = pl.DataFrame({'a1': [1, 2, 3], 'b2': [4, 5, 6]})
+    pool = WorkerPool(size=1)
+    try:
+        # single columns are retried on low_memory_executor and succeed
+        notes: list[ProgressNotification] = []
+        MultiprocessingExecutor(df.lazy(), MemoryHungryColumnExecutor(600 * 1024 * 1024), notes.append, FileCache(),
+                                timeout_secs=30.0, async_mode=False, worker_pool=pool,
+                                memory_limit_bytes=limit).run()
+        assert [n.success for n in notes] == [True, True]
+
+        # a group with nothing smaller to fall back to is reported as oom
+        class NoFallback(MemoryHungryColumnExecutor):
+            def low_memory_executor(self):
+                return None
+        notes = []
+        exc = MultiprocessingExecutor(df.lazy(), NoFallback(600 * 1024 * 1024), notes.append, FileCache(),
+                                      timeout_secs=30.0, async_mode=False, worker_pool=pool,
+                                      memory_limit_bytes=limit)
+        exc.run()
+        assert notes and all(n.failure_kind == FAILURE_OOM for n in notes)
+        history = [e for e in exc.executor_log.get_log_events() if e.failure_kind == FAILURE_OOM]
+        assert len(history) == 2
+    finally:
+        pool.shutdown()
+
+
+def test_multiprocessing_executor_cancel():
+    """cancel() kills the running group's worker, stops dispatching and doesn't leave failures in the log"""
+    ldf = pl.DataFrame({'a1': [1, 2, 3], 'b2': [10, 20, 30], 'c3': [4, 5, 6]}).lazy()
+    notes: list[ProgressNotification] = []
+    exc = MultiprocessingExecutor(ldf, SlowColumnExecutor(30), notes.append, FileCache(),
+                                  timeout_secs=60.0, max_concurrency=1)
+    exc.run()
+    time.sleep(1.0)
+    t0 = time.monotonic()
+    exc.cancel()
+    exc._work_thread.join(10)
+    assert not exc._work_thread.is_alive()
+    assert time.monotonic() - t0 < 5
+    assert notes == []
+    assert exc.executor_log.get_log_events() == []
@@ -595,3 +595,125 @@ def test_no_exec_per_column_group(tmp_path):
         cache_utils_module._executor_log = None
         if original_home:
             os.environ['HOME'] = original_home
+
+
+def test_streaming_paf_column_executor_matches_in_memory(tmp_path):
+    import numpy as np
+    from buckaroo.customizations.polars_sketch_analysis import PL_Sketch_Analysis_Klasses
+    from buckaroo.file_cache.paf_column_executor import StreamingPAFColumnExecutor
+
+    df = pl.DataFrame({'ints': np.arange(30_000) % 3000,
+                       'strs': [f"s{i % 7}" for i in range(30_000)]})
+    path = tmp_path / "streamed.csv"
+    df.write_csv(path)
+    ldf = pl.scan_csv(path)
+
+    class SmallBatches(StreamingPAFColumnExecutor):
+        batch_rows = 4000
+
+    results = {}
+    for klass in (PAFColumnExecutor, SmallBatches):
+        exec_ = klass(PL_Sketch_Analysis_Klasses)
+        args = exec_.get_execution_args({c: {} for c in df.columns})
+        results[klass] = exec_.execute(ldf, args)
+
+    in_mem, streamed = results[PAFColumnExecutor], results[SmallBatches]
+    for col in df.columns:
+        a, b = in_mem[col].result, streamed[col].result
+        assert b['length'] == a['length'] == 30_000
+        assert b['dtype'] == a['dtype']
+        assert abs(b['distinct_count'] - a['distinct_count']) / a['distinct_count'] < 0.05
+        assert b['most_freq'] == a['most_freq']
+        assert len(b['histogram']) == len(a['histogram'])
+    # quantiles come from per batch KLL sketches merged together
+    assert abs(streamed['ints'].result['median'] - in_mem['ints'].result['median']) < 60
+
+
+def test_streaming_paf_column_executor_stops_between_batches_when_cancelled():
+    import pytest
+    from buckaroo.customizations.polars_sketch_analysis import PL_Sketch_Analysis_Klasses
+    from buckaroo.file_cache.cancellation import CancellationToken, ExecutionCancelled
+    from buckaroo.file_cache.paf_column_executor import StreamingPAFColumnExecutor
+
+    token = CancellationToken()
+    batches = []
+
+    class CancelAfterFirstBatch(StreamingPAFColumnExecutor):
+        batch_rows = 1000
+
+        def _series_stats(self, only_cols, res):
+            orig = only_cols.collect_batches
+
+            def counting_batches(**kwargs):
+                for batch in orig(**kwargs):
+                    batches.append(batch.height)
+                    token.cancel()
+                    yield batch
+            only_cols.collect_batches = counting_batches
+            return super()._series_stats(only_cols, res)
+
+    ldf = pl.DataFrame({'ints': list(range(10_000))}).lazy()
+    exec_ = CancelAfterFirstBatch(PL_Sketch_Analysis_Klasses)
+    args = exec_.get_execution_args({'ints': {}})
+    with pytest.raises(ExecutionCancelled):
+        exec_.execute_with_cancel(ldf, args, token)
+    assert len(batches) == 1
+
+
+def test_low_memory_chain_stops_for_unstreamable_analyses():
+    from buckaroo.customizations.polars_analysis import PL_Analysis_Klasses
+    from buckaroo.customizations.polars_sketch_analysis import PL_Sketch_Analysis_Klasses
+    from buckaroo.file_cache.paf_column_executor import MIN_STREAMING_BATCH_ROWS, analyses_streamable
+
+    assert analyses_streamable(PL_Sketch_Analysis_Klasses)
+    # exact median, mode and value_counts need memory for every distinct value
+    assert not analyses_streamable(PL_Analysis_Klasses)
+
+    def chain(analyses):
+        levels = []
+        exec_ = PAFColumnExecutor(analyses).low_memory_executor()
+        while exec_ is not None:
+            levels.append(exec_.batch_rows)
+            exec_ = exec_.low_memory_executor()
+        return levels
+
+    sketch_levels = chain(PL_Sketch_Analysis_Klasses)
+    assert sketch_levels[-1] == MIN_STREAMING_BATCH_ROWS
+    assert sketch_levels == sorted(sketch_levels, reverse=True)
+    # the switch to the streaming engine is still tried, halving batches isn't
+    assert len(chain(PL_Analysis_Klasses)) == 1
+
+
+def test_paf_column_executor_select_only_group_isnt_collected(tmp_path, monkeypatch):
+    from buckaroo.customizations.polars_analysis import PL_Analysis_Klasses
+    path = tmp_path / "t.parquet"
+    pl.DataFrame({'a': list(range(1000)), 'b': [f"s{i % 7}" for i in range(1000)]}).write_parquet(path)
+    ldf = pl.scan_parquet(path)
+
+    heights = []
+    collect = pl.LazyFrame.collect
+
+    def recording_collect(self, *args, **kwargs):
+        res = collect(self, *args, **kwargs)
+        # reads of the file, not eager ops on the value_counts
+        if "Parquet SCAN" in self.explain():
+            heights.append(res.height)
+        return res
+    monkeypatch.setattr(pl.LazyFrame, "collect", recording_collect)
+    exec_ = PAFColumnExecutor(PL_Analysis_Klasses)
+    results = exec_.execute(ldf, exec_.get_execution_args({'a': {}, 'b': {}}))
+
+    # only the aggregates were read, dtype comes from the schema
+    assert heights and max(heights) < 1000
+    assert results['a'].result['dtype'] == pl.Int64
+    assert results['a'].result['_type'] == 'integer'
+    assert len(results['a'].result['histogram']) > 5
+    assert results['b'].result['mode'] == 's0'
+
+    class LengthOp(PolarsAnalysis):
+        column_ops = {'op_len': ("all", len)}
+    heights.clear()
+    exec_ = PAFColumnExecutor([SelectOnlyAnalysis, LengthOp])
+    results = exec_.execute(ldf, exec_.get_execution_args({'a': {}}))
+    # a column_op still gets the group's data
+    assert results['a'].result['op_len'] == 1000 and max(heights) == 1000
@@ -0,0 +1,81 @@
+import polars as pl
+
+from buckaroo.customizations.polars_analysis import BasicAnalysis, VCAnalysis
+from buckaroo.file_cache.base import ExecutorArgs
+from buckaroo.file_cache.paf_column_executor import PAFColumnExecutor
+from buckaroo.file_cache.parquet_footer import (
+    footer_stats_for_lazyframe, is_plain_parquet_scan, parquet_footer_stats)
+from buckaroo.pluggable_analysis_framework.polars_analysis_management import polars_select_expressions
+
+
+def write_parquet(tmp_path):
+    df = pl.DataFrame({
+        'ints': [5, None, 5, 9, None, 5],
+        'floats': [1.5, 1.5, None, -4.0, 1.5, 8.25],
+        'strs': ['b', 'a', None, 'c', 'd', 'e'],
+        'all_null': pl.Series([None] * 6, dtype=pl.Int64),
+        'structs': [{'x': 1}, None, {'x': 2}, {'x': 3}, {'x': 4}, {'x': 5}],
+    })
+    path = tmp_path / "data.parquet"
+    df.write_parquet(path, row_group_size=2, statistics=True)
+    return df, path
+
+
+def test_parquet_footer_stats_match_polars(tmp_path):
+    df, path = write_parquet(tmp_path)
+    stats = parquet_footer_stats(path)
+    assert set(stats.keys()) == set(df.columns)
+    for col in ['ints', 'floats', 'all_null']:
+        ser = df[col]
+        assert stats[col] == {'length': 6, 'null_count': ser.null_count(),
+                              'min': ser.min(), 'max': ser.max()}
+    # binary min/max can be truncated by writers, only the counts are used
+    assert stats['strs'] == {'length': 6, 'null_count': 1}
+    # nested columns only get a row count
+    assert stats['structs'] == {'length': 6}
+
+    assert list(parquet_footer_stats(path, columns=['floats']).keys()) == ['floats']
+    assert parquet_footer_stats(tmp_path / "missing.parquet") == {}
+
+
+def test_footer_stats_only_for_plain_scans(tmp_path):
+    _df, path = write_parquet(tmp_path)
+    ldf = pl.scan_parquet(path)
+    assert is_plain_parquet_scan(ldf, path)
+    assert footer_stats_for_lazyframe(ldf, path)['ints']['max'] == 9
+    assert footer_stats_for_lazyframe(ldf.filter(pl.col('ints') > 3), path) == {}
+    assert footer_stats_for_lazyframe(ldf.head(2), path) == {}
+    assert footer_stats_for_lazyframe(pl.DataFrame({'a': [1]}).lazy(), path) == {}
+    assert footer_stats_for_lazyframe(ldf, None) == {}
+
+
+def test_paf_column_executor_uses_footer_stats(tmp_path):
+    _df, path = write_parquet(tmp_path)
+    ldf = pl.scan_parquet(path)
+    analyses = [VCAnalysis, BasicAnalysis]
+    cols = ['ints', 'floats']
+    args = ExecutorArgs(columns=cols, column_specific_expressions=False, include_hash=False,
+                        expressions=polars_select_expressions(analyses),
+                        row_start=None, row_end=None, extra=None, no_exec=False)
+
+    plain = PAFColumnExecutor(analyses).execute(ldf, args)
+    footer_stats = footer_stats_for_lazyframe(ldf, path, cols)
+    with_footer = PAFColumnExecutor(analyses, footer_stats=footer_stats).execute(ldf, args)
+    for col in cols:
+        expected, actual = plain[col].result, with_footer[col].result
+        assert expected.keys() == actual.keys()
+        for k, v in expected.items():
+            if isinstance(v, pl.Series):
+                assert v.equals(actual[k])
+            else:
+                assert actual[k] == v, k
+
+    # expressions answered by the footer aren't evaluated
+    fake_footer = {c: {'length': 1000, 'null_count': 7, 'min': -1, 'max': 1} for c in cols}
+    executor = PAFColumnExecutor(analyses, footer_stats=fake_footer)
+    remaining, known = executor._split_footer_expressions(ldf.select(cols), list(args.expressions))
+    assert len(remaining) == len(args.expressions) - 4
+    faked = executor.execute(ldf, args)
+    assert faked['ints'].result['length'] == 1000
+    assert faked['ints'].result['null_count'] == 7
+    assert faked['ints'].result['mean'] == plain['ints'].result['mean']
@@ -0,0 +1,86 @@
+import os
+import time
+
+import polars as pl
+import pytest
+
+from buckaroo.file_cache.base import ColumnResult, FileCache, ProgressNotification
+from buckaroo.file_cache import multiprocessing_executor
+from buckaroo.file_cache.multiprocessing_executor import MultiprocessingExecutor
+from buckaroo.file_cache.mp_timeout_decorator import TimeoutException
+from buckaroo.file_cache.mp_worker_pool import WorkerPool
+from buckaroo.file_cache.result_transport import ArrowRef, pack_results, unpack_results
+from .executor_test_utils import SimpleColumnExecutor
+
+
+def test_pack_unpack_roundtrip(tmp_path):
+    vc = pl.Series('a', list(range(1000)) * 20).value_counts()
+    results = {'a': ColumnResult(1, 'a', [], {
+        'value_counts': vc.to_struct(), 'mean': 2.5,
+        'small': pl.Series('s', [1, 2]), 'empty': pl.Series('e', [], dtype=pl.Int64)})}
+    packed = pack_results(results, min_bytes=10_000, directory=tmp_path)
+    raw = packed.results['a'].result
+    assert isinstance(raw['value_counts'], ArrowRef)
+    # small Series and scalars stay inline
+    assert isinstance(raw['small'], pl.Series) and raw['mean'] == 2.5
+    assert os.path.exists(packed.ipc_path)
+
+    unpacked = unpack_results(packed)['a'].result
+    assert unpacked['value_counts'].equals(vc.to_struct())
+    assert unpacked['small'].to_list() == [1, 2]
+    # the file is removed once mapped
+    assert not os.path.exists(packed.ipc_path)
+
+
+def test_pack_without_large_series_writes_nothing(tmp_path):
+    results = {'a': ColumnResult(1, 'a', [], {'mean': 1.0})}
+    packed = pack_results(results, directory=tmp_path)
+    assert packed.ipc_path is None
+    assert unpack_results(packed) == results
+    assert list(tmp_path.iterdir()) == []
+
+
+class ValueCountsColumnExecutor(SimpleColumnExecutor):
+    def execute(self, ldf, execution_args):
+        res = super().execute(ldf, execution_args)
+        for col, col_result in res.items():
+            col_result.result['value_counts'] = ldf.select(col).collect()[col].value_counts().to_struct()
+        return res
+
+
+def test_executor_results_through_arrow():
+    df = pl.DataFrame({'a1': list(range(20_000)), 'b2': [1, 2] * 10_000})
+    notes: list[ProgressNotification] = []
+    pool = WorkerPool(size=1)
+    try:
+        exc = MultiprocessingExecutor(df.lazy(), ValueCountsColumnExecutor(), notes.append, FileCache(),
+                                      timeout_secs=30.0, async_mode=False, worker_pool=pool)
+        exc.run()
+    finally:
+        pool.shutdown()
+    assert all(n.success for n in notes)
+    by_col = {c: r.result for n in notes for c, r in n.result.items()}
+    assert len(by_col['a1']['value_counts']) == 20_000
+    assert sorted(by_col['b2']['value_counts'].struct.field('count').to_list()) == [10_000, 10_000]
+
+
+def _write_then_hang(context, ex_args, ipc_path):
+    results = {'a': ColumnResult(1, 'a', [], {'vc': pl.Series('vc', list(range(1000)))})}
+    pack_results(results, min_bytes=0, path=ipc_path)
+    time.sleep(30)
+
+
+def test_unread_reply_is_removed_on_timeout(tmp_path, monkeypatch):
+    # the worker wrote its reply but was killed before the parent read it
+    monkeypatch.setattr(multiprocessing_executor, 'reply_path',
+                        lambda: tmp_path / f"reply-{len(list(tmp_path.iterdir()))}.arrow")
+    df = pl.DataFrame({'a1': [1, 2, 3]})
+    pool = WorkerPool(size=1)
+    try:
+        exc = MultiprocessingExecutor(df.lazy(), SimpleColumnExecutor(), lambda n: None, FileCache(),
+                                      timeout_secs=3.0, async_mode=False, worker_pool=pool)
+        with pytest.raises(TimeoutException):
+            exc._run_in_worker(_write_then_hang, None)
+    finally:
+        pool.shutdown()
+    assert list(tmp_path.iterdir()) == []
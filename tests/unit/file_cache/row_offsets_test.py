@@ -0,0 +1,110 @@
+import polars as pl
+
+from buckaroo.file_cache.base import MemoryFileCache
+from buckaroo.file_cache.row_offsets import (
+    RowOffsetIndex, read_rows, row_offset_index_for, scan_row_offsets, text_source)
+from buckaroo.file_cache.sqlite_file_cache import SQLiteFileCache
+from buckaroo.lazy_infinite_polars_widget import LazyInfinitePolarsBuckarooWidget
+
+
+def _df(n):
+    return pl.DataFrame({
+        'a': list(range(n)),
+        # quoted newlines and commas don't end rows
+        'b': [f"line {i}\nwith, comma" if i % 7 == 0 else f"s{i}" for i in range(n)]})
+
+
+def _check_windows(path, kind, expected, stride):
+    ro = scan_row_offsets(path, kind, stride=stride)
+    assert ro.row_count == len(expected)
+    schema = expected.schema
+    for start, end in [(0, 5), (3, 11), (stride, stride + 1), (len(expected) - 4, len(expected) + 10), (9, 9)]:
+        got = read_rows(path, kind, schema, ro, start, end)
+        assert got.equals(expected.slice(start, max(end - start, 0))), (start, end)
+
+
+def test_csv_offsets(tmp_path):
+    path = tmp_path / "t.csv"
+    df = _df(53)
+    df.write_csv(path)
+    _check_windows(path, "csv", df, stride=4)
+    # no newline after the last row
+    path.write_bytes(path.read_bytes().rstrip(b"\n"))
+    _check_windows(path, "csv", df, stride=5)
+    # a file of only a header has no rows
+    header = tmp_path / "h.csv"
+    header.write_text("a,b\n")
+    assert scan_row_offsets(header, "csv").row_count == 0
+
+
+def test_ndjson_offsets(tmp_path):
+    path = tmp_path / "t.ndjson"
+    df = _df(41)
+    df.write_ndjson(path)
+    _check_windows(path, "ndjson", df, stride=6)
+
+
+def test_text_source_only_default_scans(tmp_path):
+    path = tmp_path / "t.csv"
+    _df(10).write_csv(path)
+    assert text_source(pl.scan_csv(path)) == (path, "csv")
+    assert text_source(pl.scan_csv(path, separator=";")) is None
+    assert text_source(pl.scan_csv(path).head(3)) is None
+    ndjson = tmp_path / "t.ndjson"
+    _df(10).write_ndjson(ndjson)
+    assert text_source(pl.scan_ndjson(ndjson)) == (ndjson, "ndjson")
+
+
+def test_sqlite_row_offsets_roundtrip_and_eviction(tmp_path):
+    path = tmp_path / "t.csv"
+    _df(30).write_csv(path)
+    cache = SQLiteFileCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get_row_offsets(path) is None
+    ro = scan_row_offsets(path, "csv", stride=4)
+    cache.upsert_row_offsets(path, ro)
+    assert cache.get_row_offsets(path) == ro
+    # stored next to a files row, so it's evicted with the file
+    assert cache.check_file(path)
+    assert cache.evict_to_budget(0) == 1
+    assert cache.get_row_offsets(path) is None
+
+
+def test_index_loaded_from_cache_and_rebuilt_on_edit(tmp_path):
+    path = tmp_path / "t.csv"
+    _df(30).write_csv(path)
+    cache = MemoryFileCache()
+    index = RowOffsetIndex(pl.scan_csv(path), path, "csv", cache, stride=4)
+    index.start()
+    assert index.wait(10)
+    assert cache.get_row_offsets(path) == index.row_offsets
+
+    # a second widget on the same file doesn't rescan it
+    again = row_offset_index_for(pl.scan_csv(path), cache)
+    assert again.ready and again.row_offsets == index.row_offsets
+
+    _df(35).write_csv(path)
+    edited = row_offset_index_for(pl.scan_csv(path), cache)
+    assert edited.wait(10) and edited.row_offsets.row_count == 35
+
+
+def test_widget_reads_windows_through_row_index(tmp_path):
+    path = tmp_path / "t.csv"
+    df = _df(60)
+    df.write_csv(path)
+    w = LazyInfinitePolarsBuckarooWidget(
+        pl.scan_csv(path), file_cache=MemoryFileCache(), index_slow_sources=True)
+    assert w._row_index is not None and w._row_index.wait(10)
+
+    reads = []
+    index_read = w._row_index.read
+    def read(start, end):
+        reads.append((start, end))
+        return index_read(start, end)
+    w._row_index.read = read
+    sent = []
+    w.send = lambda payload, buffers: sent.append((payload, buffers))
+    w._handle_payload_args({'start': 50, 'end': 55})
+    window = pl.read_parquet(sent[0][1][0])
+    assert window['index'].to_list() == [50, 51, 52, 53, 54]
+    assert window[w._orig_to_rw['b']].to_list() == df['b'][50:55].to_list()
+    assert reads[0] == (50, 55)
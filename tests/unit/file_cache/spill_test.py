@@ -0,0 +1,120 @@
+import os
+
+import polars as pl
+
+from buckaroo.file_cache.spill import SourceSpill, evict_spills, slow_source_path, spill_for, spill_path_for
+from buckaroo.lazy_infinite_polars_widget import LazyInfinitePolarsBuckarooWidget
+
+
+def _write_csv(path, n=50):
+    pl.DataFrame({'a': list(range(n)), 'b': [f"s{i}" for i in range(n)]}).write_csv(path)
+    return path
+
+
+def test_slow_source_path(tmp_path):
+    csv = _write_csv(tmp_path / "t.csv")
+    assert slow_source_path(pl.scan_csv(csv)) == csv
+    ndjson = tmp_path / "t.ndjson"
+    pl.DataFrame({'a': [1, 2]}).write_ndjson(ndjson)
+    assert slow_source_path(pl.scan_ndjson(ndjson)) == ndjson
+
+    # already seekable, or not the file's rows any more
+    parquet = tmp_path / "t.parquet"
+    pl.DataFrame({'a': [1, 2]}).write_parquet(parquet)
+    assert slow_source_path(pl.scan_parquet(parquet)) is None
+    assert slow_source_path(pl.scan_csv(csv).filter(pl.col('a') > 3)) is None
+    assert slow_source_path(pl.DataFrame({'a': [1]}).lazy()) is None
+
+
+def test_spill_path_keyed_by_content_and_options(tmp_path):
+    csv = _write_csv(tmp_path / "t.csv")
+    ldf = pl.scan_csv(csv)
+    spill_path = spill_path_for(ldf, csv, tmp_path)
+    assert spill_path == spill_path_for(pl.scan_csv(csv), csv, tmp_path)
+    assert spill_path != spill_path_for(pl.scan_csv(csv, has_header=False), csv, tmp_path)
+
+    _write_csv(csv, n=60)
+    edited = spill_path_for(pl.scan_csv(csv), csv, tmp_path)
+    assert edited != spill_path
+    # same source path and options, another file identity, so spilling the new version replaces the old one
+    path_key, ident_key, options_key = spill_path.name.split("-")
+    assert edited.name.split("-")[0] == path_key
+    assert edited.name.split("-")[1] != ident_key
+    assert edited.name.split("-")[2] == options_key
+
+
+def test_spill_written_once_and_replaces_stale(tmp_path):
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+    csv = _write_csv(tmp_path / "t.csv")
+    spill = spill_for(pl.scan_csv(csv), spill_dir)
+    assert spill is not None and spill.wait(10)
+    assert spill.scan().collect().equals(pl.read_csv(csv))
+    assert spill_for(pl.scan_csv(csv), spill_dir) is spill
+    # a new process finds it on disk
+    assert SourceSpill(pl.scan_csv(csv), spill.path).ready
+
+    _write_csv(csv, n=60)
+    respill = spill_for(pl.scan_csv(csv), spill_dir)
+    assert respill.wait(10) and respill.path != spill.path
+    assert list(spill_dir.iterdir()) == [respill.path]
+
+
+def test_spill_with_other_options_keeps_existing_spill(tmp_path):
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+    csv = _write_csv(tmp_path / "t.csv")
+    spill = spill_for(pl.scan_csv(csv), spill_dir)
+    assert spill.wait(10)
+    other = spill_for(pl.scan_csv(csv, infer_schema_length=10), spill_dir)
+    assert other.wait(10) and other.path != spill.path
+    # same file, so neither spill is stale
+    assert spill.scan().collect().equals(pl.read_csv(csv))
+    assert sorted(spill_dir.iterdir()) == sorted([spill.path, other.path])
+
+
+def test_evict_spills_least_recently_scanned_first(tmp_path):
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+    spills = []
+    for name in ["a", "b"]:
+        csv = _write_csv(tmp_path / f"{name}.csv")
+        spill = spill_for(pl.scan_csv(csv), spill_dir)
+        assert spill.wait(10)
+        spills.append(spill)
+    os.utime(spills[0].path, (0, 0))
+    os.utime(spills[1].path, (100, 100))
+    size = spills[1].path.stat().st_size
+
+    assert evict_spills(10**9, spill_dir) == 0
+    assert evict_spills(size, spill_dir) == 1
+    assert list(spill_dir.iterdir()) == [spills[1].path]
+    # an evicted spill falls back to the source
+    assert spills[0].scan() is None
+    assert spills[1].scan() is not None
+    assert spills[1].path.stat().st_mtime > 100
+
+
+def test_widget_serves_windows_from_spill(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    csv = _write_csv(tmp_path / "t.csv")
+    w = LazyInfinitePolarsBuckarooWidget(pl.scan_csv(csv), spill_slow_sources=True)
+    assert w._spill is not None and w._spill.wait(10)
+    assert w._spill.path.parent == tmp_path / ".buckaroo" / "spill"
+    assert w._row_source().explain().startswith("Ipc SCAN")
+
+    sent = []
+    w.send = lambda payload, buffers: sent.append((payload, buffers))
+    w._handle_payload_args({'start': 40, 'end': 45})
+    window = pl.read_parquet(sent[0][1][0])
+    assert window['index'].to_list() == [40, 41, 42, 43, 44]
+    assert window[w._orig_to_rw['a']].to_list() == [40, 41, 42, 43, 44]
+
+    # sorted windows gather from the memory mapped spill
+    assert w._spill.frame() is w._spill.frame()
+    w._handle_payload_args({'start': 0, 'end': 3, 'sort': w._orig_to_rw['a'], 'sort_direction': 'desc'})
+    window = pl.read_parquet(sent[-1][1][0])
+    assert window[w._orig_to_rw['a']].to_list() == [49, 48, 47]
+
+    # opt in only
+    assert LazyInfinitePolarsBuckarooWidget(pl.scan_csv(csv))._spill is None
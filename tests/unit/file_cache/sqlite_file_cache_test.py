@@ -115,3 +115,217 @@ def test_sqlite_filecache_executor_integration():
         assert stored is not None
         assert stored.get('len') == 3
 
+
+def test_sqlite_filecache_wal_and_batch(tmp_path):
+    db_path = tmp_path / "file_cache.sqlite"
+    fc = SQLiteFileCache(str(db_path))
+    (mode,) = fc._conn.execute("PRAGMA journal_mode").fetchone()
+    assert mode == "wal"
+
+    import sqlite3
+    reader = sqlite3.connect(str(db_path))
+    def committed_count() -> int:
+        return reader.execute("SELECT COUNT(1) FROM series_results").fetchone()[0]
+
+    with fc.batch():
+        fc.upsert_key(1, {'len': 3})
+        with fc.batch():
+            fc.upsert_keys([(2, {'len': 4}), (3, {'len': 5})])
+        # nested batch exit doesn't commit
+        assert committed_count() == 0
+        # reads on the writing connection see pending writes
+        assert fc.get_series_results(2) == {'len': 4}
+    assert committed_count() == 3
+
+    # outside a batch each write commits immediately
+    fc.upsert_key(4, {'len': 6})
+    assert committed_count() == 4
+
+
+
+def test_sqlite_filecache_batch_isnt_committed_by_another_thread(tmp_path):
+    import sqlite3
+    import threading
+    db_path = tmp_path / "file_cache.sqlite"
+    fc = SQLiteFileCache(str(db_path))
+    reader = sqlite3.connect(str(db_path))
+
+    def committed() -> set[int]:
+        return {int(k) for (k,) in reader.execute("SELECT series_hash FROM series_results")}
+
+    other = threading.Thread(target=fc.upsert_key, args=(99, {'len': 1}))
+    with fc.batch():
+        fc.upsert_key(1, {'len': 3})
+        # the other thread's write would commit the half built batch along with it
+        other.start()
+        other.join(0.2)
+        assert other.is_alive()
+        assert committed() == set()
+        fc.upsert_key(2, {'len': 4})
+    other.join(5)
+    assert committed() == {1, 2, 99}
+
+def test_sqlite_filecache_upsert_keys_merges():
+    fc = SQLiteFileCache(":memory:")
+    fc.upsert_key(7, {'len': 3, 'min': 1})
+    fc.upsert_keys([(7, {'max': 9}), (8, {'len': 2}), (7, {'min': 0})])
+    assert fc.get_series_results(7) == {'len': 3, 'min': 0, 'max': 9}
+    assert fc.get_series_results(8) == {'len': 2}
+
+
+def test_sqlite_filecache_merged_sd_partial_load():
+    fc = SQLiteFileCache(":memory:")
+    path_1 = create_tempfile_with_text("hello")
+    merged_sd = {
+        'a': {'orig_col_name': 'foo', 'rewritten_col_name': 'a', 'null_count': 0, 'mode': 'x'},
+        'b': {'orig_col_name': 'bar', 'rewritten_col_name': 'b', 'null_count': 3, 'min': 1.5},
+        'c': {'orig_col_name': 'baz', 'rewritten_col_name': 'c', 'null_count': 1, 'max': None},
+    }
+    fc.upsert_file_metadata(path_1, {'merged_sd': merged_sd, 'alpha': 1})
+
+    md = fc.get_file_metadata(path_1)
+    assert md['alpha'] == 1
+    assert md['merged_sd'] == merged_sd
+    assert list(md['merged_sd'].keys()) == ['a', 'b', 'c']
+
+    partial = fc.get_file_metadata(path_1, columns=['baz', 'foo'])
+    assert partial['merged_sd'] == {'a': merged_sd['a'], 'c': merged_sd['c']}
+    assert list(partial['merged_sd'].keys()) == ['a', 'c']
+
+    # metadata updates without merged_sd leave the column stats in place
+    fc.upsert_file_series_hashes(path_1, {'foo': 12})
+    md = fc.get_file_metadata(path_1)
+    assert md['merged_sd'] == merged_sd
+    assert md['series_hashes'] == {'foo': 12}
+
+
+def test_sqlite_filecache_upsert_column_stats():
+    fc = SQLiteFileCache(":memory:")
+    path_1 = create_tempfile_with_text("hello")
+    merged_sd = {
+        'a': {'orig_col_name': 'foo', 'null_count': 0},
+        'b': {'orig_col_name': 'bar', 'null_count': 3},
+    }
+    fc.upsert_file_metadata(path_1, {'merged_sd': merged_sd, 'alpha': 1})
+
+    # only the passed columns are rewritten, they keep their position
+    fc.upsert_column_stats(path_1, {'a': {'orig_col_name': 'foo', 'null_count': 0, 'mean': 2.5},
+                                    'c': {'orig_col_name': 'baz', 'null_count': 1}})
+    md = fc.get_file_metadata(path_1)
+    assert md['alpha'] == 1
+    assert md['merged_sd'] == {
+        'a': {'orig_col_name': 'foo', 'null_count': 0, 'mean': 2.5},
+        'b': {'orig_col_name': 'bar', 'null_count': 3},
+        'c': {'orig_col_name': 'baz', 'null_count': 1}}
+    assert list(md['merged_sd'].keys()) == ['a', 'b', 'c']
+
+    # a file without an entry gets one
+    path_2 = create_tempfile_with_text("world")
+    fc.upsert_column_stats(path_2, {'a': {'orig_col_name': 'foo', 'null_count': 0}})
+    assert fc.get_file_metadata(path_2)['merged_sd'] == {'a': {'orig_col_name': 'foo', 'null_count': 0}}
+
+
+def test_sqlite_filecache_reads_legacy_merged_sd_blob():
+    fc = SQLiteFileCache(":memory:")
+    path_1 = create_tempfile_with_text("hello")
+    merged_sd = {'a': {'orig_col_name': 'foo', 'null_count': 2},
+                 'b': {'orig_col_name': 'bar', 'null_count': 0}}
+    fc._conn.execute(
+        "INSERT INTO files(path, mtime, metadata_json, merged_sd_blob) VALUES (?,?,?,?)",
+        (str(path_1), path_1.stat().st_mtime, '{}', fc._merged_sd_to_parquet_blob(merged_sd)))
+    assert fc.get_file_metadata(path_1)['merged_sd'] == merged_sd
+    assert fc.get_file_metadata(path_1, columns=['bar'])['merged_sd'] == {'b': merged_sd['b']}
+
+
+def test_sqlite_filecache_evict_to_budget_lru():
+    fc = SQLiteFileCache(":memory:")
+    paths = [create_tempfile_with_text(f"file {i}") for i in range(3)]
+    for i, p in enumerate(paths):
+        fc.upsert_file_metadata(p, {'merged_sd': {'a': {'orig_col_name': 'a', 'mode': 'x' * 100}}})
+        fc.upsert_keys([(100 + i, {'len': i}), (999, {'len': 0})])
+        fc.upsert_file_series_hashes(p, {'a': 100 + i, 'shared': 999})
+    # paths[0] was used most recently, paths[1] is the least recently used
+    for i, last_access in enumerate([300.0, 100.0, 200.0]):
+        fc._conn.execute("UPDATE files SET last_access=? WHERE path=?", (last_access, str(paths[i])))
+
+    total = fc.cache_bytes()
+    assert fc.evict_to_budget(total) == 0
+    assert fc.evict_to_budget(total - 1) == 1
+    assert fc.get_file_metadata(paths[1]) is None
+    assert fc.get_series_results(101) is None
+    # still referenced by the remaining files
+    assert fc.get_series_results(999) == {'len': 0}
+    assert fc.get_file_metadata(paths[0])['merged_sd']['a']['mode'] == 'x' * 100
+
+    assert fc.evict_to_budget(0) == 2
+    assert fc.cache_bytes() == 0
+
+
+def test_sqlite_filecache_check_file_bumps_last_access():
+    fc = SQLiteFileCache(":memory:")
+    path_1 = create_tempfile_with_text("hello")
+    fc.add_metadata(path_1, {'alpha': 1})
+    fc._conn.execute("UPDATE files SET last_access=0 WHERE path=?", (str(path_1),))
+    fc._last_access_written.clear()
+    assert fc.check_file(path_1)
+    (last_access,) = fc._conn.execute("SELECT last_access FROM files WHERE path=?", (str(path_1),)).fetchone()
+    assert last_access > time.time() - 60
+
+
+def test_sqlite_filecache_gc_orphan_series():
+    fc = SQLiteFileCache(":memory:")
+    path_1 = create_tempfile_with_text("hello")
+    fc.upsert_keys([(1, {'len': 1}), (2, {'len': 2}), (3, {'len': 3})])
+    fc.upsert_file_series_hashes(path_1, {'a': 1})
+    # the file's column changed, 1 is released
+    fc.upsert_file_series_hashes(path_1, {'a': 2})
+    # recently released results get a grace period
+    assert fc.gc_orphan_series(min_age_seconds=3600) == 0
+    assert fc.gc_orphan_series() == 1
+    assert fc.get_series_results(1) is None
+    assert fc.get_series_results(2) == {'len': 2}
+    # never referenced by a file, e.g. an in memory frame's results
+    assert fc.get_series_results(3) == {'len': 3}
+
+
+def test_sqlite_filecache_gc_keeps_series_another_file_references():
+    fc = SQLiteFileCache(":memory:")
+    path_1 = create_tempfile_with_text("hello")
+    path_2 = create_tempfile_with_text("hello again")
+    fc.upsert_keys([(1, {'len': 1})])
+    fc.upsert_file_series_hashes(path_1, {'a': 1})
+    fc.upsert_file_series_hashes(path_2, {'a': 1})
+    fc.remove_files([str(path_1)])
+    assert fc.get_file_metadata(path_1) is None
+    assert fc.gc_orphan_series() == 0
+    assert fc.get_series_results(1) == {'len': 1}
+    fc.remove_files([str(path_2)])
+    assert fc.gc_orphan_series() == 1
+    assert fc.get_series_results(1) is None
+
+
+def test_enforce_cache_budget(tmp_path):
+    from buckaroo.file_cache.cache_utils import enforce_cache_budget
+    fc = SQLiteFileCache(str(tmp_path / "file_cache.sqlite"))
+    path_1 = create_tempfile_with_text("hello")
+    fc.upsert_keys([(1, {'len': 1}), (2, {'len': 2}), (3, {'len': 3})])
+    fc.upsert_file_series_hashes(path_1, {'a': 2})
+    fc.upsert_file_series_hashes(path_1, {'a': 1})
+    fc._conn.execute("UPDATE released_series SET released_at=0")
+    fc._conn.commit()
+
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+    (spill_dir / "x-y-z.arrow").write_bytes(b"0" * 100)
+
+    assert enforce_cache_budget(fc, max_bytes=10**9, spill_dir=spill_dir) == {
+        'orphan_series': 1, 'files_evicted': 0, 'spills_evicted': 0}
+    assert fc.get_series_results(2) is None
+    assert fc.get_series_results(3) == {'len': 3}
+    assert enforce_cache_budget(fc, max_bytes=0, spill_dir=spill_dir) == {
+        'orphan_series': 0, 'files_evicted': 1, 'spills_evicted': 1}
+    assert fc.get_series_results(1) is None
+    # unreferenced results go too once evicting files isn't enough
+    assert fc.get_series_results(3) is None
+    assert fc.cache_bytes() == 0
+    assert list(spill_dir.iterdir()) == []
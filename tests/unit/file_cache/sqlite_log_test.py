@@ -57,3 +57,124 @@ def test_sqlite_executor_log_failure_and_previous_failure_check(tmp_path):
     assert log2.check_log_for_previous_failure(incomplete.dfi, incomplete.args) is True
 
 
+
+
+def _args(cols):
+    from buckaroo.file_cache.base import ExecutorArgs
+    return ExecutorArgs(columns=cols, column_specific_expressions=False, include_hash=False,
+                        expressions=[], row_start=None, row_end=None, extra=None)
+
+
+def test_sqlite_executor_log_dfi_events_incremental():
+    log = SQLiteExecutorLog(":memory:")
+    dfi, other = (1, "a.parquet"), (2, "b.parquet")
+    log.log_start_col_group(dfi, _args(['a']))
+    log.log_start_col_group(other, _args(['x']))
+    evs = log.get_dfi_log_events(dfi)
+    assert [ev.args.columns for ev in evs] == [['a']]
+    assert not evs[0].completed
+
+    # a pending event that completes later is refreshed, new events are appended
+    log.log_end_col_group(dfi, _args(['a']))
+    log.log_start_col_group(dfi, _args(['b']))
+    evs = log.get_dfi_log_events(dfi)
+    assert [(ev.args.columns, ev.completed) for ev in evs] == [(['a'], True), (['b'], False)]
+    # ids stringified by the json dfi key still match
+    assert len(log.get_dfi_log_events(("1", "a.parquet"))) == 2
+
+
+
+def test_sqlite_executor_log_bounds_histories_and_pending_lookups(monkeypatch):
+    import buckaroo.file_cache.sqlite_log as sqlite_log
+    monkeypatch.setattr(sqlite_log, "MAX_DFI_HISTORIES", 3)
+    monkeypatch.setattr(sqlite_log, "_SQLITE_MAX_PARAMS", 4)
+    log = SQLiteExecutorLog(":memory:")
+    for i in range(10):
+        log.get_dfi_log_events((i, f"{i}.parquet"))
+    assert len(log._histories) == 3
+
+    # more running events than fit in one IN (...) query
+    dfi = (99, "wide.parquet")
+    for i in range(10):
+        log.log_start_col_group(dfi, _args([f"c{i}"]))
+    assert len(log.get_dfi_log_events(dfi)) == 10
+    for i in range(0, 10, 2):
+        log.log_end_col_group(dfi, _args([f"c{i}"]))
+    evs = log.get_dfi_log_events(dfi)
+    assert [ev.completed for ev in evs] == [i % 2 == 0 for i in range(10)]
+
+def test_sqlite_executor_log_prune(tmp_path):
+    from datetime import datetime, timedelta
+    db_path = str(tmp_path / "exec_log.db")
+    log = SQLiteExecutorLog(db_path)
+    dfi = (1, "a.parquet")
+    for completed in (0, 1, 0, 1):
+        log.log_start_col_group(dfi, _args(['a']))
+        if completed:
+            log.log_end_col_group(dfi, _args(['a']))
+    log.log_start_col_group(dfi, _args(['b']))
+    old = (datetime.now() - timedelta(days=2)).isoformat()
+    ancient = (datetime.now() - timedelta(days=60)).isoformat()
+    log._conn.execute("UPDATE events SET start_time=?", (old,))
+    log._conn.execute("UPDATE events SET start_time=? WHERE columns_json=?", (ancient, '["b"]'))
+    log._conn.commit()
+
+    reopened = SQLiteExecutorLog(db_path)
+    evs = reopened.get_log_events()
+    # ['b'] is past retention, ['a'] is compacted to its newest completed and incomplete runs
+    assert sorted((ev.args.columns[0], ev.completed) for ev in evs) == [('a', False), ('a', True)]
+    assert reopened.check_log_for_previous_failure(dfi, _args(['a']))
+    assert reopened.check_log_for_completed(dfi, _args(['a']))
+
+
+def test_sqlite_executor_log_column_costs_persist_per_schema(tmp_path):
+    from buckaroo.file_cache.batch_planning import schema_key
+    db = str(tmp_path / "log.sqlite")
+    df = pl.DataFrame({'a1': [1,2,3], 'b2': [4,5,6]})
+    ex = Executor(df.lazy(), SimpleColumnExecutor(), lambda p: None, FileCache(),
+                  executor_log=SQLiteExecutorLog(db), planning_function=simple_one_column_planning)
+    ex.run()
+    ex.run()
+
+    # a new session and a different file with the same schema
+    key = schema_key(dict(pl.DataFrame({'a1': [7], 'b2': [8]}).schema))
+    costs = SQLiteExecutorLog(db).get_column_costs(key)
+    assert set(costs) == {'a1', 'b2'}
+    assert costs['a1'].runs == 1 and costs['a1'].dtype == 'Int64'
+    assert costs['a1'].total_rows == 0
+    assert SQLiteExecutorLog(db).get_column_costs(schema_key({'a1': pl.String})) == {}
+
+
+def test_sqlite_executor_log_failure_kind(tmp_path):
+    from buckaroo.file_cache.base import ExecutorArgs
+    from buckaroo.file_cache.batch_planning import extract_execution_history
+    log = SQLiteExecutorLog(str(tmp_path / "log.sqlite"))
+    dfi = (1, "f.csv")
+    args = ExecutorArgs(columns=['a'], column_specific_expressions=False, include_hash=True,
+                        expressions=[], row_start=None, row_end=None, extra=None)
+    other = ExecutorArgs(columns=['b'], column_specific_expressions=False, include_hash=True,
+                         expressions=[], row_start=None, row_end=None, extra=None)
+    log.log_start_col_group(dfi, args)
+    log.log_failed_col_group(dfi, args, "oom")
+    log.log_start_col_group(dfi, other)
+
+    history = extract_execution_history(SQLiteExecutorLog(str(tmp_path / "log.sqlite")), dfi)
+    assert [(r.columns, r.error, r.timed_out) for r in history] == [(['a'], "oom", False), (['b'], None, True)]
+    # still counts as a previous failure
+    assert log.check_log_for_previous_failure(dfi, args)
+
+
+def test_sqlite_executor_log_cancelled_group_is_forgotten():
+    log = SQLiteExecutorLog(":memory:")
+    dfi = (1, "a.parquet")
+    log.log_start_col_group(dfi, _args(['a']))
+    log.log_start_col_group(dfi, _args(['b']))
+    assert len(log.get_dfi_log_events(dfi)) == 2
+    log.log_cancelled_col_group(dfi, _args(['b']))
+    # dropped from the cached history too, it was pending there
+    assert [ev.args.columns for ev in log.get_dfi_log_events(dfi)] == [['a']]
+    assert not log.check_log_for_previous_failure(dfi, _args(['b']))
+    # completed groups are kept
+    log.log_end_col_group(dfi, _args(['a']))
+    log.log_cancelled_col_group(dfi, _args(['a']))
+    assert log.check_log_for_completed(dfi, _args(['a']))
@@ -5,12 +5,20 @@ These tests use simulated execution results - no actual timeouts or multiprocess
 """
 from datetime import timedelta
 
+import polars as pl
+
+from buckaroo.file_cache.base import Executor, MemoryFileCache
 from buckaroo.file_cache.batch_planning import (
+    ColumnBatch,
     ExecutionResult,
     PlanningContext,
+    PlanningResult,
     default_planning_function,
+    prioritized_columns,
     smart_planning_function,
+    without_in_flight,
 )
+from .executor_test_utils import SimpleColumnExecutor
 
 
 def test_baseline_measurement():
@@ -280,3 +288,45 @@ def test_extract_execution_history_function():
     # For now, just verify the function exists and has correct signature
     from buckaroo.file_cache.batch_planning import extract_execution_history
     assert callable(extract_execution_history)
+
+
+def test_without_in_flight_drops_running_groups():
+    """Open events of running groups aren't timeouts, earlier real timeouts stay."""
+    old_timeout = ExecutionResult(columns=['a'], success=False, execution_time=timedelta(seconds=30), timed_out=True)
+    done = ExecutionResult(columns=['b'], success=True, execution_time=timedelta(seconds=1), timed_out=False)
+    running = ExecutionResult(columns=['a'], success=False, execution_time=timedelta(seconds=30), timed_out=True)
+    history = [old_timeout, done, running]
+    assert without_in_flight(history, [['a']]) == [old_timeout, done]
+    assert without_in_flight(history, []) == history
+
+
+def test_prioritized_columns():
+    remaining = ['a', 'b', 'c', 'd']
+    assert prioritized_columns(remaining, ['c', 'a', 'c', 'z']) == ['c', 'a']
+    # nothing visible left to compute, plan the rest
+    assert prioritized_columns(remaining, ['z']) == remaining
+    assert prioritized_columns(remaining, []) == remaining
+
+
+def test_priority_columns_preempt_queued_batches():
+    """Changing the priority drops queued batches and plans the priority columns first."""
+    def queue_all(context: PlanningContext) -> PlanningResult:
+        batches = [ColumnBatch(columns=[c], expected_duration=timedelta(seconds=1)) for c in context.remaining_columns]
+        return PlanningResult(batches=batches, phase="queue_all", notes="")
+
+    ldf = pl.DataFrame({c: [1, 2, 3] for c in 'abcdef'}).lazy()
+    ex = Executor(ldf, SimpleColumnExecutor(), lambda note: None, MemoryFileCache(), planning_function=queue_all)
+    ex.set_priority_columns(['d', 'e'])
+    assert ex.get_next_column_chunk() == ['d']
+    ex._update_planning_state_after_execution(['d'])
+    assert ex.get_next_column_chunk() == ['e']
+    ex._update_planning_state_after_execution(['e'])
+    # the rest in schema order once the priority columns are done
+    assert ex.get_next_column_chunk() == ['a']
+    ex._update_planning_state_after_execution(['a'])
+
+    # scrolled right while b, c and f were queued
+    ex.set_priority_columns(['f'])
+    assert ex.get_next_column_chunk() == ['f']
+    ex._update_planning_state_after_execution(['f'])
+    assert ex.get_next_column_chunk() == ['b']
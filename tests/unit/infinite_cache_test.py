@@ -0,0 +1,144 @@
+import threading
+import time
+
+import polars as pl
+
+from buckaroo.infinite_cache import (
+    SliceCache, SortIndexCache, adjacent_windows, filtered_rows, gather_window, sort_permutation)
+
+
+def _wait_for(pred, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not pred() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return pred()
+
+
+def test_sort_permutation_matches_sort():
+    df = pl.DataFrame({'x': [3, None, 1, 5, 2], 'y': list('abcde')})
+    for descending in (False, True):
+        perm = sort_permutation(df.lazy(), 'x', descending)
+        assert perm.dtype == pl.UInt32
+        expected = df.sort('x', descending=descending)
+        assert df[perm].equals(expected)
+
+
+def test_gather_window():
+    ldf = pl.DataFrame({'x': [30, 10, 20, 50, 40]}).lazy()
+    perm = sort_permutation(ldf, 'x', False)
+    assert gather_window(ldf, perm, 1, 3)['x'].to_list() == [20, 30]
+    assert gather_window(ldf, None, 1, 3)['x'].to_list() == [10, 20]
+    # windows past the end are clipped
+    assert gather_window(ldf, perm, 4, 10)['x'].to_list() == [50]
+
+
+
+def test_gather_window_reads_slices_of_a_scan(tmp_path, monkeypatch):
+    path = tmp_path / "t.parquet"
+    df = pl.DataFrame({'x': list(range(300_000, 0, -1)), 'y': list(range(300_000))})
+    df.write_parquet(path, row_group_size=10_000)
+    ldf = pl.scan_parquet(path)
+    perm = sort_permutation(ldf, 'y', True)
+
+    plans = []
+    collect = pl.LazyFrame.collect
+
+    def recording_collect(self, *args, **kwargs):
+        plans.append(self.explain())
+        return collect(self, *args, **kwargs)
+    monkeypatch.setattr(pl.LazyFrame, "collect", recording_collect)
+    window = gather_window(ldf, perm, 100, 110)
+    assert window.equals(df[perm.slice(100, 10)])
+    # every read is a slice pushed into the scan, nothing gathers over the whole file
+    assert plans and all("SLICE: Positive" in p and ".gather(" not in p for p in plans)
+
+    # a materialized frame is gathered from directly
+    assert gather_window(df, perm, 100, 110).equals(window)
+    assert gather_window(df, perm, 5, 5).height == 0
+
+def test_filtered_rows():
+    ldf = pl.DataFrame({'x': [30, 10, 20, 50, 40]}).lazy()
+    rows = filtered_rows(ldf, pl.col('x') > 15, None, False)
+    assert rows.to_list() == [0, 2, 3, 4]
+    # matching rows in sort order, so a window is a slice of them
+    rows = filtered_rows(ldf, pl.col('x') > 15, 'x', True)
+    assert gather_window(ldf, rows, 0, 2)['x'].to_list() == [50, 40]
+
+
+def test_sort_index_cache_filtered_rows():
+    ldf = pl.DataFrame({'x': list(range(10))}).lazy()
+    cache = SortIndexCache()
+    rows = cache.get_rows(ldf, 'even', pl.col('x') % 2 == 0)
+    assert rows.to_list() == [0, 2, 4, 6, 8]
+    assert cache.get_rows(ldf, 'even', pl.col('x') % 2 == 0) is rows
+    desc = cache.get_rows(ldf, 'even', pl.col('x') % 2 == 0, 'x', True)
+    assert desc.to_list() == [8, 6, 4, 2, 0]
+    # filtered rows and the plain permutation are separate entries
+    cache.get(ldf, 'x', True)
+    assert len(cache) == 3
+
+
+def test_sort_index_cache_reuses_and_evicts():
+    ldf = pl.DataFrame({'a': list(range(100)), 'b': list(range(100))}).lazy()
+    # room for two 100 row UInt32 permutations
+    cache = SortIndexCache(max_bytes=800)
+    perm_a = cache.get(ldf, 'a', False)
+    assert cache.get(ldf, 'a', False) is perm_a
+    cache.get(ldf, 'a', True)
+    assert len(cache) == 2 and cache.nbytes == 800
+
+    # a third evicts the least recently used, ('a', True)
+    cache.get(ldf, 'a', False)
+    cache.get(ldf, 'b', False)
+    assert len(cache) == 2
+    assert cache.get(ldf, 'a', False) is perm_a
+
+
+def test_slice_cache_reuses_and_evicts():
+    cache = SliceCache(max_bytes=20)
+    calls = []
+    def encoder(buf):
+        def encode():
+            calls.append(buf)
+            return buf
+        return encode
+
+    assert cache.get((None, None, 0, 10), encoder(b'a' * 10)) == b'a' * 10
+    assert cache.get((None, None, 0, 10), encoder(b'x' * 10)) == b'a' * 10
+    assert calls == [b'a' * 10] and (cache.hits, cache.misses) == (1, 1)
+
+    cache.get((None, None, 10, 20), encoder(b'b' * 10))
+    cache.get((None, None, 0, 10), encoder(b'x'))
+    # the least recently used window goes when a third doesn't fit
+    cache.get((None, None, 20, 30), encoder(b'c' * 10))
+    assert (None, None, 10, 20) not in cache
+    assert (None, None, 0, 10) in cache and cache.nbytes == 20
+
+
+def test_slice_cache_prefetch_and_clear():
+    cache = SliceCache()
+    cache.prefetch([('k1', lambda: b'one'), ('k2', lambda: b'two')])
+    assert _wait_for(lambda: len(cache) == 2)
+    assert cache.get('k2', lambda: b'never') == b'two'
+
+    # windows encoded from data since cleared aren't cached
+    release = threading.Event()
+    def slow():
+        release.wait(5)
+        return b'stale'
+    cache.prefetch([('k3', slow)])
+    cache.clear()
+    release.set()
+    time.sleep(0.1)
+    assert len(cache) == 0
+
+
+def test_adjacent_windows():
+    # forward, or the first request, looks ahead first
+    assert adjacent_windows(100, 150, 50, 1000, None) == [(150, 200), (50, 100)]
+    assert adjacent_windows(100, 150, 50, 1000, 50) == [(150, 200), (50, 100)]
+    # scrolling back looks behind first
+    assert adjacent_windows(100, 150, 50, 1000, 150) == [(50, 100), (150, 200)]
+    # nothing before the first row or past the last
+    assert adjacent_windows(0, 50, 50, 60, None) == [(50, 100)]
+    assert adjacent_windows(50, 100, 50, 60, None) == [(0, 50)]
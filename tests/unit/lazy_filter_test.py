@@ -0,0 +1,54 @@
+import polars as pl
+import pytest
+
+from buckaroo.lazy_filter import RowFilter, row_filter_from_state
+
+
+def _matches(row_filter, df):
+    return df.filter(row_filter.expr(df.schema))
+
+
+def test_search_matches_string_columns():
+    df = pl.DataFrame({'a': ['foo', 'bar', None], 'b': ['xx', 'food', 'baz'], 'n': [1, 2, 3]})
+    assert _matches(RowFilter(search='foo'), df)['n'].to_list() == [1, 2]
+    # case sensitive and literal, like the pandas Search command
+    assert _matches(RowFilter(search='FOO'), df).height == 0
+    assert _matches(RowFilter(search='.a'), df).height == 0
+    # without string columns nothing matches
+    assert _matches(RowFilter(search='1'), df.select('n')).height == 0
+
+
+def test_search_matches_categorical_and_enum_columns():
+    df = pl.DataFrame({
+        'c': pl.Series(['foo', 'bar', 'baz'], dtype=pl.Categorical),
+        'e': pl.Series(['x', 'food', 'y'], dtype=pl.Enum(['x', 'y', 'food'])),
+        'n': [1, 2, 3]})
+    assert _matches(RowFilter(search='foo'), df)['n'].to_list() == [1, 2]
+
+
+def test_column_filters_and_nulls():
+    df = pl.DataFrame({'x': [1, None, 3, 4], 's': ['a', 'b', None, 'ab']})
+    assert _matches(RowFilter(column_filters=(('x', '>=', 3),)), df)['x'].to_list() == [3, 4]
+    assert _matches(RowFilter(column_filters=(('x', 'is_null', None),)), df).height == 1
+    assert _matches(RowFilter(column_filters=(('x', 'in', (1, 4)),)), df)['x'].to_list() == [1, 4]
+    # terms are ANDed
+    both = RowFilter(search='a', column_filters=(('x', '!=', 1),))
+    assert _matches(both, df)['x'].to_list() == [4]
+
+
+def test_row_filter_from_state():
+    rw_to_orig = {'a': 'name', 'b': 'v'}
+    assert row_filter_from_state({'search_string': '', 'column_filters': []}, rw_to_orig) is None
+    assert row_filter_from_state({'quick_command_args': {'search': ['x']}}, rw_to_orig) == RowFilter(search='x')
+
+    state = {'search_string': 'x', 'column_filters': [{'col': 'b', 'op': 'in', 'val': [1, 2]}]}
+    row_filter = row_filter_from_state(state, rw_to_orig)
+    assert row_filter.column_filters == (('v', 'in', (1, 2)),)
+    # equal states share cache entries
+    assert row_filter.key == row_filter_from_state(dict(state), rw_to_orig).key
+    assert row_filter.key != RowFilter(search='x').key
+
+    with pytest.raises(ValueError, match="unknown column"):
+        row_filter_from_state({'column_filters': [{'col': 'v', 'op': '=='}]}, rw_to_orig)
+    with pytest.raises(ValueError, match="unknown op"):
+        row_filter_from_state({'column_filters': [{'col': 'b', 'op': 'like'}]}, rw_to_orig)
@@ -1,8 +1,10 @@
+import time
 import polars as pl
 
 from buckaroo.lazy_infinite_polars_widget import LazyInfinitePolarsBuckarooWidget
 from buckaroo.file_cache.base import FileCache
 from buckaroo.read_utils import read_df
+from buckaroo.df_util import old_col_new_col
 from pathlib import Path
 from buckaroo.file_cache.base import Executor as _Exec
 from tests.unit.file_cache.executor_test_utils import wait_for_nested_executor_finish
@@ -10,7 +12,7 @@ from tests.unit.file_cache.executor_test_utils import wait_for_nested_executor_f
 
 def _capture_sends(widget):
     sent = []
-    def _send(payload, buffers):
+    def _send(payload, buffers=None):
         sent.append((payload, buffers))
     widget.send = _send  # type: ignore[attr-defined]
     return sent
@@ -409,3 +411,179 @@ def test_column_subset_filters_cached_columns(tmp_path):
     # Also check that the widget's df_meta reflects the correct column count
     assert bw2.df_meta['columns'] == 3, f"bw2 should report 3 columns, got {bw2.df_meta['columns']}"
 
+
+
+def test_viewport_message_prioritizes_visible_columns():
+    df = pl.DataFrame({'first': [1, 2], 'second': [3, 4], 'third': [5, 6]})
+    w = LazyInfinitePolarsBuckarooWidget(df.lazy())
+    rw = w._orig_to_rw
+    # the grid reports rewritten names, plus the index column
+    w._handle_viewport(['index', rw['third'], rw['second']])
+    assert w._df.priority_columns == ['third', 'second']
+    assert w._df.executor._priority_columns == ['third', 'second']
+
+
+def test_close_and_replacement_cancel_computation():
+    from buckaroo.lazy_infinite_polars_widget import _replace_cell_widget
+    df = pl.DataFrame({'a': [1, 2, 3]})
+    w1 = LazyInfinitePolarsBuckarooWidget(df.lazy())
+    w2 = LazyInfinitePolarsBuckarooWidget(df.lazy())
+    _replace_cell_widget("cell-1", w1)
+    assert not w1._df.executor.cancel_token.cancelled
+    # re-running the cell displays w2 in place of w1
+    _replace_cell_widget("cell-1", w2)
+    assert w1._df.executor.cancel_token.cancelled
+    assert not w2._df.executor.cancel_token.cancelled
+    w2.close()
+    assert w2._df.executor.cancel_token.cancelled
+
+
+def test_progress_sends_only_changed_columns(monkeypatch):
+    from buckaroo.dataflow.summary_delta import SummaryDeltaBuffer
+    df = pl.DataFrame({'a': [1, 2, 3], 'b': [4, 5, 6]})
+    w = LazyInfinitePolarsBuckarooWidget(df.lazy())
+    sent = []
+    monkeypatch.setattr(w, 'send', sent.append)
+    w._summary_deltas = SummaryDeltaBuffer(w._apply_summary_delta, window_secs=60)
+
+    delta = {'a': {**w._df.merged_sd['a'], 'mean': 42.0}}
+    w._df.merged_sd.update(delta)
+    w._df.progress_update_callback(delta)
+    msg = sent[-1]
+    assert msg['type'] == 'summary_delta'
+    # only column a's cells travel
+    assert all(set(row) <= {'index', 'level_0', 'a'} for row in msg['all_stats'])
+    mean_row = next(row for row in w.df_data_dict['all_stats'] if row['index'] == 'mean')
+    assert mean_row['a'] == 42.0
+
+    # updates inside the window are held back until the run is over
+    w._df.progress_update_callback({'b': {**w._df.merged_sd['b'], 'mean': 7.0}})
+    assert len(sent) == 1
+    w._df.progress_done_callback()
+    assert len(sent) == 2
+    assert mean_row['b'] == 7.0
+    assert mean_row['a'] == 42.0
+
+
+def test_sorted_windows_reuse_permutation(monkeypatch):
+    df = pl.DataFrame({'v': [7, 3, 9, 1, 5, 8, 2, 6, 4, 0]})
+    w = LazyInfinitePolarsBuckarooWidget(df.lazy())
+    captured = _capture_sends(w)
+    rw = w._orig_to_rw['v']
+
+    w._handle_payload_args({'start': 0, 'end': 4, 'sort': rw, 'sort_direction': 'desc'})
+
+    # later windows gather through the cached permutation instead of sorting
+    def no_sort(self, *args, **kwargs):
+        raise AssertionError("LazyFrame.sort called for a cached sort")
+    monkeypatch.setattr(pl.LazyFrame, "sort", no_sort)
+    w._handle_payload_args({'start': 4, 'end': 8, 'sort': rw, 'sort_direction': 'desc',
+                            'second_request': {'start': 8, 'end': 10}})
+
+    windows = [pl.read_parquet(buffers[0]) for _, buffers in captured]
+    assert [out[rw].to_list() for out in windows] == [[9, 8, 7, 6], [5, 4, 3, 2], [1, 0]]
+    assert windows[1]['index'].to_list() == [4, 5, 6, 7]
+    assert len(w._sort_index) == 1
+
+
+def test_windows_served_from_slice_cache():
+    df = pl.DataFrame({'v': list(range(100))})
+    w = LazyInfinitePolarsBuckarooWidget(df.lazy())
+    captured = _capture_sends(w)
+    rw = w._orig_to_rw['v']
+
+    w._handle_payload_args({'start': 0, 'end': 20, 'origEnd': 10})
+    # the next block is encoded in the background before the grid asks for it
+    deadline = time.monotonic() + 5
+    while (None, None, None, 10, 30) not in w._slice_cache and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert (None, None, None, 10, 30) in w._slice_cache
+
+    w._handle_payload_args({'start': 10, 'end': 30, 'origEnd': 20})
+    w._handle_payload_args({'start': 0, 'end': 20, 'origEnd': 10})
+    assert w._slice_cache.misses == 1 and w._slice_cache.hits == 2
+    windows = [pl.read_parquet(buffers[0]) for _, buffers in captured]
+    assert windows[1][rw].to_list() == list(range(10, 30))
+    assert windows[1]['index'].to_list() == list(range(10, 30))
+    assert windows[2].equals(windows[0])
+
+
+def test_filtered_windows_page_through_cached_matches(monkeypatch):
+    df = pl.DataFrame({'name': [f"row{i}" for i in range(100)], 'v': list(range(100))})
+    w = LazyInfinitePolarsBuckarooWidget(df.lazy())
+    captured = _capture_sends(w)
+    name_rw, v_rw = w._orig_to_rw['name'], w._orig_to_rw['v']
+    # names containing a 7 with v below 80
+    w.buckaroo_state = {'search_string': '7', 'quick_command_args': {},
+                        'column_filters': [{'col': v_rw, 'op': '<', 'val': 80}]}
+    expected = [i for i in range(80) if '7' in str(i)]
+
+    w._handle_payload_args({'start': 0, 'end': 5, 'sort': v_rw, 'sort_direction': 'desc'})
+    assert captured[0][0]['length'] == len(expected)
+    assert w.df_meta['filtered_rows'] == len(expected)
+    assert w.df_meta['total_rows'] == 100
+
+    # later windows page through the cached row ids instead of filtering again
+    def no_filter(self, *args, **kwargs):
+        raise AssertionError("LazyFrame.filter called for a cached filter")
+    monkeypatch.setattr(pl.LazyFrame, "filter", no_filter)
+    w._handle_payload_args({'start': 5, 'end': 20, 'sort': v_rw, 'sort_direction': 'desc'})
+
+    windows = [pl.read_parquet(buffers[0]) for _, buffers in captured]
+    assert [v for out in windows for v in out[v_rw].to_list()] == expected[::-1]
+    assert windows[0][name_rw].to_list() == [f"row{i}" for i in expected[::-1][:5]]
+    assert len(w._sort_index) == 1
+
+
+def test_quick_command_search_and_bad_filters():
+    df = pl.DataFrame({'name': ['apple', 'banana', 'cherry', None], 'v': [1, 2, 3, 4]})
+    w = LazyInfinitePolarsBuckarooWidget(df.lazy())
+    captured = _capture_sends(w)
+    name_rw = w._orig_to_rw['name']
+
+    # the StatusBar search box sets quick_command_args
+    w.buckaroo_state = {'search_string': '', 'quick_command_args': {'search': ['an']}, 'column_filters': []}
+    w._handle_payload_args({'start': 0, 'end': 10})
+    assert pl.read_parquet(captured[-1][1][0])[name_rw].to_list() == ['banana']
+
+    w.buckaroo_state = {'search_string': '', 'quick_command_args': {},
+                        'column_filters': [{'col': 'nope', 'op': '==', 'val': 1}]}
+    w._handle_payload_args({'start': 0, 'end': 10})
+    assert "unknown column" in captured[-1][0]['error_info']
+
+    # clearing the filter shows every row again
+    w.buckaroo_state = {'search_string': '', 'quick_command_args': {}, 'column_filters': []}
+    w._handle_payload_args({'start': 0, 'end': 10})
+    assert captured[-1][0]['length'] == 4
+    assert w.df_meta['filtered_rows'] == 4
+
+
+def test_wide_cached_file_reads_visible_columns_first(tmp_path):
+    from buckaroo.file_cache.cached_summary import CACHED_SUMMARY_CHUNK
+    cols = [f"c{i}" for i in range(CACHED_SUMMARY_CHUNK + 10)]
+    df = pl.DataFrame({c: [i, i + 1] for i, c in enumerate(cols)})
+    fpath = tmp_path / "wide.parquet"
+    df.write_parquet(fpath)
+    orig_to_rw = dict(old_col_new_col(pl.DataFrame({c: [] for c in cols})))
+    fc = FileCache()
+    fc.upsert_file_metadata(fpath, {'merged_sd': {
+        rw: {'orig_col_name': orig, 'rewritten_col_name': rw, 'mean': float(i)}
+        for i, (orig, rw) in enumerate(orig_to_rw.items())}})
+
+    class FailingExec(_Exec):
+        def run(self, cancel_token=None):  # type: ignore[override]
+            raise RuntimeError("only the cache is read in this test")
+
+    w = LazyInfinitePolarsBuckarooWidget(pl.scan_parquet(fpath), file_path=str(fpath), file_cache=fc,
+                                         sync_executor_class=FailingExec, parallel_executor_class=FailingExec)
+    first, last = orig_to_rw['c0'], orig_to_rw[cols[-1]]
+    assert w._df.merged_sd[first]['mean'] == 0.0
+    # past the first chunk only placeholders until the grid scrolls there
+    assert w._df.merged_sd[last]['__status__'] == 'pending'
+    assert not w._cached_summary.is_loaded(last)
+
+    sent = _capture_sends(w)
+    w._handle_viewport([last])
+    assert w._df.merged_sd[last]['mean'] == float(len(cols) - 1)
+    assert '__status__' not in w._df.merged_sd[last]
+    assert sent and sent[-1][0]['type'] == 'summary_delta'
@@ -200,6 +200,26 @@ def test_numeric_histograms():
     assert histogram_bins != ['faked'], "Should have real histogram_bins, not fake"
 
 
+def test_histogram_select_clauses_match_series_histogram():
+    """HistogramAnalysis' lazy expressions give the same histogram_args as normalize_polars_histogram_ser"""
+    from buckaroo.customizations.polars_analysis import normalize_polars_histogram_ser
+    rng = np.random.default_rng(42)
+    hist_df = pl.DataFrame({
+        'floats': rng.standard_normal(500),
+        'ints': rng.integers(-300, 300, 500),
+        'constant': [7] * 500,
+        'with_nulls': pl.Series([None, 1.5, 2.5, 8.0, 3.0] * 100)})
+    summary_df, errs = PolarsAnalysisPipeline.full_produce_summary_df(hist_df, HA_CLASSES)
+    for rw, col in zip('abcd', hist_df.columns):
+        expected = normalize_polars_histogram_ser(hist_df[col])
+        actual = summary_df[rw]['histogram_args']
+        assert actual['low_tail'] == expected['low_tail']
+        assert actual['high_tail'] == expected['high_tail']
+        assert list(actual['meat_histogram'][0]) == list(expected['meat_histogram'][0])
+        np.testing.assert_allclose(actual['meat_histogram'][1], expected['meat_histogram'][1])
+        np.testing.assert_allclose(actual['normalized_populations'], expected['normalized_populations'])
+
+
 def Xtest_numeric_histograms():
     """
     The Polars implementations of histograms have been very unstable in the 1.0 release series.
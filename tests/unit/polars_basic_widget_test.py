@@ -78,6 +78,54 @@ def test_polars_infinite():
     pbw = PolarsBuckarooInfiniteWidget(bool_df)
     pbw._handle_payload_args({'start':0, 'end':3})
 
+def test_polars_infinite_slice_cache():
+    df = pl.DataFrame({'a': [5, 3, 1, 4, 2, 0]})
+    pbw = PolarsBuckarooInfiniteWidget(df)
+    sent = []
+    pbw.send = lambda payload, buffers=None: sent.append((payload, buffers))
+
+    pbw._handle_payload_args({'start':0, 'end':3, 'sort':'a', 'sort_direction':'asc'})
+    pbw._handle_payload_args({'start':0, 'end':3, 'sort':'a', 'sort_direction':'asc'})
+    assert pbw._slice_cache.hits == 1
+    first, second = [pl.read_parquet(buffers[0]) for _, buffers in sent]
+    assert first['a'].to_list() == [0, 1, 2] and first.equals(second)
+    assert first['index'].to_list() == [5, 2, 4]
+
+    # the unsorted second_request is answered too
+    pbw._handle_payload_args({'start':0, 'end':2, 'second_request': {'start':4, 'end':6}})
+    assert pl.read_parquet(sent[-1][1][0])['a'].to_list() == [2, 0]
+
+    # a new processed_df makes the cached windows stale
+    _unused, processed_df, merged_sd = pbw.dataflow.widget_args_tuple
+    new_df = processed_df.with_columns(pl.col('a') * 10)
+    pbw.dataflow.widget_args_tuple = (id(new_df), new_df, merged_sd)
+    assert len(pbw._slice_cache) == 0
+    pbw._handle_payload_args({'start':0, 'end':3, 'sort':'a', 'sort_direction':'asc'})
+    assert pl.read_parquet(sent[-1][1][0])['a'].to_list() == [0, 10, 20]
+
+def test_polars_infinite_indexes_once(monkeypatch):
+    df = pl.DataFrame({'a': [5, 3, 1, 4, 2, 0]})
+    pbw = PolarsBuckarooInfiniteWidget(df)
+    sent = []
+    pbw.send = lambda payload, buffers=None: sent.append((payload, buffers))
+    calls = []
+    index_frame = pbw._index_frame
+    monkeypatch.setattr(pbw, '_index_frame', lambda processed_df: calls.append(1) or index_frame(processed_df))
+
+    pbw._handle_payload_args({'start':0, 'end':3})
+    pbw._handle_payload_args({'start':0, 'end':3})
+    pbw._handle_payload_args({'start':3, 'end':6})
+    assert len(calls) == 1
+    assert pl.read_parquet(sent[-1][1][0])['index'].to_list() == [3, 4, 5]
+
+    # a new processed_df is indexed again
+    _unused, processed_df, merged_sd = pbw.dataflow.widget_args_tuple
+    new_df = processed_df.with_columns(pl.col('a') * 10)
+    pbw.dataflow.widget_args_tuple = (id(new_df), new_df, merged_sd)
+    pbw._handle_payload_args({'start':0, 'end':3})
+    assert len(calls) == 2
+    assert pl.read_parquet(sent[-1][1][0])['a'].to_list() == [50, 30, 10]
+
 def Xtest_polars_index_col():
     df = pl.DataFrame({'bools':[True, True, False, False, True, None],
                        'index':[   0,    1,     2,     3,    4,    5]